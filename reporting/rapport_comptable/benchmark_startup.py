@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure du temps de démarrage (python -X importtime)
+
+Vérifie, pour chaque chemin de démarrage, le temps cumulé des imports et
+l'absence des bibliothèques lourdes qui ne doivent se charger qu'à leur étape.
+
+Chemins mesurés:
+    help     main.py --help
+    sans-ui  imports du mode --sans-ui jusqu'au calcul de la balance
+             (main, sécurité, parser, traitement) - sans openpyxl/pptx/tkinter
+
+Usage:
+    python benchmark_startup.py            # rapport + code de sortie 1 si budget dépassé
+    python benchmark_startup.py --top 15   # afficher les 15 imports les plus coûteux
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BASE_DIR = Path(__file__).parent
+
+# Budgets de démarrage (secondes, temps cumulé des imports de premier niveau)
+STARTUP_BUDGETS = {
+    'help': 0.3,
+    'sans-ui': 1.5,
+}
+
+# Bibliothèques qui ne doivent pas être chargées sur ces chemins
+FORBIDDEN_MODULES = {
+    'help': ['tkinter', 'pptx', 'PIL', 'pdf2image', 'openpyxl', 'pandas'],
+    'sans-ui': ['tkinter', 'pptx', 'PIL', 'pdf2image', 'openpyxl'],
+}
+
+STARTUP_COMMANDS = {
+    'help': [str(BASE_DIR / "main.py"), "--help"],
+    'sans-ui': ["-c", "import main; from modules import sage_parser, data_processor"],
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Analyse la sortie de -X importtime
+
+    Returns:
+        Liste (module, profondeur, temps cumulé en µs)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            cumulative = int(cumulative)
+        except ValueError:
+            # Ligne d'en-tête
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, cumulative))
+    return imports
+
+
+def measure_startup(path: str) -> Dict:
+    """
+    Lance un chemin de démarrage sous -X importtime
+
+    Args:
+        path: Nom du chemin ('help' ou 'sans-ui')
+
+    Returns:
+        Dictionnaire {'total_s', 'modules', 'imports'}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *STARTUP_COMMANDS[path]],
+        cwd=BASE_DIR, capture_output=True, text=True, timeout=120
+    )
+    imports = parse_importtime(result.stderr)
+
+    # Le premier niveau d'import (profondeur 0) porte le temps cumulé total
+    total_us = sum(cumulative for _, depth, cumulative in imports if depth == 0)
+
+    return {
+        'total_s': total_us / 1_000_000,
+        'modules': {name for name, _, _ in imports},
+        'imports': imports,
+    }
+
+
+def check_startup(path: str, measure: Dict) -> List[str]:
+    """Retourne les violations (budget dépassé, bibliothèque chargée trop tôt)"""
+    violations = []
+
+    if measure['total_s'] > STARTUP_BUDGETS[path]:
+        violations.append(
+            f"{path}: {measure['total_s']:.3f}s > budget {STARTUP_BUDGETS[path]:.3f}s"
+        )
+
+    for module in FORBIDDEN_MODULES[path]:
+        if module in measure['modules']:
+            violations.append(f"{path}: '{module}' importé au démarrage")
+
+    return violations
+
+
+def main():
+    """Point d'entrée du benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark du temps de démarrage")
+    parser.add_argument('--top', type=int, default=10, help="Nombre d'imports les plus coûteux affichés")
+    args = parser.parse_args()
+
+    violations = []
+    for path in STARTUP_COMMANDS:
+        measure = measure_startup(path)
+        violations.extend(check_startup(path, measure))
+
+        print(f"⏱️  {path}: {measure['total_s']:.3f}s (budget {STARTUP_BUDGETS[path]:.3f}s)")
+        top_level = sorted((i for i in measure['imports'] if i[1] == 0), key=lambda i: -i[2])
+        for name, _, cumulative in top_level[:args.top]:
+            print(f"     {cumulative / 1000:8.1f} ms  {name}")
+
+    if violations:
+        print()
+        for violation in violations:
+            print(f"❌ {violation}")
+        sys.exit(1)
+
+    print("✅ Budgets de démarrage respectés")
+
+
+if __name__ == "__main__":
+    main()
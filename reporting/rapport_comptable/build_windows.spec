@@ -9,6 +9,10 @@ Usage sur Windows:
     pyinstaller build_windows.spec
 
 Le fichier .exe sera créé dans le dossier dist/
+
+Les modules lourds (tkinter, openpyxl, python-pptx, PIL) sont importés à
+l'étape qui les utilise; vérifier les budgets de démarrage avant le build:
+    python benchmark_startup.py
 """
 
 import sys
@@ -11,8 +11,12 @@ sous forme de mappings directs pour des performances optimales.
 """
 
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Callable, Optional
 from enum import Enum
+import hashlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -171,3 +175,98 @@ def get_all_cr_regles() -> Dict[str, List[RegleCorrespondance]]:
         "CHARGES": CR_CHARGES_REGLES,
         "PRODUITS": CR_PRODUITS_REGLES
     }
+
+
+# ===========================
+# CONFIGURATION APPLICATIVE (config.json)
+# ===========================
+
+CONFIG_FILE = Path(__file__).parent / "config.json"
+
+
+@lru_cache(maxsize=None)
+def load_app_config() -> Dict:
+    """
+    Charge config.json une seule fois par processus
+
+    Returns:
+        Dictionnaire de configuration (vide si le fichier est absent ou illisible)
+    """
+    if not CONFIG_FILE.exists():
+        logger.warning(f"Fichier de configuration introuvable: {CONFIG_FILE}")
+        return {}
+
+    try:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture de {CONFIG_FILE.name}: {e}")
+        return {}
+
+
+@dataclass
+class AnnexeConfig:
+    """
+    Définition d'une annexe du rapport PowerPoint
+
+    Attributes:
+        titre: Titre de la slide (ex: "Annexe 2 : Dettes Fournisseurs")
+        prefixes: Préfixes de comptes à lister (ex: ["401"])
+    """
+    titre: str
+    prefixes: List[str]
+
+
+ANNEXES_PAR_DEFAUT = [
+    AnnexeConfig("Annexe 1 : Décaissements à justifier", ["47"]),
+    AnnexeConfig("Annexe 2 : Dettes Fournisseurs", ["401"]),
+    AnnexeConfig("Annexe 3 : Autres dettes, Préfinancement", ["42", "43", "44"]),
+    AnnexeConfig("Annexe 4 : Créditeurs divers", ["471", "472", "473"]),
+]
+
+ANNEXE_LIGNES_PAR_SLIDE = 18
+
+
+def get_annexes_config() -> List[AnnexeConfig]:
+    """
+    Retourne la liste des annexes à générer
+
+    La liste peut être redéfinie dans config.json (powerpoint.annexes), par exemple:
+    [{"titre": "Annexe 1 : Clients", "prefixes": ["411"]}]
+    """
+    annexes = load_app_config().get('powerpoint', {}).get('annexes')
+    if not annexes:
+        return ANNEXES_PAR_DEFAUT
+
+    return [
+        AnnexeConfig(annexe['titre'], [str(prefix) for prefix in annexe['prefixes']])
+        for annexe in annexes
+    ]
+
+
+def get_annexe_lignes_par_slide() -> int:
+    """Retourne le nombre maximum de comptes par slide d'annexe (powerpoint.annexe_lignes_par_slide)"""
+    return int(load_app_config().get('powerpoint', {}).get('annexe_lignes_par_slide', ANNEXE_LIGNES_PAR_SLIDE))
+
+
+def get_rules_version() -> str:
+    """
+    Empreinte des règles qui déterminent le contenu des rapports
+
+    Couvre les règles de correspondance du bilan et du compte de résultat, les
+    annexes, les sections excel/powerpoint de config.json et la version de
+    l'application: toute modification donne une nouvelle version.
+
+    Returns:
+        Empreinte hexadécimale (16 caractères)
+    """
+    app_config = load_app_config()
+    contenu = {
+        'application': app_config.get('application', {}).get('version'),
+        'bilan': repr(get_all_bilan_regles()),
+        'compte_resultat': repr(get_all_cr_regles()),
+        'annexes': repr(get_annexes_config()),
+        'excel': app_config.get('excel'),
+        'powerpoint': app_config.get('powerpoint'),
+    }
+    return hashlib.sha256(json.dumps(contenu, sort_keys=True).encode('utf-8')).hexdigest()[:16]
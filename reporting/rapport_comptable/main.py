@@ -19,18 +19,18 @@ import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from modules import sage_parser
-from modules import data_processor
-from modules import excel_generator
-from modules import ui_interface
-from modules import ppt_generator
+# Les modules lourds (pandas, openpyxl, python-pptx, tkinter) sont importés
+# à l'étape qui les utilise: --help et le démarrage en --sans-ui restent rapides.
+from config import load_app_config
 from modules import security
-from modules.data_processor import get_client_code_from_name
+from utils import profiler, progress, time_budget
+from utils.exceptions import ProcessingCancelledError, ProcessingTimeoutError
+from utils.profiler import profile_stage
 
 
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
@@ -67,11 +67,68 @@ def generer_rapport_complet(
     commentaires_file: Optional[str] = None,
     client_name: Optional[str] = None,
     sans_ui: bool = False,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    profile: bool = False,
+    force: bool = False,
+    budget_file: Optional[str] = None,
+    limite_quotidienne: Optional[int] = None
 ):
     """
     Génère le rapport comptable complet
 
+    En mode interface, le traitement s'exécute sur un thread de travail et une
+    fenêtre de progression (étape en cours, compteurs, bouton Annuler) reste
+    réactive sur le thread principal; les fenêtres de configuration et de
+    commentaires restent sur le thread principal.
+
+    Args:
+        fichier_sage: Chemin vers le fichier TXT exporté de Sage (optionnel si sélectionné via UI)
+        output_excel: Chemin de sortie du fichier Excel (optionnel)
+        output_ppt: Chemin de sortie du PowerPoint (optionnel)
+        commentaires_file: Fichier JSON avec commentaires pré-saisis (optionnel)
+        sans_ui: Si True, génère sans interface utilisateur
+        logger: Logger (optionnel)
+        profile: Si True, mesure chaque étape et écrit un profil JSON à côté des sorties
+        force: Si True, régénère les rapports même si leurs entrées n'ont pas changé
+        budget_file: Budget CSV/XLSX multi-clients (défaut: config.json 'budget.fichier')
+        limite_quotidienne: Limite quotidienne de rapports du compte (défaut: celle de security)
+    """
+    kwargs = dict(
+        fichier_sage=fichier_sage,
+        output_excel=output_excel,
+        output_ppt=output_ppt,
+        commentaires_file=commentaires_file,
+        client_name=client_name,
+        sans_ui=sans_ui,
+        logger=logger,
+        profile=profile,
+        force=force,
+        budget_file=budget_file,
+        limite_quotidienne=limite_quotidienne
+    )
+    if sans_ui:
+        return _generer_rapport(**kwargs)
+
+    from modules import ui_interface
+    return ui_interface.run_with_progress(_generer_rapport, **kwargs)
+
+
+def _generer_rapport(
+    fichier_sage: Optional[str] = None,
+    output_excel: Optional[str] = None,
+    output_ppt: Optional[str] = None,
+    commentaires_file: Optional[str] = None,
+    client_name: Optional[str] = None,
+    sans_ui: bool = False,
+    logger: Optional[logging.Logger] = None,
+    profile: bool = False,
+    force: bool = False,
+    budget_file: Optional[str] = None,
+    limite_quotidienne: Optional[int] = None
+):
+    """
+    Pipeline de génération (voir generer_rapport_complet)
+
     Args:
         fichier_sage: Chemin vers le fichier TXT exporté de Sage (optionnel si sélectionné via UI)
         output_excel: Chemin de sortie du fichier Excel (optionnel)
@@ -79,6 +136,10 @@ def generer_rapport_complet(
         commentaires_file: Fichier JSON avec commentaires pré-saisis (optionnel)
         sans_ui: Si True, génère sans interface utilisateur
         logger: Logger (optionnel)
+        profile: Si True, mesure chaque étape et écrit un profil JSON à côté des sorties
+        force: Si True, régénère les rapports même si leurs entrées n'ont pas changé
+        budget_file: Budget CSV/XLSX multi-clients (défaut: config.json 'budget.fichier')
+        limite_quotidienne: Limite quotidienne de rapports du compte (défaut: celle de security)
     """
 
     if logger is None:
@@ -90,17 +151,6 @@ def generer_rapport_complet(
         print("=" * 80)
         print()
 
-        # ====================================================================
-        # ÉTAPE 0A: VÉRIFICATION DE SÉCURITÉ
-        # ====================================================================
-        authorized, username = security.security_check()
-
-        if not authorized:
-            logger.error("Vérification de sécurité échouée")
-            return False
-
-        logger.info(f"Utilisateur autorisé: {username}")
-
         # ====================================================================
         # ÉTAPE 0: COLLECTER LA CONFIGURATION (SI NÉCESSAIRE)
         # ====================================================================
@@ -116,7 +166,8 @@ def generer_rapport_complet(
             print("🔄 Étape 0/6: Configuration - Saisie des paramètres...")
             logger.info("Lancement de l'interface de configuration")
 
-            config = ui_interface.collect_configuration()
+            from modules import ui_interface
+            config = progress.call_in_ui(ui_interface.collect_configuration)
 
             if not config:
                 print("   ⚠️  Configuration annulée par l'utilisateur")
@@ -139,6 +190,7 @@ def generer_rapport_complet(
             # Mode sans UI ou fichier fourni en ligne de commande
             # Créer une config minimale avec le client si fourni
             if client_name:
+                from modules.data_processor import get_client_code_from_name
                 client_code = get_client_code_from_name(client_name)
                 config = {
                     'client': client_name,
@@ -161,6 +213,15 @@ def generer_rapport_complet(
         if not Path(fichier_sage).exists():
             raise FileNotFoundError(f"Fichier source introuvable: {fichier_sage}")
 
+        # Budget prévisionnel (colonne BUDGET PREVI du suivi d'activité)
+        if budget_file is None:
+            budget_file = load_app_config().get('budget', {}).get('fichier')
+        if budget_file and not Path(budget_file).exists():
+            raise FileNotFoundError(f"Fichier de budget introuvable: {budget_file}")
+
+        # Fichiers de sortie imposés: seuls ceux-ci peuvent être réutilisés
+        sorties_imposees = {'excel': output_excel is not None, 'ppt': output_ppt is not None}
+
         # Générer les noms de fichiers de sortie si non fournis
         base_name = Path(fichier_sage).stem
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -183,16 +244,140 @@ def generer_rapport_complet(
         logger.info(f"Fichier Excel: {output_excel}")
         logger.info(f"Fichier PowerPoint: {output_ppt}")
 
+        # Utiliser les infos de config pour la première génération
+        initial_commentaires = {
+            'periode': config.get('periode', '') if config else '',
+            'cabinet': config.get('cabinet', '2BN CONSULTING') if config else '2BN CONSULTING',
+            'client': config.get('client', 'BAMBOO IMMO') if config else 'BAMBOO IMMO',
+        }
+
+        # ====================================================================
+        # ÉTAPE 0B: RÉUTILISER LES RAPPORTS INCHANGÉS (MANIFESTE)
+        # ====================================================================
+        # Les commentaires saisis dans l'interface ne sont connus qu'après la
+        # génération: le manifeste ne concerne que les exécutions non interactives
+        manifestes = {}
+        entrees = {}
+        reutilises = {}
+
+        if sans_ui or commentaires_file:
+            from config import get_rules_version
+            from modules.data_processor import get_mapping_file
+            from utils.output_manifest import OutputManifest, compute_inputs
+
+            client_code = config.get('client_code') if config else None
+            options = {'client_code': client_code}
+            if budget_file:
+                from utils.output_manifest import file_sha256
+                options['budget'] = {'fichier': file_sha256(Path(budget_file)),
+                                     'client': config.get('client') if config else None}
+            if config and config.get('client'):
+                from modules.data_processor import rappel_n1_signature
+                options['rappel_n1'] = rappel_n1_signature(config.get('client'), Path(fichier_sage))
+            if commentaires_file and Path(commentaires_file).exists():
+                source_commentaires = Path(commentaires_file)
+            else:
+                source_commentaires = initial_commentaires
+
+            entrees['ppt'] = compute_inputs(
+                fichier_sage,
+                get_mapping_file(client_code),
+                get_rules_version(),
+                commentaires=source_commentaires,
+                options=options
+            )
+            # Le classeur ne dépend pas des commentaires
+            entrees['excel'] = {**entrees['ppt'], 'commentaires': None}
+
+            par_dossier = {}
+            for kind, output, generer in (('excel', output_excel, generer_excel), ('ppt', output_ppt, generer_ppt)):
+                if not generer:
+                    continue
+                dossier = Path(output).parent.resolve()
+                if dossier not in par_dossier:
+                    par_dossier[dossier] = OutputManifest(dossier)
+                manifestes[kind] = par_dossier[dossier]
+
+                if force:
+                    continue
+                existant = manifestes[kind].find(
+                    kind, entrees[kind], path=Path(output) if sorties_imposees[kind] else None
+                )
+                if existant is not None:
+                    reutilises[kind] = str(existant)
+
+            if 'excel' in reutilises:
+                output_excel, generer_excel = reutilises['excel'], False
+            if 'ppt' in reutilises:
+                output_ppt, generer_ppt = reutilises['ppt'], False
+
+            for kind, path in reutilises.items():
+                print(f"♻️  {kind.upper()} inchangé, fichier existant réutilisé: {path}")
+                logger.info(f"Entrées inchangées, {kind} réutilisé: {path} (--force pour régénérer)")
+
+            if reutilises and not (generer_excel or generer_ppt):
+                print("   ✅ Aucune entrée modifiée depuis la dernière génération (--force pour régénérer)")
+                print()
+                return True
+
+        # ====================================================================
+        # ÉTAPE 0C: VÉRIFICATION DE SÉCURITÉ
+        # ====================================================================
+        # Après le manifeste: un rapport réutilisé ne consomme pas de rapport du quota quotidien.
+        # Les entrées du classeur (sans les commentaires) identifient le rapport: une présentation
+        # régénérée après une modification des commentaires ne compte pas une seconde fois.
+        from utils.output_manifest import data_sha256
+        authorized, username = security.security_check(
+            limite_quotidienne or security.DAILY_REPORT_LIMIT,
+            report_key=f"rapport:{data_sha256(entrees['excel'])}" if entrees else None
+        )
+
+        if not authorized:
+            logger.error("Vérification de sécurité échouée")
+            return False
+
+        logger.info(f"Utilisateur autorisé: {username}")
+
+        if profile:
+            profiler.start_profiling({
+                'client': config.get('client') if config else None,
+                'client_code': config.get('client_code') if config else None,
+                'fichier_source': Path(fichier_sage).name,
+            })
+
+        # Budget de temps: chaque étape est un point de contrôle (annulation propre)
+        app_config = load_app_config()
+        performance_config = app_config.get('performance', {})
+        time_budget.start_budget(performance_config.get('max_processing_time'))
+
         # ====================================================================
         # ÉTAPE 1: PARSER LE FICHIER SAGE
         # ====================================================================
         print("🔄 Étape 1/5: Parsing du fichier Sage...")
+        progress.report_step(1, 4, "Lecture du grand livre")
         logger.info("Étape 1: Parsing du fichier Sage")
 
-        df = sage_parser.parse_sage_file(fichier_sage)
-        df = sage_parser.clean_data(df)
+        from modules import sage_parser
+
+        # Au-delà de validation.max_lines: lecture par blocs (annulation et budget de temps entre les blocs)
+        # et feuille GL BI SEP écrite en flux à l'enregistrement du classeur
+        max_lines = app_config.get('validation', {}).get('max_lines')
+        chunk_size = None
+        if max_lines:
+            nb_lignes = sage_parser.count_lines(fichier_sage)
+            if nb_lignes > max_lines:
+                chunk_size = performance_config.get('chunk_size', 10000)
+                print(f"   ℹ️  Grand livre volumineux ({nb_lignes} lignes > {max_lines}): "
+                      f"lecture par blocs de {chunk_size} lignes")
+                logger.info(f"Lecture par blocs: {nb_lignes} lignes, blocs de {chunk_size}")
+
+        with profile_stage("parse"):
+            df = sage_parser.parse_sage_file(fichier_sage, chunk_size=chunk_size)
+        with profile_stage("clean"):
+            df = sage_parser.clean_data(df)
         
         nb_ecritures = len(df)
+        progress.report_count("écritures", nb_ecritures)
         logger.info(f"✅ {nb_ecritures} écritures chargées")
         print(f"   ✅ {nb_ecritures} écritures chargées")
         print()
@@ -201,59 +386,81 @@ def generer_rapport_complet(
         # ÉTAPE 2: TRAITER LES DONNÉES
         # ====================================================================
         print("🔄 Étape 2/5: Traitement des données comptables...")
+        progress.report_step(2, 4, "Calcul des états comptables")
         logger.info("Étape 2: Traitement des données")
 
-        # Calculer la balance
-        balance = data_processor.calculate_balance(df)
-        logger.info(f"Balance calculée: {len(balance)} comptes")
-
-        # Générer le compte de résultat (utilise les règles pré-compilées dans config.py)
-        compte_resultat = data_processor.generate_cr_synthetique(balance)
+        from modules import artifacts
+        from utils.montants import format_fcfa
+
+        # Mêmes calculs (et mêmes étapes mesurées) que la sous-commande compute
+        modele = artifacts.compute_model(
+            df,
+            client_code=config.get('client_code') if config else None,
+            client_name=config.get('client') if config else None,
+            budget_file=budget_file
+        )
+        balance, suivi_data = modele['balance'], modele['suivi_data']
+        bilan, compte_resultat, sig = modele['bilan'], modele['compte_resultat'], modele['sig']
         resultat_net = compte_resultat['resultat']
-        logger.info(f"Résultat net: {resultat_net:,.2f} FCFA")
-
-        # Générer le bilan (utilise les règles pré-compilées dans config.py)
-        bilan = data_processor.generate_bilan_synthetique(balance, resultat_net)
-        logger.info(f"Bilan généré - Actif: {bilan['total_actif']:,.2f}, Passif: {bilan['total_passif']:,.2f}")
-
-        # Calculer les SIG
-        sig = data_processor.calculate_sig(compte_resultat)
-        logger.info(f"SIG calculés: {len(sig)} indicateurs")
 
         print(f"   ✅ Balance: {len(balance)} comptes")
-        print(f"   ✅ Résultat net: {resultat_net:,.2f} FCFA")
+        print(f"   ✅ Résultat net: {format_fcfa(resultat_net)}")
         print()
         
         # ====================================================================
         # ÉTAPE 3: GÉNÉRER LE FICHIER EXCEL
         # ====================================================================
+        client_code = config.get('client_code') if config else None
+        # Le PowerPoint est rendu depuis les mêmes états calculés
+        modele_ppt = {
+            'bilan': bilan,
+            'compte_resultat': compte_resultat,
+            'sig': sig,
+            'suivi_data': suivi_data,
+            'balance': balance,
+            'excel_data': None,
+        }
+
         if generer_excel:
             print("🔄 Étape 3/5: Génération du fichier Excel...")
+            progress.report_step(3, 4, "Génération du fichier Excel")
             logger.info("Étape 3: Génération Excel")
 
-            # Récupérer le code client depuis la configuration
-            client_code = config.get('client_code') if config else None
-
             if client_code:
                 logger.info(f"Génération Excel avec mapping client: {client_code}")
             else:
                 logger.info("Génération Excel avec mapping par défaut")
 
-            wb = excel_generator.create_workbook(
-                df_grand_livre=df,
-                df_balance=balance,
-                bilan=bilan,
-                compte_resultat=compte_resultat,
-                sig=sig,
-                client_code=client_code
-            )
-
-            # Ajouter le watermark à toutes les feuilles (nom du cabinet)
-            logger.info("Ajout du watermark au fichier Excel...")
-            cabinet_name = config.get('cabinet', '2BN CONSULTING') if config else '2BN CONSULTING'
-            security.add_watermark_to_workbook(wb, cabinet_name)
-
-            wb.save(output_excel)
+            with profile_stage("excel"):
+                from modules import excel_generator
+
+                wb = excel_generator.create_workbook(
+                    df_grand_livre=df,
+                    df_balance=balance,
+                    bilan=bilan,
+                    compte_resultat=compte_resultat,
+                    sig=sig,
+                    client_code=client_code,
+                    suivi_data=suivi_data,
+                    grand_livre_en_flux=chunk_size is not None
+                )
+
+                # Ajouter le watermark à toutes les feuilles (nom du cabinet)
+                logger.info("Ajout du watermark au fichier Excel...")
+                cabinet_name = config.get('cabinet', '2BN CONSULTING') if config else '2BN CONSULTING'
+                with profile_stage("watermark"):
+                    security.add_watermark_to_workbook(wb, cabinet_name)
+
+            # Tableaux de la présentation repris du classeur en mémoire (pas de relecture du fichier)
+            if generer_ppt:
+                from modules import ppt_generator
+                modele_ppt['excel_data'] = ppt_generator.extract_workbook_ranges(wb, ppt_generator.EXCEL_RANGES)
+
+            with profile_stage("excel_save"):
+                if chunk_size is not None:
+                    excel_generator.save_workbook_streaming(wb, output_excel, df)
+                else:
+                    wb.save(output_excel)
 
             # Enregistrer la génération dans l'audit log
             security.log_report_generation(
@@ -269,7 +476,7 @@ def generer_rapport_complet(
         else:
             print("⏭️  Étape 3/5: Génération Excel ignorée (option non cochée)")
             print()
-        
+
         # ====================================================================
         # ÉTAPE 4: ENRICHIR LES COMMENTAIRES
         # ====================================================================
@@ -293,6 +500,7 @@ def generer_rapport_complet(
             print(f"🔄 Étape 4/6: Chargement des commentaires depuis {commentaires_file}...")
             logger.info(f"Chargement des commentaires: {commentaires_file}")
 
+            from modules import ui_interface
             commentaires = ui_interface.load_comments_from_file(commentaires_file)
             print(f"   ✅ Commentaires chargés")
             logger.info("Commentaires chargés avec succès")
@@ -302,13 +510,18 @@ def generer_rapport_complet(
             print("🔄 Étape 4/6: Enrichissement des commentaires...")
             logger.info("Lancement de l'interface d'enrichissement")
 
-            commentaires = ui_interface.collect_comments_for_existing_reports(
-                periode=config.get('periode', ''),
-                cabinet=config.get('cabinet', '2BN CONSULTING'),
-                client=config.get('client', 'BAMBOO IMMO'),
-                excel_path=output_excel if generer_excel else None,
-                ppt_path=output_ppt if generer_ppt else None
-            )
+            from modules import ui_interface
+
+            # La saisie utilisateur ne compte pas dans le temps de traitement
+            with time_budget.paused():
+                commentaires = progress.call_in_ui(
+                    ui_interface.collect_comments_for_existing_reports,
+                    periode=config.get('periode', ''),
+                    cabinet=config.get('cabinet', '2BN CONSULTING'),
+                    client=config.get('client', 'BAMBOO IMMO'),
+                    excel_path=output_excel if generer_excel else None,
+                    ppt_path=output_ppt if generer_ppt else None
+                )
 
             if commentaires:
                 print(f"   ✅ Commentaires enrichis")
@@ -330,20 +543,18 @@ def generer_rapport_complet(
         # ====================================================================
         if generer_ppt:
             print("🔄 Étape 5/6: Génération du PowerPoint initial...")
+            progress.report_step(4, 4, "Génération du PowerPoint")
             logger.info("Étape 5: Génération PowerPoint initial")
 
-            # Utiliser les infos de config pour la première génération
-            initial_commentaires = {
-                'periode': config.get('periode', '') if config else '',
-                'cabinet': config.get('cabinet', '2BN CONSULTING') if config else '2BN CONSULTING',
-                'client': config.get('client', 'BAMBOO IMMO') if config else 'BAMBOO IMMO',
-            }
+            with profile_stage("ppt"):
+                from modules import ppt_generator
 
-            ppt_generator.generate_powerpoint(
-                excel_path=output_excel,
-                output_path=output_ppt,
-                commentaires=initial_commentaires
-            )
+                ppt_generator.generate_powerpoint(
+                    excel_path=output_excel,
+                    output_path=output_ppt,
+                    commentaires=initial_commentaires,
+                    **modele_ppt
+                )
 
             print(f"   ✅ Fichier PowerPoint initial généré: {output_ppt}")
             logger.info(f"Fichier PowerPoint initial généré: {output_ppt}")
@@ -357,13 +568,18 @@ def generer_rapport_complet(
         # ====================================================================
         if generer_ppt and commentaires and not sans_ui:
             print("🔄 Étape 6/6: Mise à jour du PowerPoint avec les commentaires...")
+            progress.report_step(4, 4, "Mise à jour du PowerPoint avec les commentaires")
             logger.info("Étape 6: Régénération PowerPoint avec commentaires enrichis")
 
-            ppt_generator.generate_powerpoint(
-                excel_path=output_excel,
-                output_path=output_ppt,
-                commentaires=commentaires
-            )
+            with profile_stage("ppt_commentaires"):
+                from modules import ppt_generator
+
+                ppt_generator.generate_powerpoint(
+                    excel_path=output_excel,
+                    output_path=output_ppt,
+                    commentaires=commentaires,
+                    **modele_ppt
+                )
 
             print(f"   ✅ PowerPoint mis à jour avec les commentaires")
             logger.info(f"PowerPoint mis à jour avec commentaires: {output_ppt}")
@@ -375,6 +591,11 @@ def generer_rapport_complet(
             print("ℹ️  Étape 6/6: Pas de mise à jour des commentaires")
             print()
         
+        # Enregistrer les entrées des fichiers générés
+        for kind, output, genere in (('excel', output_excel, generer_excel), ('ppt', output_ppt, generer_ppt)):
+            if genere and kind in manifestes:
+                manifestes[kind].record(kind, output, entrees[kind])
+
         # ====================================================================
         # RÉSUMÉ FINAL
         # ====================================================================
@@ -387,11 +608,13 @@ def generer_rapport_complet(
             print(f"   📄 Excel:      {Path(output_excel).absolute()}")
         if generer_ppt:
             print(f"   📊 PowerPoint: {Path(output_ppt).absolute()}")
+        for kind, path in reutilises.items():
+            print(f"   ♻️  {kind.upper()} (inchangé): {Path(path).absolute()}")
         print()
         print("📈 Statistiques:")
         print(f"   • Écritures traitées: {nb_ecritures}")
         print(f"   • Comptes dans la balance: {len(balance)}")
-        print(f"   • Résultat net: {resultat_net:,.2f} FCFA")
+        print(f"   • Résultat net: {format_fcfa(resultat_net)}")
         print()
         print("=" * 80)
         
@@ -399,6 +622,39 @@ def generer_rapport_complet(
         
         return True
         
+    except ProcessingTimeoutError as e:
+        print()
+        print("=" * 80)
+        print("           ⏱️  TRAITEMENT INTERROMPU: TEMPS MAXIMUM DÉPASSÉ")
+        print("=" * 80)
+        print(time_budget.format_timeout_report(e))
+        print()
+        print("Augmentez performance.max_processing_time dans config.json si nécessaire.")
+        print()
+        logger.error(f"{e}\n{time_budget.format_timeout_report(e)}")
+        security.audit_event(
+            "PROCESSING_TIMEOUT",
+            level="WARNING",
+            stage=e.stage,
+            elapsed_s=round(e.elapsed, 1),
+            budget_s=e.budget,
+            gl_file=Path(fichier_sage).name if fichier_sage else None
+        )
+        return False
+
+    except ProcessingCancelledError as e:
+        print()
+        print(f"⏹️  {e}")
+        print()
+        logger.warning(str(e))
+        security.audit_event(
+            "PROCESSING_CANCELLED",
+            level="WARNING",
+            stage=e.stage,
+            gl_file=Path(fichier_sage).name if fichier_sage else None
+        )
+        return False
+
     except Exception as e:
         print()
         print("=" * 80)
@@ -409,10 +665,618 @@ def generer_rapport_complet(
         logger.error(f"Erreur lors de la génération: {e}", exc_info=True)
         return False
 
+    finally:
+        time_budget.stop_budget()
+
+        # Enregistrer le profil d'exécution, y compris en cas d'échec
+        stage_profiler = profiler.stop_profiling()
+        if stage_profiler is not None:
+            reference = Path(output_excel or output_ppt)
+            stage_profiler.save(reference.with_name(f"{reference.stem}_profile.json"))
+
+
+def executer_job_daemon(job: Dict) -> Dict:
+    """
+    Exécute un job du démon en mode sans interface
+
+    Args:
+        job: Demande (fichier_sage, client, dossier_sortie, excel, ppt)
+
+    Returns:
+        Chemins des fichiers générés {'excel': ..., 'ppt': ...}
+    """
+    fichier_sage = job['fichier_sage']
+    dossier_sortie = Path(job.get('dossier_sortie') or Path(fichier_sage).parent)
+
+    # Horodatage à la microseconde: plusieurs jobs peuvent viser le même fichier source
+    base_name = Path(fichier_sage).stem
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    output_excel = job.get('excel') or str(dossier_sortie / f"RAPPORT_{base_name}_{timestamp}.xlsx")
+    output_ppt = job.get('ppt') or str(dossier_sortie / f"RAPPORT_{base_name}_{timestamp}.pptx")
+
+    # Chaque job compte dans la limite quotidienne du compte qui exécute le service
+    limite = load_app_config().get('daemon', {}).get('limite_quotidienne') or security.DAILY_REPORT_LIMIT
+    success = generer_rapport_complet(
+        fichier_sage=fichier_sage,
+        output_excel=output_excel,
+        output_ppt=output_ppt,
+        client_name=job.get('client'),
+        sans_ui=True,
+        limite_quotidienne=limite
+    )
+
+    if not success:
+        utilises = security.get_usage_store().get_count(security.get_current_username(),
+                                                        datetime.now().strftime("%Y-%m-%d"))
+        if utilises >= limite:
+            raise RuntimeError(f"Limite quotidienne du compte de service atteinte ({utilises}/{limite}); "
+                               f"augmenter daemon.limite_quotidienne dans config.json")
+        raise RuntimeError("Échec de la génération du rapport (voir les logs)")
+
+    return {'excel': output_excel, 'ppt': output_ppt}
+
+
+def run_daemon(host: Optional[str] = None, port: Optional[int] = None,
+               workers: Optional[int] = None, logger: Optional[logging.Logger] = None):
+    """
+    Lance le démon de génération (serveur HTTP local, modules préchargés)
+
+    Les valeurs non fournies sont lues dans config.json (section "daemon").
+    """
+    from modules import report_daemon
+
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    daemon_config = load_app_config().get('daemon', {})
+    host = host or daemon_config.get('host', report_daemon.DEFAULT_HOST)
+    port = port or daemon_config.get('port', report_daemon.DEFAULT_PORT)
+    workers = workers or daemon_config.get('workers', report_daemon.DEFAULT_WORKERS)
+
+    report_daemon.warm_up()
+
+    daemon = report_daemon.ReportDaemon(
+        runner=executer_job_daemon,
+        workers=workers,
+        max_queue=daemon_config.get('max_queue', report_daemon.DEFAULT_MAX_QUEUE),
+        max_finished=daemon_config.get('jobs_termines_max', report_daemon.DEFAULT_MAX_FINISHED),
+        finished_ttl=daemon_config.get('jobs_termines_ttl', report_daemon.DEFAULT_FINISHED_TTL)
+    )
+    server = report_daemon.create_server(daemon, host, port)
+
+    print(f"🚀 Démon de rapports en écoute sur http://{host}:{server.server_port} ({workers} worker(s))")
+    logger.info(f"Démon démarré sur {host}:{server.server_port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("⏹️  Arrêt du démon...")
+    finally:
+        server.server_close()
+        daemon.shutdown()
+        logger.info("Démon arrêté")
+
+
+def run_watch(dossier: str, workers: Optional[int] = None, logger: Optional[logging.Logger] = None):
+    """
+    Surveille un dossier et génère un rapport pour chaque nouvel export Sage
+
+    Le client est déduit du nom du fichier; les rapports sont écrits dans
+    <dossier>/rapports. Réglages dans config.json (sections "watch" et "daemon").
+    """
+    from modules import report_daemon, watch_folder
+    from modules.data_processor import infer_client_from_filename
+
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    if not Path(dossier).is_dir():
+        raise NotADirectoryError(f"Dossier à surveiller introuvable: {dossier}")
+
+    app_config = load_app_config()
+    watch_config = app_config.get('watch', {})
+    daemon_config = app_config.get('daemon', {})
+
+    report_daemon.warm_up()
+
+    daemon = report_daemon.ReportDaemon(
+        runner=executer_job_daemon,
+        workers=workers or daemon_config.get('workers', report_daemon.DEFAULT_WORKERS),
+        max_queue=daemon_config.get('max_queue', report_daemon.DEFAULT_MAX_QUEUE),
+        max_finished=daemon_config.get('jobs_termines_max', report_daemon.DEFAULT_MAX_FINISHED),
+        finished_ttl=daemon_config.get('jobs_termines_ttl', report_daemon.DEFAULT_FINISHED_TTL)
+    )
+    watcher = watch_folder.FolderWatcher(
+        dossier,
+        daemon,
+        debounce=watch_config.get('debounce', watch_folder.DEFAULT_DEBOUNCE),
+        infer_client=infer_client_from_filename
+    )
+
+    print(f"👀 Surveillance du dossier: {Path(dossier).absolute()}")
+    print(f"   Rapports générés dans: {watcher.output_dir.absolute()}")
+
+    try:
+        watcher.run_forever(interval=watch_config.get('interval', watch_folder.DEFAULT_INTERVAL))
+    except KeyboardInterrupt:
+        print("⏹️  Arrêt de la surveillance...")
+    finally:
+        daemon.shutdown()
+        logger.info("Surveillance arrêtée")
+
+
+# ============================================================================
+# SOUS-COMMANDES PAR ÉTAPE (ARTEFACTS INTERMÉDIAIRES)
+# ============================================================================
+
+STAGE_COMMANDS = ('parse', 'compute', 'render-excel', 'render-ppt', 'balance', 'cumul', 'ingest',
+                  'consolidate', 'reconcile')
+
+
+def commande_parse(args, logger: logging.Logger) -> bool:
+    """parse: fichier TXT Sage -> grand livre nettoyé (colonnes)"""
+    from modules import artifacts, sage_parser
+
+    if not Path(args.fichier_sage).exists():
+        raise FileNotFoundError(f"Fichier source introuvable: {args.fichier_sage}")
+
+    df = sage_parser.clean_data(sage_parser.parse_sage_file(args.fichier_sage))
+    output = Path(args.output or artifacts.default_ledger_path(args.fichier_sage))
+    artifacts.save_ledger(df, output)
+
+    print(f"   ✅ {len(df)} écritures -> {output}")
+    return True
+
+
+def commande_compute(args, logger: logging.Logger) -> bool:
+    """compute: grand livre nettoyé (fichier TXT ou exercice de l'entrepôt) -> modèle des états"""
+    from modules import artifacts, data_processor, sage_parser
+    from utils.montants import format_fcfa
+
+    if args.grand_livre:
+        grand_livre = Path(args.grand_livre)
+        if grand_livre.suffix.lower() == '.txt':
+            df = sage_parser.clean_data(sage_parser.parse_sage_file(grand_livre))
+            # render-excel relit le grand livre nettoyé, pas l'export TXT
+            grand_livre = artifacts.save_ledger(df, artifacts.default_ledger_path(grand_livre))
+        else:
+            df = artifacts.load_ledger(grand_livre)
+        entrepot = None
+    else:
+        # Exercice déjà ingéré: lu dans l'entrepôt, sans re-parser l'export
+        from modules import warehouse
+        if not args.client or not args.exercice:
+            raise ValueError("Sans grand livre, --client et --exercice sont requis (lecture de l'entrepôt)")
+        entrepot = Path(args.entrepot or warehouse.DEFAULT_WAREHOUSE)
+        df = warehouse.LedgerWarehouse(entrepot).ledger(args.client, args.exercice)
+        if df.empty:
+            raise ValueError(f"Aucune écriture dans l'entrepôt pour {args.client} {args.exercice}")
+        grand_livre = entrepot.with_name(
+            f"{warehouse.client_key(args.client).replace(' ', '_')}_{args.exercice}{artifacts.LEDGER_SUFFIX}"
+        )
+
+    client_code = data_processor.get_client_code_from_name(args.client) if args.client else None
+    if args.budget and not args.client:
+        raise ValueError("--budget nécessite --client (lignes du client dans le fichier de budget)")
+    model = artifacts.compute_model(df, client_code=client_code, client_name=args.client,
+                                    budget_file=args.budget, db_path=args.entrepot)
+
+    output = Path(args.output or artifacts.default_model_path(grand_livre))
+    artifacts.save_model(model, output, source={
+        'grand_livre': None if entrepot else str(grand_livre.absolute()),
+        'entrepot': str(entrepot.absolute()) if entrepot else None,
+        'exercice': args.exercice,
+        'budget': str(Path(args.budget).absolute()) if args.budget else None,
+        'client': args.client,
+        'client_code': client_code,
+        'periode': datetime.now().strftime("%B %Y"),
+        'cabinet': '2BN CONSULTING',
+    })
+
+    print(f"   ✅ Balance: {len(model['balance'])} comptes, "
+          f"résultat net: {format_fcfa(model['compte_resultat']['resultat'])} -> {output}")
+    return True
+
+
+def _cle_modele(modele: str) -> str:
+    """
+    Identifiant d'un modèle pour la limite quotidienne
+
+    Le classeur, la présentation et leurs nouveaux rendus (modèle PowerPoint ou
+    commentaires modifiés) d'un même modèle comptent pour un seul rapport.
+    """
+    from utils.output_manifest import file_sha256
+    return f"modele:{file_sha256(Path(modele))}"
+
+
+def commande_render_excel(args, logger: logging.Logger) -> bool:
+    """render-excel: modèle des états (+ grand livre) -> fichier Excel"""
+    from modules import artifacts, excel_generator
+
+    model = artifacts.load_model(args.modele)
+    source = model['source']
+
+    # Le classeur reprend le grand livre détaillé (feuille GL)
+    grand_livre = args.grand_livre or source.get('grand_livre')
+    depuis_entrepot = not grand_livre and source.get('entrepot')
+    if depuis_entrepot:
+        grand_livre = source['entrepot']
+    if not grand_livre or not Path(grand_livre).exists():
+        raise FileNotFoundError(f"Grand livre introuvable: {grand_livre} (option --grand-livre)")
+
+    if depuis_entrepot:
+        from modules import warehouse
+        df = warehouse.LedgerWarehouse(grand_livre).ledger(source.get('client'), source.get('exercice'))
+    elif Path(grand_livre).suffix.lower() == '.txt':
+        from modules import sage_parser
+        df = sage_parser.clean_data(sage_parser.parse_sage_file(grand_livre))
+    else:
+        df = artifacts.load_ledger(grand_livre)
+
+    # Vérification (et décompte de la limite quotidienne) une fois le grand livre lu
+    authorized, username = security.security_check(report_key=_cle_modele(args.modele))
+    if not authorized:
+        return False
+
+    output = str(args.output or artifacts.default_report_path(args.modele, '.xlsx'))
+
+    # Au-delà de validation.max_lines, la feuille GL BI SEP est écrite en flux
+    max_lines = load_app_config().get('validation', {}).get('max_lines')
+    en_flux = bool(max_lines) and len(df) > max_lines
+
+    wb = excel_generator.create_workbook(
+        df_grand_livre=df,
+        df_balance=model['balance'],
+        bilan=model['bilan'],
+        compte_resultat=model['compte_resultat'],
+        sig=model['sig'],
+        client_code=source.get('client_code'),
+        suivi_data=model['suivi_data'],
+        grand_livre_en_flux=en_flux
+    )
+    security.add_watermark_to_workbook(wb, source.get('cabinet') or '2BN CONSULTING')
+    if en_flux:
+        excel_generator.save_workbook_streaming(wb, output, df)
+    else:
+        wb.save(output)
+
+    security.log_report_generation(
+        username=username,
+        client_code=source.get('client_code') or "INCONNU",
+        gl_file=grand_livre,
+        output_excel=output
+    )
+
+    print(f"   ✅ Fichier Excel généré: {output}")
+    return True
+
+
+def commande_render_ppt(args, logger: logging.Logger) -> bool:
+    """render-ppt: modèle des états (+ classeur Excel, commentaires) -> PowerPoint"""
+    from modules import artifacts, ppt_generator
+
+    model = artifacts.load_model(args.modele)
+    source = model['source']
+
+    # Les tableaux sont repris du classeur rendu depuis le même modèle, s'il existe
+    excel_path = str(args.excel or artifacts.default_report_path(args.modele, '.xlsx'))
+
+    authorized, username = security.security_check(report_key=_cle_modele(args.modele))
+    if not authorized:
+        return False
+
+    commentaires = {
+        'periode': source.get('periode', ''),
+        'cabinet': source.get('cabinet') or '2BN CONSULTING',
+        'client': source.get('client') or 'BAMBOO IMMO',
+    }
+    if args.commentaires:
+        from modules import ui_interface
+        commentaires.update(ui_interface.load_comments_from_file(args.commentaires) or {})
+
+    output = str(args.output or artifacts.default_report_path(args.modele, '.pptx'))
+    ppt_generator.generate_powerpoint(
+        excel_path=excel_path,
+        output_path=output,
+        commentaires=commentaires,
+        bilan=model['bilan'],
+        compte_resultat=model['compte_resultat'],
+        sig=model['sig'],
+        suivi_data=model['suivi_data'],
+        balance=model['balance']
+    )
+
+    print(f"   ✅ Fichier PowerPoint généré: {output}")
+    return True
+
+
+def _date_option(valeur: Optional[str]) -> Optional[datetime]:
+    """Date d'une option en ligne de commande (JJ/MM/AAAA ou AAAA-MM-JJ)"""
+    if not valeur:
+        return None
+    return datetime.strptime(valeur, "%d/%m/%Y" if '/' in valeur else "%Y-%m-%d")
+
+
+def commande_balance(args, logger: logging.Logger) -> bool:
+    """balance: grand livre -> balance générale à date et balance à six colonnes d'une période (+ fins de mois)"""
+    from modules import artifacts, data_processor, excel_generator, sage_parser
+
+    grand_livre = Path(args.grand_livre)
+    if not grand_livre.exists():
+        raise FileNotFoundError(f"Grand livre introuvable: {grand_livre}")
+    date_debut, date_fin = _date_option(args.du), _date_option(args.au)
+
+    if grand_livre.suffix.lower() == '.txt':
+        df = sage_parser.clean_data(sage_parser.parse_sage_file(grand_livre))
+    else:
+        df = artifacts.load_ledger(grand_livre)
+
+    # Une même balance (grand livre et période) rendue à nouveau ne compte qu'une fois
+    from utils.output_manifest import data_sha256, file_sha256
+    authorized, username = security.security_check(report_key="balance:" + data_sha256(
+        {'grand_livre': file_sha256(grand_livre), 'du': args.du, 'au': args.au}
+    ))
+    if not authorized:
+        return False
+
+    balance = data_processor.calculate_balance_six_colonnes(df, date_debut, date_fin)
+    # Index cumulé: balance générale à la date d'arrêté et soldes des fins de mois sans reparcourir le grand livre
+    index = data_processor.CumulativeLedgerIndex.from_ledger(df)
+    balance_generale = index.balance_au(date_fin)
+    soldes_mensuels = index.soldes_fin_de_mois(date_fin.year if date_fin else None) if args.fins_de_mois else None
+    periode = (f"du {date_debut:%d/%m/%Y}" if date_debut else "depuis l'origine") + \
+              (f" au {date_fin:%d/%m/%Y}" if date_fin else "")
+
+    output = str(args.output or artifacts.default_report_path(grand_livre, '.xlsx', prefix="BALANCE"))
+    wb = excel_generator.create_balance_six_colonnes_workbook(balance, periode, balance_generale, soldes_mensuels)
+    security.add_watermark_to_workbook(wb, '2BN CONSULTING')
+    wb.save(output)
+
+    security.log_report_generation(
+        username=username,
+        client_code="BALANCE",
+        gl_file=str(grand_livre),
+        output_excel=output
+    )
+
+    print(f"   ✅ Balance à six colonnes {periode}: {len(balance)} comptes -> {output}")
+    return True
+
+
+def commande_cumul(args, logger: logging.Logger) -> bool:
+    """cumul: export cumulé du mois -> état de l'exercice mis à jour (seules les nouvelles écritures sont parsées)"""
+    from modules import incremental
+    from utils.montants import format_fcfa
+
+    state, stats = incremental.ingest_export(args.fichier_sage, args.etat)
+    balance = state.balance()
+
+    print(f"   ✅ {stats['ajoutees']} écriture(s) ajoutée(s), {stats['retirees']} retirée(s), "
+          f"{stats['inchangees']} inchangée(s) -> {args.etat}")
+    print(f"   Balance: {len(balance)} comptes, total débit: {format_fcfa(balance['total_debit'].sum())}")
+    return True
+
+
+def commande_ingest(args, logger: logging.Logger) -> bool:
+    """ingest: export Sage -> entrepôt local (écritures et soldes mensuels du client)"""
+    from modules import warehouse
+
+    entrepot = Path(args.entrepot or warehouse.DEFAULT_WAREHOUSE)
+    stats = warehouse.LedgerWarehouse(entrepot).ingest(args.fichier_sage, args.client, args.exercice)
+
+    print(f"   ✅ {stats['client']} {stats['exercice']}: {stats['ajoutees']} écriture(s) ajoutée(s), "
+          f"{stats['retirees']} retirée(s), {stats['inchangees']} inchangée(s) -> {entrepot}")
+    return True
+
+
+def commande_consolidate(args, logger: logging.Logger) -> bool:
+    """consolidate: entités liées (entrepôt) -> bilan, CR et SIG combinés après éliminations intragroupe"""
+    from modules import consolidation, excel_generator
+    from utils.montants import format_fcfa
+
+    entites = [consolidation.parse_entity_spec(spec) for spec in args.entite]
+    eliminations = consolidation.load_eliminations(args.eliminations) if args.eliminations else []
+
+    authorized, username = security.security_check()
+    if not authorized:
+        return False
+
+    resultat = consolidation.consolidate(entites, eliminations, exercice=args.exercice,
+                                         db_path=args.entrepot, workers=args.workers)
+
+    exercices = sorted({infos['exercice'] for infos in resultat['entites'].values()})
+    noms = '_'.join(nom.replace(' ', '_') for nom in resultat['entites'])
+    output = str(args.output or f"CONSOLIDATION_{noms}_{'-'.join(map(str, exercices))}.xlsx")
+
+    wb = excel_generator.create_consolidation_workbook(resultat)
+    security.add_watermark_to_workbook(wb, '2BN CONSULTING')
+    wb.save(output)
+
+    security.log_report_generation(
+        username=username,
+        client_code="CONSOLIDATION " + " + ".join(resultat['entites']),
+        gl_file=",".join(fichier.name if fichier else nom for nom, fichier in entites),
+        output_excel=output
+    )
+
+    for nom, infos in resultat['entites'].items():
+        print(f"   {nom} {infos['exercice']}: résultat net {format_fcfa(infos['resultat'])}")
+    rapport = resultat['eliminations']
+    print(f"   ✅ Éliminations: {format_fcfa(int(rapport['elimine'].sum()))} "
+          f"({int((rapport['statut'] != 'éliminé').sum())} paire(s) à vérifier)")
+    print(f"   ✅ Résultat consolidé: {format_fcfa(resultat['compte_resultat']['resultat'])} -> {output}")
+    return True
+
+
+def commande_reconcile(args, logger: logging.Logger) -> bool:
+    """reconcile: grands livres de deux entités liées -> écritures intragroupe rapprochées, suspectes, non rapprochées"""
+    from modules import consolidation, excel_generator, intercompany
+
+    if len(args.entite) != 2:
+        print("❌ Indiquer exactement deux entités (--entite A --entite B)")
+        return False
+    (nom_a, fichier_a), (nom_b, fichier_b) = [consolidation.parse_entity_spec(spec) for spec in args.entite]
+    paires = intercompany.pairs_between(consolidation.load_eliminations(args.paires), nom_a, nom_b)
+    if not paires:
+        print(f"❌ Aucune paire de comptes entre {nom_a} et {nom_b} dans {args.paires}")
+        return False
+
+    authorized, username = security.security_check()
+    if not authorized:
+        return False
+
+    ledger_a = intercompany.load_entity_ledger(nom_a, fichier_a, args.exercice, args.entrepot)
+    ledger_b = intercompany.load_entity_ledger(nom_b, fichier_b, args.exercice, args.entrepot)
+    fenetre = intercompany.FENETRE_JOURS if args.fenetre is None else args.fenetre
+    resultat = intercompany.reconcile(ledger_a, ledger_b, paires, fenetre_jours=fenetre)
+
+    output = str(args.output or f"RAPPROCHEMENT_{nom_a.replace(' ', '_')}_{nom_b.replace(' ', '_')}.xlsx")
+    wb = excel_generator.create_reconciliation_workbook(resultat, nom_a, nom_b)
+    security.add_watermark_to_workbook(wb, '2BN CONSULTING')
+    wb.save(output)
+
+    security.log_report_generation(
+        username=username,
+        client_code=f"RAPPROCHEMENT {nom_a} / {nom_b}",
+        gl_file=",".join(fichier.name if fichier else nom for nom, fichier in ((nom_a, fichier_a), (nom_b, fichier_b))),
+        output_excel=output
+    )
+
+    print(f"   {len(paires)} paire(s) de comptes, fenêtre de {fenetre} jour(s)")
+    print(f"   ✅ {len(resultat['rapproches'])} rapprochée(s), {len(resultat['suspects'])} suspecte(s), "
+          f"{len(resultat['non_rapproches_a'])} non rapprochée(s) {nom_a}, "
+          f"{len(resultat['non_rapproches_b'])} non rapprochée(s) {nom_b} -> {output}")
+    return True
+
+
+def build_stage_parser() -> argparse.ArgumentParser:
+    """Parser des sous-commandes parse / compute / render-excel / render-ppt / balance / cumul / ingest / consolidate / reconcile"""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Exécution d'une seule étape du pipeline avec artefacts intermédiaires"
+    )
+    parser.add_argument(
+        '--log-level',
+        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+        default='INFO',
+        help="Niveau de logging (défaut: INFO)"
+    )
+    subparsers = parser.add_subparsers(dest='commande', required=True)
+
+    parse_cmd = subparsers.add_parser('parse', help="Fichier TXT Sage -> grand livre nettoyé (.npz/.parquet)")
+    parse_cmd.add_argument('fichier_sage', help="Fichier TXT exporté de Sage")
+    parse_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: <fichier>.ledger.npz)")
+
+    compute_cmd = subparsers.add_parser('compute', help="Grand livre -> modèle des états (.json/.msgpack)")
+    compute_cmd.add_argument('grand_livre', nargs='?',
+                             help="Grand livre nettoyé (sortie de parse) ou fichier TXT Sage "
+                                  "(absent: exercice lu dans l'entrepôt)")
+    compute_cmd.add_argument('--client', help="Nom du client (mapping du suivi d'activité)")
+    compute_cmd.add_argument('--exercice', type=int, help="Exercice à lire dans l'entrepôt (sans grand livre)")
+    compute_cmd.add_argument('--entrepot', help="Entrepôt SQLite (défaut: entrepot/grand_livre.sqlite3)")
+    compute_cmd.add_argument('--budget', help="Budget CSV/XLSX multi-clients (colonne BUDGET PREVI)")
+    compute_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: <fichier>.modele.json)")
+
+    excel_cmd = subparsers.add_parser('render-excel', help="Modèle des états -> fichier Excel")
+    excel_cmd.add_argument('modele', help="Modèle des états (sortie de compute)")
+    excel_cmd.add_argument('--grand-livre', help="Grand livre nettoyé (défaut: celui enregistré dans le modèle)")
+    excel_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: RAPPORT_<fichier>.xlsx)")
+
+    ppt_cmd = subparsers.add_parser('render-ppt', help="Modèle des états -> PowerPoint")
+    ppt_cmd.add_argument('modele', help="Modèle des états (sortie de compute)")
+    ppt_cmd.add_argument('--excel', help="Classeur dont les tableaux sont repris (défaut: RAPPORT_<fichier>.xlsx)")
+    ppt_cmd.add_argument('--commentaires', '-c', help="Fichier JSON avec commentaires pré-saisis")
+    ppt_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: RAPPORT_<fichier>.pptx)")
+
+    balance_cmd = subparsers.add_parser('balance', help="Grand livre -> balance à six colonnes d'une période (.xlsx)")
+    balance_cmd.add_argument('grand_livre', help="Fichier TXT Sage ou grand livre nettoyé (sortie de parse)")
+    balance_cmd.add_argument('--du', help="Début de la période (JJ/MM/AAAA; écritures antérieures en ouverture)")
+    balance_cmd.add_argument('--au', help="Fin de la période incluse (JJ/MM/AAAA)")
+    balance_cmd.add_argument('--fins-de-mois', action='store_true',
+                             help="Ajouter les soldes des douze fins de mois de l'exercice")
+    balance_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: BALANCE_<fichier>.xlsx)")
+
+    cumul_cmd = subparsers.add_parser('cumul', help="Export cumulé du mois -> état de l'exercice (ingestion incrémentale)")
+    cumul_cmd.add_argument('fichier_sage', help="Fichier TXT exporté de Sage (cumul depuis le début de l'exercice)")
+    cumul_cmd.add_argument('--etat', required=True, help="État cumulé de l'exercice (.cumul.npz, créé s'il n'existe pas)")
+
+    ingest_cmd = subparsers.add_parser('ingest', help="Export Sage -> entrepôt local (historique par client et exercice)")
+    ingest_cmd.add_argument('fichier_sage', help="Fichier TXT exporté de Sage")
+    ingest_cmd.add_argument('--client', required=True, help="Nom du client")
+    ingest_cmd.add_argument('--exercice', type=int, help="Exercice (défaut: année la plus fréquente des écritures)")
+    ingest_cmd.add_argument('--entrepot', help="Entrepôt SQLite (défaut: entrepot/grand_livre.sqlite3)")
+
+    conso_cmd = subparsers.add_parser('consolidate', help="Entités liées -> bilan, CR et SIG consolidés (.xlsx)")
+    conso_cmd.add_argument('--entite', action='append', required=True, metavar='NOM[=FICHIER]',
+                           help="Entité de l'entrepôt, ou export Sage à y intégrer (répéter pour chaque entité)")
+    conso_cmd.add_argument('--eliminations', help="Paires de comptes intragroupe (CSV/JSON: entite_a, compte_a, "
+                                                  "entite_b, compte_b)")
+    conso_cmd.add_argument('--exercice', type=int, help="Exercice (défaut: celui de chaque entité)")
+    conso_cmd.add_argument('--entrepot', help="Entrepôt SQLite (défaut: entrepot/grand_livre.sqlite3)")
+    conso_cmd.add_argument('--workers', type=int,
+                           help="Exports parsés (processus) et entités lues en parallèle (défaut: toutes)")
+    conso_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: CONSOLIDATION_<entités>.xlsx)")
+
+    reconcile_cmd = subparsers.add_parser('reconcile', help="Deux entités liées -> rapprochement des comptes "
+                                                            "intragroupe (.xlsx)")
+    reconcile_cmd.add_argument('--entite', action='append', required=True, metavar='NOM[=FICHIER]',
+                               help="Entité de l'entrepôt, ou son grand livre (TXT Sage ou sortie de parse); "
+                                    "deux fois: A puis B")
+    reconcile_cmd.add_argument('--paires', required=True, help="Paires de comptes intragroupe (même format que "
+                                                               "les éliminations de consolidate)")
+    reconcile_cmd.add_argument('--fenetre', type=int, help="Écart de dates admis en jours (défaut: 5)")
+    reconcile_cmd.add_argument('--exercice', type=int, help="Exercice lu dans l'entrepôt (défaut: le dernier)")
+    reconcile_cmd.add_argument('--entrepot', help="Entrepôt SQLite (défaut: entrepot/grand_livre.sqlite3)")
+    reconcile_cmd.add_argument('--output', '-o', help="Fichier de sortie (défaut: RAPPROCHEMENT_<A>_<B>.xlsx)")
+
+    return parser
+
+
+def run_stage_command(args, logger: Optional[logging.Logger] = None) -> bool:
+    """
+    Exécute une sous-commande d'étape
+
+    Args:
+        args: Arguments analysés par build_stage_parser()
+        logger: Logger (optionnel)
+
+    Returns:
+        True si l'étape s'est terminée avec succès
+    """
+    if logger is None:
+        logger = logging.getLogger(__name__)
+
+    commandes = {
+        'parse': commande_parse,
+        'compute': commande_compute,
+        'render-excel': commande_render_excel,
+        'render-ppt': commande_render_ppt,
+        'balance': commande_balance,
+        'cumul': commande_cumul,
+        'ingest': commande_ingest,
+        'consolidate': commande_consolidate,
+        'reconcile': commande_reconcile,
+    }
+
+    print(f"🔄 Étape {args.commande}...")
+    logger.info(f"Sous-commande: {args.commande}")
+    try:
+        return commandes[args.commande](args, logger)
+    except Exception as e:
+        print(f"❌ Erreur ({args.commande}): {e}")
+        logger.error(f"Erreur lors de l'étape {args.commande}: {e}", exc_info=True)
+        return False
+
 
 def main():
     """Point d'entrée principal du script"""
     
+    # Sous-commandes par étape (l'argument positionnel reste le fichier Sage sinon)
+    if len(sys.argv) > 1 and sys.argv[1] in STAGE_COMMANDS:
+        stage_args = build_stage_parser().parse_args()
+        logger = setup_logging(stage_args.log_level)
+        sys.exit(0 if run_stage_command(stage_args, logger) else 1)
+
     # Parser les arguments
     parser = argparse.ArgumentParser(
         description="Génération automatique de rapports comptables",
@@ -437,6 +1301,43 @@ Exemples d'utilisation:
 
   # Avec client spécifique (utilise le mapping personnalisé)
   python main.py fichier_sage.txt --client "BLUE LEASE" --sans-ui
+
+  # Colonne "Rappel année N-1" depuis le grand livre de l'année précédente
+  python main.py fichier_sage.txt --client "BLUE LEASE" --gl-n1 gl_annee_precedente.txt --sans-ui
+
+  # Colonne "BUDGET PREVI" et écart au budget (budget multi-clients, lignes du client)
+  python main.py fichier_sage.txt --client "BLUE LEASE" --budget budget_2025.csv --sans-ui
+
+  # Régénérer même si le fichier source, le mapping et les commentaires sont inchangés
+  python main.py fichier_sage.txt --sans-ui --force
+
+  # Avec profil d'exécution par étape (RAPPORT_..._profile.json)
+  python main.py fichier_sage.txt --sans-ui --profile
+
+  # Démon local (POST http://127.0.0.1:8765/jobs {"fichier_sage": "...", "client": "..."})
+  python main.py --daemon --workers 2
+
+  # Surveillance d'un dossier partagé (client déduit du nom du fichier)
+  python main.py --watch "D:/Exports Sage"
+
+  # Étapes séparées avec artefacts réutilisables (rendu seul après changement de commentaires)
+  python main.py parse fichier_sage.txt                  # -> fichier_sage.ledger.npz
+  python main.py compute fichier_sage.ledger.npz --client "BLUE LEASE"
+  python main.py render-excel fichier_sage.modele.json    # -> RAPPORT_fichier_sage.xlsx
+  python main.py render-ppt fichier_sage.modele.json -c commentaires.json
+
+  # Balance à six colonnes d'une période (ouverture, mouvements, clôture)
+  python main.py balance fichier_sage.txt --du 01/01/2025 --au 31/03/2025 --fins-de-mois
+
+  # Entrepôt local (historique par client et exercice, lu par compute et le rappel N-1)
+  python main.py ingest fichier_sage.txt --client "BLUE LEASE"
+  python main.py compute --client "BLUE LEASE" --exercice 2025
+
+  # Consolidation d'entités liées (éliminations intragroupe: entite_a;compte_a;entite_b;compte_b)
+  python main.py consolidate --entite "BIMMO=gl_bimmo.txt" --entite MIMMO --eliminations intragroupe.csv
+
+  # Rapprochement des comptes intragroupe (montant, pièce, dates à 5 jours près)
+  python main.py reconcile --entite BIMMO --entite "MIMMO=gl_mimmo.txt" --paires intragroupe.csv
         """
     )
     
@@ -466,12 +1367,62 @@ Exemples d'utilisation:
         help="Nom du client (ex: 'BLUE LEASE', 'BIT', etc.) pour utiliser son mapping spécifique"
     )
 
+    parser.add_argument(
+        '--gl-n1',
+        metavar='FICHIER',
+        help="Grand livre de l'exercice précédent, ajouté à l'entrepôt pour la colonne 'Rappel année N-1' "
+             "(nécessite --client)"
+    )
+
+    parser.add_argument(
+        '--budget',
+        metavar='FICHIER',
+        help="Budget CSV/XLSX (client, categorie, mois, montant) pour la colonne 'BUDGET PREVI' "
+             "(défaut: config.json 'budget.fichier')"
+    )
+
     parser.add_argument(
         '--sans-ui',
         action='store_true',
         help="Générer sans interface utilisateur (mode automatique)"
     )
 
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="Mesurer la durée et la mémoire de chaque étape (profil JSON à côté des sorties)"
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help="Régénérer les rapports même si leurs entrées n'ont pas changé (manifeste)"
+    )
+
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help="Lancer le démon de génération (serveur HTTP local, voir config.json 'daemon')"
+    )
+
+    parser.add_argument(
+        '--watch',
+        metavar='DOSSIER',
+        help="Surveiller un dossier et générer un rapport pour chaque nouvel export TXT"
+    )
+
+    parser.add_argument(
+        '--port',
+        type=int,
+        help="Port d'écoute du démon (défaut: config.json)"
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help="Nombre de rapports générés en parallèle (démon, surveillance; défaut: config.json)"
+    )
+
     parser.add_argument(
         '--log-level',
         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
@@ -483,7 +1434,23 @@ Exemples d'utilisation:
     
     # Configuration du logging
     logger = setup_logging(args.log_level)
-    
+
+    if args.daemon:
+        run_daemon(port=args.port, workers=args.workers, logger=logger)
+        sys.exit(0)
+
+    if args.watch:
+        run_watch(args.watch, workers=args.workers, logger=logger)
+        sys.exit(0)
+
+    # Exercice précédent ajouté à l'entrepôt (une seule fois: les rapports suivants le relisent)
+    if args.gl_n1:
+        if not args.client:
+            parser.error("--gl-n1 nécessite --client")
+        from modules import warehouse
+        stats = warehouse.LedgerWarehouse().ingest(args.gl_n1, args.client)
+        print(f"🗄️ Exercice {stats['exercice']} ajouté à l'entrepôt ({stats['ajoutees']} écriture(s))")
+
     # Génération du rapport
     success = generer_rapport_complet(
         fichier_sage=args.fichier_sage,
@@ -492,7 +1459,10 @@ Exemples d'utilisation:
         commentaires_file=args.commentaires,
         client_name=args.client,
         sans_ui=args.sans_ui,
-        logger=logger
+        logger=logger,
+        profile=args.profile,
+        force=args.force,
+        budget_file=args.budget
     )
     
     # Code de sortie
@@ -500,4 +1470,7 @@ Exemples d'utilisation:
 
 
 if __name__ == "__main__":
+    # Exécutable PyInstaller: les processus de travail relancent l'exécutable
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
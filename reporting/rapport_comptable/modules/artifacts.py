@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 9: Artefacts intermédiaires du pipeline
+
+Permet de relancer une seule étape (ex: le rendu après une modification du
+modèle PowerPoint ou des commentaires) sans reparser ni recalculer, ou de
+répartir le rendu sur d'autres postes.
+
+Artefacts:
+- Grand livre nettoyé, stockage en colonnes:
+    .npz      une colonne numpy par champ (sans dépendance supplémentaire)
+    .parquet  si pyarrow est installé
+- Modèle des états (balance, bilan, compte de résultat, SIG, suivi d'activité):
+    .json     par défaut
+    .msgpack  si msgpack est installé
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import montants
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT = "rapport_comptable.modele"
+MODEL_VERSION = 2  # 2: montants en unités mineures entières (utils.montants)
+
+LEDGER_SUFFIX = ".ledger.npz"
+MODEL_SUFFIX = ".modele.json"
+
+# Éléments du modèle transmis tels quels aux générateurs Excel et PowerPoint
+MODEL_STATEMENTS = ('compte_resultat', 'bilan', 'sig', 'suivi_data')
+
+_META_KEY = "__meta__"
+_NA_SUFFIX = "__na"
+
+
+def _artifact_stem(path: Path) -> str:
+    """Nom de base d'un fichier source ou d'un artefact (sans .ledger/.modele)"""
+    name = Path(path).name
+    for suffix in (LEDGER_SUFFIX, MODEL_SUFFIX, ".ledger.parquet", ".modele.msgpack"):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(path).stem
+
+
+def default_ledger_path(fichier_sage: Path) -> Path:
+    """Chemin par défaut du grand livre nettoyé (à côté du fichier source)"""
+    return Path(fichier_sage).with_name(_artifact_stem(fichier_sage) + LEDGER_SUFFIX)
+
+
+def default_model_path(ledger_path: Path) -> Path:
+    """Chemin par défaut du modèle des états (à côté du grand livre)"""
+    return Path(ledger_path).with_name(_artifact_stem(ledger_path) + MODEL_SUFFIX)
+
+
+def default_report_path(model_path: Path, extension: str, prefix: str = "RAPPORT") -> Path:
+    """Chemin par défaut d'un rapport rendu depuis un modèle ou un grand livre (<PREFIXE>_<nom>.<ext>)"""
+    return Path(model_path).with_name(f"{prefix}_{_artifact_stem(model_path)}{extension}")
+
+
+# ===========================
+# GRAND LIVRE (COLONNES)
+# ===========================
+
+def save_ledger(df: pd.DataFrame, path: Path) -> Path:
+    """
+    Enregistre le grand livre nettoyé en colonnes
+
+    Args:
+        df: DataFrame nettoyé (sage_parser.clean_data)
+        path: Fichier de sortie (.npz, ou .parquet avec pyarrow)
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    path = Path(path)
+
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+        logger.info(f"💾 Grand livre enregistré: {path} ({len(df)} lignes)")
+        return path
+
+    if path.suffix != '.npz':
+        raise ValueError(f"Format de grand livre non supporté: {path.suffix} (.npz ou .parquet)")
+
+    arrays = {}
+    dtypes = {}
+    for col in df.columns:
+        serie = df[col]
+        na = serie.isna().to_numpy()
+        if na.any():
+            arrays[col + _NA_SUFFIX] = na
+
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            arrays[col] = serie.to_numpy()
+        elif pd.api.types.is_integer_dtype(serie):
+            arrays[col] = serie.to_numpy(dtype='int64', na_value=0)
+        elif pd.api.types.is_float_dtype(serie):
+            arrays[col] = serie.to_numpy(dtype='float64')
+        else:
+            arrays[col] = serie.fillna('').astype(str).to_numpy(dtype=str)
+        dtypes[col] = str(serie.dtype)
+
+    meta = {'columns': list(df.columns), 'dtypes': dtypes}
+    # Tableaux numpy natifs uniquement: relecture sans pickle
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays, **{_META_KEY: np.array(json.dumps(meta))})
+
+    logger.info(f"💾 Grand livre enregistré: {path} ({len(df)} lignes)")
+    return path
+
+
+def load_ledger(path: Path) -> pd.DataFrame:
+    """
+    Relit un grand livre enregistré par save_ledger
+
+    Args:
+        path: Fichier .npz ou .parquet
+
+    Returns:
+        DataFrame identique à celui enregistré (colonnes et types)
+    """
+    path = Path(path)
+
+    if path.suffix == '.parquet':
+        return _montants_en_unites(pd.read_parquet(path))
+
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data[_META_KEY]))
+        columns = {}
+        for col in meta['columns']:
+            serie = pd.Series(data[col]).astype(meta['dtypes'][col])
+            if col + _NA_SUFFIX in data.files:
+                serie = serie.mask(data[col + _NA_SUFFIX])
+            columns[col] = serie
+
+    df = _montants_en_unites(pd.DataFrame(columns, columns=meta['columns']))
+    logger.info(f"📂 Grand livre chargé: {path} ({len(df)} lignes)")
+    return df
+
+
+def _montants_en_unites(df: pd.DataFrame) -> pd.DataFrame:
+    """Convertit en unités mineures entières les montants d'un grand livre enregistré en FCFA décimaux (ancien format)"""
+    for col in ('debit', 'credit', 'solde'):
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]):
+            df[col] = montants.en_unites(df[col])
+    return df
+
+
+# ===========================
+# MODÈLE DES ÉTATS
+# ===========================
+
+def compute_model(df: pd.DataFrame, client_code: Optional[str] = None,
+                  client_name: Optional[str] = None, budget_file: Optional[Path] = None,
+                  db_path: Optional[Path] = None) -> Dict:
+    """
+    Calcule les états à partir du grand livre nettoyé
+
+    Étape 2 du pipeline complet (main) et de la sous-commande compute: chaque
+    calcul est une étape mesurée (profile_stage), donc aussi un point de
+    contrôle du budget de temps et de l'annulation.
+
+    Args:
+        df: Grand livre nettoyé
+        client_code: Code client pour le mapping du suivi d'activité (optionnel)
+        client_name: Nom du client: rappel N-1 lu dans l'entrepôt et lignes du budget (optionnel)
+        budget_file: Budget CSV/XLSX multi-clients (colonne BUDGET PREVI, nécessite client_name)
+        db_path: Entrepôt SQLite du rappel N-1 (défaut: modules.warehouse.DEFAULT_WAREHOUSE)
+
+    Returns:
+        Dictionnaire {balance, compte_resultat, bilan, sig, suivi_data}
+    """
+    from modules import data_processor, sage_parser
+    from utils.profiler import profile_stage
+    from utils.progress import report_count
+
+    with profile_stage("balance"):
+        balance = data_processor.calculate_balance(df)
+        # Arbre des comptes (totaux par classe et radical) partagé par le CR et le bilan
+        hierarchie = data_processor.AccountHierarchy.from_balance(balance)
+    logger.info(f"Balance calculée: {len(balance)} comptes")
+    report_count("comptes", len(balance))
+
+    # Compte de résultat et bilan (règles pré-compilées dans config.py)
+    with profile_stage("compte_resultat"):
+        compte_resultat = data_processor.generate_cr_synthetique(balance, hierarchie)
+    logger.info(f"Résultat net: {montants.format_fcfa(compte_resultat['resultat'])}")
+
+    with profile_stage("bilan"):
+        bilan = data_processor.generate_bilan_synthetique(balance, compte_resultat['resultat'], hierarchie)
+    logger.info(f"Bilan généré - Actif: {montants.en_fcfa(bilan['total_actif']):,.2f}, "
+                f"Passif: {montants.en_fcfa(bilan['total_passif']):,.2f}")
+
+    with profile_stage("sig"):
+        sig = data_processor.calculate_sig(compte_resultat)
+    logger.info(f"SIG calculés: {len(sig)} indicateurs")
+
+    # Suivi d'activité calculé une seule fois (feuille Excel + tendance PowerPoint)
+    with profile_stage("suivi_activite"):
+        suivi_data = data_processor.prepare_suivi_activite_detaille(df, client_code=client_code)
+
+    # Rappel de l'année N-1: soldes mensuels de l'exercice précédent lus dans l'entrepôt
+    with profile_stage("rappel_n1"):
+        data_processor.add_rappel_n1(suivi_data, data_processor.load_rappel_n1(
+            client_name, sage_parser.get_exercice(df), db_path
+        ))
+
+    # Budget prévisionnel du client: colonne BUDGET PREVI et écart au budget
+    if budget_file:
+        with profile_stage("budget"):
+            from modules.budget import add_budget, load_budget
+            if client_name:
+                add_budget(suivi_data, load_budget(budget_file, client_name))
+            else:
+                logger.warning("⚠️ Budget ignoré: aucun client indiqué (option --client)")
+
+    return {
+        'balance': balance,
+        'compte_resultat': compte_resultat,
+        'bilan': bilan,
+        'sig': sig,
+        'suivi_data': suivi_data,
+    }
+
+
+def _to_builtin(value):
+    """Convertit les scalaires numpy/pandas pour la sérialisation"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    raise TypeError(f"Type non sérialisable: {type(value).__name__}")
+
+
+def _balance_to_dict(balance: pd.DataFrame) -> Dict:
+    """Balance en colonnes/lignes (valeurs manquantes -> None)"""
+    return {
+        'columns': list(balance.columns),
+        'dtypes': {col: str(dtype) for col, dtype in balance.dtypes.items()},
+        'data': balance.astype(object).where(balance.notna(), None).values.tolist(),
+    }
+
+
+def _balance_from_dict(data: Dict) -> pd.DataFrame:
+    """Reconstruit la balance avec ses types d'origine"""
+    balance = pd.DataFrame(data['data'], columns=data['columns'])
+    return balance.astype(data['dtypes'])
+
+
+def save_model(model: Dict, path: Path, source: Optional[Dict] = None) -> Path:
+    """
+    Enregistre le modèle des états
+
+    Args:
+        model: Résultat de compute_model
+        path: Fichier de sortie (.json, ou .msgpack avec msgpack)
+        source: Informations sur l'origine (fichier, client, grand livre...)
+
+    Returns:
+        Chemin du fichier écrit
+    """
+    path = Path(path)
+    payload = {
+        'format': MODEL_FORMAT,
+        'version': MODEL_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': source or {},
+        'balance': _balance_to_dict(model['balance']),
+        **{name: model[name] for name in MODEL_STATEMENTS},
+    }
+
+    if path.suffix == '.msgpack':
+        import msgpack
+
+        with open(path, 'wb') as f:
+            f.write(msgpack.packb(payload, default=_to_builtin))
+    elif path.suffix == '.json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=_to_builtin)
+    else:
+        raise ValueError(f"Format de modèle non supporté: {path.suffix} (.json ou .msgpack)")
+
+    logger.info(f"💾 Modèle des états enregistré: {path}")
+    return path
+
+
+def load_model(path: Path) -> Dict:
+    """
+    Relit un modèle enregistré par save_model
+
+    Args:
+        path: Fichier .json ou .msgpack
+
+    Returns:
+        Dictionnaire {balance, compte_resultat, bilan, sig, suivi_data, source}
+
+    Raises:
+        ValueError: Si le fichier n'est pas un modèle de version compatible
+    """
+    path = Path(path)
+
+    if path.suffix == '.msgpack':
+        import msgpack
+
+        with open(path, 'rb') as f:
+            payload = msgpack.unpackb(f.read(), strict_map_key=False)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+    if payload.get('format') != MODEL_FORMAT or payload.get('version') != MODEL_VERSION:
+        raise ValueError(f"{path.name} n'est pas un modèle des états (version {MODEL_VERSION})")
+
+    model = {name: payload[name] for name in MODEL_STATEMENTS}
+    model['balance'] = _balance_from_dict(payload['balance'])
+    model['source'] = payload.get('source', {})
+
+    logger.info(f"📂 Modèle des états chargé: {path}")
+    return model
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 12: Budget prévisionnel et écart au budget du suivi d'activité
+
+Ce module gère:
+- La lecture en continu d'un fichier de budget CSV ou XLSX (plusieurs clients):
+  seules les lignes du client du rapport sont conservées, bloc par bloc
+- Le rapprochement vectorisé budget / réalisé mensuel par catégorie du suivi
+- La colonne "BUDGET PREVI" (budget cumulé jusqu'au dernier mois réalisé),
+  d'où l'"Ecart au budget" de la feuille SUIVI ACTIVITE
+
+Format du fichier (une ligne par client x catégorie x mois, en-têtes
+insensibles à la casse et aux accents):
+
+    client;categorie;mois;montant[;section]
+    BAMBOO IMMO;Frais bancaires;1;150000
+
+- mois: 1-12, nom du mois ("Janvier"), AAAA-MM ou date
+- montant: en FCFA, positif; le signe du suivi (charges négatives) est appliqué
+- section (optionnelle): personnel, charges ou produits, pour une catégorie
+  budgétée sans réalisé
+"""
+
+import csv
+import logging
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.montants import en_unites
+
+logger = logging.getLogger(__name__)
+
+BUDGET_COLUMNS = ['client', 'categorie', 'mois', 'montant']
+BUDGET_CHUNK_SIZE = 100_000  # Lignes lues par bloc (CSV)
+SECTIONS = ('personnel', 'charges', 'produits')
+SECTIONS_CHARGES = ('personnel', 'charges')
+
+_MOIS = {
+    'JANVIER': 1, 'FEVRIER': 2, 'MARS': 3, 'AVRIL': 4, 'MAI': 5, 'JUIN': 6,
+    'JUILLET': 7, 'AOUT': 8, 'SEPTEMBRE': 9, 'OCTOBRE': 10, 'NOVEMBRE': 11, 'DECEMBRE': 12,
+}
+_ORDRE_SANS_REALISE = 999  # Catégories budgétées sans réalisé: en fin de section
+
+
+def normalize_key(texte) -> str:
+    """Clé de rapprochement: majuscules, sans accents ni espaces multiples ("Impôts " -> "IMPOTS")"""
+    texte = unicodedata.normalize('NFKD', str(texte))
+    texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    return ' '.join(texte.upper().split())
+
+
+def _normalize_keys(serie: pd.Series) -> pd.Series:
+    """normalize_key sur une série: calculée une fois par valeur distincte (clients et catégories répétés)"""
+    codes, valeurs = pd.factorize(serie.astype(str))
+    cles = np.array([normalize_key(valeur) for valeur in valeurs] + [''], dtype=object)
+    return pd.Series(cles[codes], index=serie.index)
+
+
+def _parse_mois(serie: pd.Series) -> pd.Series:
+    """Mois 1-12 depuis un numéro, un nom de mois, AAAA-MM ou une date (0 si illisible)"""
+    texte = serie.astype(str).str.strip()
+    mois = pd.to_numeric(texte, errors='coerce')
+    noms = _normalize_keys(texte).map(_MOIS)
+    dates = pd.to_datetime(texte.where(texte.str.contains('-')), errors='coerce', format='mixed').dt.month
+    mois = mois.where(mois.between(1, 12)).fillna(noms).fillna(dates)
+    return mois.fillna(0).astype('int64')
+
+
+def _csv_delimiter(path: Path, encoding: str) -> str:
+    """Séparateur du CSV (';', ',' ou tabulation) déduit de l'en-tête"""
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        entete = f.readline()
+    try:
+        return csv.Sniffer().sniff(entete, delimiters=';,\t').delimiter
+    except csv.Error:
+        return ';'
+
+
+def _iter_csv(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Blocs du CSV (texte brut, en-têtes normalisés)"""
+    encoding = 'utf-8-sig'
+    try:
+        delimiter = _csv_delimiter(path, encoding)
+    except UnicodeDecodeError:
+        encoding = 'ISO-8859-1'
+        delimiter = _csv_delimiter(path, encoding)
+
+    colonnes = set(BUDGET_COLUMNS) | {'section'}
+    for bloc in pd.read_csv(path, sep=delimiter, dtype=str, encoding=encoding, chunksize=chunk_size,
+                            skipinitialspace=True, usecols=lambda col: normalize_key(col).lower() in colonnes):
+        bloc.columns = [normalize_key(col).lower() for col in bloc.columns]
+        yield bloc
+
+
+def _iter_xlsx(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Blocs de la première feuille du classeur (lecture seule, ligne à ligne)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        lignes = wb.worksheets[0].iter_rows(values_only=True)
+        entete = [normalize_key(col).lower() if col is not None else '' for col in next(lignes, [])]
+        bloc: List[tuple] = []
+        for ligne in lignes:
+            bloc.append(ligne)
+            if len(bloc) >= chunk_size:
+                yield pd.DataFrame(bloc, columns=entete)
+                bloc = []
+        if bloc:
+            yield pd.DataFrame(bloc, columns=entete)
+    finally:
+        wb.close()
+
+
+def load_budget(path: Path, client: str, chunk_size: int = BUDGET_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Lit le budget d'un client dans un fichier CSV ou XLSX multi-clients
+
+    Le fichier est lu par blocs: seules les lignes du client sont gardées en mémoire.
+
+    Args:
+        path: Fichier de budget (.csv ou .xlsx)
+        client: Nom du client (comparé sans casse ni accents)
+        chunk_size: Nombre de lignes par bloc
+
+    Returns:
+        DataFrame (cle, categorie, section, mois, budget) - budget en unités mineures,
+        positif, une ligne par catégorie et par mois
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        ValueError: Si une colonne obligatoire manque
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Fichier de budget introuvable: {path}")
+
+    blocs = _iter_xlsx(path, chunk_size) if path.suffix.lower() in ('.xlsx', '.xlsm') else _iter_csv(path, chunk_size)
+    cle_client = normalize_key(client)
+
+    retenus = []
+    for bloc in blocs:
+        manquantes = [col for col in BUDGET_COLUMNS if col not in bloc.columns]
+        if manquantes:
+            raise ValueError(f"Colonnes manquantes dans {path.name}: {', '.join(manquantes)}")
+        bloc = bloc[_normalize_keys(bloc['client']) == cle_client]
+        if not bloc.empty:
+            retenus.append(bloc)
+
+    if not retenus:
+        logger.warning(f"⚠️ Aucune ligne de budget pour {client} dans {path.name}")
+        return pd.DataFrame({'cle': [], 'categorie': [], 'section': [],
+                             'mois': np.array([], dtype='int64'), 'budget': np.array([], dtype='int64')})
+
+    lignes = pd.concat(retenus, ignore_index=True)
+    budget = pd.DataFrame({
+        'cle': _normalize_keys(lignes['categorie']),
+        'categorie': lignes['categorie'].astype(str).str.strip(),
+        'section': (lignes['section'].astype(str).str.strip().str.lower()
+                    if 'section' in lignes.columns else pd.Series('', index=lignes.index)),
+        'mois': _parse_mois(lignes['mois']),
+        'budget': en_unites(lignes['montant'].astype(str).str.replace(' ', '').str.replace(',', '.')),
+    })
+
+    illisibles = (budget['mois'] == 0) | budget['budget'].isna()
+    if illisibles.any():
+        logger.warning(f"⚠️ {int(illisibles.sum())} ligne(s) de budget ignorée(s) (mois ou montant illisible)")
+    budget = budget[~illisibles]
+    budget['budget'] = budget['budget'].astype('int64').abs()
+    budget['section'] = budget['section'].where(budget['section'].isin(SECTIONS), '')
+
+    budget = budget.groupby(['cle', 'mois'], as_index=False).agg(
+        categorie=('categorie', 'first'), section=('section', 'max'), budget=('budget', 'sum')
+    )
+    logger.info(f"📋 Budget {client}: {budget['cle'].nunique()} catégorie(s), {len(budget)} ligne(s) mensuelles")
+    return budget[['cle', 'categorie', 'section', 'mois', 'budget']]
+
+
+def _realise(suivi_data: Dict) -> pd.DataFrame:
+    """Réalisé mensuel du suivi en format long (section, libelle, cle, mois, realise)"""
+    from modules.data_processor import MOIS_NOMS
+
+    lignes = [
+        (section, categorie['libelle'], mois_num, categorie.get('mois_data', {}).get(mois_nom, 0))
+        for section in SECTIONS if isinstance(suivi_data.get(section), list)
+        for categorie in suivi_data[section]
+        for mois_num, mois_nom in enumerate(MOIS_NOMS, start=1)
+    ]
+    realise = pd.DataFrame(lignes, columns=['section', 'libelle', 'mois', 'realise'])
+    realise['cle'] = _normalize_keys(realise['libelle']) if len(realise) else pd.Series(dtype=str)
+    realise['realise'] = realise['realise'].astype('int64')
+    return realise
+
+
+def compare_budget(suivi_data: Dict, budget: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rapproche budget et réalisé par catégorie et par mois (jointure vectorisée)
+
+    Args:
+        suivi_data: Résultat de data_processor.prepare_suivi_activite_detaille
+        budget: Résultat de load_budget
+
+    Returns:
+        DataFrame (section, libelle, mois, realise, budget, ecart) dans le signe
+        du suivi (charges négatives): un écart positif est favorable
+    """
+    realise = _realise(suivi_data)
+    comparaison = realise.merge(budget, on=['cle', 'mois'], how='outer', suffixes=('', '_budget'))
+
+    comparaison['section'] = comparaison['section'].fillna(comparaison['section_budget']).fillna('')
+    comparaison['libelle'] = comparaison['libelle'].fillna(comparaison['categorie'])
+    comparaison['realise'] = comparaison['realise'].fillna(0).astype('int64')
+    comparaison['budget'] = comparaison['budget'].fillna(0).astype('int64')
+    comparaison['budget'] = comparaison['budget'].where(
+        ~comparaison['section'].isin(SECTIONS_CHARGES), -comparaison['budget']
+    )
+    comparaison['ecart'] = comparaison['realise'] - comparaison['budget']
+    return comparaison[['section', 'libelle', 'mois', 'realise', 'budget', 'ecart']]
+
+
+def add_budget(suivi_data: Dict, budget: Optional[pd.DataFrame], dernier_mois: Optional[int] = None) -> Dict:
+    """
+    Ajoute à chaque catégorie du suivi son budget cumulé ('budget')
+
+    Le budget est cumulé jusqu'au dernier mois réalisé, comme le TOTAL ANNEE:
+    l'écart au budget compare des périodes identiques.
+
+    Args:
+        suivi_data: Résultat de prepare_suivi_activite_detaille (modifié en place)
+        budget: Résultat de load_budget (None: rien à ajouter)
+        dernier_mois: Dernier mois du réalisé (défaut: dernier mois non nul du suivi)
+
+    Returns:
+        suivi_data
+    """
+    if budget is None or budget.empty:
+        return suivi_data
+
+    comparaison = compare_budget(suivi_data, budget)
+    if dernier_mois is None:
+        actifs = comparaison.loc[comparaison['realise'] != 0, 'mois']
+        dernier_mois = int(actifs.max()) if not actifs.empty else 12
+
+    sans_section = comparaison.loc[comparaison['section'] == '', 'libelle'].unique()
+    if len(sans_section):
+        logger.warning(f"⚠️ Budget sans réalisé ni section ignoré: {', '.join(map(str, sans_section))}")
+
+    cumul = (comparaison[(comparaison['mois'] <= dernier_mois) & (comparaison['section'] != '')]
+             .groupby(['section', 'libelle'])['budget'].sum())
+
+    for (section, libelle), montant in cumul.items():
+        categories = suivi_data.get(section)
+        if not isinstance(categories, list):
+            continue
+        categorie = next((c for c in categories if c['libelle'] == libelle), None)
+        if categorie is None:
+            if montant == 0:
+                continue
+            from modules.data_processor import MOIS_NOMS
+            categorie = {'libelle': libelle, 'ordre': _ORDRE_SANS_REALISE,
+                         'mois_data': {mois: 0 for mois in MOIS_NOMS}}
+            categories.append(categorie)
+        categorie['budget'] = int(montant)
+
+    logger.info(f"📋 Budget rapproché jusqu'au mois {dernier_mois}: {len(cumul)} catégorie(s)")
+    return suivi_data
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 13: Consolidation multi-entités
+
+États combinés (bilan, compte de résultat, SIG) d'entités liées (BIMMO,
+MIMMO, ...) à partir de leurs soldes mensuels dans l'entrepôt (Module 11):
+les cubes déjà intégrés sont relus, pas recalculés.
+
+Ce module gère:
+- La balance de chaque entité, lue dans l'entrepôt. Un export fourni est
+  d'abord intégré: la comparaison et le parsing de ses nouvelles écritures
+  se font dans des processus de travail (un par export), seule l'écriture
+  SQLite, courte, est faite l'une après l'autre dans le processus principal
+- Les éliminations intragroupe: pour chaque paire de comptes réciproques
+  (créance / dette, produit / charge), le montant commun est éliminé des deux
+  entités; l'écart éventuel reste dans les états et est signalé
+- La balance combinée et ses états, calculés comme ceux d'une entité
+
+Fichier des éliminations (CSV ou JSON, une paire par ligne):
+
+    entite_a;compte_a;entite_b;compte_b
+    BIMMO;4511;MIMMO;4521
+
+Les comptes sont des numéros ou des radicaux ("4511" couvre 45110000, 45111000...).
+"""
+
+import csv
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from modules import warehouse
+from utils.montants import format_fcfa
+
+logger = logging.getLogger(__name__)
+
+ELIMINATION_COLUMNS = ['entite_a', 'compte_a', 'entite_b', 'compte_b']
+
+
+def parse_entity_spec(spec: str) -> Tuple[str, Optional[Path]]:
+    """
+    Entité de la ligne de commande: "NOM" (déjà dans l'entrepôt) ou "NOM=fichier.txt"
+
+    Returns:
+        (nom de l'entité, export Sage à intégrer ou None)
+    """
+    nom, _, fichier = spec.partition('=')
+    if not nom.strip():
+        raise ValueError(f"Entité sans nom: '{spec}' (attendu NOM ou NOM=fichier.txt)")
+    return warehouse.client_key(nom), Path(fichier.strip()) if fichier.strip() else None
+
+
+def load_eliminations(path: Path) -> List[Dict]:
+    """
+    Lit la liste des paires de comptes à éliminer
+
+    Args:
+        path: Fichier CSV (séparateur ';' ou ',') ou JSON (liste d'objets)
+
+    Returns:
+        Liste de {entite_a, compte_a, entite_b, compte_b} (entités normalisées, comptes en texte)
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas
+        ValueError: Si une colonne manque
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Fichier des éliminations introuvable: {path}")
+
+    if path.suffix.lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            lignes = json.load(f)
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            contenu = f.read()
+        delimiter = ';' if contenu.split('\n', 1)[0].count(';') else ','
+        lignes = list(csv.DictReader(contenu.splitlines(), delimiter=delimiter))
+
+    paires = []
+    for numero, ligne in enumerate(lignes, start=1):
+        ligne = {str(cle).strip().lower(): valeur for cle, valeur in ligne.items() if cle is not None}
+        manquantes = [col for col in ELIMINATION_COLUMNS if not str(ligne.get(col) or '').strip()]
+        if manquantes:
+            raise ValueError(f"{path.name}, paire {numero}: {', '.join(manquantes)} manquant(s)")
+        paires.append({
+            'entite_a': warehouse.client_key(str(ligne['entite_a'])),
+            'compte_a': str(ligne['compte_a']).strip(),
+            'entite_b': warehouse.client_key(str(ligne['entite_b'])),
+            'compte_b': str(ligne['compte_b']).strip(),
+        })
+
+    logger.info(f"📋 {len(paires)} paire(s) de comptes intragroupe à éliminer")
+    return paires
+
+
+def _prepare_export(db_path: Path, nom: str, fichier: Path, exercice: Optional[int]) -> Dict:
+    """Intégration préparée d'un export (exécutée dans un processus de travail)"""
+    return warehouse.LedgerWarehouse(db_path).prepare_ingest(fichier, nom, exercice)
+
+
+def ingest_exports(entites: List[Tuple[str, Optional[Path]]], exercice: Optional[int] = None,
+                   db_path: Optional[Path] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Intègre à l'entrepôt les exports fournis (NOM=fichier.txt)
+
+    Le parsing est lié au GIL et l'écriture SQLite prend le verrou de la base:
+    les exports sont comparés et parsés dans des processus séparés, puis
+    écrits l'un après l'autre (transactions courtes).
+
+    Args:
+        entites: Liste de (nom, export Sage ou None) - voir parse_entity_spec
+        exercice: Exercice (défaut: celui de chaque export)
+        db_path: Entrepôt SQLite (défaut: warehouse.DEFAULT_WAREHOUSE)
+        workers: Nombre de processus de travail (défaut: un par export)
+
+    Returns:
+        {nom: exercice intégré} pour les entités fournies avec un export
+    """
+    db_path = Path(db_path or warehouse.DEFAULT_WAREHOUSE)
+    entrepot = warehouse.LedgerWarehouse(db_path)
+    exports = [(warehouse.client_key(nom), fichier) for nom, fichier in entites if fichier is not None]
+
+    if len(exports) > 1 and (workers or len(exports)) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers or len(exports), len(exports))) as executor:
+            futures = [executor.submit(_prepare_export, db_path, nom, fichier, exercice) for nom, fichier in exports]
+            preparations = [future.result() for future in futures]
+    else:
+        preparations = [entrepot.prepare_ingest(fichier, nom, exercice) for nom, fichier in exports]
+
+    return {preparation['client']: entrepot.commit_ingest(preparation)['exercice']
+            for preparation in preparations}
+
+
+def _entity_balance(entrepot: warehouse.LedgerWarehouse, nom: str, exercice: Optional[int]) -> Dict:
+    """Balance d'une entité lue dans l'entrepôt (dernier exercice par défaut)"""
+    if exercice is None:
+        exercices = entrepot.exercices(nom)
+        if not exercices:
+            raise ValueError(f"Entité absente de l'entrepôt: {nom} (indiquer NOM=fichier.txt)")
+        exercice = exercices[-1]
+
+    balance = entrepot.balance(nom, exercice)
+    if balance.empty:
+        raise ValueError(f"Aucune écriture dans l'entrepôt pour {nom} {exercice}")
+    return {'exercice': exercice, 'balance': balance}
+
+
+def entity_balances(entites: List[Tuple[str, Optional[Path]]], exercice: Optional[int] = None,
+                    db_path: Optional[Path] = None, workers: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Balances des entités, lues dans l'entrepôt après intégration des exports fournis
+
+    Seules les lectures de l'entrepôt (connexions séparées, mode WAL) sont
+    faites en parallèle sur des threads; l'intégration des exports est
+    faite par ingest_exports.
+
+    Args:
+        entites: Liste de (nom, export Sage ou None) - voir parse_entity_spec
+        exercice: Exercice (défaut: celui de l'export, ou le dernier de l'entrepôt)
+        db_path: Entrepôt SQLite (défaut: warehouse.DEFAULT_WAREHOUSE)
+        workers: Nombre d'entités traitées en parallèle (défaut: une par entité)
+
+    Returns:
+        {nom: {'exercice', 'balance'}} dans l'ordre des entités
+    """
+    integres = ingest_exports(entites, exercice, db_path, workers)
+    entrepot = warehouse.LedgerWarehouse(db_path or warehouse.DEFAULT_WAREHOUSE)
+    with ThreadPoolExecutor(max_workers=workers or len(entites), thread_name_prefix="entite") as executor:
+        futures = {
+            nom: executor.submit(_entity_balance, entrepot, nom, integres.get(nom, exercice))
+            for nom in (warehouse.client_key(nom) for nom, _ in entites)
+        }
+        return {nom: future.result() for nom, future in futures.items()}
+
+
+def _matching(balance: pd.DataFrame, compte: str) -> pd.Series:
+    """Masque des comptes de la balance couverts par un numéro ou un radical"""
+    return balance['compte'].astype(str).str.startswith(compte)
+
+
+def _reduce(balance: pd.DataFrame, masque: pd.Series, montant: int):
+    """
+    Ramène vers zéro les soldes des comptes masqués, à hauteur de montant (unités mineures)
+
+    L'élimination est passée en mouvement de sens contraire (crédit d'un solde
+    débiteur, débit d'un solde créditeur), compte par compte dans l'ordre.
+    """
+    sens = 1 if balance.loc[masque, 'solde'].sum() > 0 else -1
+    reste = montant
+    for index in balance.index[masque]:
+        if reste <= 0:
+            break
+        part = min(reste, max(sens * int(balance.at[index, 'solde']), 0))
+        if sens > 0:
+            balance.at[index, 'total_credit'] += part
+        else:
+            balance.at[index, 'total_debit'] += part
+        balance.at[index, 'solde'] -= sens * part
+        reste -= part
+
+
+def _with_soldes(balance: pd.DataFrame) -> pd.DataFrame:
+    """Recalcule les colonnes de solde de la balance à partir des totaux"""
+    balance['solde'] = balance['total_debit'] - balance['total_credit']
+    balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+    balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
+    return balance
+
+
+def apply_eliminations(balances: Dict[str, pd.DataFrame],
+                       eliminations: List[Dict]) -> Tuple[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Élimine les soldes réciproques des paires de comptes intragroupe
+
+    Pour une paire de soldes de sens contraires (ex: créance de A sur B et dette
+    de B envers A), le plus petit des deux montants est éliminé des deux côtés.
+    Deux soldes de même sens ne sont pas réciproques: rien n'est éliminé.
+
+    Args:
+        balances: {entité: balance au format de calculate_balance} (non modifiées)
+        eliminations: Résultat de load_eliminations
+
+    Returns:
+        (balances après éliminations, rapport des éliminations: entite_a, compte_a,
+        solde_a, entite_b, compte_b, solde_b, elimine, ecart, statut)
+    """
+    ajustees = {nom: balance.copy() for nom, balance in balances.items()}
+    rapport = []
+
+    for paire in eliminations:
+        ligne = dict(paire)
+        absentes = [paire[cle] for cle in ('entite_a', 'entite_b') if paire[cle] not in ajustees]
+        if absentes:
+            rapport.append({**ligne, 'solde_a': 0, 'solde_b': 0, 'elimine': 0, 'ecart': 0,
+                            'statut': f"entité absente: {', '.join(absentes)}"})
+            continue
+
+        balance_a, balance_b = ajustees[paire['entite_a']], ajustees[paire['entite_b']]
+        masque_a, masque_b = _matching(balance_a, paire['compte_a']), _matching(balance_b, paire['compte_b'])
+        solde_a, solde_b = int(balance_a.loc[masque_a, 'solde'].sum()), int(balance_b.loc[masque_b, 'solde'].sum())
+
+        if solde_a * solde_b > 0:
+            elimine, statut = 0, "soldes de même sens"
+        else:
+            elimine = min(abs(solde_a), abs(solde_b))
+            _reduce(balance_a, masque_a, elimine)
+            _reduce(balance_b, masque_b, elimine)
+            statut = "éliminé" if abs(solde_a) == abs(solde_b) else "écart"
+
+        rapport.append({**ligne, 'solde_a': solde_a, 'solde_b': solde_b, 'elimine': elimine,
+                        'ecart': abs(solde_a) - abs(solde_b), 'statut': statut})
+        if statut != "éliminé":
+            logger.warning(f"⚠️ {paire['entite_a']} {paire['compte_a']} / {paire['entite_b']} "
+                           f"{paire['compte_b']}: {statut}")
+
+    colonnes = ELIMINATION_COLUMNS[:2] + ['solde_a'] + ELIMINATION_COLUMNS[2:] + \
+        ['solde_b', 'elimine', 'ecart', 'statut']
+    return {nom: _with_soldes(balance) for nom, balance in ajustees.items()}, pd.DataFrame(rapport, columns=colonnes)
+
+
+def combine_balances(balances: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Balance combinée: totaux des entités sommés par compte
+
+    Returns:
+        DataFrame au format de calculate_balance (libellé de la première entité)
+    """
+    combinee = (pd.concat(list(balances.values()), ignore_index=True)
+                .groupby('compte', as_index=False, sort=True)
+                .agg(libelle=('libelle', 'first'), total_debit=('total_debit', 'sum'),
+                     total_credit=('total_credit', 'sum')))
+    combinee['compte'] = combinee['compte'].astype('Int64')
+    return _with_soldes(combinee)
+
+
+def consolidate(entites: List[Tuple[str, Optional[Path]]], eliminations: Optional[List[Dict]] = None,
+                exercice: Optional[int] = None, db_path: Optional[Path] = None,
+                workers: Optional[int] = None) -> Dict:
+    """
+    Consolide les entités: balances depuis l'entrepôt, éliminations, états combinés
+
+    Args:
+        entites: Liste de (nom, export Sage ou None)
+        eliminations: Paires de comptes intragroupe (load_eliminations, optionnel)
+        exercice: Exercice commun (défaut: celui de chaque entité)
+        db_path: Entrepôt SQLite (défaut: warehouse.DEFAULT_WAREHOUSE)
+        workers: Nombre d'exports parsés et d'entités lues en parallèle
+
+    Returns:
+        Dictionnaire {entites: {nom: {exercice, balance, resultat}}, eliminations,
+        balance, compte_resultat, bilan, sig} - montants en unités mineures
+    """
+    from modules import data_processor
+
+    if len(entites) < 2:
+        raise ValueError("La consolidation nécessite au moins deux entités")
+
+    par_entite = entity_balances(entites, exercice, db_path, workers)
+    exercices = sorted({infos['exercice'] for infos in par_entite.values()})
+    if len(exercices) > 1:
+        logger.warning(f"⚠️ Entités d'exercices différents: {', '.join(map(str, exercices))}")
+
+    for infos in par_entite.values():
+        infos['resultat'] = data_processor.generate_cr_synthetique(infos['balance'])['resultat']
+
+    ajustees, rapport = apply_eliminations(
+        {nom: infos['balance'] for nom, infos in par_entite.items()}, eliminations or []
+    )
+    balance = combine_balances(ajustees)
+    hierarchie = data_processor.AccountHierarchy.from_balance(balance)
+    compte_resultat = data_processor.generate_cr_synthetique(balance, hierarchie)
+    bilan = data_processor.generate_bilan_synthetique(balance, compte_resultat['resultat'], hierarchie)
+    sig = data_processor.calculate_sig(compte_resultat)
+
+    logger.info(f"✅ Consolidation de {len(par_entite)} entités: {len(balance)} comptes, "
+                f"éliminations: {format_fcfa(int(rapport['elimine'].sum()))}")
+    return {
+        'entites': par_entite,
+        'eliminations': rapport,
+        'balance': balance,
+        'compte_resultat': compte_resultat,
+        'bilan': bilan,
+        'sig': sig,
+    }
@@ -8,12 +8,24 @@ Ce module gère:
 - La génération des synthèses comptables (bilan, compte de résultat)
 - Le calcul des Soldes Intermédiaires de Gestion (SIG)
 - La préparation des données pour le suivi d'activité
+- L'index par préfixe de compte sur la balance (annexes)
+- La balance à six colonnes (ouverture, mouvements, clôture) et l'index
+  cumulé par compte pour toute période sans reparcourir le grand livre
+- La balance à une date et les soldes des douze fins de mois (index cumulé)
+- L'arbre des comptes (classe → radicaux → compte) et ses totaux par nœud
+- Le rappel de l'année N-1 du suivi d'activité (soldes mensuels de l'entrepôt)
+
+Les montants sont des entiers en unités mineures (utils.montants): toutes les
+sommes sont exactes.
 """
 
+import numpy as np
 import pandas as pd
+import copy
 import logging
 import re
 import json
+from bisect import bisect_left
 from pathlib import Path
 from typing import Dict, List, Tuple, Set, Optional
 import sys
@@ -21,6 +33,7 @@ import sys
 # Importer la configuration
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import get_bilan_actif_regles, get_bilan_passif_regles, get_cr_charges_regles, get_cr_produits_regles, RegleCorrespondance
+from utils.montants import en_fcfa, format_fcfa
 
 logger = logging.getLogger(__name__)
 
@@ -51,14 +64,479 @@ def calculate_balance(df: pd.DataFrame) -> pd.DataFrame:
     balance['solde'] = balance['total_debit'] - balance['total_credit']
 
     # Déterminer le sens du solde
-    balance['solde_debiteur'] = balance['solde'].apply(lambda x: x if x > 0 else 0)
-    balance['solde_crediteur'] = balance['solde'].apply(lambda x: -x if x < 0 else 0)
+    balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+    balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
 
     logger.info(f"Balance calculée: {len(balance)} comptes")
 
     return balance
 
 
+JOURNAL_OUVERTURE = 'RAN'  # Journal des reports à nouveau
+
+MOIS_NOMS = [
+    'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
+]
+
+BALANCE_SIX_COLONNES = ['compte', 'libelle',
+                        'ouverture_debit', 'ouverture_credit',
+                        'mouvement_debit', 'mouvement_credit',
+                        'cloture_debit', 'cloture_credit']
+
+
+def _split_solde(solde) -> Tuple[np.ndarray, np.ndarray]:
+    """Répartit un solde (débit - crédit) en colonnes débitrice et créditrice"""
+    solde = np.asarray(solde)
+    return np.clip(solde, 0, None), np.clip(-solde, 0, None)
+
+
+def _assemble_six_colonnes(comptes, libelles, ouverture, mouvement_debit, mouvement_credit) -> pd.DataFrame:
+    """Construit la balance à six colonnes à partir du solde d'ouverture et des mouvements"""
+    mouvement_debit = np.asarray(mouvement_debit)
+    mouvement_credit = np.asarray(mouvement_credit)
+    ouverture_debit, ouverture_credit = _split_solde(ouverture)
+    cloture_debit, cloture_credit = _split_solde(np.asarray(ouverture) + mouvement_debit - mouvement_credit)
+
+    return pd.DataFrame({
+        'compte': comptes,
+        'libelle': libelles,
+        'ouverture_debit': ouverture_debit,
+        'ouverture_credit': ouverture_credit,
+        'mouvement_debit': mouvement_debit,
+        'mouvement_credit': mouvement_credit,
+        'cloture_debit': cloture_debit,
+        'cloture_credit': cloture_credit,
+    }, columns=BALANCE_SIX_COLONNES)
+
+
+def calculate_balance_six_colonnes(df: pd.DataFrame, date_debut=None, date_fin=None,
+                                   journal_ouverture: str = JOURNAL_OUVERTURE) -> pd.DataFrame:
+    """
+    Balance à six colonnes: soldes d'ouverture, mouvements de la période, soldes de clôture
+
+    Un seul groupby vectorisé: chaque écriture est d'abord classée (ouverture,
+    période, hors période) par des masques, puis les quatre montants sont
+    sommés ensemble.
+
+    Args:
+        df: DataFrame du Grand Livre
+        date_debut: Début de la période (None: depuis l'origine). Les écritures
+            antérieures s'ajoutent au solde d'ouverture.
+        date_fin: Fin de la période incluse (None: jusqu'à la dernière écriture)
+        journal_ouverture: Journal des reports à nouveau (toujours en ouverture)
+
+    Returns:
+        DataFrame avec colonnes BALANCE_SIX_COLONNES, trié par compte
+    """
+    dates = df['date']
+    ouverture = (df['journal'] == journal_ouverture).to_numpy()
+    periode = ~ouverture
+
+    if date_debut is not None:
+        anterieur = (dates < pd.Timestamp(date_debut)).fillna(False).to_numpy() & periode
+        ouverture = ouverture | anterieur
+        periode = periode & ~anterieur
+    if date_fin is not None:
+        # Écritures postérieures ou non datées: hors période
+        periode = periode & (dates <= pd.Timestamp(date_fin)).fillna(False).to_numpy()
+
+    debit = df['debit'].to_numpy()
+    credit = df['credit'].to_numpy()
+
+    sommes = pd.DataFrame({
+        'compte': df['compte'],
+        'libelle': df['libelle'],
+        'ouverture': np.where(ouverture, debit - credit, 0),
+        'mouvement_debit': np.where(periode, debit, 0),
+        'mouvement_credit': np.where(periode, credit, 0),
+    }).groupby('compte', sort=True).agg({
+        'libelle': 'first',
+        'ouverture': 'sum',
+        'mouvement_debit': 'sum',
+        'mouvement_credit': 'sum',
+    }).reset_index()
+
+    balance = _assemble_six_colonnes(
+        sommes['compte'], sommes['libelle'], sommes['ouverture'],
+        sommes['mouvement_debit'], sommes['mouvement_credit']
+    )
+    logger.info(f"Balance à six colonnes calculée: {len(balance)} comptes")
+    return balance
+
+
+class CumulativeLedgerIndex:
+    """
+    Index cumulé du grand livre par compte et par date
+
+    Construit une seule fois: les écritures (hors reports à nouveau) sont triées
+    par (compte, date) et leurs débits/crédits cumulés. Chaque écriture reçoit
+    une clé composite rang_compte * span + jour: le cumul d'un compte jusqu'à
+    une date s'obtient par une recherche dichotomique dans les clés, pour tous
+    les comptes à la fois. Une balance de période ou à date coûte
+    O(comptes · log n), sans reparcourir le grand livre; les soldes des douze
+    fins de mois sont obtenus en une seule recherche vectorisée.
+
+    Les écritures non datées sont placées après la dernière date: elles ne
+    sont comptées que pour une période sans date de fin.
+    """
+
+    def __init__(self, df: pd.DataFrame, journal_ouverture: str = JOURNAL_OUVERTURE):
+        """
+        Args:
+            df: DataFrame du Grand Livre
+            journal_ouverture: Journal des reports à nouveau
+        """
+        entetes = df.groupby('compte', sort=True).agg({'libelle': 'first'}).reset_index()
+        self.comptes = entetes['compte'].to_numpy()
+        self.libelles = entetes['libelle'].to_numpy()
+        rangs = pd.Series(np.arange(len(self.comptes)), index=self.comptes)
+
+        ran = (df['journal'] == journal_ouverture).to_numpy()
+        debit = df['debit'].to_numpy()
+        credit = df['credit'].to_numpy()
+
+        # Reports à nouveau par compte
+        rangs_ran = rangs[df['compte'][ran]].to_numpy()
+        self.ran_debit = np.zeros(len(self.comptes), dtype=debit.dtype)
+        self.ran_credit = np.zeros(len(self.comptes), dtype=credit.dtype)
+        np.add.at(self.ran_debit, rangs_ran, debit[ran])
+        np.add.at(self.ran_credit, rangs_ran, credit[ran])
+        self.ouverture_ran = self.ran_debit - self.ran_credit
+
+        mouvements = ~ran
+        jours = df['date'][mouvements].to_numpy(dtype='datetime64[D]').astype('int64')
+        non_datees = np.isnat(df['date'][mouvements].to_numpy(dtype='datetime64[D]'))
+        datees = jours[~non_datees]
+        self.jour_min = int(datees.min()) if len(datees) else 0
+        # Décalages dans un compte: 0..etendue pour les dates, etendue+1 pour les
+        # non datées; le span laisse une clé libre entre deux comptes
+        self.etendue = (int(datees.max()) if len(datees) else 0) - self.jour_min
+        self.span = self.etendue + 3
+        decalages = np.where(non_datees, self.etendue + 1, jours - self.jour_min)
+
+        cles = rangs[df['compte'][mouvements]].to_numpy() * self.span + decalages
+        ordre = np.argsort(cles, kind='stable')
+        self.cles = cles[ordre]
+        self.cumul_debit = np.concatenate([[0], np.cumsum(debit[mouvements][ordre])])
+        self.cumul_credit = np.concatenate([[0], np.cumsum(credit[mouvements][ordre])])
+
+        self._base = np.arange(len(self.comptes)) * self.span
+
+    @classmethod
+    def from_ledger(cls, df: pd.DataFrame) -> 'CumulativeLedgerIndex':
+        """Construit l'index à partir du grand livre nettoyé"""
+        return cls(df)
+
+    def _jour(self, date) -> int:
+        """Décalage d'une date dans la clé composite"""
+        return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype('int64')) - self.jour_min
+
+    def _positions_avant(self, date_debut) -> np.ndarray:
+        """Position, pour chaque compte, de la première écriture à partir de date_debut"""
+        decalage = 0 if date_debut is None else min(max(self._jour(date_debut), 0), self.etendue + 1)
+        return np.searchsorted(self.cles, self._base + decalage, side='left')
+
+    def _decalage_fin(self, date_fin) -> int:
+        """Décalage de la dernière clé comptée jusqu'à date_fin incluse"""
+        if date_fin is None:
+            return self.etendue + 1  # Écritures non datées comprises
+        return min(max(self._jour(date_fin), -1), self.etendue)
+
+    def _positions_fin(self, date_fin) -> np.ndarray:
+        """Position, pour chaque compte, après la dernière écriture jusqu'à date_fin incluse"""
+        return np.searchsorted(self.cles, self._base + self._decalage_fin(date_fin), side='right')
+
+    def _soldes_aux(self, dates) -> np.ndarray:
+        """Soldes (débit - crédit, reports à nouveau compris) de chaque compte à chaque date"""
+        decalages = np.array([self._decalage_fin(date) for date in dates], dtype='int64')
+        positions = np.searchsorted(self.cles, self._base[:, None] + decalages[None, :], side='right')
+        debut = self._positions_avant(None)[:, None]
+        mouvements = (self.cumul_debit[positions] - self.cumul_debit[debut]
+                      - self.cumul_credit[positions] + self.cumul_credit[debut])
+        return self.ouverture_ran[:, None] + mouvements
+
+    def balance_periode(self, date_debut=None, date_fin=None) -> pd.DataFrame:
+        """
+        Balance à six colonnes d'une période quelconque, sans reparcourir le grand livre
+
+        Args:
+            date_debut: Début de la période (None: depuis l'origine)
+            date_fin: Fin de la période incluse (None: jusqu'à la dernière écriture)
+
+        Returns:
+            DataFrame avec colonnes BALANCE_SIX_COLONNES (mêmes valeurs que
+            calculate_balance_six_colonnes sur la même période)
+        """
+        debut = self._positions_avant(None)
+        avant = self._positions_avant(date_debut)
+        # Période vide (date_fin < date_debut): aucun mouvement
+        fin = np.maximum(self._positions_fin(date_fin), avant)
+
+        debit_avant = self.cumul_debit[avant] - self.cumul_debit[debut]
+        credit_avant = self.cumul_credit[avant] - self.cumul_credit[debut]
+
+        return _assemble_six_colonnes(
+            self.comptes, self.libelles,
+            self.ouverture_ran + debit_avant - credit_avant,
+            self.cumul_debit[fin] - self.cumul_debit[avant],
+            self.cumul_credit[fin] - self.cumul_credit[avant]
+        )
+
+    def balance_au(self, date=None) -> pd.DataFrame:
+        """
+        Balance à une date (ex: "au 15"), reports à nouveau compris
+
+        Args:
+            date: Date d'arrêté incluse (None: toutes les écritures)
+
+        Returns:
+            DataFrame au format de calculate_balance (mêmes valeurs que
+            calculate_balance sur les écritures arrêtées à cette date)
+        """
+        debut = self._positions_avant(None)
+        fin = self._positions_fin(date)
+
+        balance = pd.DataFrame({
+            'compte': self.comptes,
+            'libelle': self.libelles,
+            'total_debit': self.ran_debit + self.cumul_debit[fin] - self.cumul_debit[debut],
+            'total_credit': self.ran_credit + self.cumul_credit[fin] - self.cumul_credit[debut],
+        })
+        balance['solde'] = balance['total_debit'] - balance['total_credit']
+        balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+        balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
+        return balance
+
+    def soldes_fin_de_mois(self, annee: Optional[int] = None) -> pd.DataFrame:
+        """
+        Soldes de chaque compte aux douze fins de mois d'un exercice
+
+        Args:
+            annee: Année civile (défaut: année de la dernière écriture datée)
+
+        Returns:
+            DataFrame avec colonnes compte, libelle, puis un solde (débit - crédit)
+            par mois (MOIS_NOMS)
+        """
+        if annee is None:
+            annee = pd.Timestamp(np.datetime64(self.jour_min + self.etendue, 'D')).year
+
+        # Sans l'alias de fréquence 'ME' (pandas >= 2.2 seulement)
+        fins_de_mois = [pd.Timestamp(annee, mois, 1) + pd.offsets.MonthEnd(0) for mois in range(1, 13)]
+        soldes = self._soldes_aux(fins_de_mois)
+
+        result = pd.DataFrame(soldes, columns=MOIS_NOMS)
+        result.insert(0, 'libelle', self.libelles)
+        result.insert(0, 'compte', self.comptes)
+        return result
+
+
+BALANCE_INDEX_COLONNES = ['compte', 'libelle', 'total_debit', 'total_credit',
+                          'solde_debiteur', 'solde_crediteur']
+
+
+class BalanceIndex:
+    """
+    Index de la balance trié par numéro de compte
+
+    Les comptes sont triés une seule fois en tant que chaînes: tous les comptes
+    commençant par un préfixe forment alors une plage contiguë, retrouvée par
+    deux recherches dichotomiques au lieu d'un parcours complet de la balance.
+    """
+
+    def __init__(self, rows: List[List]):
+        """
+        Args:
+            rows: Lignes [compte, libelle, total_debit, total_credit, solde_debiteur, solde_crediteur]
+        """
+        self.rows = sorted(rows, key=lambda row: str(row[0]))
+        self.comptes = [str(row[0]) for row in self.rows]
+
+    @classmethod
+    def from_balance(cls, balance: pd.DataFrame) -> 'BalanceIndex':
+        """Construit l'index à partir de la balance calculée par calculate_balance"""
+        return cls(balance[BALANCE_INDEX_COLONNES].values.tolist())
+
+    @classmethod
+    def from_rows(cls, rows: List[List]) -> 'BalanceIndex':
+        """
+        Construit l'index à partir des lignes de la feuille balance Excel
+
+        Les lignes sans numéro de compte (total général, filigrane) sont ignorées.
+        """
+        return cls([
+            list(row[:len(BALANCE_INDEX_COLONNES)]) for row in rows
+            if row and row[0] is not None and str(row[0]).strip().isdigit()
+        ])
+
+    def _plage(self, prefix: str) -> Tuple[int, int]:
+        """Retourne les bornes [début, fin) des comptes commençant par le préfixe"""
+        debut = bisect_left(self.comptes, prefix)
+        fin = bisect_left(self.comptes, prefix + '\uffff', lo=debut)
+        return debut, fin
+
+    def lookup(self, prefixes: List[str]) -> List[List]:
+        """
+        Retourne les lignes des comptes correspondant à au moins un préfixe
+
+        Args:
+            prefixes: Préfixes de comptes (ex: ["42", "43", "44"])
+
+        Returns:
+            Lignes triées par compte, sans doublon si les préfixes se recouvrent
+        """
+        plages = sorted(self._plage(str(prefix)) for prefix in prefixes)
+
+        # Fusionner les plages qui se recouvrent (ex: "47" et "471")
+        fusion: List[List[int]] = []
+        for debut, fin in plages:
+            if debut >= fin:
+                continue
+            if fusion and debut <= fusion[-1][1]:
+                fusion[-1][1] = max(fusion[-1][1], fin)
+            else:
+                fusion.append([debut, fin])
+
+        return [row for debut, fin in fusion for row in self.rows[debut:fin]]
+
+
+HIERARCHIE_NIVEAUX = (4, 3, 2, 1)  # Radicaux agrégés: 4, 3, 2 chiffres puis classe
+HIERARCHIE_COLONNES = ['total_debit', 'total_credit', 'solde', 'solde_debiteur', 'solde_crediteur']
+
+
+def _sans_imbrication(radicaux) -> List[str]:
+    """Radicaux dédoublonnés, sans ceux déjà couverts par un radical plus court"""
+    result: List[str] = []
+    for radical in sorted({str(r) for r in radicaux}):
+        if not result or not radical.startswith(result[-1]):
+            result.append(radical)
+    return result
+
+
+class AccountHierarchy:
+    """
+    Arbre des comptes: classe → radicaux à 2, 3, 4 chiffres → compte
+
+    Les totaux de tous les nœuds sont calculés une seule fois, du bas vers le
+    haut (les comptes, puis chaque niveau agrégé à partir du niveau inférieur):
+    le total d'un radical est ensuite une simple lecture de dictionnaire.
+    Les radicaux plus longs (5 chiffres et plus) sont retrouvés par recherche
+    dichotomique sur les comptes triés et leurs cumuls.
+
+    Les valeurs sont des vecteurs (une colonne par grandeur): balance
+    (HIERARCHIE_COLONNES) ou montants mensuels du suivi d'activité.
+    """
+
+    def __init__(self, comptes, valeurs, colonnes: List[str]):
+        """
+        Args:
+            comptes: Numéros de compte (un par ligne)
+            valeurs: Tableau (comptes x colonnes) des grandeurs à agréger
+            colonnes: Noms des grandeurs
+        """
+        self.colonnes = list(colonnes)
+        self._position = {colonne: i for i, colonne in enumerate(self.colonnes)}
+
+        feuilles = pd.DataFrame(np.asarray(valeurs), columns=self.colonnes)
+        feuilles.index = pd.Index([str(compte) for compte in comptes])
+        feuilles = feuilles.groupby(level=0, sort=True).sum()
+
+        # Recherche dichotomique pour les radicaux hors niveaux agrégés
+        self.comptes = list(feuilles.index)
+        cumuls = np.cumsum(feuilles.to_numpy(), axis=0)
+        self._cumuls = np.vstack([np.zeros((1, len(self.colonnes)), dtype=cumuls.dtype), cumuls])
+
+        # Passe ascendante: chaque niveau est agrégé à partir du précédent.
+        # Un nœud plus court que le niveau remonte tel quel (ex: compte "47").
+        self.noeuds: Dict[str, np.ndarray] = dict(zip(feuilles.index, feuilles.to_numpy()))
+        niveau = feuilles
+        for longueur in HIERARCHIE_NIVEAUX:
+            niveau = niveau.groupby(niveau.index.str[:longueur], sort=False).sum()
+            self.noeuds.update(zip(niveau.index, niveau.to_numpy()))
+
+    @classmethod
+    def from_balance(cls, balance: pd.DataFrame) -> 'AccountHierarchy':
+        """Construit l'arbre à partir de la balance calculée par calculate_balance"""
+        return cls(balance['compte'], balance[HIERARCHIE_COLONNES].to_numpy(),
+                   HIERARCHIE_COLONNES)
+
+    def totaux(self, radical) -> np.ndarray:
+        """
+        Totaux de toutes les grandeurs pour un radical
+
+        Args:
+            radical: Classe, radical ou numéro de compte (ex: "6", "601", "60110000")
+
+        Returns:
+            Vecteur des totaux (zéros si aucun compte ne correspond)
+        """
+        radical = str(radical)
+        noeud = self.noeuds.get(radical)
+        if noeud is not None:
+            return noeud
+
+        debut = bisect_left(self.comptes, radical)
+        fin = bisect_left(self.comptes, radical + '\uffff', lo=debut)
+        return self._cumuls[fin] - self._cumuls[debut]
+
+    def total(self, radical, colonne: str = 'solde') -> float:
+        """Total d'une grandeur pour un radical (lecture directe pour les niveaux 1 à 4)"""
+        return self.totaux(radical)[self._position[colonne]].item()
+
+    def somme(self, radicaux: List[str], exclusions: Optional[List[str]] = None,
+              colonne: str = 'solde') -> float:
+        """
+        Total d'une grandeur sur plusieurs radicaux, exclusions déduites
+
+        Les radicaux qui se recouvrent (ex: "47" et "471") ne sont comptés
+        qu'une fois, comme dans match_accounts_by_radicals.
+
+        Args:
+            radicaux: Radicaux de comptes (ex: ["40"])
+            exclusions: Radicaux à exclure (ex: ["409"])
+            colonne: Grandeur à sommer
+
+        Returns:
+            Total (0 si aucun compte ne correspond)
+        """
+        exclusions = _sans_imbrication(exclusions or [])
+        total = 0
+
+        for radical in _sans_imbrication(radicaux):
+            if any(radical.startswith(exclusion) for exclusion in exclusions):
+                continue
+            total += self.total(radical, colonne)
+            for exclusion in exclusions:
+                if exclusion.startswith(radical):
+                    total -= self.total(exclusion, colonne)
+
+        return total
+
+    def solde_regle(self, radicaux: List[str], exclusions: Optional[List[str]] = None,
+                    condition_solde: Optional[str] = "") -> float:
+        """
+        Solde (débit - crédit) des comptes d'une règle de correspondance
+
+        Même résultat que match_accounts_by_radicals(...)['solde'].sum(): la
+        condition de solde porte sur chaque compte, d'où les totaux séparés
+        des soldes débiteurs et créditeurs.
+
+        Args:
+            radicaux: Radicaux de la règle
+            exclusions: Radicaux exclus
+            condition_solde: "POSITIF" (comptes débiteurs), "NEGATIF" (comptes créditeurs) ou ""
+
+        Returns:
+            Solde cumulé des comptes retenus
+        """
+        if condition_solde == "POSITIF":
+            return self.somme(radicaux, exclusions, 'solde_debiteur')
+        if condition_solde == "NEGATIF":
+            return 0 - self.somme(radicaux, exclusions, 'solde_crediteur')
+        return self.somme(radicaux, exclusions, 'solde')
+
+
 def calculate_sig(compte_resultat: Dict) -> Dict:
     """
     Calcule les Soldes Intermédiaires de Gestion (SIG) selon SYSCOHADA
@@ -78,13 +556,13 @@ def calculate_sig(compte_resultat: Dict) -> Dict:
     produits_list = compte_resultat['produits']
 
     # Helper function pour trouver un montant par libellé (avec matching partiel)
-    def find_montant(data_list: List[Dict], search_key: str) -> float:
+    def find_montant(data_list: List[Dict], search_key: str) -> int:
         """Trouve le montant d'un poste par son libellé (case-insensitive, partial match)"""
         search_key_lower = search_key.lower()
         for item in data_list:
             if search_key_lower in item['poste'].lower():
                 return item['montant']
-        return 0.0
+        return 0
 
     # SIG selon SYSCOHADA (simplifié)
 
@@ -161,11 +639,32 @@ def calculate_sig(compte_resultat: Dict) -> Dict:
         'frais_financiers': frais_financiers
     }
 
-    logger.info(f"SIG calculés - CA: {chiffre_affaires:,.2f} | EBE: {ebe:,.2f} | Résultat net: {resultat_net:,.2f}")
+    logger.info(f"SIG calculés - CA: {en_fcfa(chiffre_affaires):,.2f} | EBE: {en_fcfa(ebe):,.2f} | Résultat net: {en_fcfa(resultat_net):,.2f}")
 
     return sig
 
 
+_mapping_cache: Dict[Path, Tuple[int, Dict]] = {}
+
+
+def _read_mapping_file(mapping_file: Path) -> Dict:
+    """
+    Lit un fichier de mapping JSON, mis en cache tant qu'il n'est pas modifié
+
+    Un processus de longue durée (mode démon) ne relit ainsi les mappings
+    qu'après modification. Une copie est retournée: l'appelant peut la modifier.
+    """
+    mtime = mapping_file.stat().st_mtime_ns
+    cached = _mapping_cache.get(mapping_file)
+
+    if cached is None or cached[0] != mtime:
+        with open(mapping_file, 'r', encoding='utf-8') as f:
+            cached = (mtime, json.load(f))
+        _mapping_cache[mapping_file] = cached
+
+    return copy.deepcopy(cached[1])
+
+
 def get_available_clients() -> Dict[str, str]:
     """
     Récupère la liste des clients disponibles avec leurs mappings
@@ -185,14 +684,13 @@ def get_available_clients() -> Dict[str, str]:
     # Parcourir tous les fichiers JSON dans le répertoire
     for mapping_file in config_dir.glob("*.json"):
         try:
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
-                client_name = mapping.get('client_name', '')
-                client_code = mapping_file.stem  # Nom du fichier sans extension
-
-                if client_name:
-                    clients[client_name] = client_code
-                    logger.debug(f"Client trouvé: {client_name} -> {client_code}")
+            mapping = _read_mapping_file(mapping_file)
+            client_name = mapping.get('client_name', '')
+            client_code = mapping_file.stem  # Nom du fichier sans extension
+
+            if client_name:
+                clients[client_name] = client_code
+                logger.debug(f"Client trouvé: {client_name} -> {client_code}")
         except Exception as e:
             logger.warning(f"Erreur lors de la lecture de {mapping_file.name}: {e}")
             continue
@@ -226,6 +724,62 @@ def get_client_code_from_name(client_name: str) -> Optional[str]:
     return None
 
 
+def _normaliser_nom(texte: str) -> str:
+    """Majuscules, séparateurs remplacés par des espaces (ex: "b.it_sep" -> "B IT SEP")"""
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", texte.upper()).split())
+
+
+def infer_client_from_filename(filename: str) -> Optional[str]:
+    """
+    Déduit le client à partir du nom d'un export Sage
+
+    Le nom du fichier est comparé, mot à mot, au nom du client, à son code
+    et aux alias déclarés dans son mapping (clé optionnelle "aliases",
+    ex: ["BIMMO"] pour "GL BIMMO NOV25.txt"). La correspondance la plus longue l'emporte.
+
+    Args:
+        filename: Nom ou chemin du fichier
+
+    Returns:
+        Nom du client (ex: "BAMBOO IMMO") ou None si aucun client ne correspond
+    """
+    nom_fichier = f" {_normaliser_nom(Path(filename).stem)} "
+    config_dir = Path(__file__).parent.parent / "config" / "suivi_activite_mappings"
+
+    meilleur, longueur = None, 0
+    for mapping_file in config_dir.glob("*.json"):
+        try:
+            mapping = _read_mapping_file(mapping_file)
+        except Exception as e:
+            logger.warning(f"Erreur lors de la lecture de {mapping_file.name}: {e}")
+            continue
+
+        client_name = mapping.get('client_name', '')
+        if not client_name:
+            continue
+
+        for candidat in [client_name, mapping_file.stem, *mapping.get('aliases', [])]:
+            candidat = _normaliser_nom(candidat)
+            if candidat and f" {candidat} " in nom_fichier and len(candidat) > longueur:
+                meilleur, longueur = client_name, len(candidat)
+
+    if meilleur:
+        logger.info(f"Client déduit du fichier '{Path(filename).name}': {meilleur}")
+    else:
+        logger.warning(f"Aucun client reconnu dans le nom '{Path(filename).name}'")
+
+    return meilleur
+
+
+def get_mapping_file(client_code: Optional[str]) -> Optional[Path]:
+    """Chemin du fichier de mapping du client (None sans code client)"""
+    if not client_code:
+        return None
+
+    config_dir = Path(__file__).parent.parent / "config" / "suivi_activite_mappings"
+    return config_dir / f"{client_code}.json"
+
+
 def load_client_mapping(client_code: Optional[str] = None) -> Optional[Dict]:
     """
     Charge le mapping de suivi d'activité pour un client spécifique
@@ -240,16 +794,14 @@ def load_client_mapping(client_code: Optional[str] = None) -> Optional[Dict]:
         return None
 
     # Chemin vers le fichier de mapping
-    config_dir = Path(__file__).parent.parent / "config" / "suivi_activite_mappings"
-    mapping_file = config_dir / f"{client_code}.json"
+    mapping_file = get_mapping_file(client_code)
 
     if not mapping_file.exists():
         logger.warning(f"Fichier de mapping non trouvé pour le client '{client_code}': {mapping_file}")
         return None
 
     try:
-        with open(mapping_file, 'r', encoding='utf-8') as f:
-            mapping = json.load(f)
+        mapping = _read_mapping_file(mapping_file)
         logger.info(f"Mapping chargé pour le client '{client_code}': {mapping.get('client_name', client_code)}")
         return mapping
     except Exception as e:
@@ -401,6 +953,102 @@ def prepare_suivi_activite_detaille(df: pd.DataFrame, client_code: Optional[str]
     return result
 
 
+def load_rappel_n1(client_name: Optional[str], exercice: Optional[int],
+                   db_path: Optional[Path] = None) -> Optional[Dict]:
+    """
+    Totaux de l'exercice précédent par catégorie du suivi, lus dans l'entrepôt
+
+    Une seule requête indexée sur les soldes mensuels (client, exercice N-1):
+    l'export de l'année précédente n'est pas re-parsé.
+
+    Args:
+        client_name: Nom du client
+        exercice: Exercice du rapport (N)
+        db_path: Entrepôt SQLite (défaut: modules.warehouse.DEFAULT_WAREHOUSE)
+
+    Returns:
+        {section: [{'libelle', 'ordre', 'montant'}]} ou None si N-1 n'est pas dans l'entrepôt
+    """
+    from modules import warehouse
+    from modules.syscohada_classifier import aggregate_year_by_category
+
+    db_path = Path(db_path or warehouse.DEFAULT_WAREHOUSE)
+    if not client_name or not exercice or not db_path.exists():
+        return None
+
+    cube = warehouse.LedgerWarehouse(db_path).monthly_balances(client_name, exercice - 1)
+    if cube.empty:
+        logger.info(f"Pas d'exercice {exercice - 1} dans l'entrepôt pour {client_name}: rappel N-1 à 0")
+        return None
+
+    logger.info(f"Rappel N-1: exercice {exercice - 1} de {client_name} lu dans l'entrepôt ({len(cube)} soldes mensuels)")
+    return aggregate_year_by_category(cube)
+
+
+def rappel_n1_signature(client_name: Optional[str], fichier_sage: Path,
+                        db_path: Optional[Path] = None) -> Optional[str]:
+    """
+    Empreinte du rappel N-1 qu'utilisera le rapport de cet export
+
+    Le rappel est lu dans l'entrepôt, hors de l'export: son empreinte entre
+    dans les options du manifeste pour qu'un exercice N-1 importé après coup
+    (--gl-n1) régénère les rapports au lieu de réutiliser les anciens.
+
+    Args:
+        client_name: Nom du client
+        fichier_sage: Export Sage de l'exercice du rapport (N)
+        db_path: Entrepôt SQLite (défaut: modules.warehouse.DEFAULT_WAREHOUSE)
+
+    Returns:
+        Empreinte SHA-256 des totaux N-1, ou None sans rappel N-1
+    """
+    from modules import incremental, warehouse
+    from utils.output_manifest import data_sha256
+
+    db_path = Path(db_path or warehouse.DEFAULT_WAREHOUSE)
+    if not client_name or not db_path.exists():
+        return None
+
+    exercice = warehouse.infer_exercice(incremental.read_lines(Path(fichier_sage)))
+    rappel = load_rappel_n1(client_name, exercice, db_path)
+    return data_sha256(rappel) if rappel is not None else None
+
+
+def add_rappel_n1(suivi_data: Dict, rappel_n1: Optional[Dict]) -> Dict:
+    """
+    Ajoute à chaque catégorie du suivi son montant de l'année N-1 ('rappel_n1')
+
+    Les catégories sont rapprochées par section et libellé; une catégorie
+    présente seulement en N-1 est ajoutée avec des mois à 0.
+
+    Args:
+        suivi_data: Résultat de prepare_suivi_activite_detaille (modifié en place)
+        rappel_n1: Résultat de load_rappel_n1 (None: rien à ajouter)
+
+    Returns:
+        suivi_data
+    """
+    if not rappel_n1:
+        return suivi_data
+
+    for section, lignes_n1 in rappel_n1.items():
+        categories = suivi_data.get(section)
+        if not isinstance(categories, list):
+            continue  # Ancien format ({'groups': [...]}): pas de rapprochement
+
+        par_libelle = {categorie['libelle']: categorie for categorie in categories}
+        for ligne in lignes_n1:
+            categorie = par_libelle.get(ligne['libelle'])
+            if categorie is None:
+                categorie = {'libelle': ligne['libelle'], 'ordre': ligne['ordre'],
+                             'mois_data': {mois: 0 for mois in MOIS_NOMS}}
+                categories.append(categorie)
+            categorie['rappel_n1'] = ligne['montant']
+        categories.sort(key=lambda x: x['ordre'])
+
+    return suivi_data
+
+
 def prepare_suivi_activite(df: pd.DataFrame, client_code: Optional[str] = None) -> Dict:
     """
     Prépare le tableau de suivi budgétaire mensuel par catégories
@@ -437,17 +1085,16 @@ def prepare_suivi_activite(df: pd.DataFrame, client_code: Optional[str] = None)
 
     # Filtrer les lignes avec date valide
     df_copy = df[df['date'].notna()].copy()
-
-    # Extraire le mois (format: 'Janvier', 'Février', etc.)
     df_copy['mois_num'] = df_copy['date'].dt.month
-    df_copy['annee'] = df_copy['date'].dt.year
 
-    # Noms des mois en français
-    mois_noms = {
-        1: 'Janvier', 2: 'Février', 3: 'Mars', 4: 'Avril',
-        5: 'Mai', 6: 'Juin', 7: 'Juillet', 8: 'Août',
-        9: 'Septembre', 10: 'Octobre', 11: 'Novembre', 12: 'Décembre'
-    }
+    # Débits et crédits mensuels par compte, agrégés une fois dans l'arbre des comptes
+    mensuel = df_copy.groupby(['compte', 'mois_num'])[['debit', 'credit']].sum().unstack(fill_value=0)
+    mensuel = mensuel.reindex(columns=pd.MultiIndex.from_product([['debit', 'credit'], range(1, 13)]),
+                              fill_value=0)
+    hierarchie = AccountHierarchy(
+        mensuel.index, mensuel.to_numpy(),
+        [f"{sens}_{mois_num}" for sens, mois_num in mensuel.columns]
+    )
 
     # Initialiser le dictionnaire de résultat
     # Structure: {categorie: {mois: montant}}
@@ -457,33 +1104,15 @@ def prepare_suivi_activite(df: pd.DataFrame, client_code: Optional[str] = None)
     for categorie, prefixes in categorie_mapping.items():
         result[categorie] = {}
 
-        for mois_num in range(1, 13):
-            mois_nom = mois_noms[mois_num]
-            montant = 0
-
-            # Filtrer par mois
-            df_mois = df_copy[df_copy['mois_num'] == mois_num]
-
-            # Pour chaque préfixe de compte
-            for prefix in prefixes:
-                # Convertir le préfixe en numéro de compte (ajouter des zéros)
-                prefix_num = int(prefix.ljust(8, '0'))
-                prefix_next = int(str(int(prefix) + 1).ljust(8, '0'))
-
-                # Filtrer les comptes correspondants
-                comptes_matches = df_mois[
-                    (df_mois['compte'] >= prefix_num) &
-                    (df_mois['compte'] < prefix_next)
-                ]
-
-                # Pour les charges: sommer les débits (positif = dépense)
-                # Pour les produits: sommer les crédits (positif = revenu)
-                if categorie.startswith('CA_') or categorie == 'Autres_produits':
-                    # PRODUITS: crédits
-                    montant += comptes_matches['credit'].sum()
-                else:
-                    # CHARGES: débits (on les met en négatif pour affichage)
-                    montant -= comptes_matches['debit'].sum()
+        for mois_num, mois_nom in enumerate(MOIS_NOMS, start=1):
+            # Pour les charges: sommer les débits (positif = dépense)
+            # Pour les produits: sommer les crédits (positif = revenu)
+            if categorie.startswith('CA_') or categorie == 'Autres_produits':
+                # PRODUITS: crédits
+                montant = hierarchie.somme(prefixes, colonne=f"credit_{mois_num}")
+            else:
+                # CHARGES: débits (on les met en négatif pour affichage)
+                montant = 0 - hierarchie.somme(prefixes, colonne=f"debit_{mois_num}")
 
             result[categorie][mois_nom] = montant
 
@@ -828,7 +1457,8 @@ def match_accounts_by_radicals(
 
 def generate_bilan_synthetique(
     balance: pd.DataFrame,
-    resultat_net: float = 0
+    resultat_net: float = 0,
+    hierarchie: Optional[AccountHierarchy] = None
 ) -> Dict:
     """
     Génère le bilan synthétique selon l'algorithme comptable correct:
@@ -846,34 +1476,27 @@ def generate_bilan_synthetique(
     Args:
         balance: DataFrame de la balance générale (avec colonne 'solde' = débit - crédit)
         resultat_net: Résultat net de l'exercice (à inclure au passif si > 0, actif si < 0)
+        hierarchie: Arbre des comptes de la balance (construit si absent)
 
     Returns:
         Dictionnaire structuré avec ACTIF et PASSIF
     """
     logger.info("Génération du bilan synthétique selon l'algorithme comptable")
 
+    if hierarchie is None:
+        hierarchie = AccountHierarchy.from_balance(balance)
+
     actif_data = []
     passif_data = []
 
     # ÉTAPE 1: Traiter l'ACTIF
     for regle in get_bilan_actif_regles():
-        # Trouver les comptes correspondants
-        comptes_matched = match_accounts_by_radicals(
-            balance,
-            regle.prefixes,
-            regle.exclusions,
-            regle.condition_solde
-        )
-
-        if len(comptes_matched) == 0:
-            montant = 0.0
-        else:
-            # LOGIQUE: Pour l'ACTIF, on prend le SOLDE BRUT (Débit - Crédit)
-            # - Si solde > 0 (débiteur): normal, montant positif à l'actif
-            # - Si solde < 0 (créditeur):
-            #   * Amortissements: montant négatif en déduction des immobilisations
-            #   * Autres: anormal mais on le prend quand même
-            montant = comptes_matched['solde'].sum()
+        # LOGIQUE: Pour l'ACTIF, on prend le SOLDE BRUT (Débit - Crédit)
+        # - Si solde > 0 (débiteur): normal, montant positif à l'actif
+        # - Si solde < 0 (créditeur):
+        #   * Amortissements: montant négatif en déduction des immobilisations
+        #   * Autres: anormal mais on le prend quand même
+        montant = hierarchie.solde_regle(regle.prefixes, regle.exclusions, regle.condition_solde)
 
         actif_data.append({
             'poste': regle.libelle,
@@ -883,25 +1506,14 @@ def generate_bilan_synthetique(
 
     # ÉTAPE 2: Traiter le PASSIF
     for regle in get_bilan_passif_regles():
-        # Trouver les comptes correspondants
-        comptes_matched = match_accounts_by_radicals(
-            balance,
-            regle.prefixes,
-            regle.exclusions,
-            regle.condition_solde
-        )
-
-        if len(comptes_matched) == 0:
-            montant = 0.0
-        else:
-            # LOGIQUE: Pour le PASSIF, on prend l'OPPOSÉ du SOLDE
-            # Car un solde créditeur (négatif) représente une dette
-            # Solde = Débit - Crédit (sera négatif pour les dettes)
-            # Montant au passif = abs(Solde) = Crédit - Débit
-            solde_total = comptes_matched['solde'].sum()
+        # LOGIQUE: Pour le PASSIF, on prend l'OPPOSÉ du SOLDE
+        # Car un solde créditeur (négatif) représente une dette
+        # Solde = Débit - Crédit (sera négatif pour les dettes)
+        # Montant au passif = abs(Solde) = Crédit - Débit
+        solde_total = hierarchie.solde_regle(regle.prefixes, regle.exclusions, regle.condition_solde)
 
-            # On prend la valeur absolue si négatif (normal), sinon on le prend tel quel (anormal)
-            montant = abs(solde_total) if solde_total < 0 else solde_total
+        # On prend la valeur absolue si négatif (normal), sinon on le prend tel quel (anormal)
+        montant = abs(solde_total) if solde_total < 0 else solde_total
 
         passif_data.append({
             'poste': regle.libelle,
@@ -924,10 +1536,10 @@ def generate_bilan_synthetique(
 
     # ÉTAPE 5: Vérification de l'équilibre (Total Actif DOIT = Total Passif)
     ecart = abs(total_actif - total_passif)
-    logger.info(f"Bilan - Actif: {total_actif:,.2f} | Passif: {total_passif:,.2f} | RN: {resultat_net:,.2f} | Écart: {ecart:,.2f}")
+    logger.info(f"Bilan - Actif: {en_fcfa(total_actif):,.2f} | Passif: {en_fcfa(total_passif):,.2f} | RN: {en_fcfa(resultat_net):,.2f} | Écart: {en_fcfa(ecart):,.2f}")
 
-    if ecart > 100:  # Tolérance de 100 FCFA
-        logger.warning(f"⚠️  ATTENTION: Écart important Actif/Passif: {ecart:,.2f} FCFA")
+    if ecart != 0:  # Sommes exactes (unités mineures): tout écart est un vrai déséquilibre
+        logger.warning(f"⚠️  ATTENTION: Écart Actif/Passif: {format_fcfa(ecart)}")
 
     return {
         'actif': actif_data,
@@ -940,35 +1552,32 @@ def generate_bilan_synthetique(
 
 
 def generate_cr_synthetique(
-    balance: pd.DataFrame
+    balance: pd.DataFrame,
+    hierarchie: Optional[AccountHierarchy] = None
 ) -> Dict:
     """
     Génère le compte de résultat synthétique en utilisant les règles de correspondance pré-compilées
 
     Args:
         balance: DataFrame de la balance générale
+        hierarchie: Arbre des comptes de la balance (construit si absent)
 
     Returns:
         Dictionnaire structuré avec CHARGES et PRODUITS
     """
     logger.info("Génération du CR synthétique depuis les règles pré-compilées")
 
+    if hierarchie is None:
+        hierarchie = AccountHierarchy.from_balance(balance)
+
     charges_data = []
     produits_data = []
 
     # Traiter les CHARGES
     for regle in get_cr_charges_regles():
-        # Trouver les comptes correspondants
-        comptes_matched = match_accounts_by_radicals(
-            balance,
-            regle.prefixes,
-            regle.exclusions,
-            regle.condition_solde
-        )
-
         # Calculer le montant (pour les charges: total débit - total crédit = solde débiteur net)
         # Cela gère les cas où il y a des régularisations en crédit
-        montant = comptes_matched['total_debit'].sum() - comptes_matched['total_credit'].sum()
+        montant = hierarchie.solde_regle(regle.prefixes, regle.exclusions, regle.condition_solde)
 
         charges_data.append({
             'poste': regle.libelle,
@@ -978,17 +1587,9 @@ def generate_cr_synthetique(
 
     # Traiter les PRODUITS
     for regle in get_cr_produits_regles():
-        # Trouver les comptes correspondants
-        comptes_matched = match_accounts_by_radicals(
-            balance,
-            regle.prefixes,
-            regle.exclusions,
-            regle.condition_solde
-        )
-
         # Calculer le montant (pour les produits: total crédit - total débit = solde créditeur net)
         # Cela gère les cas où il y a des régularisations en débit
-        montant = comptes_matched['total_credit'].sum() - comptes_matched['total_debit'].sum()
+        montant = 0 - hierarchie.solde_regle(regle.prefixes, regle.exclusions, regle.condition_solde)
 
         produits_data.append({
             'poste': regle.libelle,
@@ -1001,7 +1602,7 @@ def generate_cr_synthetique(
     total_produits = sum(item['montant'] for item in produits_data)
     resultat = total_produits - total_charges
 
-    logger.info(f"CR synthétique généré - Charges: {total_charges:,.2f} | Produits: {total_produits:,.2f} | Résultat: {resultat:,.2f}")
+    logger.info(f"CR synthétique généré - Charges: {en_fcfa(total_charges):,.2f} | Produits: {en_fcfa(total_produits):,.2f} | Résultat: {en_fcfa(resultat):,.2f}")
 
     return {
         'charges': charges_data,
@@ -13,17 +13,40 @@ Ce module gère:
 import pandas as pd
 import openpyxl
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.formatting.rule import CellIsRule
 import logging
+from copy import copy
 from typing import Dict
 
-from utils.exceptions import ExcelGenerationError
+from utils import montants
+from utils.exceptions import ExcelGenerationError, ProcessingInterrupted
+from utils.profiler import profile_stage
+from utils.progress import check_cancelled, report_count
+from utils.time_budget import checkpoint
 
 logger = logging.getLogger(__name__)
 
+GRAND_LIVRE_SHEET = "GL BI SEP"
+GRAND_LIVRE_HEADERS = [
+    "N° Compte",
+    "Date",
+    "Journal",
+    "N° Pièce",
+    "Libellé",
+    "Lettrage",
+    "Débit",
+    "Crédit",
+    "Solde",
+]
+GRAND_LIVRE_MONTANTS = ('debit', 'credit', 'solde')
+
+# Lignes écrites entre deux contrôles du budget de temps et de l'annulation
+CHECKPOINT_ROWS = 1000
+
 
 def create_workbook(
     df_grand_livre: pd.DataFrame,
@@ -32,10 +55,16 @@ def create_workbook(
     compte_resultat: Dict,
     sig: Dict,
     client_code: str = None,
+    suivi_data: Dict = None,
+    avec_grand_livre: bool = True,
+    grand_livre_en_flux: bool = False,
 ) -> Workbook:
     """
     Crée un nouveau classeur Excel avec toutes les feuilles
 
+    Les montants reçus sont en unités mineures (utils.montants); ils sont
+    convertis en FCFA une seule fois ici, avant l'écriture des feuilles.
+
     Args:
         df_grand_livre: DataFrame du Grand Livre
         df_balance: DataFrame de la Balance
@@ -43,6 +72,10 @@ def create_workbook(
         compte_resultat: Dictionnaire du compte de résultat
         sig: Dictionnaire des SIG
         client_code: Code du client pour utiliser son mapping spécifique (optionnel)
+        suivi_data: Suivi d'activité déjà préparé (optionnel, recalculé sinon)
+        avec_grand_livre: Si False, la feuille GL BI SEP est omise (tableaux de synthèse seulement)
+        grand_livre_en_flux: Si True, les écritures du GL BI SEP ne sont pas chargées dans le
+            classeur; elles sont écrites à l'enregistrement par save_workbook_streaming
 
     Returns:
         Workbook openpyxl
@@ -52,6 +85,14 @@ def create_workbook(
         logger.info(f"Utilisation du mapping pour le client: {client_code}")
 
     try:
+        if avec_grand_livre:
+            df_grand_livre = montants.colonnes_en_fcfa(df_grand_livre, GRAND_LIVRE_MONTANTS)
+        df_balance = montants.colonnes_en_fcfa(df_balance, montants.COLONNES_BALANCE)
+        bilan = montants.etat_en_fcfa(bilan)
+        compte_resultat = montants.etat_en_fcfa(compte_resultat)
+        sig = montants.sig_en_fcfa(sig)
+        suivi_data = montants.suivi_en_fcfa(suivi_data)
+
         wb = Workbook()
 
         # Supprimer la feuille par défaut
@@ -59,75 +100,274 @@ def create_workbook(
             wb.remove(wb["Sheet"])
 
         # Ajouter les différentes feuilles
-        add_grand_livre_sheet(wb, df_grand_livre)
-        add_balance_sheet(wb, df_balance)
+        if avec_grand_livre:
+            with profile_stage(GRAND_LIVRE_SHEET):
+                add_grand_livre_sheet(wb, df_grand_livre, en_flux=grand_livre_en_flux)
+        with profile_stage("BG BI SEP"):
+            add_balance_sheet(wb, df_balance)
 
         # Détecter le format du bilan (ancien format avec clés fixes vs nouveau format avec listes)
         # Nouveau format: bilan['actif'] est une liste de dicts avec 'poste' et 'montant'
         # Ancien format: bilan['actif'] est un dict avec des clés comme 'immo_incorp', 'stocks', etc.
-        if isinstance(bilan.get("actif"), list):
-            logger.info("Détection du nouveau format de bilan (depuis correspondances)")
-            add_bilan_sheet_from_mapping(wb, bilan)
-        else:
-            logger.info("Détection de l'ancien format de bilan")
-            add_bilan_sheet(wb, bilan)
+        with profile_stage("BILAN SYNTH"):
+            if isinstance(bilan.get("actif"), list):
+                logger.info("Détection du nouveau format de bilan (depuis correspondances)")
+                add_bilan_sheet_from_mapping(wb, bilan)
+            else:
+                logger.info("Détection de l'ancien format de bilan")
+                add_bilan_sheet(wb, bilan)
 
         # Détecter le format du CR (ancien format avec clés fixes vs nouveau format avec listes)
-        if isinstance(compte_resultat.get("charges"), list):
-            logger.info("Détection du nouveau format de CR (depuis correspondances)")
-            add_compte_resultat_sheet_from_mapping(wb, compte_resultat)
-        else:
-            logger.info("Détection de l'ancien format de CR")
-            add_compte_resultat_sheet(wb, compte_resultat)
+        with profile_stage("CR SYNTH"):
+            if isinstance(compte_resultat.get("charges"), list):
+                logger.info("Détection du nouveau format de CR (depuis correspondances)")
+                add_compte_resultat_sheet_from_mapping(wb, compte_resultat)
+            else:
+                logger.info("Détection de l'ancien format de CR")
+                add_compte_resultat_sheet(wb, compte_resultat)
 
-        add_sig_sheet(wb, sig)
-        add_suivi_activite_sheet(wb, df_grand_livre, client_code=client_code)
+        with profile_stage("SIG"):
+            add_sig_sheet(wb, sig)
+        with profile_stage("SUIVI ACTIVITE"):
+            add_suivi_activite_sheet(wb, df_grand_livre, client_code=client_code, suivi_data=suivi_data)
 
         logger.info(f"Classeur créé avec {len(wb.sheetnames)} feuilles")
 
         return wb
 
+    except ProcessingInterrupted:
+        # Budget de temps dépassé ou annulation: pas une erreur de génération
+        raise
+
     except Exception as e:
         logger.error(f"Erreur lors de la création du classeur: {e}")
         raise ExcelGenerationError(f"Impossible de créer le classeur Excel: {e}")
 
 
-def add_grand_livre_sheet(wb: Workbook, df: pd.DataFrame):
-    """Ajoute la feuille Grand Livre"""
-    logger.info("Ajout de la feuille Grand Livre")
+def create_consolidation_workbook(consolidation: Dict) -> Workbook:
+    """
+    Crée le classeur des états consolidés (balance combinée, bilan, CR, SIG)
 
-    ws = wb.create_sheet("GL BI SEP")
+    Args:
+        consolidation: Résultat de consolidation.consolidate (unités mineures)
+
+    Returns:
+        Workbook openpyxl
+    """
+    logger.info("Création du classeur consolidé")
+
+    try:
+        wb = Workbook()
+        wb.remove(wb.active)
+
+        add_consolidation_sheet(wb, consolidation['entites'], consolidation['eliminations'])
+        add_balance_sheet(wb, montants.colonnes_en_fcfa(consolidation['balance'], montants.COLONNES_BALANCE))
+        add_bilan_sheet_from_mapping(wb, montants.etat_en_fcfa(consolidation['bilan']))
+        add_compte_resultat_sheet_from_mapping(wb, montants.etat_en_fcfa(consolidation['compte_resultat']))
+        add_sig_sheet(wb, montants.sig_en_fcfa(consolidation['sig']))
+
+        logger.info(f"Classeur consolidé créé avec {len(wb.sheetnames)} feuilles")
+        return wb
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du classeur consolidé: {e}")
+        raise ExcelGenerationError(f"Impossible de créer le classeur consolidé: {e}")
+
+
+def add_consolidation_sheet(wb: Workbook, entites: Dict, eliminations: pd.DataFrame):
+    """
+    Ajoute la feuille CONSOLIDATION: périmètre (résultat par entité) et éliminations intragroupe
+    """
+    logger.info("Ajout de la feuille Consolidation")
+
+    ws = wb.create_sheet("CONSOLIDATION")
+
+    ws.append(["Périmètre de consolidation", "", "", ""])
+    apply_header_style(ws, 1, 4)
+    ws.append(["Entité", "Exercice", "Comptes", "Résultat net"])
+    apply_header_style(ws, 2, 4)
+    for nom, infos in entites.items():
+        ws.append([nom, infos['exercice'], len(infos['balance']), montants.en_fcfa(infos['resultat'])])
+    apply_number_format(ws, "D", 3, ws.max_row)
+
+    ws.append([])
+    ws.append(["Éliminations intragroupe", "", "", "", "", "", "", "", ""])
+    apply_header_style(ws, ws.max_row, 9)
+    ws.append(["Entité A", "Compte A", "Solde A", "Entité B", "Compte B", "Solde B",
+               "Éliminé", "Écart", "Statut"])
+    apply_header_style(ws, ws.max_row, 9)
+    debut = ws.max_row + 1
+    for ligne in eliminations.itertuples(index=False):
+        ws.append([ligne.entite_a, ligne.compte_a, montants.en_fcfa(ligne.solde_a),
+                   ligne.entite_b, ligne.compte_b, montants.en_fcfa(ligne.solde_b),
+                   montants.en_fcfa(ligne.elimine), montants.en_fcfa(ligne.ecart), ligne.statut])
+    for colonne in ("C", "F", "G", "H"):
+        apply_number_format(ws, colonne, debut, ws.max_row)
+
+    adjust_column_widths(ws)
+
+
+def create_reconciliation_workbook(rapprochement: Dict, entite_a: str, entite_b: str) -> Workbook:
+    """
+    Crée le classeur du rapprochement intragroupe entre deux entités
+
+    Args:
+        rapprochement: Résultat de intercompany.reconcile (unités mineures)
+        entite_a: Nom de l'entité A
+        entite_b: Nom de l'entité B
+
+    Returns:
+        Workbook openpyxl
+    """
+    logger.info(f"Création du classeur de rapprochement {entite_a} / {entite_b}")
+
+    try:
+        wb = Workbook()
+        wb.remove(wb.active)
+
+        synthese = rapprochement['synthese']
+        paires = (synthese['compte_a'] + " / " + synthese['compte_b']).tolist()
+        add_reconciliation_summary_sheet(wb, synthese, entite_a, entite_b)
+
+        colonnes_appariees = [
+            "Paire", f"Compte {entite_a}", "Date", "Journal", "N° Pièce", "Libellé", "Montant",
+            f"Compte {entite_b}", "Date", "Journal", "N° Pièce", "Libellé", "Écart (jours)",
+        ]
+        add_reconciliation_lines_sheet(wb, "RAPPROCHES", rapprochement['rapproches'], paires,
+                                       colonnes_appariees)
+        add_reconciliation_lines_sheet(wb, "SUSPECTS", rapprochement['suspects'], paires,
+                                       colonnes_appariees + ["Motif"])
+
+        colonnes = ["Paire", "Compte", "Date", "Journal", "N° Pièce", "Libellé", "Montant"]
+        add_reconciliation_lines_sheet(wb, f"NON RAPPROCHES {entite_a}"[:31],
+                                       rapprochement['non_rapproches_a'], paires, colonnes)
+        # Montants de B dans son propre sens (débit - crédit)
+        non_rapproches_b = rapprochement['non_rapproches_b'].assign(
+            montant=-rapprochement['non_rapproches_b']['montant']
+        )
+        add_reconciliation_lines_sheet(wb, f"NON RAPPROCHES {entite_b}"[:31],
+                                       non_rapproches_b, paires, colonnes)
+
+        logger.info(f"Classeur de rapprochement créé avec {len(wb.sheetnames)} feuilles")
+        return wb
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du classeur de rapprochement: {e}")
+        raise ExcelGenerationError(f"Impossible de créer le classeur de rapprochement: {e}")
+
+
+def add_reconciliation_summary_sheet(wb: Workbook, synthese: pd.DataFrame, entite_a: str, entite_b: str):
+    """
+    Ajoute la feuille SYNTHESE: soldes réciproques, écart et nombre d'écritures par statut
+    """
+    logger.info("Ajout de la feuille Synthèse du rapprochement")
+
+    ws = wb.create_sheet("SYNTHESE")
 
-    # Ajouter les en-têtes
     headers = [
-        "N° Compte",
-        "Date",
-        "Journal",
-        "N° Pièce",
-        "Libellé",
-        "Lettrage",
-        "Débit",
-        "Crédit",
-        "Solde",
+        f"Compte {entite_a}", f"Compte {entite_b}", f"Solde {entite_a}", f"Solde {entite_b}",
+        "Écart", "Rapprochées", "Suspectes", f"Non rapprochées {entite_a}", f"Non rapprochées {entite_b}",
     ]
     ws.append(headers)
+    apply_header_style(ws, 1, len(headers))
+    for ligne in synthese.itertuples(index=False):
+        ws.append([ligne.compte_a, ligne.compte_b, montants.en_fcfa(ligne.solde_a),
+                   montants.en_fcfa(ligne.solde_b), montants.en_fcfa(ligne.ecart),
+                   ligne.rapproches, ligne.suspects, ligne.non_rapproches_a, ligne.non_rapproches_b])
+    for colonne in ("C", "D", "E"):
+        apply_number_format(ws, colonne, 2, ws.max_row)
+
+    adjust_column_widths(ws)
+
+
+def add_reconciliation_lines_sheet(wb: Workbook, titre: str, lignes: pd.DataFrame, paires: list,
+                                   headers: list):
+    """
+    Ajoute une feuille d'écritures du rapprochement (rapprochées, suspectes ou non rapprochées)
+
+    Args:
+        wb: Classeur
+        titre: Nom de la feuille
+        lignes: Écritures de intercompany.reconcile (colonne paire: numéro de paire)
+        paires: Libellé de chaque paire ("compte A / compte B")
+        headers: En-têtes, dans l'ordre des colonnes de lignes
+    """
+    logger.info(f"Ajout de la feuille {titre}")
+
+    ws = wb.create_sheet(titre)
+    ws.append(headers)
+    apply_header_style(ws, 1, len(headers))
+
+    lignes = montants.colonnes_en_fcfa(lignes, ['montant'])
+    lignes['paire'] = [paires[numero] for numero in lignes['paire'].tolist()]
+    # Dates manquantes: cellules vides
+    lignes = lignes.astype(object).where(lignes.notna(), None)
+    for row in dataframe_to_rows(lignes, index=False, header=False):
+        ws.append(row)
+
+    colonne_montant = get_column_letter(headers.index("Montant") + 1)
+    apply_number_format(ws, colonne_montant, 2, ws.max_row)
+    for cell in ws[1]:
+        if cell.value == "Date":
+            for row in range(2, ws.max_row + 1):
+                ws.cell(row=row, column=cell.column).number_format = "DD/MM/YYYY"
+
+    adjust_column_widths(ws)
+
+
+def _iter_grand_livre_rows(df: pd.DataFrame):
+    """
+    Lignes d'écritures du Grand Livre, avec un point de contrôle toutes les CHECKPOINT_ROWS lignes
+
+    Le nombre de lignes écrites est publié à chaque point de contrôle (fenêtre de progression).
+
+    Raises:
+        ProcessingTimeoutError: Si le budget de temps est dépassé
+        ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+    """
+    for index, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=1):
+        if index % CHECKPOINT_ROWS == 0:
+            checkpoint(GRAND_LIVRE_SHEET)
+            check_cancelled()
+            report_count("lignes GL écrites", index)
+        yield row
+
+
+def add_grand_livre_sheet(wb: Workbook, df: pd.DataFrame, en_flux: bool = False):
+    """
+    Ajoute la feuille Grand Livre
+
+    Args:
+        wb: Classeur
+        df: DataFrame du Grand Livre (montants en FCFA)
+        en_flux: Si True, seuls l'en-tête et les lignes de totaux sont écrits; les
+            écritures sont insérées à l'enregistrement (save_workbook_streaming)
+    """
+    logger.info("Ajout de la feuille Grand Livre")
+
+    ws = wb.create_sheet(GRAND_LIVRE_SHEET)
+
+    # Ajouter les en-têtes
+    headers = GRAND_LIVRE_HEADERS
+    ws.append(headers)
 
     # Appliquer le style d'en-tête
     apply_header_style(ws, 1, len(headers))
 
     # Ajouter les données
-    for r_idx, row in enumerate(
-        dataframe_to_rows(df, index=False, header=False), start=2
-    ):
-        ws.append(row)
+    if not en_flux:
+        for row in _iter_grand_livre_rows(df):
+            ws.append(row)
 
-    # Appliquer le formatage des nombres
-    apply_number_format(ws, "G", 2, len(df) + 1)  # Débit
-    apply_number_format(ws, "H", 2, len(df) + 1)  # Crédit
-    apply_number_format(ws, "I", 2, len(df) + 1)  # Solde
+        # Appliquer le formatage des nombres
+        apply_number_format(ws, "G", 2, len(df) + 1)  # Débit
+        apply_number_format(ws, "H", 2, len(df) + 1)  # Crédit
+        apply_number_format(ws, "I", 2, len(df) + 1)  # Solde
 
     # Ajouter les 3 lignes de totaux (comme dans le fichier manuel)
+    # En flux, les formules visent les lignes du fichier final; le style, celles de la feuille
     last_data_row = len(df) + 1
+    decalage = len(df) if en_flux else 0
 
     # Ligne 1: Totaux des colonnes Débit et Crédit
     total_row_1 = last_data_row + 1
@@ -144,8 +384,8 @@ def add_grand_livre_sheet(wb: Workbook, df: pd.DataFrame):
             "",
         ]
     )
-    apply_number_format(ws, "G", total_row_1, total_row_1)
-    apply_number_format(ws, "H", total_row_1, total_row_1)
+    apply_number_format(ws, "G", total_row_1 - decalage, total_row_1 - decalage)
+    apply_number_format(ws, "H", total_row_1 - decalage, total_row_1 - decalage)
 
     # Ligne 2: Ligne vide (séparateur)
     ws.append(["", "", "", "", "", "", "", "", ""])
@@ -154,11 +394,11 @@ def add_grand_livre_sheet(wb: Workbook, df: pd.DataFrame):
     # Dans le fichier manuel, cette valeur est dans la colonne Crédit (H)
     total_row_3 = last_data_row + 3
     ws.append(["", "", "", "", "", "", "", f"=H{total_row_1}-G{total_row_1}", ""])
-    apply_number_format(ws, "H", total_row_3, total_row_3)
+    apply_number_format(ws, "H", total_row_3 - decalage, total_row_3 - decalage)
 
     # Appliquer un style de mise en évidence pour les lignes de totaux
-    apply_total_style(ws, total_row_1, len(headers))
-    apply_total_style(ws, total_row_3, len(headers))
+    apply_total_style(ws, total_row_1 - decalage, len(headers))
+    apply_total_style(ws, total_row_3 - decalage, len(headers))
 
     # Ajuster la largeur des colonnes
     adjust_column_widths(ws)
@@ -244,6 +484,93 @@ def add_balance_sheet(wb: Workbook, df: pd.DataFrame):
     adjust_column_widths(ws)
 
 
+def create_balance_six_colonnes_workbook(balance: pd.DataFrame, periode: str,
+                                         balance_generale: pd.DataFrame = None,
+                                         soldes_mensuels: pd.DataFrame = None) -> Workbook:
+    """
+    Crée le classeur de la balance à six colonnes d'une période
+
+    Args:
+        balance: Résultat de data_processor.calculate_balance_six_colonnes (unités mineures)
+        periode: Libellé de la période (ex: "du 01/01/2025 au 31/03/2025")
+        balance_generale: Balance à la date d'arrêté (CumulativeLedgerIndex.balance_au, optionnel)
+        soldes_mensuels: Soldes aux fins de mois (CumulativeLedgerIndex.soldes_fin_de_mois, optionnel)
+
+    Returns:
+        Workbook openpyxl
+    """
+    logger.info(f"Création du classeur de balance à six colonnes ({periode})")
+
+    try:
+        wb = Workbook()
+        wb.remove(wb.active)
+        if balance_generale is not None:
+            add_balance_sheet(wb, montants.colonnes_en_fcfa(balance_generale, montants.COLONNES_BALANCE))
+        add_balance_six_colonnes_sheet(wb, balance, periode)
+        if soldes_mensuels is not None:
+            add_soldes_mensuels_sheet(wb, soldes_mensuels)
+        return wb
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la création de la balance à six colonnes: {e}")
+        raise ExcelGenerationError(f"Impossible de créer la balance à six colonnes: {e}")
+
+
+def add_balance_six_colonnes_sheet(wb: Workbook, balance: pd.DataFrame, periode: str):
+    """
+    Ajoute la feuille BG 6 COLONNES: ouverture, mouvements de la période et clôture par compte
+    """
+    logger.info("Ajout de la feuille Balance à six colonnes")
+
+    ws = wb.create_sheet("BG 6 COLONNES")
+
+    headers = [
+        "N° Compte", "Libellé",
+        "Ouverture Débit", "Ouverture Crédit",
+        "Mouvements Débit", "Mouvements Crédit",
+        "Clôture Débit", "Clôture Crédit",
+    ]
+    ws.append([f"Balance {periode}"] + [""] * (len(headers) - 1))
+    apply_header_style(ws, 1, len(headers))
+    ws.append(headers)
+    apply_header_style(ws, 2, len(headers))
+
+    balance = montants.colonnes_en_fcfa(balance, [col for col in balance.columns if col not in ('compte', 'libelle')])
+    for row in dataframe_to_rows(balance, index=False, header=False):
+        ws.append(row)
+
+    last_data_row = 2 + len(balance)
+    ws.append(["", "TOTAL GÉNÉRAL"] + [
+        f"=SUM({get_column_letter(col)}3:{get_column_letter(col)}{last_data_row})"
+        for col in range(3, len(headers) + 1)
+    ])
+    for col in range(3, len(headers) + 1):
+        apply_number_format(ws, get_column_letter(col), 3, ws.max_row)
+    apply_total_style(ws, ws.max_row, len(headers))
+
+    adjust_column_widths(ws)
+
+
+def add_soldes_mensuels_sheet(wb: Workbook, soldes: pd.DataFrame):
+    """
+    Ajoute la feuille SOLDES MENSUELS: solde (débit - crédit) de chaque compte à chaque fin de mois
+    """
+    logger.info("Ajout de la feuille Soldes mensuels")
+
+    ws = wb.create_sheet("SOLDES MENSUELS")
+
+    headers = ["N° Compte", "Libellé"] + [str(col) for col in soldes.columns[2:]]
+    ws.append(headers)
+    apply_header_style(ws, 1, len(headers))
+
+    soldes = montants.colonnes_en_fcfa(soldes, soldes.columns[2:])
+    for row in dataframe_to_rows(soldes, index=False, header=False):
+        ws.append(row)
+    for col in range(3, len(headers) + 1):
+        apply_number_format(ws, get_column_letter(col), 2, ws.max_row)
+
+    adjust_column_widths(ws)
+
 def add_bilan_sheet_from_mapping(wb: Workbook, bilan: Dict):
     """
     Ajoute la feuille Bilan Synthèse en respectant exactement le format du modèle client.
@@ -1543,7 +1870,8 @@ def detect_available_months(df: pd.DataFrame) -> list:
     return mois_list
 
 
-def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str = None):
+def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str = None,
+                             suivi_data: Dict = None):
     """
     Ajoute la feuille SUIVI ACTIVITE - Tableau de bord budgétaire mensuel
 
@@ -1553,13 +1881,15 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
         wb: Workbook Excel
         df: DataFrame du Grand Livre
         client_code: Code du client (non utilisé dans cette version)
+        suivi_data: Données déjà préparées par prepare_suivi_activite_detaille (optionnel)
     """
     logger.info("Ajout de la feuille Suivi d'Activité - Approche directe depuis GL")
 
     from modules.data_processor import prepare_suivi_activite_detaille, load_client_mapping
 
-    # Préparer les données avec regroupement intelligent
-    suivi_data = prepare_suivi_activite_detaille(df, client_code=client_code)
+    # Préparer les données avec regroupement intelligent (sauf si déjà fournies)
+    if suivi_data is None:
+        suivi_data = prepare_suivi_activite_detaille(df, client_code=client_code)
 
     ws = wb.create_sheet("SUIVI ACTIVITE")
 
@@ -1620,9 +1950,9 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
     apply_header_style(ws, 5, nb_colonnes_total)
 
     # Fonction helper pour ajouter une ligne
-    def add_data_row(libelle, mois_data, indent_level=0, is_subtotal=False):
+    def add_data_row(libelle, mois_data, indent_level=0, is_subtotal=False, rappel_n1=0, budget=0):
         indent = "  " * indent_level
-        row_data = ["", f"{indent}{libelle}", 0, 0]
+        row_data = ["", f"{indent}{libelle}", rappel_n1, budget]
 
         for mois in mois_disponibles:
             montant = mois_data.get(mois, 0)
@@ -1660,6 +1990,24 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
 
         return current_row
 
+    def variation_pct_formula(row_num):
+        """Variation % d'une ligne de total (rapport au rappel N-1, pas somme des pourcentages)"""
+        col_total_letter = get_column_letter(col_total_annee)
+        return f"=IF(C{row_num}=0,0,({col_total_letter}{row_num}-C{row_num})/C{row_num}*100)"
+
+    def section_total_row(libelle, rows, row_num):
+        """Ligne de total d'une section: somme des lignes (rappel N-1 et budget compris)"""
+        total_row = ["", libelle]
+        for col_idx in range(3, col_variation_pct + 1):
+            col_letter = get_column_letter(col_idx)
+            if not rows:
+                total_row.append(0)
+            elif col_idx == col_variation_pct:
+                total_row.append(variation_pct_formula(row_num))
+            else:
+                total_row.append(f"={'+'.join(f'{col_letter}{row}' for row in rows)}")
+        return total_row
+
     # SECTION 1: CHARGES DE PERSONNEL
     personnel_categories = suivi_data.get('personnel', [])
     personnel_rows = []
@@ -1667,20 +2015,13 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
     if personnel_categories:
         for categorie in personnel_categories:
             # Ajouter une ligne par catégorie SYSCOHADA
-            row_num = add_data_row(categorie['libelle'], categorie['mois_data'], indent_level=1)
+            row_num = add_data_row(categorie['libelle'], categorie['mois_data'], indent_level=1,
+                                   rappel_n1=categorie.get('rappel_n1', 0), budget=categorie.get('budget', 0))
             personnel_rows.append(row_num)
 
     # Total charges de personnel
     total_personnel_row_num = ws.max_row + 1
-    total_personnel_row = ["", "Total charges de personnel", 0, 0]
-
-    for col_idx in range(col_premier_mois, col_variation_pct + 1):
-        col_letter = get_column_letter(col_idx)
-        if personnel_rows:
-            formula_parts = [f"{col_letter}{row}" for row in personnel_rows]
-            total_personnel_row.append(f"={'+'.join(formula_parts)}")
-        else:
-            total_personnel_row.append(0)
+    total_personnel_row = section_total_row("Total charges de personnel", personnel_rows, total_personnel_row_num)
 
     ws.append(total_personnel_row)
     apply_total_style(ws, ws.max_row, nb_colonnes_total)
@@ -1692,20 +2033,13 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
     if charges_categories:
         for categorie in charges_categories:
             # Ajouter une ligne par catégorie SYSCOHADA
-            row_num = add_data_row(categorie['libelle'], categorie['mois_data'], indent_level=1)
+            row_num = add_data_row(categorie['libelle'], categorie['mois_data'], indent_level=1,
+                                   rappel_n1=categorie.get('rappel_n1', 0), budget=categorie.get('budget', 0))
             charges_rows.append(row_num)
 
     # Total autres charges
     total_autres_charges_row_num = ws.max_row + 1
-    total_autres_row = ["", "Autres charges", 0, 0]
-
-    for col_idx in range(col_premier_mois, col_variation_pct + 1):
-        col_letter = get_column_letter(col_idx)
-        if charges_rows:
-            formula_parts = [f"{col_letter}{row}" for row in charges_rows]
-            total_autres_row.append(f"={'+'.join(formula_parts)}")
-        else:
-            total_autres_row.append(0)
+    total_autres_row = section_total_row("Autres charges", charges_rows, total_autres_charges_row_num)
 
     ws.append(total_autres_row)
     apply_total_style(ws, ws.max_row, nb_colonnes_total)
@@ -1720,9 +2054,10 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
                         f"=C{total_personnel_row_num}+C{total_autres_charges_row_num}",
                         f"=D{total_personnel_row_num}+D{total_autres_charges_row_num}"]
 
-    for col_idx in range(col_premier_mois, col_variation_pct + 1):
+    for col_idx in range(col_premier_mois, col_variation_pct):
         col_letter = get_column_letter(col_idx)
         total_charges_row.append(f"={col_letter}{total_personnel_row_num}+{col_letter}{total_autres_charges_row_num}")
+    total_charges_row.append(variation_pct_formula(total_charges_row_num))
 
     ws.append(total_charges_row)
     apply_total_style(ws, ws.max_row, nb_colonnes_total)
@@ -1736,18 +2071,24 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
         ws.append([""] * nb_colonnes_total)
 
     # SECTION 3: PRODUITS
-    produits_groups = suivi_data.get('produits', {}).get('groups', [])
+    # Le classifieur SYSCOHADA renvoie une liste de catégories (ancien format: {'groups': [...]})
+    produits_groups = suivi_data.get('produits', [])
+    if isinstance(produits_groups, dict):
+        produits_groups = produits_groups.get('groups', [])
     produits_rows = []
 
     if produits_groups:
         for group in produits_groups:
             if group.get('is_subtotal'):
                 for entry in group.get('entries', []):
-                    add_data_row(entry['libelle'], entry['mois_data'], indent_level=1)
-                row_num = add_data_row(group['libelle'], group['mois_data'], indent_level=1, is_subtotal=True)
+                    add_data_row(entry['libelle'], entry['mois_data'], indent_level=1,
+                                 rappel_n1=entry.get('rappel_n1', 0), budget=entry.get('budget', 0))
+                row_num = add_data_row(group['libelle'], group['mois_data'], indent_level=1, is_subtotal=True,
+                                       rappel_n1=group.get('rappel_n1', 0), budget=group.get('budget', 0))
                 produits_rows.append(row_num)
             else:
-                add_data_row(group['libelle'], group['mois_data'], indent_level=1)
+                add_data_row(group['libelle'], group['mois_data'], indent_level=1,
+                             rappel_n1=group.get('rappel_n1', 0), budget=group.get('budget', 0))
                 produits_rows.append(ws.max_row)
 
     # Ligne vide
@@ -1755,15 +2096,7 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
 
     # Total CA
     total_ca_row_num = ws.max_row + 1
-    total_ca_row = ["", "CA", 0, 0]
-
-    for col_idx in range(col_premier_mois, col_variation_pct + 1):
-        col_letter = get_column_letter(col_idx)
-        if produits_rows:
-            formula_parts = [f"{col_letter}{row}" for row in produits_rows]
-            total_ca_row.append(f"={'+'.join(formula_parts)}")
-        else:
-            total_ca_row.append(0)
+    total_ca_row = section_total_row("CA", produits_rows, total_ca_row_num)
 
     ws.append(total_ca_row)
     apply_total_style(ws, ws.max_row, nb_colonnes_total)
@@ -1776,9 +2109,10 @@ def add_suivi_activite_sheet(wb: Workbook, df: pd.DataFrame, client_code: str =
                     f"=C{total_ca_row_num}+C{total_charges_row_num}",
                     f"=D{total_ca_row_num}+D{total_charges_row_num}"]
 
-    for col_idx in range(col_premier_mois, col_variation_pct + 1):
+    for col_idx in range(col_premier_mois, col_variation_pct):
         col_letter = get_column_letter(col_idx)
         resultat_row.append(f"={col_letter}{total_ca_row_num}+{col_letter}{total_charges_row_num}")
+    resultat_row.append(variation_pct_formula(ws.max_row + 1))
 
     ws.append(resultat_row)
     apply_result_style(ws, ws.max_row, nb_colonnes_total)
@@ -2103,3 +2437,109 @@ def save_workbook(wb: Workbook, output_path: str):
     except Exception as e:
         logger.error(f"Erreur lors de la sauvegarde: {e}")
         raise ExcelGenerationError(f"Impossible de sauvegarder le fichier Excel: {e}")
+
+
+def _copy_cell(ws, cell) -> WriteOnlyCell:
+    """Copie une cellule (valeur et style) vers une feuille en écriture seule"""
+    copie = WriteOnlyCell(ws, value=cell.value)
+    if cell.has_style:
+        copie.font = copy(cell.font)
+        copie.fill = copy(cell.fill)
+        copie.border = copy(cell.border)
+        copie.alignment = copy(cell.alignment)
+        copie.protection = copy(cell.protection)
+        copie.number_format = cell.number_format
+    return copie
+
+
+def _copy_sheet_streaming(source, ws, df_flux: pd.DataFrame = None):
+    """
+    Recopie une feuille vers une feuille en écriture seule
+
+    Args:
+        source: Feuille du classeur construit par create_workbook
+        ws: Feuille en écriture seule (vide)
+        df_flux: Écritures (montants en FCFA) à insérer après l'en-tête (ligne 1), ou None
+    """
+    decalage = len(df_flux) if df_flux is not None else 0
+
+    # Dimensions et affichage: à fixer avant la première ligne
+    for lettre, dimension in source.column_dimensions.items():
+        if dimension.width:
+            ws.column_dimensions[lettre].width = dimension.width
+    for ligne, dimension in source.row_dimensions.items():
+        if dimension.height:
+            ws.row_dimensions[ligne + decalage if ligne > 1 else ligne].height = dimension.height
+    ws.sheet_view.showGridLines = source.sheet_view.showGridLines
+    if source.freeze_panes:
+        ws.freeze_panes = source.freeze_panes
+    for plage in source.merged_cells.ranges:
+        ws.merged_cells.add(str(plage))
+    for formatage in source.conditional_formatting:
+        for regle in formatage.rules:
+            ws.conditional_formatting.add(str(formatage.sqref), regle)
+
+    for index, row in enumerate(source.iter_rows(), start=1):
+        ws.append([_copy_cell(ws, cell) for cell in row])
+
+        if index == 1 and df_flux is not None:
+            colonnes_montants = {GRAND_LIVRE_HEADERS.index(entete) for entete in ("Débit", "Crédit", "Solde")}
+            for valeurs in _iter_grand_livre_rows(df_flux):
+                ligne = list(valeurs)
+                for colonne in colonnes_montants:
+                    cellule = WriteOnlyCell(ws, value=ligne[colonne])
+                    cellule.number_format = "# ##0"
+                    ligne[colonne] = cellule
+                ws.append(ligne)
+
+
+def _abandon_streaming(sortie: Workbook):
+    """Ferme les feuilles en écriture seule d'un enregistrement interrompu et supprime leurs fichiers temporaires"""
+    for ws in sortie.worksheets:
+        if ws._writer is None:
+            continue
+        if not ws.closed:
+            ws.close()
+        ws._writer.cleanup()
+
+
+def save_workbook_streaming(wb: Workbook, output_path: str, df_grand_livre: pd.DataFrame):
+    """
+    Enregistre un classeur dont le GL BI SEP a été créé en flux (grand livre volumineux)
+
+    Le classeur est recopié dans un classeur openpyxl en écriture seule; les écritures
+    sont insérées sous l'en-tête du GL BI SEP au fil de l'écriture du fichier, sans
+    cellule en mémoire. Le résultat est identique à celui de wb.save() sur un classeur
+    créé avec toutes les écritures.
+
+    Args:
+        wb: Classeur créé avec create_workbook(grand_livre_en_flux=True)
+        output_path: Chemin du fichier à écrire
+        df_grand_livre: DataFrame du Grand Livre (unités mineures, comme pour create_workbook)
+
+    Raises:
+        ExcelGenerationError: Si l'enregistrement échoue
+        ProcessingTimeoutError: Si le budget de temps est dépassé pendant l'écriture du GL
+        ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+    """
+    logger.info(f"Sauvegarde du classeur en flux: {output_path}")
+
+    sortie = Workbook(write_only=True)
+    try:
+        df_flux = montants.colonnes_en_fcfa(df_grand_livre, GRAND_LIVRE_MONTANTS)
+
+        for source in wb.worksheets:
+            ws = sortie.create_sheet(source.title)
+            _copy_sheet_streaming(source, ws, df_flux if source.title == GRAND_LIVRE_SHEET else None)
+
+        sortie.save(output_path)
+        logger.info(f"Classeur sauvegardé avec succès ({len(df_flux)} écritures en flux)")
+
+    except ProcessingInterrupted:
+        # Rien n'est écrit à output_path avant save(): seuls les fichiers temporaires des feuilles sont à supprimer
+        _abandon_streaming(sortie)
+        raise
+
+    except Exception as e:
+        logger.error(f"Erreur lors de la sauvegarde: {e}")
+        raise ExcelGenerationError(f"Impossible de sauvegarder le fichier Excel: {e}")
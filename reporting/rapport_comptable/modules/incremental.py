@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 10: Ingestion incrémentale des exports cumulés de l'exercice
+
+Les grands livres mensuels sont cumulés: l'export de novembre reprend celui
+d'octobre et ajoute les nouvelles écritures. L'état cumulé de l'exercice
+garde l'empreinte de chaque écriture déjà intégrée; à l'export suivant, seules
+les écritures nouvelles sont parsées et agrégées, et le cube mensuel
+(compte x mois) et la balance sont mis à jour par différence.
+
+- Empreinte d'une écriture: compte, date, journal, pièce, libellé, débit,
+  crédit. Le lettrage et le solde progressif, réécrits par Sage quand des
+  écritures antérieures sont ajoutées, n'en font pas partie.
+- Comparaison en multi-ensemble: deux écritures identiques restent deux
+  écritures. Une écriture absente du nouvel export (supprimée ou modifiée
+  dans Sage) est retirée du cube.
+- Stockage en colonnes (.npz, sans pickle), comme les artefacts du Module 9.
+"""
+
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules import sage_parser
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT = "rapport_comptable.cumul"
+STATE_VERSION = 1
+
+# Champs d'une ligne Sage retenus pour l'empreinte (hors lettrage et solde progressif)
+ROW_KEY_COLUMNS = [0, 1, 2, 3, 4, 6, 7]
+
+_ENTRY_COLUMNS = ['hash', 'compte', 'mois', 'debit', 'credit']
+_CUBE_COLUMNS = ['compte', 'mois', 'debit', 'credit']
+_META_KEY = "__meta__"
+
+_JOUR_SANS_DATE = np.iinfo('int64').max  # Les écritures non datées passent après les autres
+
+
+def read_lines(file_path: Path) -> List[str]:
+    """Lignes non vides d'un export Sage (ISO-8859-1)"""
+    with open(file_path, 'r', encoding='ISO-8859-1') as f:
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+def row_hashes(lines: List[str]) -> np.ndarray:
+    """
+    Empreintes 64 bits des lignes (calcul vectorisé, sans conversion des types)
+
+    Args:
+        lines: Lignes brutes de l'export
+
+    Returns:
+        Tableau uint64, une empreinte par ligne
+    """
+    if not lines:
+        return np.array([], dtype='uint64')
+
+    champs = pd.Series(lines).str.split('\t', expand=True)
+    champs = champs.reindex(columns=range(len(sage_parser.SAGE_COLUMNS)))
+    cles = champs[ROW_KEY_COLUMNS].fillna('').apply(lambda col: col.str.strip())
+    return pd.util.hash_pandas_object(cles, index=False).to_numpy()
+
+
+def _with_occurrence(hashes: np.ndarray) -> pd.DataFrame:
+    """Empreintes numérotées par occurrence (multi-ensemble: deux écritures identiques restent distinctes)"""
+    cles = pd.DataFrame({'hash': hashes})
+    cles['occurrence'] = cles.groupby('hash').cumcount()
+    return cles
+
+
+def compare_export(lines: List[str], known_hashes: np.ndarray) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """
+    Compare un export aux écritures déjà intégrées et parse uniquement les nouvelles
+
+    Args:
+        lines: Lignes non vides du nouvel export
+        known_hashes: Empreintes des écritures déjà intégrées (uint64)
+
+    Returns:
+        Tuple (écritures nouvelles parsées, avec leurs colonnes 'hash' et 'ligne';
+        ligne de chaque écriture connue dans le nouvel export, -1 si elle en a disparu;
+        nombre de lignes inchangées)
+    """
+    hashes = row_hashes(lines)
+    nouveau = _with_occurrence(hashes)
+    nouveau['ligne'] = np.arange(len(lines))
+    ancien = _with_occurrence(np.asarray(known_hashes, dtype='uint64'))
+    ancien['position'] = np.arange(len(ancien))
+
+    comparaison = nouveau.merge(ancien, on=['hash', 'occurrence'], how='outer', indicator=True)
+    ajoutees = np.sort(comparaison.loc[comparaison['_merge'] == 'left_only', 'ligne'].to_numpy(dtype='int64'))
+    communes = comparaison[comparaison['_merge'] == 'both']
+    positions = np.full(len(ancien), -1, dtype='int64')
+    positions[communes['position'].to_numpy(dtype='int64')] = communes['ligne'].to_numpy(dtype='int64')
+
+    delta = sage_parser.parse_sage_lines([lines[i] for i in ajoutees])
+    delta['hash'] = hashes[ajoutees]
+    delta['ligne'] = ajoutees
+    delta = delta.dropna(subset=['compte']).reset_index(drop=True)
+    return delta, positions, len(communes)
+
+
+def _cube_of(entries: pd.DataFrame) -> pd.DataFrame:
+    """Débits et crédits par (compte, mois)"""
+    return entries.groupby(['compte', 'mois'], as_index=False)[['debit', 'credit']].sum()
+
+
+class YtdState:
+    """
+    État cumulé de l'exercice pour un client
+
+    Attributs:
+        entries: Écritures intégrées (empreinte, compte, mois AAAAMM ou 0, débit, crédit)
+        cube: Débits et crédits par (compte, mois), tenu à jour par différence
+        libelles: Libellé de chaque compte (celui de sa première écriture datée)
+        source: Dernier export intégré et statistiques
+    """
+
+    def __init__(self, entries: Optional[pd.DataFrame] = None, cube: Optional[pd.DataFrame] = None,
+                 libelles: Optional[pd.DataFrame] = None, source: Optional[Dict] = None):
+        self.entries = entries if entries is not None else pd.DataFrame({
+            'hash': np.array([], dtype='uint64'),
+            **{col: np.array([], dtype='int64') for col in _ENTRY_COLUMNS[1:]},
+        })
+        self.cube = cube if cube is not None else _cube_of(self.entries)
+        self.libelles = libelles if libelles is not None else pd.DataFrame({
+            'compte': np.array([], dtype='int64'),
+            'jour': np.array([], dtype='int64'),
+            'libelle': np.array([], dtype=object),
+        })
+        self.source = source or {}
+
+    # ------------------------------------------------------------------
+    # Mise à jour
+    # ------------------------------------------------------------------
+
+    def ingest(self, lines: List[str]) -> Dict[str, int]:
+        """
+        Intègre un nouvel export cumulé: seules les écritures nouvelles sont parsées
+
+        Args:
+            lines: Lignes non vides du nouvel export
+
+        Returns:
+            Statistiques {lignes, ajoutees, retirees, inchangees}
+        """
+        delta, positions, inchangees = compare_export(lines, self.entries['hash'].to_numpy())
+        retirees = np.flatnonzero(positions < 0)
+
+        dates = delta['date']
+        nouvelles = pd.DataFrame({
+            'hash': delta['hash'].to_numpy(dtype='uint64'),
+            'compte': delta['compte'].to_numpy(dtype='int64'),
+            'mois': (dates.dt.year * 100 + dates.dt.month).fillna(0).to_numpy(dtype='int64'),
+            'debit': delta['debit'].to_numpy(dtype='int64'),
+            'credit': delta['credit'].to_numpy(dtype='int64'),
+        })
+        retrait = self.entries.iloc[retirees]
+
+        # Cube mis à jour par différence: + écritures nouvelles, - écritures disparues
+        retrait_cube = _cube_of(retrait)
+        retrait_cube[['debit', 'credit']] *= -1
+        cube = _cube_of(pd.concat([self.cube, _cube_of(nouvelles), retrait_cube], ignore_index=True))
+        presents = pd.concat([self.entries.drop(self.entries.index[retirees]), nouvelles], ignore_index=True)
+        self.cube = cube.merge(presents[['compte', 'mois']].drop_duplicates(), on=['compte', 'mois'])
+        self.entries = presents
+
+        self._update_libelles(delta)
+
+        stats = {
+            'lignes': len(lines),
+            'ajoutees': len(nouvelles),
+            'retirees': len(retrait),
+            'inchangees': inchangees,
+        }
+        logger.info(f"📥 Ingestion incrémentale: {stats['ajoutees']} écriture(s) ajoutée(s), "
+                    f"{stats['retirees']} retirée(s), {stats['inchangees']} inchangée(s)")
+        return stats
+
+    def _update_libelles(self, delta: pd.DataFrame):
+        """Libellé de la première écriture de chaque compte (ordre compte, date de clean_data)"""
+        if delta.empty:
+            return
+        jours = delta['date'].to_numpy(dtype='datetime64[D]')
+        candidats = pd.DataFrame({
+            'compte': delta['compte'].to_numpy(dtype='int64'),
+            'jour': np.where(np.isnat(jours), _JOUR_SANS_DATE, jours.astype('int64')),
+            'libelle': delta['libelle'].to_numpy(dtype=object),
+        })
+        self.libelles = (
+            pd.concat([self.libelles, candidats], ignore_index=True)
+            .sort_values(['compte', 'jour'], kind='stable')
+            .drop_duplicates('compte')
+            .reset_index(drop=True)
+        )
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def balance(self) -> pd.DataFrame:
+        """Balance au format de data_processor.calculate_balance, issue du cube"""
+        balance = self.cube.groupby('compte', as_index=False)[['debit', 'credit']].sum()
+        balance = balance.merge(self.libelles[['compte', 'libelle']], on='compte', how='left')
+        balance = balance.rename(columns={'debit': 'total_debit', 'credit': 'total_credit'})
+        balance['compte'] = balance['compte'].astype('Int64')
+        balance['solde'] = balance['total_debit'] - balance['total_credit']
+        balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+        balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
+        return balance[['compte', 'libelle', 'total_debit', 'total_credit',
+                        'solde', 'solde_debiteur', 'solde_crediteur']]
+
+    def monthly_cube(self) -> pd.DataFrame:
+        """Cube (compte, mois) trié; mois = AAAAMM, 0 pour les écritures non datées"""
+        return self.cube.sort_values(['compte', 'mois']).reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # Stockage
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path) -> Path:
+        """Enregistre l'état (.npz, écriture atomique)"""
+        path = Path(path)
+        arrays = {f"entries_{col}": self.entries[col].to_numpy() for col in _ENTRY_COLUMNS}
+        arrays.update({f"cube_{col}": self.cube[col].to_numpy(dtype='int64') for col in _CUBE_COLUMNS})
+        arrays['libelles_compte'] = self.libelles['compte'].to_numpy(dtype='int64')
+        arrays['libelles_jour'] = self.libelles['jour'].to_numpy(dtype='int64')
+        arrays['libelles_libelle'] = self.libelles['libelle'].astype(str).to_numpy(dtype=str)
+        meta = {'format': STATE_FORMAT, 'version': STATE_VERSION, 'source': self.source}
+
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays, **{_META_KEY: np.array(json.dumps(meta, ensure_ascii=False))})
+        tmp_path.replace(path)
+        logger.info(f"💾 État cumulé enregistré: {path} ({len(self.entries)} écritures)")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> 'YtdState':
+        """
+        Relit un état enregistré par save
+
+        Raises:
+            ValueError: Si le fichier n'est pas un état cumulé de version compatible
+        """
+        with np.load(Path(path), allow_pickle=False) as data:
+            meta = json.loads(str(data[_META_KEY]))
+            if meta.get('format') != STATE_FORMAT or meta.get('version') != STATE_VERSION:
+                raise ValueError(f"{Path(path).name} n'est pas un état cumulé (version {STATE_VERSION})")
+            entries = pd.DataFrame({col: data[f"entries_{col}"] for col in _ENTRY_COLUMNS})
+            cube = pd.DataFrame({col: data[f"cube_{col}"] for col in _CUBE_COLUMNS})
+            libelles = pd.DataFrame({
+                'compte': data['libelles_compte'],
+                'jour': data['libelles_jour'],
+                'libelle': data['libelles_libelle'].astype(object),
+            })
+        return cls(entries, cube, libelles, meta.get('source'))
+
+
+def ingest_export(file_path: Path, state_path: Path) -> Tuple[YtdState, Dict[str, int]]:
+    """
+    Intègre un export cumulé dans l'état de l'exercice (créé s'il n'existe pas)
+
+    Args:
+        file_path: Export TXT Sage (cumul depuis le début de l'exercice)
+        state_path: Fichier de l'état cumulé (.cumul.npz)
+
+    Returns:
+        Tuple (état mis à jour et enregistré, statistiques de l'ingestion)
+    """
+    file_path = Path(file_path)
+    state_path = Path(state_path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Le fichier n'existe pas: {file_path}")
+
+    state = YtdState.load(state_path) if state_path.exists() else YtdState()
+    stats = state.ingest(read_lines(file_path))
+    state.source = {
+        'fichier': file_path.name,
+        'integre_le': datetime.now().isoformat(timespec='seconds'),
+        **stats,
+    }
+    state.save(state_path)
+    return state, stats
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 14: Rapprochement des comptes intragroupe
+
+Rapproche les écritures de deux entités liées sur leurs comptes réciproques
+(paires de comptes du Module 13): une écriture de A trouve sa contrepartie
+de même montant et de sens contraire chez B.
+
+Ce module gère:
+- La sélection des écritures des paires de comptes (numéros ou radicaux)
+- Trois passes de jointure un pour un, par clé entière et tri sur la date
+  (jointure de hachage puis pd.merge_asof):
+    1. montant, pièce et date dans la fenêtre       -> rapproché
+    2. montant et date dans la fenêtre, pièce autre -> suspect
+    3. montant et pièce, date hors fenêtre          -> suspect
+- Les écritures restantes (non rapprochées) de chaque côté et la synthèse
+  des écarts par paire de comptes
+"""
+
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FENETRE_JOURS = 5  # Écart de dates admis entre une écriture et sa contrepartie
+
+_COLONNES = ['paire', 'compte', 'date', 'journal', 'piece', 'libelle', 'montant']
+_HORS_PIECE = re.compile(r'[^0-9A-Z]')
+
+
+def _normalize_pieces(pieces: pd.Series) -> pd.Series:
+    """Référence de pièce comparable: majuscules, lettres et chiffres seulement ("fa-012 " -> "FA012")"""
+    codes, valeurs = pd.factorize(pieces.fillna('').astype(str))
+    cles = [valeur.upper() for valeur in valeurs.tolist()]
+    cles = np.array([cle if cle.isascii() and cle.isalnum() else _HORS_PIECE.sub('', cle) for cle in cles]
+                    + [''], dtype=object)
+    return pd.Series(cles[codes], index=pieces.index)
+
+
+def select_entries(ledger: pd.DataFrame, comptes: List[str], sens: int = 1) -> pd.DataFrame:
+    """
+    Écritures d'un grand livre sur les comptes des paires
+
+    Args:
+        ledger: Grand livre nettoyé (sage_parser.clean_data)
+        comptes: Numéro ou radical de compte de chaque paire (l'indice est le numéro de paire)
+        sens: 1 pour l'entité A; -1 pour B (montant de sens contraire, comparable à celui de A)
+
+    Returns:
+        DataFrame (paire, compte, date, journal, piece, libelle, montant);
+        montant = (débit - crédit) x sens, en unités mineures
+    """
+    # Paire de chaque compte distinct (la première paire qui le couvre)
+    codes, numeros = pd.factorize(ledger['compte'])
+    numeros = [str(numero) for numero in numeros.tolist()]
+    paire_du_compte = np.full(len(numeros) + 1, -1)
+    for numero, compte in reversed(list(enumerate(comptes))):
+        couverts = np.array([numero_compte.startswith(str(compte)) for numero_compte in numeros] + [False])
+        paire_du_compte[couverts] = numero
+    paire = paire_du_compte[codes]
+    retenues = paire >= 0
+
+    selection = ledger.loc[retenues, _COLONNES[1:-1]]
+    selection.insert(0, 'paire', paire[retenues])
+    selection['montant'] = (ledger['debit'] - ledger['credit']).to_numpy()[retenues].astype('int64') * sens
+    return selection[selection['montant'] != 0].reset_index(drop=True)
+
+
+def _join_keys(a: pd.DataFrame, b: pd.DataFrame, colonnes: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Clé entière commune à A et B pour des colonnes de jointure (-1 si la pièce est vide)"""
+    communes = pd.concat([a[colonnes], b[colonnes]], ignore_index=True)
+    cles = communes.groupby(colonnes, sort=False).ngroup().to_numpy()
+    if 'cle_piece' in colonnes:
+        cles = np.where(communes['cle_piece'].to_numpy() == '', -1, cles)
+    return cles[:len(a)], cles[len(a):]
+
+
+def _match_pass(a: pd.DataFrame, b: pd.DataFrame, tolerance: Optional[pd.Timedelta]) -> pd.DataFrame:
+    """
+    Appariement un pour un des écritures de A et B de même clé, à la date la plus proche
+
+    Les écritures de même date sont d'abord appariées par rang (jointure de
+    hachage sur la clé, la date et le rang d'occurrence). Chaque tour suivant
+    joint (merge_asof) les écritures restantes de A à l'écriture de B la plus
+    proche en date; une écriture de B retenue par plusieurs écritures de A va
+    à la plus proche, les autres repassent au tour suivant.
+
+    Args:
+        a, b: DataFrames (pos, cle, date) - pos: position de l'écriture, cle: entier
+        tolerance: Écart de dates maximal (None: sans limite)
+
+    Returns:
+        DataFrame (pos_a, pos_b) des paires retenues
+    """
+    a = a.sort_values('date', kind='stable')
+    b = b.sort_values('date', kind='stable')
+
+    meme_jour = (a.assign(rang=a.groupby(['cle', 'date']).cumcount())
+                 .merge(b.assign(rang=b.groupby(['cle', 'date']).cumcount()),
+                        on=['cle', 'date', 'rang'], suffixes=('_a', '_b')))
+    paires = [meme_jour[['pos_a', 'pos_b']]]
+    a = a[~a['pos'].isin(meme_jour['pos_a'])]
+    b = b[~b['pos'].isin(meme_jour['pos_b'])]
+
+    while len(a) and len(b):
+        candidats = pd.merge_asof(
+            a.rename(columns={'pos': 'pos_a'}),
+            b.rename(columns={'pos': 'pos_b', 'date': 'date_b'}),
+            left_on='date', right_on='date_b', by='cle', direction='nearest', tolerance=tolerance,
+        ).dropna(subset=['pos_b'])
+        if candidats.empty:
+            break
+
+        candidats['pos_b'] = candidats['pos_b'].astype('int64')
+        candidats['ecart'] = (candidats['date'] - candidats['date_b']).abs()
+        retenus = candidats.sort_values(['ecart', 'pos_a'], kind='stable').drop_duplicates('pos_b')
+        paires.append(retenus[['pos_a', 'pos_b']])
+
+        a = a[~a['pos'].isin(retenus['pos_a'])]
+        b = b[~b['pos'].isin(retenus['pos_b'])]
+
+    return pd.concat(paires, ignore_index=True)
+
+
+def _paired(a: pd.DataFrame, b: pd.DataFrame, paires: pd.DataFrame) -> pd.DataFrame:
+    """Lignes côte à côte (colonnes _a et _b) des écritures appariées"""
+    cote_a = a.loc[paires['pos_a'], _COLONNES].reset_index(drop=True)
+    cote_b = b.loc[paires['pos_b'], _COLONNES[1:-1]].reset_index(drop=True)
+    lignes = pd.concat([cote_a.add_suffix('_a').rename(columns={'paire_a': 'paire', 'montant_a': 'montant'}),
+                        cote_b.add_suffix('_b')], axis=1)
+    lignes['ecart_jours'] = (lignes['date_a'] - lignes['date_b']).abs().dt.days.astype('int64')
+    return lignes
+
+
+def reconcile(ledger_a: pd.DataFrame, ledger_b: pd.DataFrame, paires: List[Tuple[str, str]],
+              fenetre_jours: int = FENETRE_JOURS) -> Dict[str, pd.DataFrame]:
+    """
+    Rapproche les écritures intragroupe de deux entités
+
+    Args:
+        ledger_a: Grand livre nettoyé de l'entité A
+        ledger_b: Grand livre nettoyé de l'entité B
+        paires: Liste de (compte de A, compte de B) - numéros ou radicaux
+        fenetre_jours: Écart de dates admis entre une écriture et sa contrepartie
+
+    Returns:
+        Dictionnaire de DataFrames (montants en unités mineures, signe de A):
+        - rapproches: écritures appariées (montant, pièce et date)
+        - suspects: appariements partiels, avec leur motif
+        - non_rapproches_a, non_rapproches_b: écritures sans contrepartie
+        - synthese: par paire, soldes de chaque côté, écart et nombre d'écritures par statut
+    """
+    a = select_entries(ledger_a, [compte_a for compte_a, _ in paires], sens=1)
+    b = select_entries(ledger_b, [compte_b for _, compte_b in paires], sens=-1)
+    fenetre = pd.Timedelta(days=fenetre_jours)
+
+    # Références de pièce normalisées ensemble: une pièce commune aux deux entités n'est traitée qu'une fois
+    pieces = _normalize_pieces(pd.concat([a['piece'], b['piece']], ignore_index=True)).to_numpy()
+    a['cle_piece'], b['cle_piece'] = pieces[:len(a)], pieces[len(a):]
+
+    cle_montant = _join_keys(a, b, ['paire', 'montant'])
+    cle_piece = _join_keys(a, b, ['paire', 'montant', 'cle_piece'])
+    # Écritures non datées: jamais appariées
+    libre_a, libre_b = a['date'].notna().to_numpy(), b['date'].notna().to_numpy()
+    apparie_a, apparie_b = np.zeros(len(a), dtype=bool), np.zeros(len(b), dtype=bool)
+
+    passes = [
+        (cle_piece, fenetre, None),
+        (cle_montant, fenetre, "pièce différente"),
+        (cle_piece, None, f"dates à plus de {fenetre_jours} jours"),
+    ]
+    rapproches, suspects = [], []
+    for (cles_a, cles_b), tolerance, motif in passes:
+        masque_a = libre_a & ~apparie_a & (cles_a >= 0)
+        masque_b = libre_b & ~apparie_b & (cles_b >= 0)
+        appariees = _match_pass(
+            pd.DataFrame({'pos': np.flatnonzero(masque_a), 'cle': cles_a[masque_a],
+                          'date': a['date'].to_numpy()[masque_a]}),
+            pd.DataFrame({'pos': np.flatnonzero(masque_b), 'cle': cles_b[masque_b],
+                          'date': b['date'].to_numpy()[masque_b]}),
+            tolerance
+        )
+        apparie_a[appariees['pos_a'].to_numpy()] = True
+        apparie_b[appariees['pos_b'].to_numpy()] = True
+
+        lignes = _paired(a, b, appariees)
+        if motif is None:
+            rapproches.append(lignes)
+        else:
+            suspects.append(lignes.assign(motif=motif))
+
+    rapproches = pd.concat(rapproches, ignore_index=True).sort_values(['paire', 'date_a'], kind='stable')
+    suspects = pd.concat(suspects, ignore_index=True).sort_values(['paire', 'date_a'], kind='stable')
+    non_rapproches_a = a.loc[~apparie_a, _COLONNES].sort_values(['paire', 'date'], kind='stable')
+    non_rapproches_b = b.loc[~apparie_b, _COLONNES].sort_values(['paire', 'date'], kind='stable')
+
+    numeros = np.arange(len(paires))
+    synthese = pd.DataFrame({
+        'compte_a': [compte_a for compte_a, _ in paires],
+        'compte_b': [compte_b for _, compte_b in paires],
+        'solde_a': a.groupby('paire')['montant'].sum().reindex(numeros, fill_value=0).to_numpy(),
+        'solde_b': -b.groupby('paire')['montant'].sum().reindex(numeros, fill_value=0).to_numpy(),
+    })
+    synthese['ecart'] = synthese['solde_a'] + synthese['solde_b']
+    for nom, lignes in (('rapproches', rapproches), ('suspects', suspects),
+                        ('non_rapproches_a', non_rapproches_a), ('non_rapproches_b', non_rapproches_b)):
+        synthese[nom] = lignes.groupby('paire').size().reindex(numeros, fill_value=0).to_numpy()
+
+    logger.info(f"🔗 Rapprochement intragroupe: {len(rapproches)} rapprochée(s), {len(suspects)} suspecte(s), "
+                f"{len(non_rapproches_a)} + {len(non_rapproches_b)} non rapprochée(s)")
+    return {
+        'rapproches': rapproches.reset_index(drop=True),
+        'suspects': suspects.reset_index(drop=True),
+        'non_rapproches_a': non_rapproches_a.reset_index(drop=True),
+        'non_rapproches_b': non_rapproches_b.reset_index(drop=True),
+        'synthese': synthese,
+    }
+
+
+def pairs_between(eliminations: List[Dict], entite_a: str, entite_b: str) -> List[Tuple[str, str]]:
+    """
+    Paires de comptes entre deux entités, orientées (compte de A, compte de B)
+
+    Args:
+        eliminations: Paires intragroupe (consolidation.load_eliminations)
+        entite_a, entite_b: Noms normalisés des deux entités
+
+    Returns:
+        Liste de (compte de A, compte de B)
+    """
+    paires = []
+    for paire in eliminations:
+        if (paire['entite_a'], paire['entite_b']) == (entite_a, entite_b):
+            paires.append((paire['compte_a'], paire['compte_b']))
+        elif (paire['entite_a'], paire['entite_b']) == (entite_b, entite_a):
+            paires.append((paire['compte_b'], paire['compte_a']))
+    return paires
+
+
+def load_entity_ledger(nom: str, fichier: Optional[Path] = None, exercice: Optional[int] = None,
+                       db_path: Optional[Path] = None) -> pd.DataFrame:
+    """
+    Grand livre nettoyé d'une entité: export Sage, artefact de l'étape parse ou entrepôt
+
+    Args:
+        nom: Nom de l'entité (client de l'entrepôt)
+        fichier: Export TXT ou grand livre nettoyé (.npz/.parquet); None: lecture de l'entrepôt
+        exercice: Exercice lu dans l'entrepôt (défaut: le dernier)
+        db_path: Entrepôt SQLite (défaut: warehouse.DEFAULT_WAREHOUSE)
+
+    Returns:
+        DataFrame au format de sage_parser.clean_data
+    """
+    if fichier is not None:
+        from modules import artifacts, sage_parser
+        if Path(fichier).suffix.lower() == '.txt':
+            return sage_parser.clean_data(sage_parser.parse_sage_file(fichier))
+        return artifacts.load_ledger(fichier)
+
+    from modules import warehouse
+    entrepot = warehouse.LedgerWarehouse(db_path or warehouse.DEFAULT_WAREHOUSE)
+    if exercice is None:
+        exercices = entrepot.exercices(nom)
+        if not exercices:
+            raise ValueError(f"Entité absente de l'entrepôt: {nom} (indiquer NOM=fichier.txt)")
+        exercice = exercices[-1]
+    return entrepot.ledger(nom, exercice)
@@ -10,18 +10,26 @@ from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, PP_PARAGRAPH_ALIGNMENT
 from pptx.dml.color import RGBColor
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE, XL_LEGEND_POSITION
 from pptx.oxml.xmlchemy import OxmlElement
-import openpyxl
-from openpyxl.styles import numbers
 import logging
-from typing import Dict, Optional, Tuple
+import re
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import os
 import subprocess
 import tempfile
 import time
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+
+from config import get_annexes_config, get_annexe_lignes_par_slide
+from modules.data_processor import BalanceIndex
+from utils import montants
+from utils.exceptions import ProcessingInterrupted
+from utils.profiler import profile_stage
+from utils.progress import check_cancelled
+from utils.time_budget import checkpoint
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +92,7 @@ def apply_slide_template(slide, title: str, slide_number: int, total_slides: int
         slide_width,
         footer_height
     )
+    footer.name = "Footer"
 
     # Remplissage gris clair
     fill = footer.fill
@@ -316,6 +325,7 @@ def _excel_range_to_image_libreoffice(excel_path: str, sheet_name: str, cell_ran
     Méthode: Crée un fichier Excel avec uniquement la plage, convertit en PDF, puis en PNG
     """
     import shutil
+    import openpyxl
 
     temp_dir = None
     try:
@@ -407,7 +417,7 @@ def _excel_range_to_image_libreoffice(excel_path: str, sheet_name: str, cell_ran
             img = images[0]
 
             # Optionnel: rogner les bords blancs
-            from PIL import ImageChops
+            from PIL import Image, ImageChops
             bg = Image.new(img.mode, img.size, img.getpixel((0,0)))
             diff = ImageChops.difference(img, bg)
             bbox = diff.getbbox()
@@ -439,26 +449,156 @@ def _excel_range_to_image_libreoffice(excel_path: str, sheet_name: str, cell_ran
                 pass
 
 
+# ============================================================================
+# LECTURE DU CLASSEUR EXCEL (une seule ouverture par génération)
+# ============================================================================
+
+# Plages reprises dans les slides (None = jusqu'à la dernière ligne de la feuille)
+EXCEL_RANGES = {
+    "BILAN SYNTH": "A1:F30",
+    "CR SYNTH": "A1:F42",
+    "SIG": "A1:F44",
+    "SUIVI ACTIVITE": "A1:M66",
+    "BG BI SEP": "A4:F",
+}
+
+
+def _parse_range(cell_range: str) -> Tuple[int, int, int, Optional[int]]:
+    """
+    Convertit une plage "A1:F30" (ou "A4:F" sans ligne de fin) en bornes numériques
+
+    Returns:
+        Tuple (min_col, min_row, max_col, max_row), max_row valant None si absent
+    """
+    from openpyxl.utils import column_index_from_string
+
+    match = re.fullmatch(r"([A-Z]+)(\d+):([A-Z]+)(\d*)", cell_range.upper())
+    if not match:
+        raise ValueError(f"Plage Excel invalide: {cell_range}")
+
+    start_col, start_row, end_col, end_row = match.groups()
+    return (
+        column_index_from_string(start_col),
+        int(start_row),
+        column_index_from_string(end_col),
+        int(end_row) if end_row else None,
+    )
+
+
+def extract_excel_ranges(excel_path: str, ranges: Dict[str, str]) -> Dict[str, List[List]]:
+    """
+    Extrait des plages du classeur Excel en listes Python, en une seule ouverture
+
+    Le classeur est ouvert en lecture seule (read_only=True, data_only=True): seules les
+    valeurs sont lues, ligne par ligne, sans charger les styles.
+
+    Args:
+        excel_path: Chemin vers le fichier Excel
+        ranges: Dictionnaire {nom_feuille: plage}. Une plage sans ligne de fin
+            (ex: "A4:F") s'étend jusqu'à la dernière ligne de la feuille.
+
+    Returns:
+        Dictionnaire {nom_feuille: lignes}, chaque ligne étant une liste de valeurs.
+        Les plages à bornes fixes sont complétées par des cellules vides (None)
+        pour conserver leurs dimensions. Les feuilles absentes sont ignorées.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        data = extract_workbook_ranges(wb, ranges)
+    finally:
+        wb.close()
+
+    logger.info(f"Classeur lu une fois: {len(data)} plage(s) extraite(s)")
+    return data
+
+
+def _valeur_cellule(value):
+    """
+    Valeur d'une cellule telle que relue dans le fichier enregistré (data_only=True)
+
+    Les formules écrites par openpyxl n'ont pas de valeur calculée (None), les
+    chaînes vides ne sont pas enregistrées, les scalaires numpy deviennent des
+    types Python et les flottants entiers sont relus comme des entiers.
+    """
+    if isinstance(value, str):
+        return None if value == '' or value.startswith('=') else value
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def extract_workbook_ranges(wb, ranges: Dict[str, str]) -> Dict[str, List[List]]:
+    """
+    Extrait des plages d'un classeur openpyxl déjà ouvert ou encore en mémoire
+
+    Permet de construire le PowerPoint à partir du classeur généré sans
+    attendre son enregistrement (voir extract_excel_ranges pour le format).
+
+    Args:
+        wb: Classeur openpyxl
+        ranges: Dictionnaire {nom_feuille: plage}
+
+    Returns:
+        Dictionnaire {nom_feuille: lignes}
+    """
+    data = {}
+
+    for sheet_name, cell_range in ranges.items():
+        if sheet_name not in wb.sheetnames:
+            logger.warning(f"Feuille absente du classeur: {sheet_name}")
+            continue
+
+        ws = wb[sheet_name]
+        min_col, min_row, max_col, max_row = _parse_range(cell_range)
+        nb_cols = max_col - min_col + 1
+
+        rows = [
+            [_valeur_cellule(value) for value in row] + [None] * (nb_cols - len(row))
+            for row in ws.iter_rows(min_row=min_row, max_row=max_row or ws.max_row,
+                                    min_col=min_col, max_col=max_col, values_only=True)
+        ]
+
+        # Compléter les plages fixes au-delà de la dernière ligne remplie
+        if max_row is not None:
+            rows.extend([[None] * nb_cols for _ in range(max_row - min_row + 1 - len(rows))])
+
+        data[sheet_name] = rows
+
+    return data
+
+
+def _has_excel_source(excel_path: Optional[str], excel_data: Optional[Dict]) -> bool:
+    """Indique si les tableaux peuvent être repris (données extraites ou fichier Excel présent)"""
+    return excel_data is not None or bool(excel_path and os.path.exists(excel_path))
+
+
+def _get_excel_rows(excel_path: str, sheet_name: str, cell_range: str,
+                    excel_data: Optional[Dict[str, List[List]]] = None) -> List[List]:
+    """Retourne les lignes d'une plage depuis les données pré-extraites, ou lit le classeur à défaut"""
+    if excel_data is not None and sheet_name in excel_data:
+        return excel_data[sheet_name]
+    return extract_excel_ranges(excel_path, {sheet_name: cell_range})[sheet_name]
+
+
 def insert_excel_table_compact(slide, excel_path: str, sheet_name: str,
                                cell_range: str, left: float, top: float,
-                               width: float, height: float, font_size: int = 8):
+                               width: float, height: float, font_size: int = 8,
+                               excel_data: Optional[Dict[str, List[List]]] = None):
     """
     Insère un tableau Excel dans PowerPoint
     Méthode simple: copie les données et crée un tableau PowerPoint natif
+
+    Les valeurs sont prises dans excel_data (voir extract_excel_ranges) si fourni.
     """
     try:
-        wb = openpyxl.load_workbook(excel_path, data_only=True)
-        ws = wb[sheet_name]
+        data_rows = _get_excel_rows(excel_path, sheet_name, cell_range, excel_data)
 
-        # Parser la plage
-        start_cell, end_cell = cell_range.split(':')
-        min_row = ws[start_cell].row
-        min_col = ws[start_cell].column
-        max_row = ws[end_cell].row
-        max_col = ws[end_cell].column
-
-        rows = max_row - min_row + 1
-        cols = max_col - min_col + 1
+        rows = len(data_rows)
+        cols = len(data_rows[0])
 
         # Créer un tableau PowerPoint simple
         table_shape = slide.shapes.add_table(rows, cols, Inches(left), Inches(top),
@@ -466,13 +606,11 @@ def insert_excel_table_compact(slide, excel_path: str, sheet_name: str,
         table = table_shape.table
 
         # Remplir le tableau
-        for i, row_idx in enumerate(range(min_row, max_row + 1)):
-            for j, col_idx in enumerate(range(min_col, max_col + 1)):
-                cell = ws.cell(row=row_idx, column=col_idx)
+        for i, row_values in enumerate(data_rows):
+            for j, value in enumerate(row_values):
                 ppt_cell = table.cell(i, j)
 
                 # Valeur
-                value = cell.value
                 if value is None or value == '':
                     ppt_cell.text = ""
                 elif isinstance(value, (int, float)):
@@ -522,7 +660,6 @@ def insert_excel_table_compact(slide, excel_path: str, sheet_name: str,
                         para.font.bold = True
 
         logger.info(f"✅ Tableau: {sheet_name} ({rows}×{cols})")
-        wb.close()
 
     except Exception as e:
         logger.error(f"❌ Erreur tableau {sheet_name}: {e}")
@@ -535,8 +672,29 @@ def insert_excel_table_compact(slide, excel_path: str, sheet_name: str,
 
 
 def generate_powerpoint(excel_path: str, output_path: str, commentaires: Optional[Dict] = None,
-                       template_path: Optional[str] = None):
-    """Génère le rapport PowerPoint complet basé sur le modèle"""
+                       template_path: Optional[str] = None, bilan: Optional[Dict] = None,
+                       compte_resultat: Optional[Dict] = None, sig: Optional[Dict] = None,
+                       suivi_data: Optional[Dict] = None, balance=None,
+                       excel_data: Optional[Dict[str, List[List]]] = None):
+    """
+    Génère le rapport PowerPoint complet basé sur le modèle
+
+    Args:
+        excel_path: Chemin du fichier Excel généré (tableaux repris dans les slides)
+        output_path: Chemin de sortie du PowerPoint
+        commentaires: Commentaires et informations du rapport (optionnel)
+        template_path: Modèle PowerPoint (optionnel, non utilisé)
+        bilan: Bilan synthétique calculé (optionnel, active le graphique du bilan)
+        compte_resultat: Compte de résultat calculé (optionnel, active le graphique du CR)
+        sig: Dictionnaire des SIG (optionnel, active la cascade des SIG)
+        suivi_data: Données du suivi d'activité par catégorie (optionnel, active la tendance mensuelle)
+        balance: Balance calculée (optionnel, source des annexes à la place de la feuille Excel)
+        excel_data: Plages déjà extraites du classeur (optionnel, voir extract_workbook_ranges);
+            le fichier Excel n'est alors pas relu et peut être encore en cours d'enregistrement
+
+    Les montants des états et de la balance sont en unités mineures (utils.montants)
+    et convertis en FCFA à l'entrée; les plages Excel sont déjà en FCFA.
+    """
 
     logger.info("=" * 80)
     logger.info("GÉNÉRATION DU RAPPORT POWERPOINT")
@@ -548,6 +706,12 @@ def generate_powerpoint(excel_path: str, output_path: str, commentaires: Optiona
         cabinet = commentaires.get('cabinet', '2BN CONSULTING') if commentaires else '2BN CONSULTING'
         client = commentaires.get('client', 'BAMBOO IMMO') if commentaires else 'BAMBOO IMMO'
 
+        bilan = montants.etat_en_fcfa(bilan)
+        compte_resultat = montants.etat_en_fcfa(compte_resultat)
+        sig = montants.sig_en_fcfa(sig)
+        suivi_data = montants.suivi_en_fcfa(suivi_data)
+        balance = montants.colonnes_en_fcfa(balance, montants.COLONNES_BALANCE)
+
         # Créer présentation
         prs = Presentation()
         prs.slide_width = Inches(10)
@@ -556,52 +720,79 @@ def generate_powerpoint(excel_path: str, output_path: str, commentaires: Optiona
         # NOMBRE TOTAL DE SLIDES (pour pagination) - sera ajusté à la fin
         total_slides = 16  # Estimation initiale
 
-        # 1. Page de titre (pas de template)
-        add_slide_1_titre(prs, client, periode, cabinet)
+        # Lire une seule fois les plages Excel partagées par toutes les slides
+        if excel_data is None and excel_path and os.path.exists(excel_path):
+            with profile_stage("lecture_excel"):
+                excel_data = extract_excel_ranges(excel_path, EXCEL_RANGES)
 
-        # 2. Sommaire
-        add_slide_2_sommaire(prs, periode, client)
+        with profile_stage("introduction"):
+            # 1. Page de titre (pas de template)
+            add_slide_1_titre(prs, client, periode, cabinet)
 
-        # 3. Objectif
-        add_slide_3_objectif(prs, periode, client)
+            # 2. Sommaire
+            add_slide_2_sommaire(prs, periode, client)
 
-        # 4. Événements significatifs
-        evenements = commentaires.get('bilan', {}).get('commentaire', '') if commentaires else ''
-        add_slide_4_evenements(prs, evenements, periode, client)
+            # 3. Objectif
+            add_slide_3_objectif(prs, periode, client)
+
+            # 4. Événements significatifs
+            evenements = commentaires.get('bilan', {}).get('commentaire', '') if commentaires else ''
+            add_slide_4_evenements(prs, evenements, periode, client)
 
         # 5-6. Situation financière (Bilan)
         bilan_comment = commentaires.get('bilan', {}).get('commentaire', '') if commentaires else ''
-        add_slide_5_6_bilan(prs, bilan_comment, excel_path, periode, client)
+        with profile_stage("bilan"):
+            add_slide_5_6_bilan(prs, bilan_comment, excel_path, periode, client, bilan=bilan,
+                                excel_data=excel_data)
 
         # 7-8. Activité (Compte de Résultat)
         cr_comment = commentaires.get('compte_resultat', {}).get('commentaire', '') if commentaires else ''
-        add_slide_7_8_activite(prs, cr_comment, excel_path, periode, client)
+        with profile_stage("compte_resultat"):
+            add_slide_7_8_activite(prs, cr_comment, excel_path, periode, client,
+                                   compte_resultat=compte_resultat, excel_data=excel_data)
 
         # 9-10. SIG
         sig_comment = commentaires.get('sig', {}).get('commentaire', '') if commentaires else ''
-        add_slide_9_10_sig(prs, sig_comment, excel_path, periode, client)
+        with profile_stage("sig"):
+            add_slide_9_10_sig(prs, sig_comment, excel_path, periode, client, sig=sig,
+                               excel_data=excel_data)
 
         # 11. Situation mensuelle (Suivi Activité)
         suivi_comment = commentaires.get('suivi_activite', {}).get('commentaire', '') if commentaires else ''
-        add_slide_11_mensuel(prs, suivi_comment, excel_path, periode, client)
+        with profile_stage("suivi_mensuel"):
+            add_slide_11_mensuel(prs, suivi_comment, excel_path, periode, client, suivi_data=suivi_data,
+                                 excel_data=excel_data)
 
         # 12. Décisions / Synthèse
         synthese_comment = commentaires.get('synthese', {}).get('commentaire', '') if commentaires else ''
-        add_slide_12_decisions(prs, synthese_comment, periode, client)
+        with profile_stage("synthese"):
+            add_slide_12_decisions(prs, synthese_comment, periode, client)
 
         # 13-16. Annexes avec données de la Balance
-        add_slides_annexes(prs, excel_path, periode, client)
+        with profile_stage("annexes"):
+            balance_index = None
+            if balance is not None:
+                balance_index = BalanceIndex.from_balance(balance)
+            elif excel_data is not None:
+                balance_index = BalanceIndex.from_rows(excel_data.get("BG BI SEP", []))
+            add_slides_annexes(prs, periode, client, balance_index=balance_index)
 
         # Mettre à jour le nombre total de slides
         total_slides = len(prs.slides)
+        update_pagination(prs)
         logger.info(f"📊 Nombre total de slides: {total_slides}")
 
         # Sauvegarder
-        prs.save(output_path)
+        with profile_stage("save"):
+            prs.save(output_path)
 
         logger.info(f"✅ PowerPoint généré: {output_path}")
         logger.info("✨ Design amélioré: Templates uniformes, tableaux stylisés, commentaires enrichis")
 
+    except ProcessingInterrupted as e:
+        logger.warning(f"⏱️ Génération PowerPoint annulée: {e}")
+        raise
+
     except Exception as e:
         logger.error(f"❌ Erreur: {e}", exc_info=True)
         raise
@@ -609,7 +800,8 @@ def generate_powerpoint(excel_path: str, output_path: str, commentaires: Optiona
 
 def insert_excel_table(slide, excel_path: str, sheet_name: str,
                        cell_range: str, left: float, top: float,
-                       width: float, height: float, font_size: int = 9):
+                       width: float, height: float, font_size: int = 9,
+                       excel_data: Optional[Dict[str, List[List]]] = None):
     """
     Insère un tableau Excel dans une slide PowerPoint
 
@@ -620,21 +812,14 @@ def insert_excel_table(slide, excel_path: str, sheet_name: str,
         cell_range: Plage de cellules (ex: "A1:F30")
         left, top, width, height: Position et dimensions en inches
         font_size: Taille de police (default: 9pt)
+        excel_data: Plages pré-extraites par extract_excel_ranges (optionnel)
     """
     try:
-        # Charger le fichier Excel
-        wb = openpyxl.load_workbook(excel_path, data_only=True)
-        ws = wb[sheet_name]
-
-        # Parser la plage de cellules
-        start_cell, end_cell = cell_range.split(':')
-        min_row = ws[start_cell].row
-        min_col = ws[start_cell].column
-        max_row = ws[end_cell].row
-        max_col = ws[end_cell].column
+        # Récupérer les valeurs (pré-extraites ou lecture du classeur)
+        data_rows = _get_excel_rows(excel_path, sheet_name, cell_range, excel_data)
 
-        rows = max_row - min_row + 1
-        cols = max_col - min_col + 1
+        rows = len(data_rows)
+        cols = len(data_rows[0])
 
         # Créer un tableau PowerPoint
         table_shape = slide.shapes.add_table(rows, cols, Inches(left), Inches(top),
@@ -642,13 +827,11 @@ def insert_excel_table(slide, excel_path: str, sheet_name: str,
         table = table_shape.table
 
         # Remplir le tableau avec les données Excel
-        for i, row_idx in enumerate(range(min_row, max_row + 1)):
-            for j, col_idx in enumerate(range(min_col, max_col + 1)):
-                cell = ws.cell(row=row_idx, column=col_idx)
+        for i, row_values in enumerate(data_rows):
+            for j, value in enumerate(row_values):
                 ppt_cell = table.cell(i, j)
 
                 # Récupérer la valeur
-                value = cell.value
                 if value is None:
                     ppt_cell.text = ""
                 elif isinstance(value, (int, float)):
@@ -769,8 +952,9 @@ def add_slide_4_evenements(prs, evenements, periode: str = "", client: str = "")
     add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "⚠️")  # Icône attention pour événements
 
 
-def add_slide_5_6_bilan(prs, commentaire, excel_path=None, periode: str = "", client: str = ""):
-    """Diapos 5-6: Situation financière (Bilan)"""
+def add_slide_5_6_bilan(prs, commentaire, excel_path=None, periode: str = "", client: str = "",
+                        bilan: Optional[Dict] = None, excel_data: Optional[Dict] = None):
+    """Diapos 5-6: Situation financière (Bilan), précédées du graphique si le bilan est fourni"""
     # Diapo 5: Tableau BILAN SYNTH - position selon rapport original
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
@@ -779,12 +963,19 @@ def add_slide_5_6_bilan(prs, commentaire, excel_path=None, periode: str = "", cl
     apply_slide_template(slide, titre, 5, 16, periode, client)
 
     # Insérer tableau compact (ajuster position pour header)
-    if excel_path and os.path.exists(excel_path):
+    if _has_excel_source(excel_path, excel_data):
         insert_excel_table_compact(slide, excel_path, "BILAN SYNTH", "A1:F30",
-                                  left=0.1, top=1.2, width=9.8, height=5.8, font_size=9)
+                                  left=0.1, top=1.2, width=9.8, height=5.8, font_size=9,
+                                  excel_data=excel_data)
     else:
         add_text(slide, "BILAN SYNTHÉTIQUE", 0.5, 3.5, 9, 1, 28, True, RGBColor(80,80,80))
 
+    # Graphique natif Actif / Passif
+    if bilan:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        apply_slide_template(slide, titre, len(prs.slides), 16, periode, client)
+        add_bilan_chart(slide, bilan, left=0.3, top=1.1, width=9.4, height=5.8)
+
     # Diapo 6: Commentaires
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     apply_slide_template(slide, titre, 6, 16, periode, client)
@@ -793,20 +984,28 @@ def add_slide_5_6_bilan(prs, commentaire, excel_path=None, periode: str = "", cl
     add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "📊")
 
 
-def add_slide_7_8_activite(prs, commentaire, excel_path=None, periode: str = "", client: str = ""):
-    """Diapos 7-8: Activité (CR)"""
+def add_slide_7_8_activite(prs, commentaire, excel_path=None, periode: str = "", client: str = "",
+                           compte_resultat: Optional[Dict] = None, excel_data: Optional[Dict] = None):
+    """Diapos 7-8: Activité (CR), précédées du graphique si le CR est fourni"""
     # Diapo 7: Tableau COMPTE DE RÉSULTAT
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     titre = f"4- Activité {client} - {periode}" if client and periode else "4- Activité de la période"
     apply_slide_template(slide, titre, 7, 16, periode, client)
 
-    if excel_path and os.path.exists(excel_path):
+    if _has_excel_source(excel_path, excel_data):
         insert_excel_table_compact(slide, excel_path, "CR SYNTH", "A1:F42",
-                                  left=0.13, top=1.2, width=9.75, height=5.7, font_size=8)
+                                  left=0.13, top=1.2, width=9.75, height=5.7, font_size=8,
+                                  excel_data=excel_data)
     else:
         add_text(slide, "COMPTE DE RÉSULTAT", 0.5, 3.5, 9, 1, 28, True, RGBColor(80,80,80))
 
+    # Graphique natif Charges / Produits
+    if compte_resultat:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        apply_slide_template(slide, titre, len(prs.slides), 16, periode, client)
+        add_cr_chart(slide, compte_resultat, left=0.3, top=1.1, width=9.4, height=5.8)
+
     # Diapo 8: Commentaires
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     apply_slide_template(slide, titre, 8, 16, periode, client)
@@ -815,20 +1014,28 @@ def add_slide_7_8_activite(prs, commentaire, excel_path=None, periode: str = "",
     add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "📊")
 
 
-def add_slide_9_10_sig(prs, commentaire, excel_path=None, periode: str = "", client: str = ""):
-    """Diapos 9-10: SIG"""
+def add_slide_9_10_sig(prs, commentaire, excel_path=None, periode: str = "", client: str = "",
+                       sig: Optional[Dict] = None, excel_data: Optional[Dict] = None):
+    """Diapos 9-10: SIG, précédées de la cascade des SIG si le dictionnaire est fourni"""
     # Diapo 9: Tableau SIG
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     titre = "5- Soldes intermédiaires de gestion"
     apply_slide_template(slide, titre, 9, 16, periode, client)
 
-    if excel_path and os.path.exists(excel_path):
+    if _has_excel_source(excel_path, excel_data):
         insert_excel_table_compact(slide, excel_path, "SIG", "A1:F44",
-                                  left=0.16, top=1.1, width=9.7, height=5.9, font_size=7)
+                                  left=0.16, top=1.1, width=9.7, height=5.9, font_size=7,
+                                  excel_data=excel_data)
     else:
         add_text(slide, "INDICATEURS CLÉS", 0.5, 3.5, 9, 1, 28, True, RGBColor(80,80,80))
 
+    # Cascade des SIG (graphique natif)
+    if sig:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        apply_slide_template(slide, titre, len(prs.slides), 16, periode, client)
+        add_sig_waterfall_chart(slide, sig, left=0.3, top=1.1, width=9.4, height=5.8)
+
     # Diapo 10: Commentaires
     slide = prs.slides.add_slide(prs.slide_layouts[6])
     apply_slide_template(slide, titre, 10, 16, periode, client)
@@ -837,25 +1044,32 @@ def add_slide_9_10_sig(prs, commentaire, excel_path=None, periode: str = "", cli
     add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "📊")
 
 
-def add_slide_11_mensuel(prs, commentaire, excel_path=None, periode: str = "", client: str = ""):
-    """Diapo 11: Situation mensuelle"""
+def add_slide_11_mensuel(prs, commentaire, excel_path=None, periode: str = "", client: str = "",
+                         suivi_data: Optional[Dict] = None, excel_data: Optional[Dict] = None):
+    """Diapo 11: Situation mensuelle, suivie de la tendance mensuelle si les données sont fournies"""
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     # Extraire l'année de la période
-    import re
     annee = re.search(r'\d{4}', periode) if periode else None
     annee_str = annee.group() if annee else "2025"
 
     titre = f"6- Situation mensuelle {client} {annee_str}" if client else f"6- Situation mensuelle {annee_str}"
     apply_slide_template(slide, titre, 11, 16, periode, client)
 
-    if excel_path and os.path.exists(excel_path):
+    if _has_excel_source(excel_path, excel_data):
         insert_excel_table_compact(slide, excel_path, "SUIVI ACTIVITE", "A1:M66",
-                                  left=0.05, top=1.1, width=9.9, height=5.9, font_size=6)
+                                  left=0.05, top=1.1, width=9.9, height=5.9, font_size=6,
+                                  excel_data=excel_data)
     else:
         text = commentaire if commentaire else "Suivi mensuel de l'activité à compléter."
         add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "📊")
 
+    # Tendance mensuelle charges / produits (graphique natif)
+    if suivi_data:
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        apply_slide_template(slide, titre, len(prs.slides), 16, periode, client)
+        add_monthly_trend_chart(slide, suivi_data, left=0.3, top=1.1, width=9.4, height=5.8)
+
 
 def add_slide_12_decisions(prs, synthese, periode: str = "", client: str = ""):
     """Diapo 12: Décisions"""
@@ -868,90 +1082,449 @@ def add_slide_12_decisions(prs, synthese, periode: str = "", client: str = ""):
     add_styled_comment_box(slide, text, 1, 1.5, 8, 5, "💡")  # Icône ampoule pour recommandations
 
 
-def add_slides_annexes(prs, excel_path=None, periode: str = "", client: str = ""):
-    """Diapos 13-16: Annexes simplifiées avec petits tableaux"""
+def add_slides_annexes(prs, periode: str = "", client: str = "",
+                       balance_index: Optional[BalanceIndex] = None):
+    """
+    Diapos 13+: Annexes issues de la balance
 
-    # Annexe 1-4: Tableaux compacts selon rapport original
-    annexes = [
-        ("Annexe 1 : Décaissements à justifier", ["47"], 0.21, 1.5, 9.63, 4.5, 13),
-        ("Annexe 2 : Dettes Fournisseurs", ["401"], 0.18, 1.5, 9.64, 5.0, 14),
-        ("Annexe 3 : Autres dettes, Préfinancement", ["42", "43", "44"], 0.76, 1.5, 8.55, 5.0, 15),
-        ("Annexe 4 : Créditeurs divers", ["471", "472", "473"], 0.19, 1.5, 9.63, 4.5, 16)
-    ]
+    La liste des annexes vient de la configuration (config.get_annexes_config).
+    Une annexe trop longue est répartie sur plusieurs slides de même gabarit,
+    chacune limitée à get_annexe_lignes_par_slide() comptes. Le budget de temps
+    et l'annulation sont contrôlés avant chaque slide.
 
-    for titre, prefixes, left, top, width, height, slide_num in annexes:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
-        apply_slide_template(slide, titre, slide_num, 16, periode, client)
+    Args:
+        prs: Présentation en cours
+        periode: Période du rapport
+        client: Nom du client
+        balance_index: Index de la balance par préfixe de compte (optionnel)
 
-        if excel_path and os.path.exists(excel_path):
-            add_annexe_table_compact(slide, excel_path, prefixes, left, top, width, height)
-        else:
+    Raises:
+        ProcessingTimeoutError: Si le budget de temps est dépassé
+        ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+    """
+    lignes_par_slide = max(1, get_annexe_lignes_par_slide())
+
+    for annexe in get_annexes_config():
+        checkpoint("annexes")
+        check_cancelled()
+        if balance_index is None:
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            apply_slide_template(slide, annexe.titre, len(prs.slides), len(prs.slides), periode, client)
             add_text(slide, "(Détails à compléter)", 0.5, 3.5, 9, 1, 18, False, RGBColor(120,120,120))
+            continue
 
+        comptes = balance_index.lookup(annexe.prefixes)
+        pages = split_annexe_rows(comptes, lignes_par_slide)
+
+        for numero, rows in enumerate(pages, start=1):
+            if numero > 1:
+                checkpoint("annexes")
+                check_cancelled()
+            titre = annexe.titre
+            if len(pages) > 1:
+                titre = f"{annexe.titre} ({numero}/{len(pages)})"
+
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            apply_slide_template(slide, titre, len(prs.slides), len(prs.slides), periode, client)
+            add_annexe_table_compact(slide, rows, 0.19, 1.5, 9.63, lignes_par_slide)
+
+        logger.info(f"✅ {annexe.titre}: {len(comptes)} comptes sur {len(pages)} slide(s)")
 
-def add_annexe_table_compact(slide, excel_path: str, prefixes: list,
-                             left: float, top: float, width: float, height: float):
-    """Ajoute un tableau d'annexe compact filtré par préfixes de comptes"""
-    try:
-        wb = openpyxl.load_workbook(excel_path, data_only=True)
-        ws = wb["BG BI SEP"]
-
-        # Filtrer les comptes
-        filtered_rows = []
-        for row_idx in range(4, ws.max_row + 1):
-            compte = ws.cell(row_idx, 1).value
-            if compte and any(str(compte).startswith(prefix) for prefix in prefixes):
-                row_data = [ws.cell(row_idx, col_idx).value for col_idx in range(1, 7)]
-                filtered_rows.append(row_data)
-
-        if not filtered_rows:
-            add_text(slide, "Aucun compte trouvé", left, top, width, height, 14, False, RGBColor(120,120,120))
-            return
-
-        # Créer petit tableau compact
-        rows = len(filtered_rows) + 1
-        table_shape = slide.shapes.add_table(rows, 6, Inches(left), Inches(top),
-                                             Inches(width), Inches(height))
-        table = table_shape.table
 
-        # En-tête
-        headers = ['N° Cpte', 'Libellé', 'Débit', 'Crédit', 'S. Déb', 'S. Créd']
-        for j, header in enumerate(headers):
-            cell = table.cell(0, j)
-            cell.text = header
-            cell.fill.solid()
-            cell.fill.fore_color.rgb = RGBColor(54, 96, 146)
+def split_annexe_rows(rows: List[List], lignes_par_slide: int) -> List[List[List]]:
+    """
+    Découpe les comptes d'une annexe en pages de taille fixe
+
+    Returns:
+        Liste de pages (au moins une, éventuellement vide)
+    """
+    if not rows:
+        return [[]]
+    return [rows[i:i + lignes_par_slide] for i in range(0, len(rows), lignes_par_slide)]
+
+
+def add_annexe_table_compact(slide, rows: List[List], left: float, top: float, width: float,
+                             lignes_par_slide: int):
+    """
+    Ajoute un tableau d'annexe compact
+
+    Args:
+        slide: Slide cible
+        rows: Lignes [compte, libelle, débit, crédit, solde débiteur, solde créditeur]
+        left, top, width: Position du tableau (pouces)
+        lignes_par_slide: Nombre maximum de lignes, fixe la hauteur disponible
+    """
+    if not rows:
+        add_text(slide, "Aucun compte trouvé", left, top, width, 1, 14, False, RGBColor(120,120,120))
+        return
+
+    # Hauteur de ligne fixe: toutes les pages d'une annexe ont le même gabarit
+    hauteur_ligne = min(0.3, 5.2 / (lignes_par_slide + 1))
+    table_shape = slide.shapes.add_table(len(rows) + 1, 6, Inches(left), Inches(top),
+                                         Inches(width), Inches(hauteur_ligne * (len(rows) + 1)))
+    table = table_shape.table
+
+    # En-tête
+    headers = ['N° Cpte', 'Libellé', 'Débit', 'Crédit', 'S. Déb', 'S. Créd']
+    for j, header in enumerate(headers):
+        cell = table.cell(0, j)
+        cell.text = header
+        cell.fill.solid()
+        cell.fill.fore_color.rgb = RGBColor(54, 96, 146)
+        tf = cell.text_frame
+        tf.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
+        tf.paragraphs[0].font.bold = True
+        tf.paragraphs[0].font.size = Pt(9)
+        tf.margin_top = Pt(1)
+        tf.margin_bottom = Pt(1)
+
+    # Données
+    for i, row_data in enumerate(rows, 1):
+        for j, value in enumerate(row_data):
+            cell = table.cell(i, j)
             tf = cell.text_frame
-            tf.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
-            tf.paragraphs[0].font.bold = True
-            tf.paragraphs[0].font.size = Pt(9)
             tf.margin_top = Pt(1)
             tf.margin_bottom = Pt(1)
 
-        # Données
-        for i, row_data in enumerate(filtered_rows, 1):
-            for j, value in enumerate(row_data):
-                cell = table.cell(i, j)
-                tf = cell.text_frame
-                tf.margin_top = Pt(1)
-                tf.margin_bottom = Pt(1)
+            if value is None or value == '':
+                cell.text = ""
+            elif isinstance(value, (int, float)):
+                cell.text = f"{value:,.0f}"
+                tf.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.RIGHT
+            else:
+                cell.text = str(value)[:30]
 
-                if value is None or value == '':
-                    cell.text = ""
-                elif isinstance(value, (int, float)):
-                    cell.text = f"{value:,.0f}"
-                    tf.paragraphs[0].alignment = PP_PARAGRAPH_ALIGNMENT.RIGHT
-                else:
-                    cell.text = str(value)[:30]
+            tf.paragraphs[0].font.size = Pt(8)
+            tf.paragraphs[0].font.name = 'Calibri'
 
-                tf.paragraphs[0].font.size = Pt(8)
-                tf.paragraphs[0].font.name = 'Calibri'
 
-        logger.info(f"✅ Annexe: {len(filtered_rows)} comptes")
+# ============================================================================
+# GRAPHIQUES NATIFS (python-pptx)
+# ============================================================================
 
-    except Exception as e:
-        logger.error(f"❌ Erreur annexe: {e}")
-        add_text(slide, "[Erreur chargement]", left, top, width, height, 14, False, RGBColor(200, 50, 50))
+MOIS_NOMS = [
+    'Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+    'Juillet', 'Août', 'Septembre', 'Octobre', 'Novembre', 'Décembre'
+]
+
+COULEUR_TOTAL = RGBColor(54, 96, 146)
+COULEUR_HAUSSE = RGBColor(112, 173, 71)
+COULEUR_BAISSE = RGBColor(192, 0, 0)
+
+
+def _style_chart(chart, font_size: int = 10, legend: bool = True):
+    """Applique le style commun (police, légende, format des montants) à un graphique"""
+    chart.font.size = Pt(font_size)
+    chart.font.name = 'Calibri'
+
+    chart.has_legend = legend
+    if legend:
+        chart.legend.position = XL_LEGEND_POSITION.BOTTOM
+        chart.legend.include_in_layout = False
+
+    value_axis = chart.value_axis
+    value_axis.tick_labels.number_format = '#,##0'
+    value_axis.tick_labels.number_format_is_linked = False
+    value_axis.has_major_gridlines = True
+    value_axis.major_gridlines.format.line.color.rgb = RGBColor(220, 220, 220)
+
+
+def _postes_non_nuls(postes: List[Dict]) -> List[Tuple[str, float]]:
+    """Retourne les couples (poste, montant) dont le montant est non nul"""
+    return [(p['poste'], float(p['montant'])) for p in postes if p.get('montant')]
+
+
+def _add_bar_chart(slide, titre: str, postes: List[Tuple[str, float]], couleur: RGBColor,
+                   left: float, top: float, width: float, height: float):
+    """Ajoute un graphique en barres horizontales (un poste par barre)"""
+    if not postes:
+        add_text(slide, f"{titre}: aucun montant", left, top + height / 2 - 0.3,
+                 width, 0.6, 12, False, RGBColor(120, 120, 120))
+        return None
+
+    chart_data = CategoryChartData()
+    # Les barres horizontales s'affichent de bas en haut: inverser pour garder l'ordre du tableau
+    chart_data.categories = [poste for poste, _ in reversed(postes)]
+    chart_data.add_series(titre, [montant for _, montant in reversed(postes)])
+
+    graphic_frame = slide.shapes.add_chart(
+        XL_CHART_TYPE.BAR_CLUSTERED,
+        Inches(left), Inches(top), Inches(width), Inches(height),
+        chart_data
+    )
+    chart = graphic_frame.chart
+    _style_chart(chart, font_size=8, legend=False)
+
+    chart.has_title = True
+    chart.chart_title.text_frame.text = titre
+    chart.chart_title.text_frame.paragraphs[0].font.size = Pt(12)
+    chart.chart_title.text_frame.paragraphs[0].font.bold = True
+
+    plot = chart.plots[0]
+    plot.gap_width = 60
+    series = plot.series[0]
+    series.format.fill.solid()
+    series.format.fill.fore_color.rgb = couleur
+    series.invert_if_negative = False
+
+    return chart
+
+
+def add_bilan_chart(slide, bilan: Dict, left: float, top: float, width: float, height: float):
+    """
+    Ajoute les graphiques natifs de l'Actif et du Passif (postes non nuls)
+
+    Args:
+        slide: La slide PowerPoint
+        bilan: Bilan synthétique (listes 'actif' et 'passif' de dicts poste/montant)
+        left, top, width, height: Position et dimensions en inches
+    """
+    demi_largeur = (width - 0.2) / 2
+    _add_bar_chart(slide, f"Actif ({bilan.get('total_actif', 0):,.0f})",
+                   _postes_non_nuls(bilan.get('actif', [])), COULEUR_TOTAL,
+                   left, top, demi_largeur, height)
+    _add_bar_chart(slide, f"Passif ({bilan.get('total_passif', 0):,.0f})",
+                   _postes_non_nuls(bilan.get('passif', [])), RGBColor(237, 125, 49),
+                   left + demi_largeur + 0.2, top, demi_largeur, height)
+
+    logger.info("✅ Graphique natif: Bilan")
+
+
+def add_cr_chart(slide, compte_resultat: Dict, left: float, top: float, width: float, height: float):
+    """
+    Ajoute les graphiques natifs des Charges et des Produits (postes non nuls)
+
+    Args:
+        slide: La slide PowerPoint
+        compte_resultat: CR synthétique (listes 'charges' et 'produits' de dicts poste/montant)
+        left, top, width, height: Position et dimensions en inches
+    """
+    demi_largeur = (width - 0.2) / 2
+    _add_bar_chart(slide, f"Charges ({compte_resultat.get('total_charges', 0):,.0f})",
+                   _postes_non_nuls(compte_resultat.get('charges', [])), COULEUR_BAISSE,
+                   left, top, demi_largeur, height)
+    _add_bar_chart(slide, f"Produits ({compte_resultat.get('total_produits', 0):,.0f})",
+                   _postes_non_nuls(compte_resultat.get('produits', [])), COULEUR_HAUSSE,
+                   left + demi_largeur + 0.2, top, demi_largeur, height)
+
+    logger.info("✅ Graphique natif: Compte de résultat")
+
+
+def get_sig_waterfall_steps(sig: Dict) -> List[Tuple[str, float, bool]]:
+    """
+    Construit les étapes de la cascade des SIG, du chiffre d'affaires au résultat net
+
+    Args:
+        sig: Dictionnaire des SIG (voir data_processor.calculate_sig)
+
+    Returns:
+        Liste de tuples (libellé, montant, est_un_total). Les totaux sont des niveaux,
+        les autres étapes des variations par rapport au niveau précédent.
+    """
+    ca = sig.get('chiffre_affaires', 0)
+    va = sig.get('valeur_ajoutee', 0)
+    achats_externes = sig.get('achats_marchandises', 0) + sig.get('charges_externes', 0)
+    # Les autres produits ne sont pas exposés par calculate_sig: on les déduit de la VA
+    autres_produits = va - ca + achats_externes
+    ebe = sig.get('ebe', 0)
+    resultat_exploitation = sig.get('resultat_exploitation', 0)
+    resultat_net = sig.get('resultat_net', 0)
+
+    return [
+        ("Chiffre d'affaires", ca, True),
+        ("Autres produits", autres_produits, False),
+        ("Achats & charges externes", -achats_externes, False),
+        ("Valeur ajoutée", va, True),
+        ("Impôts et taxes", -sig.get('impots_taxes', 0), False),
+        ("Charges de personnel", -sig.get('charges_personnel', 0), False),
+        ("EBE", ebe, True),
+        ("Dotations", -sig.get('dotations_amortissements', 0), False),
+        ("Résultat d'exploitation", resultat_exploitation, True),
+        ("Autres éléments", resultat_net - resultat_exploitation, False),
+        ("Résultat net", resultat_net, True),
+    ]
+
+
+def compute_waterfall_series(steps: List[Tuple[str, float, bool]]) -> Tuple[List[float], List[float], List[float]]:
+    """
+    Décompose une cascade en trois séries empilables (base invisible, partie positive, partie négative)
+
+    Chaque barre couvre l'intervalle [bas, haut] entre le niveau précédent et le nouveau niveau.
+    Les colonnes empilées cumulant séparément positifs et négatifs, une barre qui traverse
+    l'axe est découpée en une partie positive et une partie négative sans base.
+
+    Args:
+        steps: Étapes (libellé, montant, est_un_total)
+
+    Returns:
+        Tuple (base, positif, negatif) de listes de même longueur que steps
+    """
+    base, positif, negatif = [], [], []
+    niveau = 0.0
+
+    for _, montant, est_total in steps:
+        if est_total:
+            debut, fin = 0.0, float(montant)
+            niveau = float(montant)
+        else:
+            debut, fin = niveau, niveau + float(montant)
+            niveau = fin
+
+        bas, haut = min(debut, fin), max(debut, fin)
+
+        if bas >= 0:
+            base.append(bas)
+            positif.append(haut - bas)
+            negatif.append(0.0)
+        elif haut <= 0:
+            base.append(haut)
+            positif.append(0.0)
+            negatif.append(bas - haut)
+        else:
+            base.append(0.0)
+            positif.append(haut)
+            negatif.append(bas)
+
+    return base, positif, negatif
+
+
+def add_sig_waterfall_chart(slide, sig: Dict, left: float, top: float, width: float, height: float):
+    """
+    Ajoute la cascade des SIG (colonnes empilées natives, base invisible)
+
+    Args:
+        slide: La slide PowerPoint
+        sig: Dictionnaire des SIG
+        left, top, width, height: Position et dimensions en inches
+    """
+    steps = get_sig_waterfall_steps(sig)
+    base, positif, negatif = compute_waterfall_series(steps)
+
+    chart_data = CategoryChartData()
+    chart_data.categories = [libelle for libelle, _, _ in steps]
+    chart_data.add_series("Base", base)
+    chart_data.add_series("Montant", positif)
+    chart_data.add_series("Montant (négatif)", negatif)
+
+    graphic_frame = slide.shapes.add_chart(
+        XL_CHART_TYPE.COLUMN_STACKED,
+        Inches(left), Inches(top), Inches(width), Inches(height),
+        chart_data
+    )
+    chart = graphic_frame.chart
+    _style_chart(chart, font_size=9, legend=False)
+
+    plot = chart.plots[0]
+    plot.gap_width = 40
+    plot.overlap = 100
+
+    # Série de base transparente
+    plot.series[0].format.fill.background()
+    plot.series[0].format.line.fill.background()
+
+    # Couleur par étape: bleu pour les totaux, vert/rouge pour les variations
+    for serie in list(plot.series)[1:]:
+        serie.invert_if_negative = False
+        for idx, (_, montant, est_total) in enumerate(steps):
+            couleur = COULEUR_TOTAL if est_total else (COULEUR_HAUSSE if montant >= 0 else COULEUR_BAISSE)
+            point = serie.points[idx]
+            point.format.fill.solid()
+            point.format.fill.fore_color.rgb = couleur
+
+    logger.info("✅ Graphique natif: Cascade des SIG")
+    return chart
+
+
+def get_monthly_totals(suivi_data: Dict) -> Tuple[List[str], List[float], List[float]]:
+    """
+    Calcule les totaux mensuels des charges et des produits depuis le suivi d'activité
+
+    Args:
+        suivi_data: Résultat de data_processor.prepare_suivi_activite_detaille
+            (listes 'personnel', 'charges', 'produits' de dicts avec 'mois_data')
+
+    Returns:
+        Tuple (mois, charges, produits) limité aux mois ayant des mouvements.
+        Les charges sont exprimées en valeur positive.
+    """
+    def _categories(section):
+        data = suivi_data.get(section, [])
+        # Ancien format: {'groups': [...]}
+        return data.get('groups', []) if isinstance(data, dict) else data
+
+    charges = {mois: 0.0 for mois in MOIS_NOMS}
+    produits = {mois: 0.0 for mois in MOIS_NOMS}
+
+    for section in ('personnel', 'charges'):
+        for categorie in _categories(section):
+            for mois, montant in categorie.get('mois_data', {}).items():
+                if mois in charges:
+                    charges[mois] += -float(montant)
+
+    for categorie in _categories('produits'):
+        for mois, montant in categorie.get('mois_data', {}).items():
+            if mois in produits:
+                produits[mois] += float(montant)
+
+    mois_actifs = [m for m in MOIS_NOMS if charges[m] != 0 or produits[m] != 0]
+    return (
+        mois_actifs,
+        [charges[m] for m in mois_actifs],
+        [produits[m] for m in mois_actifs],
+    )
+
+
+def add_monthly_trend_chart(slide, suivi_data: Dict, left: float, top: float,
+                            width: float, height: float):
+    """
+    Ajoute la courbe mensuelle charges vs produits (graphique en ligne natif)
+
+    Args:
+        slide: La slide PowerPoint
+        suivi_data: Données du suivi d'activité par catégorie
+        left, top, width, height: Position et dimensions en inches
+    """
+    mois, charges, produits = get_monthly_totals(suivi_data)
+
+    if not mois:
+        add_text(slide, "Aucun mouvement mensuel", left, top + height / 2 - 0.3,
+                 width, 0.6, 14, False, RGBColor(120, 120, 120))
+        return None
+
+    chart_data = CategoryChartData()
+    chart_data.categories = mois
+    chart_data.add_series("Charges", charges)
+    chart_data.add_series("Produits", produits)
+
+    graphic_frame = slide.shapes.add_chart(
+        XL_CHART_TYPE.LINE_MARKERS,
+        Inches(left), Inches(top), Inches(width), Inches(height),
+        chart_data
+    )
+    chart = graphic_frame.chart
+    _style_chart(chart, font_size=10, legend=True)
+
+    for serie, couleur in zip(chart.plots[0].series, (COULEUR_BAISSE, COULEUR_HAUSSE)):
+        serie.smooth = False
+        serie.format.line.color.rgb = couleur
+        serie.format.line.width = Pt(2.5)
+        serie.marker.format.fill.solid()
+        serie.marker.format.fill.fore_color.rgb = couleur
+
+    logger.info(f"✅ Graphique natif: Tendance mensuelle ({len(mois)} mois)")
+    return chart
+
+
+def update_pagination(prs):
+    """Réécrit la pagination 'Page X/Y' des pieds de page selon l'ordre réel des slides"""
+    total = len(prs.slides)
+    for numero, slide in enumerate(prs.slides, start=1):
+        for shape in slide.shapes:
+            if shape.name != "Footer" or not shape.has_text_frame:
+                continue
+            for paragraph in shape.text_frame.paragraphs:
+                for run in paragraph.runs:
+                    run.text = re.sub(r"Page \d+/\d+", f"Page {numero}/{total}", run.text)
 
 
 def add_text(slide, text, left, top, width, height, size, bold, color):
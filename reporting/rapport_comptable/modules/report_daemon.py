@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 7: Démon de génération de rapports
+
+Serveur HTTP local (127.0.0.1) qui garde les modules chargés en mémoire et
+exécute les rapports demandés sur un pool de workers borné.
+
+API (JSON):
+    POST /jobs        {"fichier_sage": "...", "client": "...", "dossier_sortie": "..."}
+                      -> 202 {"job_id", "status": "en_attente"}  (503 si file pleine)
+    GET  /jobs/<id>   -> {"job_id", "status", "outputs", "error", ...}
+    GET  /jobs        -> liste des jobs
+    GET  /health      -> {"status": "ok", "workers", "en_attente"}
+
+Statuts: en_attente, en_cours, termine, echec
+
+Les jobs terminés sont oubliés après un délai (jobs_termines_ttl) et au-delà
+d'un nombre maximum (jobs_termines_max): GET /jobs/<id> répond alors 404.
+
+Limite quotidienne: chaque job exécute la vérification de sécurité et compte
+dans la limite de rapports du compte qui fait tourner le service (et non de
+la personne qui dépose la demande). Ce compte dispose de sa propre limite,
+réglée par "limite_quotidienne" dans la section "daemon" de config.json; une
+fois atteinte, les jobs suivants passent en échec avec un message explicite.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 20
+DEFAULT_MAX_FINISHED = 200     # Jobs terminés conservés
+DEFAULT_FINISHED_TTL = 3600.0  # Secondes de conservation d'un job terminé
+
+# Champs acceptés dans une demande de rapport
+JOB_FIELDS = ('fichier_sage', 'client', 'dossier_sortie', 'excel', 'ppt')
+
+
+class JobQueueFull(Exception):
+    """La file d'attente du démon a atteint sa capacité"""
+
+
+class ReportDaemon:
+    """
+    File de jobs de génération servie par un pool de workers borné
+
+    Le runner reçoit la demande (dict) et retourne les chemins générés
+    ({'excel': ..., 'ppt': ...}); toute exception marque le job en échec.
+    """
+
+    def __init__(self, runner: Callable[[Dict], Dict], workers: int = DEFAULT_WORKERS,
+                 max_queue: int = DEFAULT_MAX_QUEUE, max_finished: int = DEFAULT_MAX_FINISHED,
+                 finished_ttl: float = DEFAULT_FINISHED_TTL):
+        """
+        Args:
+            runner: Fonction exécutant un job et retournant ses fichiers de sortie
+            workers: Nombre de rapports générés en parallèle
+            max_queue: Nombre maximum de jobs en attente ou en cours
+            max_finished: Nombre maximum de jobs terminés conservés
+            finished_ttl: Durée de conservation d'un job terminé (secondes)
+        """
+        self.runner = runner
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+
+        self.jobs: Dict[str, Dict] = {}
+        # Jobs terminés, dans l'ordre de fin: job_id -> instant de fin (monotonic)
+        self._finished: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rapport")
+
+    def _evict_finished(self):
+        """Oublie les jobs terminés trop anciens ou en surnombre (verrou tenu par l'appelant)"""
+        limite = time.monotonic() - self.finished_ttl
+        surnombre = len(self._finished) - self.max_finished
+        for job_id, fin in list(self._finished.items()):
+            if fin >= limite and surnombre <= 0:
+                break
+            del self._finished[job_id]
+            del self.jobs[job_id]
+            surnombre -= 1
+
+    def _pending(self) -> int:
+        """Nombre de jobs en attente ou en cours"""
+        return sum(1 for job in self.jobs.values() if job['status'] in ('en_attente', 'en_cours'))
+
+    def submit(self, request: Dict) -> Dict:
+        """
+        Ajoute un job à la file
+
+        Args:
+            request: Demande (fichier_sage obligatoire, autres champs de JOB_FIELDS optionnels)
+
+        Returns:
+            État initial du job
+
+        Raises:
+            ValueError: Si la demande est invalide
+            JobQueueFull: Si la file est pleine
+        """
+        if not request.get('fichier_sage'):
+            raise ValueError("Le champ 'fichier_sage' est obligatoire")
+
+        unknown = set(request) - set(JOB_FIELDS)
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            self._evict_finished()
+            if self._pending() >= self.max_queue:
+                raise JobQueueFull(f"File pleine ({self.max_queue} jobs)")
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'job_id': job_id,
+                'status': 'en_attente',
+                'request': dict(request),
+                'outputs': {},
+                'error': None,
+                'submitted_at': datetime.now().isoformat(timespec='seconds'),
+                'finished_at': None,
+            }
+            self.jobs[job_id] = job
+
+        self._executor.submit(self._run_job, job_id)
+        logger.info(f"📥 Job {job_id} ajouté: {request['fichier_sage']}")
+        return self.get(job_id)
+
+    def _run_job(self, job_id: str):
+        """Exécute un job sur un worker et enregistre son résultat"""
+        with self._lock:
+            job = self.jobs[job_id]
+            job['status'] = 'en_cours'
+            request = dict(job['request'])
+
+        try:
+            outputs = self.runner(request)
+            status, error = 'termine', None
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} en échec: {e}", exc_info=True)
+            outputs, status, error = {}, 'echec', str(e)
+
+        with self._lock:
+            job.update({
+                'status': status,
+                'outputs': outputs or {},
+                'error': error,
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+            })
+            self._finished[job_id] = time.monotonic()
+            self._evict_finished()
+        logger.info(f"✅ Job {job_id}: {status}")
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Retourne une copie de l'état du job (None si inconnu)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job else None
+
+    def list_jobs(self) -> List[Dict]:
+        """Retourne l'état de tous les jobs"""
+        with self._lock:
+            self._evict_finished()
+            return json.loads(json.dumps(list(self.jobs.values())))
+
+    def health(self) -> Dict:
+        """Retourne l'état du démon"""
+        with self._lock:
+            return {'status': 'ok', 'workers': self.workers, 'en_attente': self._pending()}
+
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool de workers"""
+        self._executor.shutdown(wait=wait)
+
+
+def _make_handler(daemon: ReportDaemon):
+    """Crée la classe de requêtes HTTP liée au démon"""
+
+    class ReportRequestHandler(BaseHTTPRequestHandler):
+        """Routes JSON du démon"""
+
+        def _send_json(self, status: int, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, daemon.health())
+            elif self.path == '/jobs':
+                self._send_json(200, daemon.list_jobs())
+            elif self.path.startswith('/jobs/'):
+                job = daemon.get(self.path[len('/jobs/'):])
+                if job is None:
+                    self._send_json(404, {'error': 'Job inconnu'})
+                else:
+                    self._send_json(200, job)
+            else:
+                self._send_json(404, {'error': 'Route inconnue'})
+
+        def do_POST(self):
+            if self.path != '/jobs':
+                self._send_json(404, {'error': 'Route inconnue'})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("La demande doit être un objet JSON")
+                self._send_json(202, daemon.submit(request))
+            except JobQueueFull as e:
+                self._send_json(503, {'error': str(e)})
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logger.debug(f"HTTP {self.address_string()} - {format % args}")
+
+    return ReportRequestHandler
+
+
+def create_server(daemon: ReportDaemon, host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Crée le serveur HTTP du démon (non démarré)
+
+    Args:
+        daemon: File de jobs à exposer
+        host: Adresse d'écoute (locale uniquement par défaut)
+        port: Port d'écoute (0: port libre choisi par le système)
+
+    Returns:
+        Serveur prêt pour serve_forever()
+    """
+    return ThreadingHTTPServer((host, port), _make_handler(daemon))
+
+
+def warm_up():
+    """Précharge les modules et les mappings pour que les jobs n'en paient pas le coût"""
+    from modules import sage_parser, data_processor, excel_generator, ppt_generator  # noqa: F401
+
+    clients = data_processor.get_available_clients()
+    for client_code in clients.values():
+        data_processor.load_client_mapping(client_code)
+
+    logger.info(f"🔥 Modules chargés, {len(clients)} mapping(s) client en cache")
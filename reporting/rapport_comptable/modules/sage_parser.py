@@ -7,26 +7,61 @@ Ce module gère:
 - La lecture du fichier TXT avec encodage ISO-8859-1
 - Le parsing des colonnes délimitées par tabulations
 - La validation et le nettoyage des données
-- La conversion en DataFrame Pandas structuré
+- La conversion en DataFrame Pandas structuré (montants en unités mineures int64)
 """
 
+import io
 import pandas as pd
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from utils.exceptions import ParsingError, FileFormatError, EncodingError, DataValidationError
+from utils.exceptions import (
+    ParsingError, FileFormatError, EncodingError, DataValidationError, ProcessingInterrupted
+)
+from utils import montants
+from utils.progress import check_cancelled, report_count
+from utils.time_budget import checkpoint
 
 logger = logging.getLogger(__name__)
 
 
-def parse_sage_file(file_path: str) -> pd.DataFrame:
+SAGE_COLUMNS = ['compte', 'date', 'journal', 'piece', 'libelle', 'lettrage', 'debit', 'credit', 'solde']
+
+
+def count_lines(file_path: str, block_size: int = 1024 * 1024) -> int:
+    """
+    Compte les lignes du fichier sans le charger (lecture binaire par blocs)
+
+    Args:
+        file_path: Chemin vers le fichier TXT Sage
+        block_size: Taille des blocs lus (octets)
+
+    Returns:
+        Nombre de lignes (la dernière ligne sans retour à la ligne est comptée)
+    """
+    count = 0
+    last = b''
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            count += block.count(b'\n')
+            last = block[-1:]
+    if last and last != b'\n':
+        count += 1
+    return count
+
+
+def parse_sage_file(file_path: str, chunk_size: Optional[int] = None) -> pd.DataFrame:
     """
     Charge et parse le fichier TXT Sage complet
 
     Args:
         file_path: Chemin vers le fichier TXT Sage
+        chunk_size: Si fourni, lecture par blocs de chunk_size lignes pour les gros
+            grands livres: budget de temps, annulation et progression sont contrôlés
+            entre les blocs. Le DataFrame complet est tout de même assemblé (le
+            classeur reprend chaque écriture): la mémoire de pointe n'est pas réduite
 
     Returns:
         DataFrame avec les colonnes: compte, date, journal, piece, libelle, lettrage, debit, credit, solde
@@ -45,12 +80,15 @@ def parse_sage_file(file_path: str) -> pd.DataFrame:
     try:
         # Lire le fichier avec encodage ISO-8859-1
         # Note: Le fichier Sage n'a PAS de ligne d'en-tête, il commence directement avec les données
+        if chunk_size:
+            return _parse_sage_file_chunked(file_path, chunk_size)
+
         df = pd.read_csv(
             file_path,
             sep='\t',
             encoding='ISO-8859-1',
             header=None,
-            names=['compte', 'date', 'journal', 'piece', 'libelle', 'lettrage', 'debit', 'credit', 'solde']
+            names=SAGE_COLUMNS
         )
 
         logger.info(f"Fichier lu avec succès: {len(df)} lignes")
@@ -62,6 +100,9 @@ def parse_sage_file(file_path: str) -> pd.DataFrame:
 
         return df
 
+    except ProcessingInterrupted:
+        raise
+
     except UnicodeDecodeError as e:
         logger.error(f"Erreur d'encodage: {e}")
         raise EncodingError(f"Erreur d'encodage du fichier. Assurez-vous qu'il est en ISO-8859-1: {e}")
@@ -71,6 +112,62 @@ def parse_sage_file(file_path: str) -> pd.DataFrame:
         raise FileFormatError(f"Format de fichier incorrect: {e}")
 
 
+def parse_sage_lines(lines: List[str]) -> pd.DataFrame:
+    """
+    Parse des lignes déjà lues d'un export Sage (ex: seules les lignes nouvelles
+    d'un export cumulé, voir modules.incremental)
+
+    Args:
+        lines: Lignes du fichier TXT Sage (sans retour à la ligne, non vides)
+
+    Returns:
+        DataFrame aux colonnes et types de parse_sage_file, une ligne par ligne reçue
+    """
+    if not lines:
+        return _convert_data_types(pd.DataFrame(columns=SAGE_COLUMNS))
+
+    df = pd.read_csv(
+        io.StringIO('\n'.join(lines)),
+        sep='\t',
+        header=None,
+        names=SAGE_COLUMNS,
+        skip_blank_lines=False
+    )
+    return _convert_data_types(df)
+
+
+def _parse_sage_file_chunked(file_path: str, chunk_size: int) -> pd.DataFrame:
+    """
+    Lecture par blocs: conversion des types bloc par bloc, budget de temps contrôlé entre les blocs
+
+    Les blocs convertis sont concaténés en un seul DataFrame: le gain porte sur la
+    réactivité (annulation, dépassement de budget, progression), pas sur la mémoire.
+    """
+    blocs = []
+    reader = pd.read_csv(
+        file_path,
+        sep='\t',
+        encoding='ISO-8859-1',
+        header=None,
+        names=SAGE_COLUMNS,
+        chunksize=chunk_size
+    )
+    with reader:
+        lignes_lues = 0
+        for bloc in reader:
+            checkpoint("parse")
+            check_cancelled()
+            blocs.append(_convert_data_types(bloc))
+            lignes_lues += len(bloc)
+            report_count("lignes lues", lignes_lues)
+
+    df = pd.concat(blocs, ignore_index=True) if blocs else _convert_data_types(
+        pd.DataFrame(columns=SAGE_COLUMNS)
+    )
+    logger.info(f"Fichier lu par blocs de {chunk_size} lignes: {len(df)} lignes ({len(blocs)} bloc(s))")
+    return df
+
+
 def _convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """
     Convertit les types de données des colonnes
@@ -95,14 +192,14 @@ def _convert_data_types(df: pd.DataFrame) -> pd.DataFrame:
     # Lettrage optionnel (nullable string)
     df['lettrage'] = df['lettrage'].fillna('').astype(str).str.strip()
 
-    # Convertir débit, crédit et solde en float
-    df['debit'] = pd.to_numeric(df['debit'], errors='coerce')
-    df['credit'] = pd.to_numeric(df['credit'], errors='coerce')
-    df['solde'] = pd.to_numeric(df['solde'], errors='coerce')
+    # Convertir débit, crédit et solde en unités mineures entières (centimes, int64)
+    df['debit'] = montants.en_unites(df['debit'])
+    df['credit'] = montants.en_unites(df['credit'])
+    df['solde'] = montants.en_unites(df['solde'])
 
-    # Remplacer NaN par 0 pour débit et crédit
-    df['debit'] = df['debit'].fillna(0)
-    df['credit'] = df['credit'].fillna(0)
+    # Remplacer les montants manquants par 0 pour débit et crédit
+    df['debit'] = df['debit'].fillna(0).astype('int64')
+    df['credit'] = df['credit'].fillna(0).astype('int64')
 
     return df
 
@@ -221,6 +318,22 @@ def get_date_range(df: pd.DataFrame) -> tuple:
     return (date_min, date_max)
 
 
+def get_exercice(df: pd.DataFrame) -> Optional[int]:
+    """
+    Retourne l'exercice des écritures (année la plus fréquente des dates)
+
+    Args:
+        df: DataFrame des écritures
+
+    Returns:
+        Année, ou None si aucune écriture n'est datée
+    """
+    annees = df['date'].dropna().dt.year
+    if annees.empty:
+        return None
+    return int(annees.mode().iloc[0])
+
+
 def get_accounts_list(df: pd.DataFrame) -> list:
     """
     Retourne la liste des comptes uniques
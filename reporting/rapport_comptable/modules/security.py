@@ -9,14 +9,16 @@ Fonctionnalités:
 3. Watermarking des rapports Excel générés
 """
 
-import json
+import atexit
 import logging
-import socket
 import getpass
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple
-from openpyxl.styles import Font, Alignment
+from typing import Optional, Tuple
+
+from utils.audit_writer import AuditWriter
+from utils.host_identity import get_host_identity
+from utils.usage_store import UsageStore
 
 
 # ============================================================================
@@ -30,157 +32,159 @@ DAILY_REPORT_LIMIT = 4  # Maximum 4 rapports par jour
 # JOURNALISATION (AUDIT LOG)
 # ============================================================================
 
+AUDIT_DIR = Path(__file__).parent.parent / "audit_logs"
+
+_audit_writer: Optional[AuditWriter] = None
+
+
 def setup_audit_log() -> Path:
     """
-    Configure le système de journalisation des activités
+    Démarre le journal d'audit asynchrone (une seule fois par processus)
+
+    Les enregistrements sont écrits en JSONL par un thread dédié, avec fsync
+    groupé et rotation mensuelle compressée (voir utils.audit_writer).
 
     Returns:
-        Path vers le fichier de log
+        Path vers le fichier d'audit du mois en cours
     """
-    # Créer le répertoire des logs d'audit
-    audit_dir = Path(__file__).parent.parent / "audit_logs"
-    audit_dir.mkdir(exist_ok=True)
-
-    # Fichier de log mensuel
-    current_month = datetime.now().strftime("%Y-%m")
-    log_file = audit_dir / f"audit_{current_month}.log"
-
-    # Configurer le logger spécifique pour l'audit
-    audit_logger = logging.getLogger("audit")
-    audit_logger.setLevel(logging.INFO)
-
-    # Handler pour le fichier
-    handler = logging.FileHandler(log_file, encoding='utf-8')
-    handler.setLevel(logging.INFO)
-
-    # Format détaillé
-    formatter = logging.Formatter(
-        '%(asctime)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    handler.setFormatter(formatter)
+    global _audit_writer
 
-    # Ajouter le handler (éviter les doublons)
-    if not audit_logger.handlers:
-        audit_logger.addHandler(handler)
+    if _audit_writer is None:
+        _audit_writer = AuditWriter(AUDIT_DIR)
+        atexit.register(_audit_writer.close)
 
-    return log_file
+    _audit_writer.start()
 
+    return _audit_writer.log_file_for(datetime.now().strftime("%Y-%m"))
 
-def log_session_start(username: str):
-    """Enregistre le début d'une session"""
-    audit_logger = logging.getLogger("audit")
 
-    hostname = socket.gethostname()
+def audit_event(event: str, level: str = "INFO", **fields):
+    """
+    Enregistre un événement d'audit structuré
 
-    audit_logger.info(
-        f"SESSION_START | User: {username} | Machine: {hostname} | IP: {get_local_ip()}"
-    )
+    Ne fait qu'ajouter l'enregistrement à la file du thread d'écriture;
+    sans effet si le journal d'audit n'a pas été démarré. Une valeur appelable
+    est évaluée par le thread d'écriture.
+
+    Args:
+        event: Type d'événement (ex: "REPORT_GENERATED")
+        level: Niveau (INFO, WARNING, ...)
+        **fields: Données de l'événement
+    """
+    if _audit_writer is None:
+        return
+
+    _audit_writer.write({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'level': level,
+        'event': event,
+        **fields,
+    })
+
+
+def log_session_start(username: str):
+    """Enregistre le début d'une session"""
+    # L'identité du poste est résolue par le thread d'audit, hors chemin critique
+    audit_event("SESSION_START", user=username, host=get_host_identity)
 
 
 def log_report_generation(username: str, client_code: str, gl_file: str,
                           output_excel: str):
     """Enregistre la génération d'un rapport"""
-    audit_logger = logging.getLogger("audit")
-
-    audit_logger.info(
-        f"REPORT_GENERATED | User: {username} | Client: {client_code} | "
-        f"GL: {Path(gl_file).name} | Excel: {Path(output_excel).name}"
+    audit_event(
+        "REPORT_GENERATED",
+        user=username,
+        client=client_code,
+        gl=Path(gl_file).name,
+        excel=Path(output_excel).name,
     )
 
 
 def log_limit_exceeded(username: str, current_count: int, limit: int):
     """Enregistre un dépassement de limite"""
-    audit_logger = logging.getLogger("audit")
-
-    audit_logger.warning(
-        f"LIMIT_EXCEEDED | User: {username} | Count: {current_count} | Limit: {limit}"
-    )
+    audit_event("LIMIT_EXCEEDED", level="WARNING", user=username, count=current_count, limit=limit)
 
 
 # ============================================================================
 # LIMITATION D'UTILISATION (4 RAPPORTS/JOUR)
 # ============================================================================
 
-def check_daily_limit(username: str, daily_limit: int = DAILY_REPORT_LIMIT) -> Tuple[bool, int, int]:
+USAGE_DIR = Path(__file__).parent.parent / "usage_data"
+
+_usage_store: Optional[UsageStore] = None
+
+
+def get_usage_store() -> UsageStore:
+    """
+    Retourne le compteur d'utilisation (usage_data/usage.sqlite3)
+
+    L'ancien fichier usage_tracking.json est repris à la première ouverture.
+    """
+    global _usage_store
+
+    if _usage_store is None:
+        _usage_store = UsageStore(USAGE_DIR / "usage.sqlite3",
+                                  legacy_json=USAGE_DIR / "usage_tracking.json")
+
+    return _usage_store
+
+
+def check_daily_limit(username: str, daily_limit: int = DAILY_REPORT_LIMIT,
+                      report_key: Optional[str] = None) -> Tuple[bool, int, int]:
     """
     Vérifie que l'utilisateur n'a pas dépassé sa limite quotidienne
 
+    La vérification et l'incrément sont atomiques: des traitements lancés en
+    parallèle ne peuvent ni perdre un incrément ni dépasser la limite.
+
     Args:
         username: Nom d'utilisateur
         daily_limit: Limite quotidienne de rapports (défaut: 4)
+        report_key: Identifiant du rapport; un rapport déjà compté aujourd'hui
+            (ex: nouveau rendu du même modèle) ne compte pas une seconde fois
 
     Returns:
         Tuple (allowed: bool, current_count: int, limit: int)
     """
     logger = logging.getLogger(__name__)
 
-    # Fichier de suivi de l'utilisation
-    usage_dir = Path(__file__).parent.parent / "usage_data"
-    usage_dir.mkdir(exist_ok=True)
-    usage_file = usage_dir / "usage_tracking.json"
-
-    # Charger les données d'utilisation
-    if usage_file.exists():
-        with open(usage_file, 'r', encoding='utf-8') as f:
-            usage_data = json.load(f)
-    else:
-        usage_data = {}
-
-    # Clé pour le jour en cours
+    # Jour en cours
     current_day = datetime.now().strftime("%Y-%m-%d")
-    key = f"{username}_{current_day}"
 
-    # Récupérer le compteur
-    current_count = usage_data.get(key, 0)
+    allowed, current_count = get_usage_store().increment_if_below(username, current_day, daily_limit, report_key)
 
     # Vérifier la limite
-    if current_count >= daily_limit:
+    if not allowed:
         logger.error(f"❌ Limite quotidienne dépassée pour {username}: {current_count}/{daily_limit}")
         log_limit_exceeded(username, current_count, daily_limit)
         return False, current_count, daily_limit
 
-    # Incrémenter le compteur
-    usage_data[key] = current_count + 1
-
-    # Sauvegarder
-    with open(usage_file, 'w', encoding='utf-8') as f:
-        json.dump(usage_data, f, indent=2)
-
-    logger.info(f"✅ Utilisation: {username} - {current_count + 1}/{daily_limit} rapports aujourd'hui")
+    logger.info(f"✅ Utilisation: {username} - {current_count}/{daily_limit} rapports aujourd'hui")
 
-    return True, current_count + 1, daily_limit
+    return True, current_count, daily_limit
 
 
-def display_usage_stats(username: str):
+def display_usage_stats(username: str, daily_limit: int = DAILY_REPORT_LIMIT):
     """
     Affiche les statistiques d'utilisation pour un utilisateur
 
     Args:
         username: Nom d'utilisateur
+        daily_limit: Limite quotidienne de rapports
     """
-    usage_dir = Path(__file__).parent.parent / "usage_data"
-    usage_file = usage_dir / "usage_tracking.json"
+    current_day = datetime.now().strftime("%Y-%m-%d")
+    count = get_usage_store().get_count(username, current_day)
 
-    if not usage_file.exists():
+    if count == 0:
         print(f"📊 Aucune utilisation enregistrée pour aujourd'hui")
         return
 
-    with open(usage_file, 'r', encoding='utf-8') as f:
-        usage_data = json.load(f)
-
-    # Filtrer les données de cet utilisateur pour aujourd'hui
-    current_day = datetime.now().strftime("%Y-%m-%d")
-    key = f"{username}_{current_day}"
-
-    count = usage_data.get(key, 0)
-
     print()
     print("📊 Statistiques d'utilisation:")
     print(f"   • Utilisateur: {username}")
     print(f"   • Date: {datetime.now().strftime('%d/%m/%Y')}")
-    print(f"   • Rapports générés aujourd'hui: {count}/{DAILY_REPORT_LIMIT}")
-    print(f"   • Rapports restants: {DAILY_REPORT_LIMIT - count}")
+    print(f"   • Rapports générés aujourd'hui: {count}/{daily_limit}")
+    print(f"   • Rapports restants: {daily_limit - count}")
     print()
 
 
@@ -197,6 +201,8 @@ def add_watermark_to_sheet(ws, company_name: str = "2BN CONSULTING", row_offset:
         company_name: Nom de l'entreprise (cabinet)
         row_offset: Décalage à partir de la dernière ligne
     """
+    from openpyxl.styles import Font, Alignment
+
     # Ajouter en bas de la feuille
     last_row = ws.max_row + row_offset
 
@@ -212,8 +218,7 @@ def add_watermark_to_sheet(ws, company_name: str = "2BN CONSULTING", row_offset:
     cell.alignment = Alignment(horizontal="left")
 
     # Log dans l'audit
-    audit_logger = logging.getLogger("audit")
-    audit_logger.info(f"WATERMARK_ADDED | Sheet: {ws.title} | Company: {company_name}")
+    audit_event("WATERMARK_ADDED", sheet=ws.title, company=company_name)
 
 
 def add_watermark_to_workbook(wb, company_name: str = "2BN CONSULTING"):
@@ -239,16 +244,9 @@ def add_watermark_to_workbook(wb, company_name: str = "2BN CONSULTING"):
 # ============================================================================
 
 def get_local_ip() -> str:
-    """Récupère l'adresse IP locale"""
-    try:
-        # Créer un socket pour obtenir l'IP
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except Exception:
-        return "Unknown"
+    """Retourne la première adresse IP locale (interfaces du poste, identité en cache)"""
+    ips = get_host_identity().get('ips', [])
+    return ips[0] if ips else "Unknown"
 
 
 def get_current_username() -> str:
@@ -265,10 +263,15 @@ def get_current_username() -> str:
 # FONCTION PRINCIPALE DE SÉCURITÉ
 # ============================================================================
 
-def security_check() -> Tuple[bool, str]:
+def security_check(daily_limit: int = DAILY_REPORT_LIMIT, report_key: Optional[str] = None) -> Tuple[bool, str]:
     """
     Effectue toutes les vérifications de sécurité
 
+    Args:
+        daily_limit: Limite quotidienne de rapports (défaut: 4; le mode service
+            peut en fixer une autre pour son compte, voir config.json "daemon")
+        report_key: Identifiant du rapport (voir check_daily_limit), optionnel
+
     Returns:
         Tuple (authorized: bool, username: str)
     """
@@ -291,7 +294,7 @@ def security_check() -> Tuple[bool, str]:
     log_session_start(username)
 
     # 3. Vérifier la limite quotidienne
-    allowed, current_count, limit = check_daily_limit(username)
+    allowed, current_count, limit = check_daily_limit(username, daily_limit, report_key)
 
     if not allowed:
         print()
@@ -307,7 +310,7 @@ def security_check() -> Tuple[bool, str]:
         return False, username
 
     # Afficher les statistiques
-    display_usage_stats(username)
+    display_usage_stats(username, daily_limit)
 
     logger.info("✅ Vérifications de sécurité passées avec succès")
     return True, username
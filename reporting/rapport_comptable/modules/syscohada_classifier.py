@@ -409,3 +409,42 @@ def aggregate_by_category(df, mois_noms) -> dict:
         'charges': aggregate_section(df_autres_charges, is_produit=False),
         'produits': aggregate_section(df_produits, is_produit=True)
     }
+
+
+def aggregate_year_by_category(cube) -> dict:
+    """
+    Totaux annuels par catégorie SYSCOHADA, depuis les débits et crédits mensuels par compte
+
+    Mêmes sections, clés et signes que aggregate_by_category (charges en
+    négatif, produits en positif); les écritures non datées (mois 0) sont
+    ignorées comme dans le suivi mensuel.
+
+    Args:
+        cube: DataFrame (compte, mois, debit, credit), ex: warehouse.monthly_balances
+
+    Returns:
+        {section: [{'libelle', 'ordre', 'montant'}]} trié par ordre
+    """
+    dates = cube[cube['mois'] != 0]
+    totaux = dates.groupby('compte')[['debit', 'credit']].sum()
+
+    categories = {'personnel': {}, 'charges': {}, 'produits': {}}
+    for compte, debit, credit in zip(totaux.index, totaux['debit'], totaux['credit']):
+        compte_str = str(compte)
+        if compte_str.startswith('66'):
+            section, montant = 'personnel', -debit
+        elif compte_str.startswith('6'):
+            section, montant = 'charges', -debit
+        elif compte_str.startswith('7'):
+            section, montant = 'produits', credit
+        else:
+            continue
+
+        classification = get_syscohada_category(compte)
+        key = classification['sous_categorie'] if classification['sous_categorie'] else classification['categorie']
+        if key not in categories[section]:
+            categories[section][key] = {'libelle': key, 'ordre': classification['ordre'], 'montant': 0}
+        categories[section][key]['montant'] += int(montant)
+
+    return {section: sorted(lignes.values(), key=lambda x: x['ordre'])
+            for section, lignes in categories.items()}
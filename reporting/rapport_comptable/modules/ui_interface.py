@@ -12,21 +12,27 @@ Fonctionnalités:
 - Interface avec onglets pour enrichir les commentaires
 - Saisie avec formatage riche (gras, italique, puces)
 - Sauvegarde/chargement des commentaires en format texte
+- Fenêtre de progression: traitement sur un thread de travail, interface
+  rafraîchie par after() (étape en cours, compteurs, bouton Annuler)
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, font as tkfont
+import contextvars
 import json
 import logging
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 import ctypes
 
 # Import pour charger les clients disponibles
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
 from data_processor import get_available_clients
+from utils.progress import ProgressChannel, start_progress
 
 logger = logging.getLogger(__name__)
 
@@ -1360,6 +1366,137 @@ Raccourcis clavier:
         return self.data
 
 
+class ProgressInterface:
+    """
+    Fenêtre de progression d'un traitement exécuté sur un thread de travail
+
+    Le thread principal ne fait que scruter le canal (after) et rafraîchir
+    l'affichage: la fenêtre reste réactive pendant le parsing et le rendu.
+    La fenêtre se ferme quand le traitement se termine ou quand il demande
+    une autre fenêtre (saisie des commentaires), retournée par run().
+    """
+
+    POLL_INTERVAL_MS = 100
+    SHOW_DELAY_MS = 300  # Pas d'affichage si le traitement demande aussitôt une autre fenêtre
+
+    def __init__(self, channel: ProgressChannel, state: Dict, done: Future,
+                 titre: str = "Génération du rapport comptable"):
+        """
+        Args:
+            channel: Canal de progression du traitement
+            state: État affiché, conservé d'une fenêtre à l'autre
+            done: Résultat du traitement (terminé quand le thread s'arrête)
+            titre: Titre de la fenêtre
+        """
+        self.channel = channel
+        self.state = state
+        self.done = done
+        self.ui_request = None
+
+        self.root = tk.Tk()
+        self.root.title(titre)
+        self.root.withdraw()
+
+        window_width, window_height = 520, 230
+        x = (self.root.winfo_screenwidth() // 2) - (window_width // 2)
+        y = (self.root.winfo_screenheight() // 2) - (window_height // 2)
+        self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        self.root.resizable(False, False)
+        self.root.protocol("WM_DELETE_WINDOW", self.annuler)
+
+        self.setup_ui(titre)
+        self._refresh()
+
+    def setup_ui(self, titre: str):
+        """Configure la fenêtre de progression"""
+        main_frame = ttk.Frame(self.root, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text=titre, font=("Arial", 12, "bold")).pack(anchor=tk.W)
+
+        self.step_label = ttk.Label(main_frame, text="Préparation...", font=("Arial", 10))
+        self.step_label.pack(anchor=tk.W, pady=(10, 5))
+
+        self.progress_bar = ttk.Progressbar(main_frame, mode="determinate", length=480)
+        self.progress_bar.pack(fill=tk.X)
+
+        self.stage_label = ttk.Label(main_frame, text="", font=("Arial", 9), foreground="gray")
+        self.stage_label.pack(anchor=tk.W, pady=(5, 0))
+
+        self.count_label = ttk.Label(main_frame, text="", font=("Arial", 9))
+        self.count_label.pack(anchor=tk.W, pady=(5, 0))
+
+        self.cancel_button = ttk.Button(main_frame, text="Annuler", command=self.annuler)
+        self.cancel_button.pack(anchor=tk.E, pady=(10, 0))
+
+    def _apply(self, event: Dict):
+        """Met à jour l'état affiché avec un événement du canal"""
+        if event['type'] == 'step':
+            self.state.update(step_index=event['index'], step_total=event['total'], step_label=event['label'])
+        elif event['type'] == 'stage':
+            self.state['stage'] = event['stage']
+        elif event['type'] == 'count':
+            self.state.setdefault('counts', {})[event['label']] = event['value']
+        elif event['type'] == 'ui':
+            self.ui_request = event
+
+    def _refresh(self):
+        """Rafraîchit les widgets à partir de l'état"""
+        if self.state.get('step_total'):
+            self.step_label.config(
+                text=f"Étape {self.state['step_index']}/{self.state['step_total']}: {self.state['step_label']}"
+            )
+            self.progress_bar.config(maximum=self.state['step_total'], value=self.state['step_index'] - 1)
+
+        if self.channel.cancelled:
+            self.stage_label.config(text="⏹️ Annulation en cours (fin de l'étape en cours)...")
+        elif self.state.get('stage'):
+            self.stage_label.config(text=f"En cours: {self.state['stage']}")
+
+        counts = self.state.get('counts', {})
+        self.count_label.config(
+            text="   ".join(f"{value:,} {label}".replace(",", " ") for label, value in counts.items())
+        )
+
+    def _poll(self):
+        """Lit le canal sans bloquer, puis se reprogramme"""
+        for event in self.channel.drain():
+            self._apply(event)
+        self._refresh()
+
+        if self.ui_request is not None or self.done.done():
+            self.root.quit()
+            self.root.destroy()
+            return
+
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _show(self):
+        """Affiche la fenêtre si le traitement est toujours en cours"""
+        if self.ui_request is None and not self.done.done():
+            self.root.deiconify()
+
+    def annuler(self):
+        """Demande l'annulation: le traitement s'arrête à la prochaine étape"""
+        if not self.channel.cancelled:
+            logger.info("Annulation demandée par l'utilisateur")
+            self.channel.cancel()
+            self.cancel_button.config(state=tk.DISABLED)
+            self._refresh()
+
+    def run(self) -> Optional[Dict]:
+        """
+        Affiche la progression jusqu'à la fin du traitement
+
+        Returns:
+            Demande d'appel d'interface en attente, ou None si le traitement est terminé
+        """
+        self.root.after(0, self._poll)
+        self.root.after(self.SHOW_DELAY_MS, self._show)
+        self.root.mainloop()
+        return self.ui_request
+
+
 def collect_configuration() -> Optional[Dict]:
     """
     Affiche l'interface de configuration initiale
@@ -1449,6 +1586,53 @@ def collect_comments_for_existing_reports(
         return None
 
 
+def run_with_progress(work: Callable, *args, titre: str = "Génération du rapport comptable", **kwargs):
+    """
+    Exécute un traitement sur un thread de travail avec une fenêtre de progression
+
+    Le traitement publie sa progression via utils.progress; ses appels
+    d'interface (progress.call_in_ui) sont exécutés ici, sur le thread
+    principal, entre deux fenêtres de progression.
+
+    Args:
+        work: Fonction de traitement
+        *args, **kwargs: Arguments de la fonction
+        titre: Titre de la fenêtre de progression
+
+    Returns:
+        Résultat de la fonction (ses exceptions sont relevées ici)
+    """
+    channel = ProgressChannel()
+    done: Future = Future()
+
+    def worker():
+        start_progress(channel)
+        try:
+            done.set_result(work(*args, **kwargs))
+        except BaseException as e:
+            done.set_exception(e)
+
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(worker,), name="pipeline", daemon=True
+    )
+    thread.start()
+
+    state: Dict = {}
+    while not done.done():
+        ui_request = ProgressInterface(channel, state, done, titre).run()
+        if ui_request is None:
+            continue
+
+        # Fenêtre demandée par le traitement (configuration, commentaires)
+        try:
+            ui_request['future'].set_result(ui_request['function'](*ui_request['args'], **ui_request['kwargs']))
+        except Exception as e:
+            ui_request['future'].set_exception(e)
+
+    thread.join()
+    return done.result()
+
+
 def load_comments_from_file(file_path: str) -> Optional[Dict]:
     """
     Charge des commentaires sauvegardés depuis un fichier JSON
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 11: Entrepôt local des grands livres (SQLite)
+
+Historique des écritures nettoyées et des soldes mensuels par client et par
+exercice: les états, la colonne "Rappel année N-1" et les tendances lisent
+l'entrepôt au lieu de re-parser les anciens exports.
+
+Ce module gère:
+- L'ingestion d'un export Sage: seules les écritures absentes de l'entrepôt
+  sont parsées (empreintes du Module 10), celles qui ont disparu de l'export
+  sont supprimées
+- Les soldes mensuels (compte x mois), recalculés pour les seuls comptes touchés
+- Les lectures: grand livre au format de clean_data, balance à une fin de mois,
+  soldes mensuels d'un ou plusieurs exercices
+
+Index: (client, compte, date) sur les écritures, clé primaire
+(client, exercice, compte, mois) sur les soldes mensuels.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from modules import incremental
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WAREHOUSE = Path(__file__).parent.parent / "entrepot" / "grand_livre.sqlite3"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS ecritures ("
+    " id INTEGER PRIMARY KEY,"
+    " client TEXT NOT NULL,"
+    " exercice INTEGER NOT NULL,"
+    " hash INTEGER NOT NULL,"
+    " compte INTEGER NOT NULL,"
+    " date TEXT,"
+    " journal TEXT, piece TEXT, libelle TEXT, lettrage TEXT,"
+    " debit INTEGER NOT NULL,"
+    " credit INTEGER NOT NULL,"
+    " ligne INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_ecritures_compte_date ON ecritures (client, compte, date)",
+    "CREATE INDEX IF NOT EXISTS idx_ecritures_exercice ON ecritures (client, exercice, hash)",
+    "CREATE TABLE IF NOT EXISTS soldes_mensuels ("
+    " client TEXT NOT NULL,"
+    " exercice INTEGER NOT NULL,"
+    " compte INTEGER NOT NULL,"
+    " mois INTEGER NOT NULL,"
+    " debit INTEGER NOT NULL,"
+    " credit INTEGER NOT NULL,"
+    " PRIMARY KEY (client, exercice, compte, mois))",
+    "CREATE TABLE IF NOT EXISTS comptes ("
+    " client TEXT NOT NULL,"
+    " exercice INTEGER NOT NULL,"
+    " compte INTEGER NOT NULL,"
+    " libelle TEXT,"
+    " PRIMARY KEY (client, exercice, compte))",
+    "CREATE TABLE IF NOT EXISTS imports ("
+    " id INTEGER PRIMARY KEY,"
+    " client TEXT NOT NULL,"
+    " exercice INTEGER NOT NULL,"
+    " fichier TEXT,"
+    " integre_le TEXT,"
+    " lignes INTEGER, ajoutees INTEGER, retirees INTEGER)",
+)
+
+# Mois AAAAMM d'une écriture (0 si non datée)
+_MOIS_SQL = "COALESCE(CAST(substr(date, 1, 4) || substr(date, 6, 2) AS INTEGER), 0)"
+
+
+def client_key(client: str) -> str:
+    """Clé client de l'entrepôt (nom en majuscules, ex: "BAMBOO IMMO")"""
+    return " ".join(client.upper().split())
+
+
+def infer_exercice(lines: List[str]) -> Optional[int]:
+    """
+    Exercice d'un export: année la plus fréquente des écritures datées
+
+    Les dates (JJMMAA, deuxième champ) sont lues sans parser l'export.
+    """
+    champs = pd.Series(lines, dtype=object).str.split('\t', n=2).str[1].str.strip()
+    dates = pd.to_datetime(champs.str.zfill(6), format='%d%m%y', errors='coerce').dropna()
+    if dates.empty:
+        return None
+    return int(dates.dt.year.mode().iloc[0])
+
+
+def _lettrages(lines: List[str], indexes: np.ndarray) -> List[str]:
+    """Lettrage (sixième champ) des lignes données, comme le lit sage_parser"""
+    if not len(indexes):
+        return []
+    champs = pd.Series([lines[i] for i in indexes], dtype=object).str.split('\t').str[5]
+    return champs.fillna('').astype(str).str.strip().tolist()
+
+
+class LedgerWarehouse:
+    """
+    Entrepôt des écritures et soldes mensuels, par client et par exercice
+
+    Comme le compteur d'utilisation, chaque opération ouvre sa propre
+    connexion (mode WAL): l'entrepôt peut être lu pendant une ingestion.
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_WAREHOUSE):
+        """
+        Args:
+            db_path: Fichier SQLite de l'entrepôt (créé s'il n'existe pas)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion en mode autocommit (transactions explicites)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def ingest(self, file_path: Path, client: str, exercice: Optional[int] = None) -> Dict:
+        """
+        Intègre un export Sage (seules les écritures nouvelles sont parsées)
+
+        Args:
+            file_path: Export TXT Sage
+            client: Nom du client
+            exercice: Exercice (défaut: année la plus fréquente des écritures)
+
+        Returns:
+            Statistiques {client, exercice, lignes, ajoutees, retirees, inchangees}
+
+        Raises:
+            FileNotFoundError: Si l'export n'existe pas
+            ValueError: Si l'exercice ne peut pas être déduit des dates
+        """
+        return self.commit_ingest(self.prepare_ingest(file_path, client, exercice))
+
+    def prepare_ingest(self, file_path: Path, client: str, exercice: Optional[int] = None) -> Dict:
+        """
+        Compare un export aux écritures de l'entrepôt et parse les nouvelles, sans verrou d'écriture
+
+        Le résultat (objets numpy/pandas, transmissible à un autre processus)
+        est écrit par commit_ingest: le parsing peut se faire dans des
+        processus de travail, seule l'écriture SQLite est sérialisée.
+
+        Args:
+            file_path: Export TXT Sage
+            client: Nom du client
+            exercice: Exercice (défaut: année la plus fréquente des écritures)
+
+        Returns:
+            Intégration préparée (voir commit_ingest)
+
+        Raises:
+            FileNotFoundError: Si l'export n'existe pas
+            ValueError: Si l'exercice ne peut pas être déduit des dates
+        """
+        file_path = Path(file_path)
+        if not file_path.exists():
+            raise FileNotFoundError(f"Le fichier n'existe pas: {file_path}")
+
+        client = client_key(client)
+        lines = incremental.read_lines(file_path)
+        if exercice is None:
+            exercice = infer_exercice(lines)
+        if exercice is None:
+            raise ValueError("Exercice introuvable: aucune écriture datée (option --exercice)")
+
+        conn = self._connect()
+        try:
+            ids, hashes = self._known(conn, client, exercice)
+        finally:
+            conn.close()
+        return self._prepare(lines, file_path, client, exercice, ids, hashes)
+
+    @staticmethod
+    def _known(conn: sqlite3.Connection, client: str, exercice: int):
+        """Identifiants et empreintes (uint64) des écritures intégrées, par identifiant"""
+        connues = conn.execute(
+            "SELECT id, hash FROM ecritures WHERE client = ? AND exercice = ? ORDER BY id",
+            (client, exercice)
+        ).fetchall()
+        ids = np.array([row[0] for row in connues], dtype='int64')
+        hashes = np.array([row[1] for row in connues], dtype='int64').view('uint64')
+        return ids, hashes
+
+    @staticmethod
+    def _prepare(lines: List[str], file_path: Path, client: str, exercice: int,
+                 ids: np.ndarray, hashes: np.ndarray) -> Dict:
+        """Écritures nouvelles parsées et rang des écritures connues dans l'export"""
+        delta, positions, inchangees = incremental.compare_export(lines, hashes)
+        return {
+            'fichier': file_path,
+            'client': client,
+            'exercice': exercice,
+            'lignes': len(lines),
+            'ids': ids,
+            'hashes': hashes,
+            'delta': delta,
+            'positions': positions,
+            'inchangees': inchangees,
+            # Lettrage des écritures connues, hors empreinte, mis à jour sans parser la ligne
+            'lettrages': _lettrages(lines, positions[positions >= 0]),
+        }
+
+    def commit_ingest(self, preparation: Dict) -> Dict:
+        """
+        Écrit une intégration préparée par prepare_ingest (transaction courte)
+
+        Si les écritures du client ont changé depuis la préparation (autre
+        intégration du même exercice entre-temps), la comparaison est refaite
+        sous le verrou.
+
+        Args:
+            preparation: Résultat de prepare_ingest
+
+        Returns:
+            Statistiques {client, exercice, lignes, ajoutees, retirees, inchangees}
+        """
+        client, exercice = preparation['client'], preparation['exercice']
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            ids, hashes = self._known(conn, client, exercice)
+            if not (np.array_equal(ids, preparation['ids']) and np.array_equal(hashes, preparation['hashes'])):
+                logger.info(f"Entrepôt {client} {exercice} modifié depuis la préparation: nouvelle comparaison")
+                preparation = self._prepare(incremental.read_lines(preparation['fichier']),
+                                            preparation['fichier'], client, exercice, ids, hashes)
+
+            delta, positions = preparation['delta'], preparation['positions']
+            retirees = positions < 0
+
+            comptes_touches = set(delta['compte'].astype('int64').tolist())
+            if retirees.any():
+                ids_retires = [(int(i),) for i in ids[retirees]]
+                comptes_touches.update(self._comptes_of(conn, ids_retires))
+                conn.executemany("DELETE FROM ecritures WHERE id = ?", ids_retires)
+            # Les écritures inchangées prennent leur rang dans le nouvel export (ordre de clean_data)
+            conn.executemany("UPDATE ecritures SET ligne = ?, lettrage = ? WHERE id = ?", zip(
+                positions[~retirees].tolist(),
+                preparation['lettrages'],
+                ids[~retirees].tolist()
+            ))
+
+            conn.executemany(
+                "INSERT INTO ecritures (client, exercice, hash, compte, date, journal, piece,"
+                " libelle, lettrage, debit, credit, ligne) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._rows_of(delta, client, exercice)
+            )
+            self._refresh_soldes(conn, client, exercice, sorted(comptes_touches))
+
+            stats = {
+                'client': client,
+                'exercice': exercice,
+                'lignes': preparation['lignes'],
+                'ajoutees': len(delta),
+                'retirees': int(retirees.sum()),
+                'inchangees': preparation['inchangees'],
+            }
+            conn.execute(
+                "INSERT INTO imports (client, exercice, fichier, integre_le, lignes, ajoutees, retirees)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (client, exercice, Path(preparation['fichier']).name, datetime.now().isoformat(timespec='seconds'),
+                 stats['lignes'], stats['ajoutees'], stats['retirees'])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        logger.info(f"🗄️ Entrepôt {client} {exercice}: {stats['ajoutees']} écriture(s) ajoutée(s), "
+                    f"{stats['retirees']} retirée(s), {stats['inchangees']} inchangée(s)")
+        return stats
+
+    @staticmethod
+    def _comptes_of(conn: sqlite3.Connection, ids: List[tuple]) -> List[int]:
+        """Comptes des écritures données (avant leur suppression)"""
+        comptes = set()
+        for (ecriture_id,) in ids:
+            row = conn.execute("SELECT compte FROM ecritures WHERE id = ?", (ecriture_id,)).fetchone()
+            if row:
+                comptes.add(row[0])
+        return sorted(comptes)
+
+    @staticmethod
+    def _rows_of(delta: pd.DataFrame, client: str, exercice: int) -> List[tuple]:
+        """Lignes à insérer (dates ISO, montants en unités mineures)"""
+        dates = delta['date'].dt.strftime('%Y-%m-%d').astype(object)
+        dates = dates.where(delta['date'].notna(), None)
+        textes = {col: delta[col].astype(object).where(delta[col].notna(), None)
+                  for col in ('journal', 'piece', 'libelle', 'lettrage')}
+        return list(zip(
+            [client] * len(delta),
+            [exercice] * len(delta),
+            delta['hash'].to_numpy(dtype='uint64').view('int64').tolist(),
+            delta['compte'].astype('int64').tolist(),
+            dates.tolist(),
+            textes['journal'].tolist(),
+            textes['piece'].tolist(),
+            textes['libelle'].tolist(),
+            textes['lettrage'].tolist(),
+            delta['debit'].astype('int64').tolist(),
+            delta['credit'].astype('int64').tolist(),
+            delta['ligne'].astype('int64').tolist(),
+        ))
+
+    @staticmethod
+    def _refresh_soldes(conn: sqlite3.Connection, client: str, exercice: int, comptes: List[int]):
+        """Recalcule soldes mensuels et libellés des comptes touchés par l'ingestion"""
+        if not comptes:
+            return
+        marques = ", ".join("?" * len(comptes))
+        params = (client, exercice, *comptes)
+
+        conn.execute(f"DELETE FROM soldes_mensuels WHERE client = ? AND exercice = ? AND compte IN ({marques})",
+                     params)
+        conn.execute(
+            "INSERT INTO soldes_mensuels (client, exercice, compte, mois, debit, credit)"
+            f" SELECT client, exercice, compte, {_MOIS_SQL} AS mois, SUM(debit), SUM(credit)"
+            f" FROM ecritures WHERE client = ? AND exercice = ? AND compte IN ({marques})"
+            " GROUP BY compte, mois",
+            params
+        )
+
+        # Libellé de la première écriture du compte (ordre compte, date de clean_data)
+        conn.execute(f"DELETE FROM comptes WHERE client = ? AND exercice = ? AND compte IN ({marques})", params)
+        conn.execute(
+            "INSERT INTO comptes (client, exercice, compte, libelle)"
+            " SELECT client, exercice, compte, libelle FROM ("
+            "  SELECT client, exercice, compte, libelle, ROW_NUMBER() OVER ("
+            "   PARTITION BY compte ORDER BY date IS NULL, date, ligne) AS rang"
+            f"  FROM ecritures WHERE client = ? AND exercice = ? AND compte IN ({marques}))"
+            " WHERE rang = 1",
+            params
+        )
+
+    # ------------------------------------------------------------------
+    # Lectures
+    # ------------------------------------------------------------------
+
+    def clients(self) -> List[str]:
+        """Clients présents dans l'entrepôt"""
+        return [row[0] for row in self._fetch("SELECT DISTINCT client FROM ecritures ORDER BY client")]
+
+    def exercices(self, client: str) -> List[int]:
+        """Exercices disponibles pour un client (ordre croissant)"""
+        return [row[0] for row in self._fetch(
+            "SELECT DISTINCT exercice FROM soldes_mensuels WHERE client = ? ORDER BY exercice",
+            (client_key(client),)
+        )]
+
+    def ledger(self, client: str, exercice: int) -> pd.DataFrame:
+        """
+        Grand livre d'un exercice au format de sage_parser.clean_data
+
+        Le solde progressif n'est pas stocké (Sage le réécrit à chaque export):
+        il est recalculé par compte dans l'ordre du dernier export intégré.
+
+        Args:
+            client: Nom du client
+            exercice: Exercice
+
+        Returns:
+            DataFrame trié par compte et date (écritures non datées en fin de compte)
+        """
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(
+                "SELECT compte, date, journal, piece, libelle, lettrage, debit, credit, ligne FROM ecritures"
+                " WHERE client = ? AND exercice = ? ORDER BY compte, date IS NULL, date, ligne",
+                conn, params=(client_key(client), exercice)
+            )
+        finally:
+            conn.close()
+
+        df['compte'] = df['compte'].astype('Int64')
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+        for col in ('journal', 'piece', 'libelle', 'lettrage'):
+            df[col] = df[col].astype('str').mask(df[col].isna())
+        df['debit'] = df['debit'].astype('int64')
+        df['credit'] = df['credit'].astype('int64')
+        ordre_export = df.sort_values('ligne').index
+        mouvements = (df['debit'] - df['credit']).loc[ordre_export]
+        solde = mouvements.groupby(df['compte'].loc[ordre_export]).cumsum().astype('Int64')
+        df['solde'] = solde.mask(solde == 0)  # Sage laisse le solde vide quand il est nul
+        return df.drop(columns='ligne')
+
+    def monthly_balances(self, client: str, exercice: Optional[int] = None) -> pd.DataFrame:
+        """
+        Débits et crédits par compte et par mois (AAAAMM, 0 pour les écritures non datées)
+
+        Args:
+            client: Nom du client
+            exercice: Exercice (défaut: tous les exercices, pour les tendances)
+
+        Returns:
+            DataFrame (exercice, compte, mois, debit, credit)
+        """
+        query = "SELECT exercice, compte, mois, debit, credit FROM soldes_mensuels WHERE client = ?"
+        params: tuple = (client_key(client),)
+        if exercice is not None:
+            query += " AND exercice = ?"
+            params += (exercice,)
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(query + " ORDER BY exercice, compte, mois", conn, params=params)
+        finally:
+            conn.close()
+
+    def balance(self, client: str, exercice: int, mois_fin: Optional[int] = None) -> pd.DataFrame:
+        """
+        Balance d'un exercice au format de data_processor.calculate_balance
+
+        Args:
+            client: Nom du client
+            exercice: Exercice
+            mois_fin: Dernier mois inclus (1-12); défaut: tout l'exercice,
+                écritures non datées comprises
+
+        Returns:
+            DataFrame (compte, libelle, total_debit, total_credit, solde, solde_debiteur, solde_crediteur)
+        """
+        condition = "" if mois_fin is None else " AND s.mois BETWEEN 1 AND ?"
+        params: tuple = (client_key(client), exercice)
+        if mois_fin is not None:
+            params += (exercice * 100 + mois_fin,)
+
+        conn = self._connect()
+        try:
+            balance = pd.read_sql_query(
+                "SELECT s.compte, c.libelle, SUM(s.debit) AS total_debit, SUM(s.credit) AS total_credit"
+                " FROM soldes_mensuels s LEFT JOIN comptes c"
+                "  ON c.client = s.client AND c.exercice = s.exercice AND c.compte = s.compte"
+                f" WHERE s.client = ? AND s.exercice = ?{condition}"
+                " GROUP BY s.compte ORDER BY s.compte",
+                conn, params=params
+            )
+        finally:
+            conn.close()
+
+        balance['compte'] = balance['compte'].astype('Int64')
+        balance['libelle'] = balance['libelle'].astype('str').mask(balance['libelle'].isna())
+        balance['total_debit'] = balance['total_debit'].astype('int64')
+        balance['total_credit'] = balance['total_credit'].astype('int64')
+        balance['solde'] = balance['total_debit'] - balance['total_credit']
+        balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+        balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
+        return balance
+
+    def _fetch(self, query: str, params: tuple = ()) -> List[tuple]:
+        """Exécute une requête de lecture"""
+        conn = self._connect()
+        try:
+            return conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
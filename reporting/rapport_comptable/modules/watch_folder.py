@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Module 8: Surveillance d'un dossier d'exports Sage
+
+Détecte les fichiers TXT nouveaux ou modifiés dans un dossier partagé et les
+transmet à la file de génération (ReportDaemon) en mode sans interface.
+
+- Anti-rebond: un fichier n'est traité qu'une fois sa taille et sa date
+  de modification stables pendant `debounce` secondes (copie terminée)
+- Empreinte SHA-256: un contenu déjà traité n'est jamais régénéré, même
+  renommé ou recopié (registre .rapports_traites.json dans le dossier)
+- Client déduit du nom du fichier (data_processor.infer_client_from_filename)
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from modules.report_daemon import JobQueueFull
+from utils.output_manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 5.0
+DEFAULT_INTERVAL = 2.0
+STATE_FILE_NAME = ".rapports_traites.json"
+OUTPUT_DIR_NAME = "rapports"
+
+
+class FolderWatcher:
+    """
+    Surveillance par scrutation (sans dépendance externe, compatible partages réseau)
+
+    Chaque appel à poll() examine le dossier une fois; run_forever() le répète.
+    """
+
+    def __init__(self, folder: Path, daemon, debounce: float = DEFAULT_DEBOUNCE,
+                 output_dir: Optional[Path] = None,
+                 infer_client: Optional[Callable[[str], Optional[str]]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            folder: Dossier surveillé
+            daemon: File de génération (ReportDaemon: submit/get)
+            debounce: Délai de stabilité avant traitement (secondes)
+            output_dir: Dossier des rapports (défaut: <folder>/rapports)
+            infer_client: Fonction nom de fichier -> nom du client (optionnel)
+            clock: Horloge (injectable pour les tests)
+        """
+        self.folder = Path(folder)
+        self.daemon = daemon
+        self.debounce = debounce
+        self.output_dir = Path(output_dir) if output_dir else self.folder / OUTPUT_DIR_NAME
+        self.infer_client = infer_client
+        self.clock = clock
+        self.state_file = self.folder / STATE_FILE_NAME
+
+        # Fichier -> (taille, mtime, instant depuis lequel il est stable)
+        self._observed: Dict[Path, Tuple[int, int, float]] = {}
+        # Fichier -> signature (taille, mtime) déjà examinée
+        self._examined: Dict[Path, Tuple[int, int]] = {}
+        # job_id -> (empreinte, fichier)
+        self._pending: Dict[str, Tuple[str, Path]] = {}
+        self.processed: Dict[str, Dict] = self._load_state()
+
+    # ------------------------------------------------------------------
+    # Registre des contenus traités
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Dict]:
+        """Charge le registre des empreintes déjà traitées"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        """Enregistre le registre (écriture atomique)"""
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.processed, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    # ------------------------------------------------------------------
+    # Scrutation
+    # ------------------------------------------------------------------
+
+    def _candidates(self) -> List[Path]:
+        """Exports Sage présents dans le dossier (fichiers .txt, hors fichiers temporaires)"""
+        return sorted(
+            path for path in self.folder.iterdir()
+            if path.is_file() and path.suffix.lower() == '.txt'
+            and not path.name.startswith(('.', '~$'))
+        )
+
+    def _stable_files(self) -> List[Path]:
+        """Met à jour l'anti-rebond et retourne les fichiers stables non encore examinés"""
+        now = self.clock()
+        stable = []
+        present = set()
+
+        for path in self._candidates():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            present.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+
+            observed = self._observed.get(path)
+            if observed is None or observed[:2] != signature:
+                # Nouveau fichier ou encore en cours de copie
+                self._observed[path] = (*signature, now)
+                continue
+
+            if now - observed[2] >= self.debounce and self._examined.get(path) != signature:
+                stable.append(path)
+
+        # Oublier les fichiers supprimés
+        for path in set(self._observed) - present:
+            self._observed.pop(path, None)
+            self._examined.pop(path, None)
+
+        return stable
+
+    def _collect_finished_jobs(self):
+        """Enregistre les empreintes des jobs terminés avec succès"""
+        for job_id, (digest, path) in list(self._pending.items()):
+            job = self.daemon.get(job_id)
+            if job is None:
+                # Job oublié par la file avant d'avoir été relevé
+                del self._pending[job_id]
+                logger.warning(f"⚠️ Résultat du job {job_id} indisponible pour {path.name}")
+                continue
+            if job['status'] in ('en_attente', 'en_cours'):
+                continue
+
+            del self._pending[job_id]
+            if job['status'] == 'termine':
+                self.processed[digest] = {
+                    'fichier': path.name,
+                    'traite_le': datetime.now().isoformat(timespec='seconds'),
+                    'outputs': job['outputs'],
+                }
+                self._save_state()
+                logger.info(f"✅ Rapport généré pour {path.name}")
+            else:
+                logger.error(f"❌ Échec de la génération pour {path.name}: {job['error']}")
+
+    def poll(self) -> List[str]:
+        """
+        Examine le dossier une fois
+
+        Returns:
+            Identifiants des jobs soumis lors de ce passage
+        """
+        self._collect_finished_jobs()
+
+        pending_digests = {digest for digest, _ in self._pending.values()}
+        submitted = []
+
+        for path in self._stable_files():
+            stat = path.stat()
+            self._examined[path] = (stat.st_size, stat.st_mtime_ns)
+
+            digest = file_sha256(path)
+            if digest in self.processed or digest in pending_digests:
+                logger.info(f"⏭️  {path.name}: contenu déjà traité")
+                continue
+
+            request = {'fichier_sage': str(path), 'dossier_sortie': str(self.output_dir)}
+            client = self.infer_client(path.name) if self.infer_client else None
+            if client:
+                request['client'] = client
+
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                job = self.daemon.submit(request)
+            except JobQueueFull:
+                # Réessayer au prochain passage
+                self._examined.pop(path, None)
+                logger.warning(f"⚠️ File pleine, {path.name} sera soumis plus tard")
+                break
+            self._pending[job['job_id']] = (digest, path)
+            pending_digests.add(digest)
+            submitted.append(job['job_id'])
+            logger.info(f"📥 {path.name} mis en file (client: {client or 'mapping par défaut'})")
+
+        return submitted
+
+    def run_forever(self, interval: float = DEFAULT_INTERVAL):
+        """Scrute le dossier jusqu'à interruption (Ctrl+C)"""
+        logger.info(f"👀 Surveillance de {self.folder} (anti-rebond {self.debounce}s)")
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                # Un fichier illisible ne doit pas arrêter la surveillance
+                logger.error(f"❌ Erreur de surveillance: {e}", exc_info=True)
+            time.sleep(interval)
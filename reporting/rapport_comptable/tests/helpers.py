@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Utilitaires partagés par les tests unitaires
+"""
+
+
+def ligne_sage(compte, date, journal, piece, libelle, debit, credit, lettrage='', solde=''):
+    """Ligne d'export Sage (tabulations)"""
+    return '\t'.join([compte, date, journal, piece, libelle, lettrage, debit, credit, solde])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour l'index de balance et les annexes PowerPoint
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+from pptx import Presentation
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.data_processor import BalanceIndex
+from modules.ppt_generator import add_slides_annexes, split_annexe_rows
+
+
+class TestAnnexes:
+    """Tests pour l'index par préfixe de compte et le découpage des annexes"""
+
+    @pytest.fixture
+    def sample_balance(self):
+        """Fixture: balance au format de calculate_balance"""
+        return pd.DataFrame({
+            'compte': ['401100', '471000', '421000', '47', '521000', '401200', '4711'],
+            'libelle': ['Fournisseur A', 'Attente', 'Personnel', 'Débiteurs', 'Banque',
+                        'Fournisseur B', 'Attente 2'],
+            'total_debit': [0, 100, 0, 10, 500, 0, 20],
+            'total_credit': [300, 0, 50, 0, 0, 200, 0],
+            'solde': [-300, 100, -50, 10, 500, -200, 20],
+            'solde_debiteur': [0, 100, 0, 10, 500, 0, 20],
+            'solde_crediteur': [300, 0, 50, 0, 0, 200, 0],
+        })
+
+    def test_lookup_prefix(self, sample_balance):
+        """Un préfixe retourne tous les comptes de la plage, triés"""
+        index = BalanceIndex.from_balance(sample_balance)
+        comptes = [row[0] for row in index.lookup(['401'])]
+        assert comptes == ['401100', '401200']
+
+    def test_lookup_overlapping_prefixes(self, sample_balance):
+        """Des préfixes qui se recouvrent ne dupliquent pas les comptes"""
+        index = BalanceIndex.from_balance(sample_balance)
+        comptes = [row[0] for row in index.lookup(['471', '47', '42'])]
+        assert comptes == ['421000', '47', '471000', '4711']
+
+    def test_from_rows_skips_non_accounts(self):
+        """Les lignes de total et de filigrane de la feuille Excel sont ignorées"""
+        rows = [
+            ['401100', 'Fournisseur', 0, 300, None, None],
+            ['TOTAL GÉNÉRAL', None, 0, 300, None, None],
+            [None, None, None, None, None, None],
+        ]
+        index = BalanceIndex.from_rows(rows)
+        assert [row[0] for row in index.lookup(['4'])] == ['401100']
+
+    def test_split_annexe_rows(self):
+        """Le découpage respecte le nombre de lignes par slide"""
+        pages = split_annexe_rows(list(range(7)), 3)
+        assert pages == [[0, 1, 2], [3, 4, 5], [6]]
+        assert split_annexe_rows([], 3) == [[]]
+
+    def test_large_annexe_split_across_slides(self, monkeypatch):
+        """Une annexe trop longue occupe plusieurs slides"""
+        from config import AnnexeConfig
+        import modules.ppt_generator as ppt_generator
+
+        monkeypatch.setattr(ppt_generator, 'get_annexes_config',
+                            lambda: [AnnexeConfig("Annexe 1 : Fournisseurs", ["401"])])
+        monkeypatch.setattr(ppt_generator, 'get_annexe_lignes_par_slide', lambda: 4)
+
+        rows = [[f"401{i:03d}", f"Fournisseur {i}", 0, 100, 0, 100] for i in range(10)]
+        prs = Presentation()
+        add_slides_annexes(prs, balance_index=BalanceIndex(rows))
+
+        assert len(prs.slides) == 3
+        tables = [shape.table for slide in prs.slides for shape in slide.shapes if shape.has_table]
+        assert [len(table.rows) for table in tables] == [5, 5, 3]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
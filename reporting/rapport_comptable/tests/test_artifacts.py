@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour les artefacts intermédiaires (grand livre en colonnes, modèle des états)
+"""
+
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.artifacts import (
+    MODEL_STATEMENTS,
+    compute_model,
+    default_ledger_path,
+    default_model_path,
+    default_report_path,
+    load_ledger,
+    load_model,
+    save_ledger,
+    save_model,
+)
+
+
+@pytest.fixture
+def ledger():
+    """Fixture: grand livre nettoyé avec valeurs manquantes"""
+    return pd.DataFrame({
+        'compte': pd.array([40110000, 60100000, 70100000, None], dtype='Int64'),
+        'date': pd.to_datetime(['2025-01-10', '2025-02-15', '2025-03-31', None]),
+        'journal': ['AC', 'AC', 'VT', None],
+        'piece': ['AC001', 'AC001', 'VT001', 'OD001'],
+        'libelle': ['FOURNISSEUR', 'ACHATS', 'VENTES', 'DIVERS'],
+        'lettrage': ['', 'A', '', ''],
+        'debit': [0, 120050, 0, 1000],
+        'credit': [120050, 0, 300000, 0],
+        'solde': pd.array([-120050, 120050, -300000, None], dtype='Int64'),
+    }).astype({'journal': 'str', 'piece': 'str', 'libelle': 'str', 'lettrage': 'str'})
+
+
+class TestLedgerArtifact:
+    """Tests pour le grand livre enregistré en colonnes"""
+
+    def test_aller_retour(self, ledger, tmp_path):
+        """Le grand livre relu est identique (types et valeurs manquantes compris)"""
+        path = save_ledger(ledger, tmp_path / "gl.ledger.npz")
+
+        pd.testing.assert_frame_equal(load_ledger(path), ledger)
+
+    def test_ancien_format_decimal(self, ledger, tmp_path):
+        """Un grand livre enregistré avec des montants décimaux est relu en unités mineures"""
+        decimal = ledger.astype({'debit': 'float64', 'credit': 'float64', 'solde': 'float64'})
+        decimal[['debit', 'credit', 'solde']] /= 100
+        path = save_ledger(decimal, tmp_path / "gl.ledger.npz")
+
+        pd.testing.assert_frame_equal(load_ledger(path), ledger)
+
+    def test_format_non_supporte(self, ledger, tmp_path):
+        """Une extension inconnue est refusée"""
+        with pytest.raises(ValueError):
+            save_ledger(ledger, tmp_path / "gl.csv")
+
+    def test_chemins_par_defaut(self):
+        """Les artefacts sont nommés d'après le fichier source"""
+        ledger_path = default_ledger_path(Path("/data/GL NOV25.txt"))
+        model_path = default_model_path(ledger_path)
+
+        assert ledger_path == Path("/data/GL NOV25.ledger.npz")
+        assert model_path == Path("/data/GL NOV25.modele.json")
+        assert default_report_path(model_path, '.xlsx') == Path("/data/RAPPORT_GL NOV25.xlsx")
+
+
+class TestModelArtifact:
+    """Tests pour le modèle des états"""
+
+    def test_aller_retour(self, ledger, tmp_path):
+        """Le modèle relu donne les mêmes états que le calcul"""
+        model = compute_model(ledger.dropna(subset=['compte']))
+        path = save_model(model, tmp_path / "gl.modele.json", source={'client': 'CLIENT'})
+
+        loaded = load_model(path)
+
+        pd.testing.assert_frame_equal(loaded['balance'], model['balance'])
+        for name in MODEL_STATEMENTS:
+            assert loaded[name] == model[name]
+        assert loaded['source'] == {'client': 'CLIENT'}
+
+    def test_fichier_incompatible(self, tmp_path):
+        """Un JSON qui n'est pas un modèle est refusé"""
+        path = tmp_path / "autre.json"
+        path.write_text('{"format": "autre"}', encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            load_model(path)
+
+
+class TestStageCommands:
+    """Enchaînement des sous-commandes compute -> render-excel"""
+
+    def test_compute_txt_puis_render_excel(self, tmp_path, monkeypatch):
+        """compute sur un export TXT enregistre un grand livre relisible par render-excel"""
+        import main
+        from openpyxl import load_workbook
+
+        monkeypatch.setattr(main.security, 'security_check', lambda *args, **kwargs: (True, 'test'))
+        monkeypatch.setattr(main.security, 'log_report_generation', lambda **kwargs: None)
+
+        export = tmp_path / "gl.txt"
+        export.write_text('\n'.join('\t'.join(ligne) for ligne in [
+            ['70620000', '310125', 'VTE', 'F01', 'Loyer', '', '0', '1000', ''],
+            ['41110000', '310125', 'VTE', 'F01', 'Loyer', '', '1000', '0', ''],
+        ]) + '\n', encoding='ISO-8859-1')
+        parser = main.build_stage_parser()
+
+        assert main.run_stage_command(parser.parse_args(['compute', str(export)]))
+        modele = default_model_path(export)
+        assert load_model(modele)['source']['grand_livre'] == str(default_ledger_path(export).absolute())
+
+        assert main.run_stage_command(parser.parse_args(['render-excel', str(modele)]))
+        wb = load_workbook(default_report_path(modele, '.xlsx'), read_only=True)
+        assert "GL BI SEP" in wb.sheetnames
+
+    def test_rendus_d_un_modele_comptent_une_fois(self, tmp_path, monkeypatch):
+        """render-excel puis render-ppt (et un nouveau rendu) du même modèle: un seul rapport du quota"""
+        import main
+        from utils.usage_store import UsageStore
+
+        store = UsageStore(tmp_path / "usage.sqlite3")
+        monkeypatch.setattr(main.security, '_usage_store', store)
+        monkeypatch.setattr(main.security, 'setup_audit_log', lambda: tmp_path / "audit.jsonl")
+        monkeypatch.setattr(main.security, 'log_report_generation', lambda **kwargs: None)
+
+        export = tmp_path / "gl.txt"
+        export.write_text('\n'.join('\t'.join(ligne) for ligne in [
+            ['70620000', '310125', 'VTE', 'F01', 'Loyer', '', '0', '1000', ''],
+            ['41110000', '310125', 'VTE', 'F01', 'Loyer', '', '1000', '0', ''],
+        ]) + '\n', encoding='ISO-8859-1')
+        parser = main.build_stage_parser()
+        modele = str(default_model_path(export))
+
+        assert main.run_stage_command(parser.parse_args(['compute', str(export)]))
+        assert main.run_stage_command(parser.parse_args(['render-excel', modele]))
+        assert main.run_stage_command(parser.parse_args(['render-ppt', modele]))
+        assert main.run_stage_command(parser.parse_args(['render-excel', modele]))
+
+        assert store.get_count(main.security.get_current_username(),
+                               main.datetime.now().strftime("%Y-%m-%d")) == 1
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le journal d'audit asynchrone
+"""
+
+import gzip
+import json
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.audit_writer import AuditWriter
+from utils.file_lock import file_lock
+
+
+class TestAuditWriter:
+    """Tests pour l'écriture JSONL, le fsync groupé et la rotation mensuelle"""
+
+    def test_records_written_as_jsonl(self, tmp_path):
+        """Les enregistrements en file sont tous écrits à la fermeture"""
+        writer = AuditWriter(tmp_path, batch_size=2, flush_interval=10)
+        writer.start()
+        for i in range(5):
+            writer.write({'timestamp': '2025-09-15T10:00:00', 'event': 'TEST', 'n': i})
+        writer.close()
+
+        lines = (tmp_path / "audit_2025-09.jsonl").read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['n'] for line in lines] == [0, 1, 2, 3, 4]
+
+    def test_monthly_rotation_compresses_closed_month(self, tmp_path):
+        """Le passage à un nouveau mois compresse le journal du mois clos"""
+        writer = AuditWriter(tmp_path, batch_size=1)
+        writer.start()
+        writer.write({'timestamp': '2025-09-30T23:59:59', 'event': 'A'})
+        writer.write({'timestamp': '2025-10-01T00:00:01', 'event': 'B'})
+        writer.close()
+
+        assert not (tmp_path / "audit_2025-09.jsonl").exists()
+        with gzip.open(tmp_path / "audit_2025-09.jsonl.gz", 'rt', encoding='utf-8') as f:
+            assert json.loads(f.read())['event'] == 'A'
+
+    def test_write_before_start_is_kept(self, tmp_path):
+        """Un enregistrement mis en file avant le démarrage n'est pas perdu"""
+        writer = AuditWriter(tmp_path)
+        writer.write({'timestamp': '2025-09-15T10:00:00', 'event': 'EARLY'})
+        writer.start()
+        writer.close()
+
+        assert 'EARLY' in (tmp_path / "audit_2025-09.jsonl").read_text(encoding='utf-8')
+
+
+    def test_bad_record_skipped_alone(self, tmp_path):
+        """Un enregistrement non sérialisable est ignoré sans perdre le reste du lot"""
+        def echoue():
+            raise RuntimeError("valeur indisponible")
+
+        circulaire = {}
+        circulaire['self'] = circulaire
+        writer = AuditWriter(tmp_path, batch_size=10, flush_interval=10)
+        writer.start()
+        writer.write({'timestamp': '2025-09-15T10:00:00', 'event': 'A'})
+        writer.write({'timestamp': '2025-09-15T10:00:01', 'event': 'B', 'valeur': echoue})
+        writer.write({'timestamp': '2025-09-15T10:00:02', 'event': 'C', 'valeur': circulaire})
+        writer.write({'timestamp': '2025-09-15T10:00:03', 'event': 'D'})
+        writer.close()
+
+        lines = (tmp_path / "audit_2025-09.jsonl").read_text(encoding='utf-8').splitlines()
+        assert [json.loads(line)['event'] for line in lines] == ['A', 'D']
+
+    def test_closed_month_compressed_once(self, tmp_path):
+        """Un mois déjà compressé n'est pas réécrit dans son .gz"""
+        (tmp_path / "audit_2025-09.jsonl").write_text('{"event": "A"}\n', encoding='utf-8')
+        AuditWriter(tmp_path)._compress_closed_months(current_month="2025-10")
+        (tmp_path / "audit_2025-09.jsonl").write_text('{"event": "A"}\n', encoding='utf-8')
+        AuditWriter(tmp_path)._compress_closed_months(current_month="2025-10")
+
+        with gzip.open(tmp_path / "audit_2025-09.jsonl.gz", 'rt', encoding='utf-8') as f:
+            assert f.read().splitlines() == ['{"event": "A"}']
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["audit_2025-09.jsonl", "audit_2025-09.jsonl.gz"]
+
+    def test_compression_skipped_while_locked(self, tmp_path):
+        """Pendant qu'un autre processus compresse, les mois clos ne sont pas touchés"""
+        (tmp_path / "audit_2025-09.jsonl").write_text('{"event": "A"}\n', encoding='utf-8')
+        with file_lock(tmp_path / ".compression.lock"):
+            AuditWriter(tmp_path)._compress_closed_months(current_month="2025-10")
+
+        assert (tmp_path / "audit_2025-09.jsonl").exists()
+        assert not (tmp_path / "audit_2025-09.jsonl.gz").exists()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
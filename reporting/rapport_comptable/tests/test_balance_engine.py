@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour la balance à six colonnes, l'index cumulé et l'arbre des comptes
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.data_processor import (
+    calculate_balance, calculate_balance_six_colonnes, CumulativeLedgerIndex,
+    AccountHierarchy, match_accounts_by_radicals
+)
+
+
+class TestBalanceSixColonnes:
+    """Tests pour la balance ouverture / mouvements / clôture"""
+
+    @pytest.fixture
+    def sample_ledger(self):
+        """Fixture: grand livre au format de sage_parser.clean_data"""
+        return pd.DataFrame({
+            'compte': pd.array([101, 101, 401, 401, 401, 512, 512, 512, 607], dtype='Int64'),
+            'date': pd.to_datetime(['2025-01-01', '2025-03-15', '2025-01-01', '2025-02-10',
+                                    '2025-04-20', '2025-02-10', '2025-03-15', None, '2025-04-20']),
+            'journal': ['RAN', 'OD', 'RAN', 'ACH', 'BQE', 'BQE', 'OD', 'BQE', 'ACH'],
+            'libelle': ['Capital', 'Capital', 'Fournisseur', 'Fournisseur', 'Fournisseur',
+                        'Banque', 'Banque', 'Banque', 'Achats'],
+            'debit': [0, 0, 0, 0, 300, 200, 50, 10, 300],
+            'credit': [1000, 50, 400, 200, 0, 0, 0, 0, 0],
+        })
+
+    def test_ran_en_ouverture(self, sample_ledger):
+        """Les reports à nouveau forment le solde d'ouverture, le reste les mouvements"""
+        balance = calculate_balance_six_colonnes(sample_ledger).set_index('compte')
+
+        assert balance.loc[101, 'ouverture_credit'] == 1000
+        assert balance.loc[101, 'mouvement_credit'] == 50
+        assert balance.loc[101, 'cloture_credit'] == 1050
+        assert balance.loc[401, 'ouverture_credit'] == 400
+        assert balance.loc[401, 'cloture_credit'] == 300
+        assert balance.loc[607, 'ouverture_debit'] == 0
+        assert balance.loc[607, 'cloture_debit'] == 300
+
+    def test_cloture_egale_calculate_balance(self, sample_ledger):
+        """Sans période, le solde de clôture est celui de calculate_balance"""
+        balance = calculate_balance(sample_ledger)
+        six = calculate_balance_six_colonnes(sample_ledger)
+
+        assert np.allclose(balance['solde'], six['cloture_debit'] - six['cloture_credit'])
+
+    def test_periode(self, sample_ledger):
+        """Les écritures antérieures passent en ouverture, les postérieures sont exclues"""
+        balance = calculate_balance_six_colonnes(
+            sample_ledger, date_debut='2025-03-01', date_fin='2025-03-31'
+        ).set_index('compte')
+
+        assert balance.loc[512, 'ouverture_debit'] == 200
+        assert balance.loc[512, 'mouvement_debit'] == 50
+        assert balance.loc[401, 'ouverture_credit'] == 600
+        assert balance.loc[401, 'mouvement_debit'] == 0
+        assert balance.loc[607, 'cloture_debit'] == 0
+
+    @pytest.mark.parametrize('date_debut,date_fin', [
+        (None, None),
+        ('2025-03-01', '2025-03-31'),
+        ('2025-02-10', '2025-02-10'),
+        ('2024-01-01', '2026-12-31'),
+        (None, '2025-02-28'),
+        ('2025-04-01', None),
+        ('2026-01-01', None),
+        (None, '2024-12-31'),
+    ])
+    def test_index_egal_groupby(self, sample_ledger, date_debut, date_fin):
+        """L'index cumulé donne la même balance que le groupby, pour toute période"""
+        index = CumulativeLedgerIndex.from_ledger(sample_ledger)
+
+        attendu = calculate_balance_six_colonnes(sample_ledger, date_debut, date_fin)
+        obtenu = index.balance_periode(date_debut, date_fin)
+
+        pd.testing.assert_frame_equal(attendu, obtenu, check_dtype=False)
+
+    def test_ecritures_non_datees(self, sample_ledger):
+        """Une écriture sans date n'est comptée que pour une période ouverte"""
+        index = CumulativeLedgerIndex.from_ledger(sample_ledger)
+
+        assert index.balance_periode().set_index('compte').loc[512, 'mouvement_debit'] == 260
+        assert index.balance_periode(date_fin='2025-12-31').set_index('compte').loc[512, 'mouvement_debit'] == 250
+
+    def test_balance_au(self, sample_ledger):
+        """La balance à une date est celle du grand livre arrêté à cette date"""
+        index = CumulativeLedgerIndex.from_ledger(sample_ledger)
+
+        arrete = sample_ledger[(sample_ledger['journal'] == 'RAN')
+                               | (sample_ledger['date'] <= '2025-03-15')]
+        attendu = calculate_balance(arrete).set_index('compte')
+        obtenu = index.balance_au('2025-03-15').set_index('compte')
+
+        for compte in attendu.index:
+            assert obtenu.loc[compte, 'total_debit'] == attendu.loc[compte, 'total_debit']
+            assert obtenu.loc[compte, 'total_credit'] == attendu.loc[compte, 'total_credit']
+            assert obtenu.loc[compte, 'solde'] == attendu.loc[compte, 'solde']
+        assert obtenu.loc[607, 'solde'] == 0
+
+    def test_soldes_fin_de_mois(self, sample_ledger):
+        """Les douze soldes de fin de mois sont ceux des balances à date"""
+        index = CumulativeLedgerIndex.from_ledger(sample_ledger)
+        soldes = index.soldes_fin_de_mois().set_index('compte')
+
+        assert list(soldes.columns[1:]) == ['Janvier', 'Février', 'Mars', 'Avril', 'Mai', 'Juin',
+                                            'Juillet', 'Août', 'Septembre', 'Octobre',
+                                            'Novembre', 'Décembre']
+        assert soldes.loc[401, 'Janvier'] == -400
+        assert soldes.loc[401, 'Février'] == -600
+        assert soldes.loc[401, 'Avril'] == -300
+        assert soldes.loc[512, 'Mars'] == 250
+        # Écriture non datée: hors fins de mois
+        assert soldes.loc[512, 'Décembre'] == 250
+        assert np.allclose(soldes['Mars'], index.balance_au('2025-03-31').set_index('compte')['solde'])
+
+
+    def test_classeur(self, sample_ledger):
+        """La feuille BG 6 COLONNES reprend la balance en FCFA avec une ligne de total"""
+        from modules.excel_generator import create_balance_six_colonnes_workbook
+
+        balance = calculate_balance_six_colonnes(sample_ledger, '2025-02-01', '2025-03-31')
+        ws = create_balance_six_colonnes_workbook(balance, "du 01/02/2025 au 31/03/2025")["BG 6 COLONNES"]
+
+        assert ws["A1"].value == "Balance du 01/02/2025 au 31/03/2025"
+        assert [ws.cell(row=3, column=col).value for col in range(1, 9)] == [101, 'Capital', 0, 10, 0, 0.5, 0, 10.5]
+        assert ws.cell(row=3 + len(balance), column=2).value == "TOTAL GÉNÉRAL"
+        assert ws.cell(row=3 + len(balance), column=8).value == f"=SUM(H3:H{2 + len(balance)})"
+
+    def test_sous_commande(self, tmp_path, monkeypatch):
+        """python main.py balance <export> --du --au écrit le classeur de la période"""
+        import main
+        from openpyxl import load_workbook
+
+        monkeypatch.setattr(main.security, 'security_check', lambda *args, **kwargs: (True, 'test'))
+        monkeypatch.setattr(main.security, 'log_report_generation', lambda **kwargs: None)
+        export = tmp_path / "gl.txt"
+        export.write_text('\n'.join('\t'.join(ligne) for ligne in [
+            ['70620000', '310125', 'VTE', 'F01', 'Loyer', '', '0', '1000', ''],
+            ['41110000', '310125', 'VTE', 'F01', 'Loyer', '', '1000', '0', ''],
+            ['41110000', '150225', 'BQE', 'B01', 'Encaissement', '', '0', '1000', ''],
+            ['52110000', '150225', 'BQE', 'B01', 'Encaissement', '', '1000', '0', ''],
+        ]) + '\n', encoding='ISO-8859-1')
+
+        args = main.build_stage_parser().parse_args(['balance', str(export), '--du', '01/02/2025'])
+        assert main.run_stage_command(args)
+
+        wb = load_workbook(tmp_path / "BALANCE_gl.xlsx", read_only=True)
+        assert wb.sheetnames == ["BG BI SEP", "BG 6 COLONNES"]
+        lignes = {row[0]: row[2:] for row in wb["BG 6 COLONNES"].iter_rows(min_row=3, values_only=True) if row[0]}
+        assert lignes[41110000] == (1000, 0, 0, 1000, 0, 0)
+        assert lignes[52110000] == (0, 0, 1000, 0, 1000, 0)
+
+    def test_sous_commande_fins_de_mois(self, sample_ledger, tmp_path, monkeypatch):
+        """--au et --fins-de-mois: balance générale à la date et soldes mensuels de l'exercice"""
+        import main
+        from modules.artifacts import save_ledger
+        from openpyxl import load_workbook
+
+        monkeypatch.setattr(main.security, 'security_check', lambda *args, **kwargs: (True, 'test'))
+        monkeypatch.setattr(main.security, 'log_report_generation', lambda **kwargs: None)
+        sample_ledger = sample_ledger.assign(piece='P', lettrage='', solde=0).astype({'libelle': 'str'})
+        grand_livre = save_ledger(sample_ledger, tmp_path / "gl.ledger.npz")
+
+        args = main.build_stage_parser().parse_args(['balance', str(grand_livre), '--au', '2025-03-31',
+                                                     '--fins-de-mois'])
+        assert main.run_stage_command(args)
+
+        wb = load_workbook(tmp_path / "BALANCE_gl.xlsx", read_only=True)
+        assert wb.sheetnames == ["BG BI SEP", "BG 6 COLONNES", "SOLDES MENSUELS"]
+        generale = {row[0]: row[2:4] for row in wb["BG BI SEP"].iter_rows(min_row=4, values_only=True)}
+        assert generale[401] == (0, 6)  # reports à nouveau compris, écriture d'avril exclue
+        soldes = {row[0]: row[2:] for row in wb["SOLDES MENSUELS"].iter_rows(min_row=2, values_only=True)}
+        assert soldes[512][:4] == (0, 2, 2.5, 2.5)
+
+
+class TestAccountHierarchy:
+    """Tests pour l'arbre des comptes et ses totaux par radical"""
+
+    @pytest.fixture
+    def sample_balance(self):
+        """Fixture: balance au format de calculate_balance"""
+        balance = pd.DataFrame({
+            'compte': pd.array([40110000, 40120000, 40910000, 47100000, 47200000,
+                                52110000, 52120000, 60110000, 70110000], dtype='Int64'),
+            'libelle': ['Fournisseur A', 'Fournisseur B', 'Avances', 'Attente', 'Attente 2',
+                        'Banque A', 'Banque B', 'Achats', 'Ventes'],
+            'total_debit': [100.0, 0.0, 80.0, 40.0, 0.0, 500.0, 0.0, 300.0, 0.0],
+            'total_credit': [0.0, 250.0, 0.0, 0.0, 15.0, 0.0, 120.0, 0.0, 900.0],
+        })
+        balance['solde'] = balance['total_debit'] - balance['total_credit']
+        balance['solde_debiteur'] = balance['solde'].clip(lower=0)
+        balance['solde_crediteur'] = (-balance['solde']).clip(lower=0)
+        return balance
+
+    def test_totaux_par_niveau(self, sample_balance):
+        """Chaque niveau (classe, 2, 3, 4 chiffres, compte) porte le total de ses comptes"""
+        hierarchie = AccountHierarchy.from_balance(sample_balance)
+
+        assert hierarchie.total('4') == -45
+        assert hierarchie.total('40') == -70
+        assert hierarchie.total('401') == -150
+        assert hierarchie.total('4012') == -250
+        assert hierarchie.total('40120000') == -250
+        assert hierarchie.total('4', 'total_debit') == 220
+        assert hierarchie.total('8') == 0
+
+    def test_radical_long(self, sample_balance):
+        """Un radical de plus de quatre chiffres est retrouvé par recherche dichotomique"""
+        hierarchie = AccountHierarchy.from_balance(sample_balance)
+
+        assert hierarchie.total('52110') == 500
+        assert hierarchie.total('5211000') == 500
+        assert hierarchie.total('52130') == 0
+
+    def test_somme_recouvrement_et_exclusions(self, sample_balance):
+        """Les radicaux imbriqués ne sont comptés qu'une fois, les exclusions sont déduites"""
+        hierarchie = AccountHierarchy.from_balance(sample_balance)
+
+        assert hierarchie.somme(['47', '471']) == 25
+        assert hierarchie.somme(['40'], ['409']) == -150
+        assert hierarchie.somme(['4091'], ['409']) == 0
+        assert hierarchie.somme([]) == 0
+
+    @pytest.mark.parametrize('radicaux,exclusions,condition', [
+        (['40'], ['409'], 'POSITIF'),
+        (['40'], ['409'], 'NEGATIF'),
+        (['52', '47'], [], 'POSITIF'),
+        (['52', '47'], [], 'NEGATIF'),
+        (['4', '40'], ['4012'], ''),
+        (['6', '7'], [], ''),
+    ])
+    def test_solde_regle_egal_match(self, sample_balance, radicaux, exclusions, condition):
+        """Le solde d'une règle est celui des comptes retenus par match_accounts_by_radicals"""
+        hierarchie = AccountHierarchy.from_balance(sample_balance)
+
+        attendu = match_accounts_by_radicals(sample_balance, radicaux, exclusions, condition)['solde'].sum()
+
+        assert hierarchie.solde_regle(radicaux, exclusions, condition) == attendu
+
+    def test_valeurs_mensuelles(self):
+        """L'arbre agrège aussi des vecteurs de montants (ex: débits mensuels)"""
+        hierarchie = AccountHierarchy(['60110000', '60120000', '61000000'],
+                                      [[10, 0], [5, 7], [1, 1]], ['debit_1', 'debit_2'])
+
+        assert hierarchie.total('60', 'debit_1') == 15
+        assert hierarchie.total('6', 'debit_2') == 8
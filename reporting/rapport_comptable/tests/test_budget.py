@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le budget prévisionnel du suivi d'activité
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.budget import add_budget, compare_budget, load_budget
+from modules.excel_generator import add_suivi_activite_sheet
+
+
+@pytest.fixture
+def suivi():
+    """Fixture: suivi d'activité (unités mineures, charges négatives) réalisé jusqu'en mars"""
+    return {
+        'personnel': [{'libelle': 'Salaires', 'ordre': 1,
+                       'mois_data': {'Janvier': -300000, 'Février': -300000, 'Mars': -300000}}],
+        'charges': [{'libelle': 'Impôts et taxes', 'ordre': 2,
+                     'mois_data': {'Janvier': -50000, 'Mars': -20000}}],
+        'produits': [{'libelle': 'Loyers', 'ordre': 1,
+                      'mois_data': {'Janvier': 1000000, 'Février': 1000000, 'Mars': 1200000}}],
+    }
+
+
+@pytest.fixture
+def budget_csv(tmp_path):
+    """Fixture: budget multi-clients au format CSV (séparateur ';', virgule décimale)"""
+    path = tmp_path / "budget.csv"
+    path.write_text(
+        "Client;Catégorie;Mois;Montant;Section\n"
+        "BAMBOO IMMO;Salaires;1;3000;\n"
+        "BAMBOO IMMO;Salaires;Février;3000;\n"
+        "BAMBOO IMMO;Salaires;2025-03;3000;\n"
+        "BAMBOO IMMO;Salaires;4;3000;\n"
+        "Bamboo Immo;IMPOTS ET TAXES;1;400,50;\n"
+        "BAMBOO IMMO;Loyers;1;9000;\n"
+        "BAMBOO IMMO;Loyers;3;9000;\n"
+        "BAMBOO IMMO;Honoraires;2;800;charges\n"
+        "BAMBOO IMMO;Inconnue;2;100;\n"
+        "AUTRE CLIENT;Loyers;1;99999;\n",
+        encoding='utf-8'
+    )
+    return path
+
+
+class TestBudget:
+    """Tests pour la lecture du budget et l'écart au budget"""
+
+    def test_lecture_csv(self, budget_csv):
+        """Seules les lignes du client sont lues; mois et montants sont normalisés"""
+        budget = load_budget(budget_csv, "bamboo immo", chunk_size=3)
+
+        salaires = budget[budget['cle'] == 'SALAIRES']
+        assert salaires['mois'].tolist() == [1, 2, 3, 4]
+        assert salaires['budget'].tolist() == [300000] * 4
+        assert budget.loc[budget['cle'] == 'IMPOTS ET TAXES', 'budget'].item() == 40050
+        assert budget.loc[budget['cle'] == 'LOYERS', 'budget'].sum() == 1800000
+
+    def test_lecture_xlsx(self, budget_csv, tmp_path):
+        """Le classeur XLSX donne le même budget que le CSV"""
+        wb = Workbook()
+        ws = wb.active
+        for ligne in budget_csv.read_text(encoding='utf-8').splitlines():
+            valeurs = ligne.split(';')
+            ws.append(valeurs[:3] + [valeurs[3].replace(',', '.')] + valeurs[4:])
+        xlsx = tmp_path / "budget.xlsx"
+        wb.save(xlsx)
+
+        pd.testing.assert_frame_equal(load_budget(xlsx, "BAMBOO IMMO"), load_budget(budget_csv, "BAMBOO IMMO"))
+
+    def test_colonnes_manquantes(self, tmp_path):
+        """Un budget sans colonne montant est refusé"""
+        path = tmp_path / "budget.csv"
+        path.write_text("client,categorie,mois\nX,Y,1\n", encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            load_budget(path, "X")
+
+    def test_comparaison_mensuelle(self, suivi, budget_csv):
+        """Budget des charges dans le signe du suivi; écart positif = favorable"""
+        comparaison = compare_budget(suivi, load_budget(budget_csv, "BAMBOO IMMO"))
+        ligne = comparaison.set_index(['libelle', 'mois'])
+
+        assert ligne.loc[('Salaires', 1), 'budget'] == -300000
+        assert ligne.loc[('Impôts et taxes', 1), 'ecart'] == -50000 + 40050
+        assert ligne.loc[('Loyers', 2), 'ecart'] == 1000000
+        assert ligne.loc[('Honoraires', 2), 'section'] == 'charges'
+
+    def test_budget_cumule(self, suivi, budget_csv):
+        """Budget cumulé jusqu'au dernier mois réalisé; catégorie budgétée sans réalisé ajoutée"""
+        add_budget(suivi, load_budget(budget_csv, "BAMBOO IMMO"))
+
+        assert suivi['personnel'][0]['budget'] == -900000
+        assert suivi['charges'][0]['budget'] == -40050
+        assert suivi['charges'][1]['libelle'] == 'Honoraires'
+        assert suivi['charges'][1]['budget'] == -80000
+        assert suivi['produits'][0]['budget'] == 1800000
+        assert all(c['libelle'] != 'Inconnue' for section in suivi.values() for c in section)
+
+    def test_colonne_excel(self, suivi):
+        """La feuille SUIVI ACTIVITE écrit le budget en colonne D"""
+        suivi['charges'][0]['budget'] = -40050
+        df = pd.DataFrame({'date': pd.to_datetime(['2025-01-15', '2025-03-10'])})
+        wb = Workbook()
+        add_suivi_activite_sheet(wb, df, suivi_data=suivi)
+        ws = wb["SUIVI ACTIVITE"]
+
+        assert ws["B8"].value.strip() == 'Impôts et taxes'
+        assert ws["D8"].value == -40050
+        assert ws["D9"].value == "=D8"
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour la consolidation multi-entités
+"""
+
+import json
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.consolidation import apply_eliminations, consolidate, load_eliminations, parse_entity_spec
+from modules.data_processor import generate_cr_synthetique
+from modules.excel_generator import create_consolidation_workbook
+from tests.helpers import ligne_sage
+
+
+@pytest.fixture
+def exports(tmp_path):
+    """Fixture: exports de deux entités liées (loyer facturé par A à B, avance de B à A)"""
+    bimmo = tmp_path / "gl_bimmo.txt"
+    bimmo.write_text('\n'.join([
+        ligne_sage('45110000', '310125', 'VTE', 'F01', 'Loyer MIMMO', '1000', '0'),
+        ligne_sage('70620000', '310125', 'VTE', 'F01', 'Loyer MIMMO', '0', '1000'),
+        ligne_sage('52110000', '150225', 'BQE', 'B01', 'Avance MIMMO', '300', '0'),
+        ligne_sage('46210000', '150225', 'BQE', 'B01', 'Avance MIMMO', '0', '300'),
+    ]) + '\n', encoding='ISO-8859-1')
+    mimmo = tmp_path / "gl_mimmo.txt"
+    mimmo.write_text('\n'.join([
+        ligne_sage('62220000', '310125', 'ACH', 'F01', 'Loyer BIMMO', '1000', '0'),
+        ligne_sage('45210000', '310125', 'ACH', 'F01', 'Loyer BIMMO', '0', '1000'),
+        ligne_sage('46110000', '150225', 'BQE', 'B01', 'Avance BIMMO', '250', '0'),
+        ligne_sage('52110000', '150225', 'BQE', 'B01', 'Avance BIMMO', '0', '250'),
+    ]) + '\n', encoding='ISO-8859-1')
+    return [("BIMMO", bimmo), ("MIMMO", mimmo)]
+
+
+@pytest.fixture
+def eliminations():
+    """Fixture: paires intragroupe (soldes de même sens, créance/dette, produit/charge, avance avec écart)"""
+    return [
+        {'entite_a': 'BIMMO', 'compte_a': '5211', 'entite_b': 'MIMMO', 'compte_b': '6222'},
+        {'entite_a': 'BIMMO', 'compte_a': '4511', 'entite_b': 'MIMMO', 'compte_b': '4521'},
+        {'entite_a': 'BIMMO', 'compte_a': '7062', 'entite_b': 'MIMMO', 'compte_b': '6222'},
+        {'entite_a': 'BIMMO', 'compte_a': '4621', 'entite_b': 'MIMMO', 'compte_b': '4611'},
+    ]
+
+
+class TestConsolidation:
+    """Tests pour les éliminations et les états combinés"""
+
+    def test_sans_elimination(self, exports, tmp_path):
+        """Sans élimination, la balance combinée est la somme des balances des entités"""
+        resultat = consolidate(exports, db_path=tmp_path / "entrepot.sqlite3")
+        balance = resultat['balance'].set_index('compte')
+
+        assert list(resultat['entites']) == ["BIMMO", "MIMMO"]
+        assert balance.loc[52110000, 'solde'] == 30000 - 25000
+        assert resultat['compte_resultat']['resultat'] == sum(
+            infos['resultat'] for infos in resultat['entites'].values()
+        )
+
+    def test_eliminations(self, exports, eliminations, tmp_path):
+        """Les soldes réciproques disparaissent; l'écart reste et est signalé"""
+        resultat = consolidate(exports, eliminations, db_path=tmp_path / "entrepot.sqlite3")
+        balance = resultat['balance'].set_index('compte')
+        rapport = resultat['eliminations']
+
+        assert balance.loc[[45110000, 45210000, 70620000, 62220000], 'solde'].tolist() == [0, 0, 0, 0]
+        assert balance.loc[46210000, 'solde'] == -5000
+        assert balance.loc[46110000, 'solde'] == 0
+        assert rapport['statut'].tolist() == ["soldes de même sens", "éliminé", "éliminé", "écart"]
+        assert rapport['elimine'].tolist() == [0, 100000, 100000, 25000]
+        assert rapport['ecart'].tolist() == [30000 - 100000, 0, 0, 5000]
+        # Produit et charge éliminés du même montant: résultat combiné inchangé
+        assert resultat['compte_resultat']['resultat'] == 0
+
+    def test_balances_non_modifiees(self, exports, eliminations, tmp_path):
+        """Les éliminations s'appliquent à des copies des balances des entités"""
+        resultat = consolidate(exports, eliminations, db_path=tmp_path / "entrepot.sqlite3")
+        bimmo = resultat['entites']['BIMMO']['balance'].set_index('compte')
+
+        assert bimmo.loc[45110000, 'solde'] == 100000
+        assert generate_cr_synthetique(resultat['entites']['BIMMO']['balance'])['resultat'] == 100000
+
+    def test_reutilisation_entrepot(self, exports, eliminations, tmp_path):
+        """Une fois intégrées, les entités sont relues depuis l'entrepôt sans leurs exports"""
+        db_path = tmp_path / "entrepot.sqlite3"
+        premier = consolidate(exports, eliminations, db_path=db_path)
+        second = consolidate([("bimmo", None), ("MIMMO", None)], eliminations, db_path=db_path)
+
+        assert second['balance'].equals(premier['balance'])
+        with pytest.raises(ValueError):
+            consolidate([("BIMMO", None), ("ABSENTE", None)], db_path=db_path)
+
+    def test_entite_absente_des_paires(self, exports, tmp_path):
+        """Une paire visant une entité hors périmètre est signalée, sans élimination"""
+        balances = {nom: infos['balance'] for nom, infos in
+                    consolidate(exports, db_path=tmp_path / "e.sqlite3")['entites'].items()}
+        _, rapport = apply_eliminations(balances, [
+            {'entite_a': 'BIMMO', 'compte_a': '4511', 'entite_b': 'AUTRE', 'compte_b': '4521'}
+        ])
+
+        assert rapport['statut'].item() == "entité absente: AUTRE"
+
+    def test_lecture_eliminations(self, tmp_path):
+        """Paires lues en CSV ou JSON; entités normalisées; colonne manquante refusée"""
+        csv_path = tmp_path / "elim.csv"
+        csv_path.write_text("Entite_A;Compte_A;Entite_B;Compte_B\nbimmo ;4511;Mimmo;4521\n", encoding='utf-8')
+        json_path = tmp_path / "elim.json"
+        json_path.write_text(json.dumps([{'entite_a': 'BIMMO', 'compte_a': 4511,
+                                          'entite_b': 'MIMMO', 'compte_b': 4521}]), encoding='utf-8')
+        invalide = tmp_path / "invalide.csv"
+        invalide.write_text("entite_a,compte_a,entite_b\nBIMMO,4511,MIMMO\n", encoding='utf-8')
+
+        assert load_eliminations(csv_path) == load_eliminations(json_path) == [
+            {'entite_a': 'BIMMO', 'compte_a': '4511', 'entite_b': 'MIMMO', 'compte_b': '4521'}
+        ]
+        with pytest.raises(ValueError):
+            load_eliminations(invalide)
+        assert parse_entity_spec("Bamboo  Immo=gl.txt") == ("BAMBOO IMMO", Path("gl.txt"))
+        assert parse_entity_spec("MIMMO") == ("MIMMO", None)
+
+    def test_classeur(self, exports, eliminations, tmp_path):
+        """Le classeur consolidé contient le périmètre, les éliminations et les états"""
+        wb = create_consolidation_workbook(
+            consolidate(exports, eliminations, db_path=tmp_path / "entrepot.sqlite3")
+        )
+        ws = wb["CONSOLIDATION"]
+
+        assert wb.sheetnames == ["CONSOLIDATION", "BG BI SEP", "BILAN SYNTH", "CR SYNTH", "SIG"]
+        assert (ws["A3"].value, ws["D3"].value) == ("BIMMO", 1000)
+        assert ws["I8"].value == "soldes de même sens"
+        assert ws["I11"].value == "écart"
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le verrou inter-processus par fichier
+"""
+
+import os
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.file_lock import file_lock
+
+
+class TestFileLock:
+    """Tests pour l'exclusion, l'attente bornée et la reprise des verrous abandonnés"""
+
+    def test_exclusif(self, tmp_path):
+        """Un second détenteur attend puis échoue; le verrou est supprimé à la sortie"""
+        lock = tmp_path / ".test.lock"
+        with file_lock(lock):
+            assert lock.exists()
+            with pytest.raises(TimeoutError):
+                with file_lock(lock, timeout=0.1):
+                    pass
+        assert not lock.exists()
+
+    def test_verrou_abandonne(self, tmp_path):
+        """Un verrou plus ancien que stale_after est repris"""
+        lock = tmp_path / ".test.lock"
+        lock.write_text("12345")
+        os.utime(lock, (0, 0))
+
+        with file_lock(lock, timeout=0):
+            assert lock.read_text() == str(os.getpid())
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
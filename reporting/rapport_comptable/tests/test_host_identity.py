@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour l'identité du poste mise en cache
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import host_identity
+from utils.host_identity import collect_host_identity
+
+
+class TestHostIdentity:
+    """Tests pour la collecte locale et le cache avec TTL"""
+
+    @pytest.fixture(autouse=True)
+    def reset_cache(self, monkeypatch):
+        """Fixture: cache mémoire vide et collecte comptée"""
+        monkeypatch.setattr(host_identity, '_cache', None)
+        self.collectes = 0
+
+        def fake_collect():
+            self.collectes += 1
+            return {'hostname': 'poste', 'ips': ['10.0.0.2'], 'collected_at': host_identity.time.time()}
+
+        monkeypatch.setattr(host_identity, 'collect_host_identity', fake_collect)
+
+    def test_cached_within_ttl(self, tmp_path):
+        """L'identité n'est collectée qu'une fois tant que le cache est valide"""
+        cache_file = tmp_path / "host_identity.json"
+        host_identity.get_host_identity(cache_file=cache_file)
+        host_identity.get_host_identity(cache_file=cache_file)
+
+        assert self.collectes == 1
+        assert cache_file.exists()
+
+    def test_disk_cache_reused(self, tmp_path, monkeypatch):
+        """Un nouveau processus relit le cache disque au lieu de collecter"""
+        cache_file = tmp_path / "host_identity.json"
+        host_identity.get_host_identity(cache_file=cache_file)
+        monkeypatch.setattr(host_identity, '_cache', None)
+
+        identity = host_identity.get_host_identity(cache_file=cache_file)
+        assert self.collectes == 1
+        assert identity['ips'] == ['10.0.0.2']
+
+    def test_expired_cache_refreshed(self, tmp_path):
+        """Un cache expiré déclenche une nouvelle collecte"""
+        cache_file = tmp_path / "host_identity.json"
+        host_identity.get_host_identity(cache_file=cache_file)
+        host_identity.get_host_identity(ttl=-1, cache_file=cache_file)
+
+        assert self.collectes == 2
+
+    def test_collect_excludes_loopback(self):
+        """La collecte réelle (interfaces locales) n'expose pas la boucle locale"""
+        identity = collect_host_identity()
+
+        assert identity['hostname']
+        assert not any(ip.startswith('127.') for ip in identity['ips'])
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
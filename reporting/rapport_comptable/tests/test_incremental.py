@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour l'ingestion incrémentale des exports cumulés
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules import sage_parser
+from modules.data_processor import calculate_balance
+from modules.incremental import YtdState, ingest_export, row_hashes
+from tests.helpers import ligne_sage
+
+
+class TestIngestionIncrementale:
+    """Tests pour l'état cumulé de l'exercice"""
+
+    @pytest.fixture
+    def octobre(self):
+        """Fixture: export cumulé à fin octobre"""
+        return [
+            ligne_sage('40110000', '011025', 'RAN', 'RAN', 'Fournisseur', '0', '1000', solde='-1000'),
+            ligne_sage('52110000', '051025', 'BQE', 'B01', 'Banque', '500', '0', solde='500'),
+            ligne_sage('52110000', '051025', 'BQE', 'B01', 'Banque', '500', '0', solde='1000'),
+            ligne_sage('60110000', '201025', 'ACH', 'F01', 'Achats', '1000.5', '0', solde='1000.5'),
+        ]
+
+    @pytest.fixture
+    def novembre(self, octobre):
+        """Fixture: export cumulé à fin novembre (octobre + nouvelles écritures, soldes réécrits)"""
+        return [
+            octobre[0],
+            ligne_sage('52110000', '031025', 'BQE', 'B00', 'Banque', '200', '0', solde='200'),
+            ligne_sage('52110000', '051025', 'BQE', 'B01', 'Banque', '500', '0', solde='700'),
+            ligne_sage('52110000', '051025', 'BQE', 'B01', 'Banque', '500', '0', lettrage='A', solde='1200'),
+            ligne_sage('52110000', '101125', 'BQE', 'B02', 'Banque', '0', '300', solde='900'),
+            octobre[3],
+            ligne_sage('60110000', '151125', 'ACH', 'F02', 'Achats', '250', '0', solde='1250.5'),
+        ]
+
+    def test_seul_le_delta_est_parse(self, octobre, novembre):
+        """Les écritures déjà intégrées sont reconnues malgré le solde et le lettrage réécrits"""
+        state = YtdState()
+        state.ingest(octobre)
+        stats = state.ingest(novembre)
+
+        assert stats == {'lignes': 7, 'ajoutees': 3, 'retirees': 0, 'inchangees': 4}
+        assert len(state.entries) == 7
+
+    def test_doublons_et_retraits(self, octobre):
+        """Deux écritures identiques restent deux écritures; une écriture disparue est retirée"""
+        state = YtdState()
+        state.ingest(octobre)
+        stats = state.ingest(octobre[:2] + octobre[3:])
+
+        assert stats['retirees'] == 1
+        assert state.balance().set_index('compte').loc[52110000, 'total_debit'] == 50000
+
+    def test_egal_ingestion_complete(self, octobre, novembre):
+        """Cube et balance incrémentaux = ceux d'une ingestion complète de novembre"""
+        incremental = YtdState()
+        incremental.ingest(octobre)
+        incremental.ingest(novembre)
+        complet = YtdState()
+        complet.ingest(novembre)
+
+        pd.testing.assert_frame_equal(incremental.monthly_cube(), complet.monthly_cube())
+        pd.testing.assert_frame_equal(incremental.balance(), complet.balance())
+
+        cube = complet.monthly_cube().set_index(['compte', 'mois'])
+        assert cube.loc[(60110000, 202510), 'debit'] == 100050
+        assert cube.loc[(60110000, 202511), 'debit'] == 25000
+
+    def test_balance_egale_calculate_balance(self, novembre):
+        """La balance de l'état est celle de calculate_balance sur le grand livre nettoyé"""
+        state = YtdState()
+        state.ingest(novembre)
+        df = sage_parser.clean_data(sage_parser.parse_sage_lines(novembre))
+
+        pd.testing.assert_frame_equal(state.balance(), calculate_balance(df).reset_index(drop=True),
+                                      check_dtype=False)
+
+    def test_empreintes(self, octobre):
+        """L'empreinte ignore le lettrage et le solde, pas les montants"""
+        variantes = [
+            octobre[1].rsplit('\t', 1)[0] + '\t999',
+            octobre[1].replace('\t\t500', '\tX\t500'),
+            octobre[1].replace('\t500\t0', '\t501\t0'),
+        ]
+        hashes = row_hashes([octobre[1]] + variantes)
+
+        assert hashes[0] == hashes[1] == hashes[2]
+        assert hashes[3] != hashes[0]
+
+    def test_sauvegarde(self, octobre, novembre, tmp_path):
+        """L'état enregistré est relu à l'identique et sert à l'export suivant"""
+        octobre_txt = tmp_path / "gl_oct.txt"
+        octobre_txt.write_text('\n'.join(octobre) + '\n', encoding='ISO-8859-1')
+        novembre_txt = tmp_path / "gl_nov.txt"
+        novembre_txt.write_text('\n'.join(novembre) + '\n', encoding='ISO-8859-1')
+        etat = tmp_path / "bimmo.cumul.npz"
+
+        ingest_export(octobre_txt, etat)
+        state, stats = ingest_export(novembre_txt, etat)
+        relu = YtdState.load(etat)
+
+        assert stats['ajoutees'] == 3
+        assert relu.source['fichier'] == "gl_nov.txt"
+        pd.testing.assert_frame_equal(relu.balance(), state.balance())
+        pd.testing.assert_frame_equal(relu.entries, state.entries)
+
+    def test_fichier_invalide(self, tmp_path):
+        """Un fichier qui n'est pas un état cumulé est refusé"""
+        autre = tmp_path / "autre.npz"
+        np.savez(autre, __meta__=np.array('{"format": "autre"}'))
+
+        with pytest.raises(ValueError):
+            YtdState.load(autre)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le rapprochement des comptes intragroupe
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.excel_generator import create_reconciliation_workbook
+from modules.intercompany import pairs_between, reconcile, select_entries
+
+
+def _ledger(lignes):
+    """Grand livre nettoyé minimal: (compte, date, piece, debit, credit) en unités mineures"""
+    df = pd.DataFrame(lignes, columns=['compte', 'date', 'piece', 'debit', 'credit'])
+    df['compte'] = df['compte'].astype('Int64')
+    df['date'] = pd.to_datetime(df['date'])
+    df['journal'] = 'OD'
+    df['libelle'] = 'Intragroupe'
+    df['debit'] = df['debit'].astype('int64')
+    df['credit'] = df['credit'].astype('int64')
+    return df
+
+
+@pytest.fixture
+def ledgers():
+    """Fixture: créance de A sur B (4511) et dette de B envers A (4521)"""
+    ledger_a = _ledger([
+        (45110000, '2025-01-31', 'F01', 100000, 0),      # rapprochée
+        (45110000, '2025-02-28', 'F02', 50000, 0),       # pièce différente chez B
+        (45110000, '2025-03-31', 'F03', 70000, 0),       # comptabilisée 20 jours plus tard chez B
+        (45110000, '2025-04-30', 'F04', 90000, 0),       # absente chez B
+        (70620000, '2025-01-31', 'F01', 0, 100000),      # hors paires
+    ])
+    ledger_b = _ledger([
+        (45210000, '2025-02-02', 'f-01 ', 0, 100000),
+        (45210000, '2025-03-01', 'X99', 0, 50000),
+        (45210000, '2025-04-20', 'F03', 0, 70000),
+        (45210000, '2025-05-15', 'F05', 0, 40000),       # absente chez A
+        (62220000, '2025-01-31', 'F01', 100000, 0),
+    ])
+    return ledger_a, ledger_b
+
+
+class TestIntercompany:
+    """Tests pour l'appariement des écritures réciproques"""
+
+    def test_statuts(self, ledgers):
+        """Chaque écriture est rapprochée, suspecte (avec motif) ou non rapprochée"""
+        resultat = reconcile(*ledgers, [('4511', '4521')])
+
+        assert resultat['rapproches'][['piece_a', 'piece_b', 'montant', 'ecart_jours']].values.tolist() == [
+            ['F01', 'f-01 ', 100000, 2]
+        ]
+        assert resultat['suspects'][['piece_a', 'piece_b', 'motif']].values.tolist() == [
+            ['F02', 'X99', "pièce différente"],
+            ['F03', 'F03', "dates à plus de 5 jours"],
+        ]
+        assert resultat['non_rapproches_a']['piece'].tolist() == ['F04']
+        assert resultat['non_rapproches_b']['piece'].tolist() == ['F05']
+
+    def test_fenetre(self, ledgers):
+        """Une fenêtre plus large rapproche l'écriture décalée de 20 jours"""
+        resultat = reconcile(*ledgers, [('4511', '4521')], fenetre_jours=30)
+
+        assert resultat['rapproches']['piece_a'].tolist() == ['F01', 'F03']
+
+    def test_doublons_un_pour_un(self):
+        """Des écritures identiques sont appariées une à une, à la date la plus proche"""
+        ledger_a = _ledger([(45110000, '2025-01-10', 'F1', 500, 0)] * 3)
+        ledger_b = _ledger([(45210000, '2025-01-10', 'F1', 0, 500),
+                            (45210000, '2025-01-12', 'F1', 0, 500)])
+        resultat = reconcile(ledger_a, ledger_b, [('4511', '4521')])
+
+        assert resultat['rapproches']['ecart_jours'].tolist() == [0, 2]
+        assert len(resultat['non_rapproches_a']) == 1
+        assert resultat['non_rapproches_b'].empty
+
+    def test_sens_contraire(self):
+        """Un montant de même sens des deux côtés n'est pas une contrepartie"""
+        ledger_a = _ledger([(45110000, '2025-01-10', 'F1', 500, 0)])
+        ledger_b = _ledger([(45210000, '2025-01-10', 'F1', 500, 0)])
+        resultat = reconcile(ledger_a, ledger_b, [('4511', '4521')])
+
+        assert resultat['rapproches'].empty and resultat['suspects'].empty
+
+    def test_selection_par_radical(self, ledgers):
+        """Les comptes des paires sont des numéros ou des radicaux; B est en sens contraire"""
+        entrees = select_entries(ledgers[1], ['452', '6222'], sens=-1)
+
+        assert entrees['paire'].tolist() == [0, 0, 0, 0, 1]
+        assert entrees['montant'].tolist() == [100000, 50000, 70000, 40000, -100000]
+
+    def test_synthese(self, ledgers):
+        """Soldes de chaque entité, écart et nombre d'écritures par statut"""
+        synthese = reconcile(*ledgers, [('4511', '4521'), ('7062', '6222')])['synthese']
+
+        assert synthese[['solde_a', 'solde_b', 'ecart']].values.tolist() == [
+            [310000, -260000, 50000],
+            [-100000, 100000, 0],
+        ]
+        assert synthese[['rapproches', 'suspects', 'non_rapproches_a', 'non_rapproches_b']].values.tolist() == [
+            [1, 2, 1, 1],
+            [1, 0, 0, 0],
+        ]
+
+    def test_paires_entre_entites(self):
+        """Les paires sont orientées de A vers B, quel que soit leur ordre dans le fichier"""
+        eliminations = [
+            {'entite_a': 'BIMMO', 'compte_a': '4511', 'entite_b': 'MIMMO', 'compte_b': '4521'},
+            {'entite_a': 'MIMMO', 'compte_a': '4611', 'entite_b': 'BIMMO', 'compte_b': '4621'},
+            {'entite_a': 'BIMMO', 'compte_a': '4512', 'entite_b': 'AUTRE', 'compte_b': '4522'},
+        ]
+
+        assert pairs_between(eliminations, 'BIMMO', 'MIMMO') == [('4511', '4521'), ('4621', '4611')]
+
+    def test_classeur(self, ledgers):
+        """Le classeur contient la synthèse et une feuille par statut, montants en FCFA"""
+        wb = create_reconciliation_workbook(reconcile(*ledgers, [('4511', '4521')]), "BIMMO", "MIMMO")
+
+        assert wb.sheetnames == ["SYNTHESE", "RAPPROCHES", "SUSPECTS",
+                                 "NON RAPPROCHES BIMMO", "NON RAPPROCHES MIMMO"]
+        assert wb["SYNTHESE"]["E2"].value == 500
+        assert (wb["RAPPROCHES"]["A2"].value, wb["RAPPROCHES"]["G2"].value) == ("4511 / 4521", 1000)
+        assert wb["SUSPECTS"]["N3"].value == "dates à plus de 5 jours"
+        assert wb["NON RAPPROCHES MIMMO"]["G2"].value == -400
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour les montants en unités mineures entières
+"""
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.montants import (
+    en_unites, en_fcfa, format_fcfa, colonnes_en_fcfa, etat_en_fcfa, sig_en_fcfa, suivi_en_fcfa
+)
+from modules.data_processor import calculate_balance, generate_bilan_synthetique
+
+
+class TestMontants:
+    """Tests pour la conversion FCFA <-> unités mineures"""
+
+    def test_en_unites(self):
+        """Les montants lus sont convertis exactement en centimes int64"""
+        unites = en_unites(pd.Series(['1200.5', '0.1', '99960', '0.29']))
+
+        assert unites.dtype == 'int64'
+        assert unites.tolist() == [120050, 10, 9996000, 29]
+
+    def test_en_unites_manquants(self):
+        """Les montants manquants ou illisibles restent manquants (Int64)"""
+        unites = en_unites(pd.Series(['12', None, 'abc']))
+
+        assert str(unites.dtype) == 'Int64'
+        assert unites[0] == 1200
+        assert unites.isna().tolist() == [False, True, True]
+
+    def test_sommes_exactes(self):
+        """Une somme de centimes est exacte, contrairement aux décimaux"""
+        unites = en_unites(pd.Series(['0.1'] * 10 + ['-1']))
+
+        assert unites.sum() == 0
+        assert sum([0.1] * 10) - 1 != 0
+
+    def test_en_fcfa(self):
+        """Retour en FCFA: entier si exact, décimal sinon"""
+        assert en_fcfa(110158900) == 1101589
+        assert isinstance(en_fcfa(110158900), int)
+        assert en_fcfa(120050) == 1200.5
+        assert en_fcfa('') == ''
+        assert format_fcfa(-123456) == "-1,234.56 FCFA"
+
+    def test_etats_en_fcfa(self):
+        """États, SIG, suivi et balance sont convertis pour le rendu"""
+        bilan = {'actif': [{'poste': 'Banque', 'radicaux': '52', 'montant': 50000}],
+                 'passif': [], 'total_actif': 50000, 'total_passif': 50000,
+                 'resultat_net': 0, 'ecart': 0}
+        suivi = {'charges': [{'libelle': 'Achats', 'ordre': 10, 'mois_data': {'Janvier': -4720000}}]}
+        balance = pd.DataFrame({'compte': [52100000], 'total_debit': [50000], 'solde': [50000]})
+
+        assert etat_en_fcfa(bilan)['actif'][0]['montant'] == 500
+        assert etat_en_fcfa(bilan)['total_actif'] == 500
+        assert sig_en_fcfa({'ebe': 150})['ebe'] == 1.5
+        assert suivi_en_fcfa(suivi)['charges'][0]['mois_data']['Janvier'] == -47200
+        assert colonnes_en_fcfa(balance, ['total_debit', 'solde'])['solde'].tolist() == [500.0]
+        # L'original n'est pas modifié
+        assert bilan['actif'][0]['montant'] == 50000
+        assert balance['solde'].tolist() == [50000]
+
+    def test_bilan_exact(self):
+        """Un bilan équilibré en centimes a un écart strictement nul"""
+        ledger = pd.DataFrame({
+            'compte': pd.array([52100000, 10100000] * 10, dtype='Int64'),
+            'libelle': ['Banque', 'Capital'] * 10,
+            'debit': [10, 0] * 10,
+            'credit': [0, 10] * 10,
+        })
+
+        bilan = generate_bilan_synthetique(calculate_balance(ledger))
+
+        assert bilan['ecart'] == 0
+        assert isinstance(bilan['total_actif'], int)
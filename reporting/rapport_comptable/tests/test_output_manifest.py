@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le manifeste des rapports générés
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import get_rules_version
+from utils.output_manifest import MANIFEST_FILE_NAME, OutputManifest, compute_inputs
+
+
+class TestComputeInputs:
+    """Tests pour les empreintes des entrées"""
+
+    @pytest.fixture
+    def sources(self, tmp_path):
+        """Fixture: grand livre et mapping client"""
+        gl = tmp_path / "gl.txt"
+        gl.write_text("401000\t010125\tAC\n", encoding='utf-8')
+        mapping = tmp_path / "client.json"
+        mapping.write_text('{"client_name": "CLIENT"}', encoding='utf-8')
+        return gl, mapping
+
+    def test_entrees_stables(self, sources):
+        """Mêmes fichiers et options: mêmes empreintes"""
+        gl, mapping = sources
+        first = compute_inputs(gl, mapping, "v1", {'periode': 'Novembre 2025'}, {'client_code': 'x'})
+        second = compute_inputs(gl, mapping, "v1", {'periode': 'Novembre 2025'}, {'client_code': 'x'})
+
+        assert first == second
+
+    def test_chaque_entree_compte(self, sources):
+        """Modifier le grand livre, le mapping, les règles ou les commentaires change l'empreinte"""
+        gl, mapping = sources
+        reference = compute_inputs(gl, mapping, "v1", {'periode': 'Novembre 2025'})
+
+        assert compute_inputs(gl, mapping, "v2", {'periode': 'Novembre 2025'}) != reference
+        assert compute_inputs(gl, mapping, "v1", {'periode': 'Décembre 2025'}) != reference
+
+        mapping.write_text('{"client_name": "AUTRE"}', encoding='utf-8')
+        assert compute_inputs(gl, mapping, "v1", {'periode': 'Novembre 2025'})['mapping'] != reference['mapping']
+
+        gl.write_text("401000\t020125\tAC\n", encoding='utf-8')
+        assert compute_inputs(gl, mapping, "v1", {'periode': 'Novembre 2025'})['gl'] != reference['gl']
+
+    def test_fichier_de_commentaires(self, sources, tmp_path):
+        """Un fichier de commentaires est pris par son contenu"""
+        gl, mapping = sources
+        commentaires = tmp_path / "commentaires.json"
+        commentaires.write_text('{"bilan": {}}', encoding='utf-8')
+
+        assert compute_inputs(gl, None, "v1", commentaires)['commentaires'] is not None
+        assert compute_inputs(gl, None, "v1")['mapping'] is None
+
+    def test_version_des_regles(self):
+        """La version des règles est stable d'un appel à l'autre"""
+        assert get_rules_version() == get_rules_version()
+        assert len(get_rules_version()) == 16
+
+
+class TestOutputManifest:
+    """Tests pour la réutilisation des rapports inchangés"""
+
+    @pytest.fixture
+    def generated(self, tmp_path):
+        """Fixture: rapport généré et enregistré dans le manifeste"""
+        report = tmp_path / "RAPPORT_1.xlsx"
+        report.write_bytes(b"classeur")
+        inputs = {'gl': 'a', 'mapping': None, 'rules': 'v1', 'commentaires': None, 'options': 'o'}
+        OutputManifest(tmp_path).record('excel', report, inputs)
+        return report, inputs
+
+    def test_reutilisation(self, generated, tmp_path):
+        """Entrées identiques: le fichier existant est retrouvé après rechargement"""
+        report, inputs = generated
+
+        assert (tmp_path / MANIFEST_FILE_NAME).exists()
+        assert OutputManifest(tmp_path).find('excel', inputs) == report
+
+    def test_entrees_modifiees(self, generated, tmp_path):
+        """Une entrée modifiée ou un autre type de fichier: rien à réutiliser"""
+        _, inputs = generated
+        manifest = OutputManifest(tmp_path)
+
+        assert manifest.find('excel', {**inputs, 'gl': 'b'}) is None
+        assert manifest.find('ppt', inputs) is None
+
+    def test_fichier_modifie_ou_supprime(self, generated, tmp_path):
+        """Un fichier modifié ou supprimé depuis sa génération n'est pas réutilisé"""
+        report, inputs = generated
+
+        report.write_bytes(b"modifie")
+        assert OutputManifest(tmp_path).find('excel', inputs) is None
+
+        report.unlink()
+        assert OutputManifest(tmp_path).find('excel', inputs) is None
+
+    def test_sortie_imposee(self, generated, tmp_path):
+        """Avec un fichier de sortie imposé, seul ce fichier peut être réutilisé"""
+        report, inputs = generated
+        manifest = OutputManifest(tmp_path)
+
+        assert manifest.find('excel', inputs, path=report) == report
+        assert manifest.find('excel', inputs, path=tmp_path / "AUTRE.xlsx") is None
+
+    def test_ecrivains_concurrents(self, generated, tmp_path):
+        """Deux manifestes ouverts en même temps conservent les entrées l'un de l'autre"""
+        report, inputs = generated
+        premier = OutputManifest(tmp_path)
+        second = OutputManifest(tmp_path)
+        ppt = tmp_path / "RAPPORT_1.pptx"
+        ppt.write_bytes(b"presentation")
+        autre = tmp_path / "RAPPORT_2.xlsx"
+        autre.write_bytes(b"autre classeur")
+
+        premier.record('ppt', ppt, inputs)
+        second.record('excel', autre, {**inputs, 'gl': 'b'})
+
+        relu = OutputManifest(tmp_path)
+        assert relu.find('excel', inputs) == report
+        assert relu.find('ppt', inputs) == ppt
+        assert relu.find('excel', {**inputs, 'gl': 'b'}) == autre
+        assert sorted(p.name for p in tmp_path.iterdir() if p.name.startswith('.')) == [MANIFEST_FILE_NAME]
+
+
+class TestQuotaEtManifeste:
+    """Un rapport réutilisé ne consomme pas de rapport du quota quotidien"""
+
+    def test_reutilisation_hors_quota(self, tmp_path, monkeypatch):
+        """Seule la première exécution passe par la vérification de la limite quotidienne"""
+        import main
+
+        verifications = []
+        monkeypatch.setattr(main.security, 'security_check',
+                            lambda *args, **kwargs: verifications.append(args) or (True, 'test'))
+        monkeypatch.setattr(main.security, 'log_report_generation', lambda **kwargs: None)
+
+        export = tmp_path / "gl.txt"
+        export.write_text('\n'.join('\t'.join(ligne) for ligne in [
+            ['70620000', '310125', 'VTE', 'F01', 'Loyer', '', '0', '1000', ''],
+            ['41110000', '310125', 'VTE', 'F01', 'Loyer', '', '1000', '0', ''],
+        ]) + '\n', encoding='ISO-8859-1')
+        sorties = {'output_excel': str(tmp_path / "RAPPORT.xlsx"), 'output_ppt': str(tmp_path / "RAPPORT.pptx")}
+
+        assert main.generer_rapport_complet(str(export), sans_ui=True, **sorties)
+        assert main.generer_rapport_complet(str(export), sans_ui=True, **sorties)
+        assert len(verifications) == 1
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour les graphiques natifs du module ppt_generator
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+from pptx import Presentation
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.ppt_generator import (
+    add_monthly_trend_chart,
+    add_sig_waterfall_chart,
+    compute_waterfall_series,
+    get_monthly_totals,
+    get_sig_waterfall_steps,
+)
+
+
+class TestPptCharts:
+    """Tests pour les graphiques natifs (cascade des SIG, tendance mensuelle)"""
+
+    @pytest.fixture
+    def sample_sig(self):
+        """Fixture: SIG d'une entreprise de services"""
+        return {
+            'chiffre_affaires': 1000,
+            'valeur_ajoutee': 700,
+            'ebe': 300,
+            'resultat_exploitation': 250,
+            'resultat_net': 200,
+            'achats_marchandises': 0,
+            'charges_externes': 300,
+            'impots_taxes': 50,
+            'charges_personnel': 350,
+            'dotations_amortissements': 50,
+        }
+
+    @pytest.fixture
+    def sample_suivi(self):
+        """Fixture: suivi d'activité au format du classifieur SYSCOHADA"""
+        return {
+            'personnel': [{'libelle': 'Salaires', 'mois_data': {'Janvier': -100, 'Février': -100}}],
+            'charges': [{'libelle': 'Loyer', 'mois_data': {'Janvier': -50, 'Mars': 0}}],
+            'produits': [{'libelle': 'Ventes', 'mois_data': {'Janvier': 400, 'Février': 300}}],
+        }
+
+    def test_waterfall_steps_reach_resultat_net(self, sample_sig):
+        """Les variations successives doivent retomber sur chaque total"""
+        steps = get_sig_waterfall_steps(sample_sig)
+        niveau = 0
+        for libelle, montant, est_total in steps:
+            if est_total:
+                if libelle != "Chiffre d'affaires":
+                    assert niveau == pytest.approx(montant)
+                niveau = montant
+            else:
+                niveau += montant
+        assert steps[-1] == ("Résultat net", 200, True)
+
+    def test_waterfall_series_crossing_zero(self):
+        """Une barre qui traverse l'axe est découpée en parties positive et négative"""
+        steps = [("Total", 100, True), ("Baisse", -150, False), ("Fin", -50, True)]
+        base, positif, negatif = compute_waterfall_series(steps)
+
+        assert base == [0, 0, 0]
+        assert positif == [100, 100, 0]
+        assert negatif == [0, -50, -50]
+
+    def test_waterfall_series_floating_bar(self):
+        """Une variation au-dessus de l'axe flotte sur une base invisible"""
+        steps = [("Total", 100, True), ("Baisse", -30, False)]
+        base, positif, negatif = compute_waterfall_series(steps)
+
+        assert base[1] == 70
+        assert positif[1] == 30
+        assert negatif[1] == 0
+
+    def test_monthly_totals(self, sample_suivi):
+        """Les charges sont sommées en positif et les mois sans mouvement ignorés"""
+        mois, charges, produits = get_monthly_totals(sample_suivi)
+
+        assert mois == ['Janvier', 'Février']
+        assert charges == [150, 100]
+        assert produits == [400, 300]
+
+    def test_native_charts_added(self, sample_sig, sample_suivi):
+        """Les graphiques sont des objets natifs de la slide"""
+        prs = Presentation()
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+
+        add_sig_waterfall_chart(slide, sample_sig, 0.5, 1, 9, 5)
+        add_monthly_trend_chart(slide, sample_suivi, 0.5, 1, 9, 5)
+
+        charts = [shape for shape in slide.shapes if shape.has_chart]
+        assert len(charts) == 2
+        assert len(list(charts[0].chart.plots[0].series)) == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
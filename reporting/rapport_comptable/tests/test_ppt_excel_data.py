@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour l'extraction des tableaux Excel depuis le classeur en mémoire
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import numpy as np
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.ppt_generator import EXCEL_RANGES, extract_excel_ranges, extract_workbook_ranges
+
+
+class TestExtractWorkbookRanges:
+    """Le classeur en mémoire doit donner les mêmes valeurs que le fichier relu"""
+
+    @pytest.fixture
+    def workbook(self):
+        """Fixture: classeur avec formules, chaînes vides, flottants entiers et numpy"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "BILAN SYNTH"
+        ws['A1'] = "ACTIF"
+        ws['B1'] = ''
+        ws['C1'] = 1500.0
+        ws['A2'] = "Total"
+        ws['B2'] = "=SUM(C1:C1)"
+        ws['C2'] = 12.5
+        ws['D2'] = np.float64(3.0)
+        return wb
+
+    def test_identique_au_fichier_relu(self, workbook, tmp_path):
+        """Les valeurs en mémoire correspondent à la relecture data_only du fichier"""
+        ranges = {"BILAN SYNTH": "A1:D2"}
+        excel_path = tmp_path / "rapport.xlsx"
+        workbook.save(excel_path)
+
+        assert extract_workbook_ranges(workbook, ranges) == extract_excel_ranges(str(excel_path), ranges)
+
+    def test_valeurs_normalisees(self, workbook):
+        """Chaîne vide et formule -> None, flottant entier -> int"""
+        data = extract_workbook_ranges(workbook, {"BILAN SYNTH": "A1:D2"})["BILAN SYNTH"]
+
+        assert data[0] == ["ACTIF", None, 1500, None]
+        assert data[1] == ["Total", None, 12.5, 3]
+        assert isinstance(data[1][3], int)
+
+    def test_feuille_absente(self, workbook):
+        """Une feuille absente est ignorée"""
+        assert "SIG" not in extract_workbook_ranges(workbook, {"SIG": "A1:B2"})
+
+
+class TestExtractExcelRanges:
+    """Le PowerPoint lit toutes ses plages en une seule ouverture du classeur"""
+
+    def test_une_seule_ouverture(self, tmp_path, monkeypatch):
+        """Une ouverture de fichier pour toutes les plages de EXCEL_RANGES"""
+        import openpyxl
+
+        wb = Workbook()
+        wb.remove(wb.active)
+        for sheet_name in EXCEL_RANGES:
+            ws = wb.create_sheet(sheet_name)
+            for row in range(1, 8):
+                ws.cell(row=row, column=1, value=f"{sheet_name} {row}")
+        excel_path = tmp_path / "rapport.xlsx"
+        wb.save(excel_path)
+
+        ouvertures = []
+        load_workbook = openpyxl.load_workbook
+
+        def compter(*args, **kwargs):
+            ouvertures.append(args)
+            return load_workbook(*args, **kwargs)
+
+        monkeypatch.setattr(openpyxl, 'load_workbook', compter)
+        data = extract_excel_ranges(str(excel_path), EXCEL_RANGES)
+
+        assert len(ouvertures) == 1
+        assert list(data) == list(EXCEL_RANGES)
+        assert len(data["BILAN SYNTH"]) == 30 and len(data["BILAN SYNTH"][0]) == 6
+        assert data["BG BI SEP"][0][0] == "BG BI SEP 4" and len(data["BG BI SEP"]) == 4
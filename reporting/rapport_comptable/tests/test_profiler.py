@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le profilage par étape
+"""
+
+import json
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import profiler
+from utils.profiler import profile_stage
+
+
+class TestProfiler:
+    """Tests pour les mesures d'étapes et l'export JSON"""
+
+    def test_inactive_profiler_is_noop(self):
+        """Sans --profile, les étapes ne sont pas mesurées"""
+        assert profiler.stop_profiling() is None
+        with profile_stage("parse"):
+            pass
+        assert profiler.stop_profiling() is None
+
+    def test_nested_stages_in_start_order(self, tmp_path):
+        """Les sous-étapes suivent leur parente et portent son préfixe"""
+        profiler.start_profiling({'client': 'TEST'})
+        with profile_stage("excel"):
+            with profile_stage("BILAN SYNTH"):
+                data = [0] * 100000
+            with profile_stage("save"):
+                pass
+        stage_profiler = profiler.stop_profiling()
+
+        output = stage_profiler.save(tmp_path / "rapport_profile.json")
+        report = json.loads(output.read_text(encoding='utf-8'))
+
+        assert report['client'] == 'TEST'
+        assert [s['stage'] for s in report['stages']] == ["excel", "excel/BILAN SYNTH", "excel/save"]
+        parent, enfant = report['stages'][0], report['stages'][1]
+        assert enfant['depth'] == 1
+        assert parent['wall_s'] >= enfant['wall_s']
+        assert parent['peak_mem_mb'] >= enfant['peak_mem_mb'] > 0
+        del data
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
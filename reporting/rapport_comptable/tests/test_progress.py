@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le canal de progression et l'exécution sur thread de travail
+"""
+
+import threading
+import time
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules import excel_generator, ui_interface
+from utils import progress
+from utils.exceptions import ProcessingCancelledError
+from utils.profiler import profile_stage
+
+
+@pytest.fixture
+def channel():
+    """Fixture: canal actif dans le contexte du test"""
+    active = progress.ProgressChannel()
+    progress.start_progress(active)
+    yield active
+    progress.stop_progress()
+
+
+class TestProgressChannel:
+    """Tests pour les événements et l'annulation"""
+
+    def test_evenements(self, channel):
+        """Étapes, sous-étapes (profile_stage) et compteurs sont publiés dans l'ordre"""
+        progress.report_step(1, 4, "Lecture du grand livre")
+        with profile_stage("parse"):
+            pass
+        progress.report_count("écritures", 566)
+
+        events = channel.drain()
+        assert [event['type'] for event in events] == ['step', 'stage', 'count']
+        assert events[1]['stage'] == "parse"
+        assert events[2]['value'] == 566
+        assert channel.drain() == []
+
+    def test_annulation_a_l_etape_suivante(self, channel):
+        """Après annulation, l'étape suivante n'est pas exécutée"""
+        executed = []
+        channel.cancel()
+
+        with pytest.raises(ProcessingCancelledError) as error:
+            with profile_stage("excel"):
+                executed.append("excel")
+
+        assert executed == []
+        assert error.value.stage == "excel"
+
+    def test_sans_canal(self):
+        """Sans canal actif: aucun effet, les appels d'interface sont directs"""
+        progress.report_step(1, 4, "Lecture")
+        progress.check_cancelled()
+        assert progress.call_in_ui(lambda x: x * 2, 21) == 42
+
+
+@pytest.fixture
+def grand_livre():
+    """Fixture: grand livre de 25 écritures (montants en FCFA)"""
+    return pd.DataFrame({
+        'compte': [40110000 + i for i in range(25)],
+        'date': pd.Timestamp('2025-01-10'),
+        'journal': 'AC',
+        'piece': [f"AC{i:03d}" for i in range(25)],
+        'libelle': 'ACHAT',
+        'lettrage': '',
+        'debit': 0.0,
+        'credit': 100.0,
+        'solde': -100.0,
+    })
+
+
+class TestAnnulationDansUneEtape:
+    """Tests pour l'annulation à l'intérieur d'une étape (boucles longues)"""
+
+    @pytest.fixture(autouse=True)
+    def petits_blocs(self, monkeypatch):
+        monkeypatch.setattr(excel_generator, 'CHECKPOINT_ROWS', 5)
+
+    def test_lignes_du_grand_livre_publiees(self, channel, grand_livre):
+        """Le nombre de lignes GL écrites est publié à chaque point de contrôle"""
+        excel_generator.add_grand_livre_sheet(excel_generator.Workbook(), grand_livre)
+
+        counts = [event['value'] for event in channel.drain() if event['type'] == 'count']
+        assert counts == [5, 10, 15, 20, 25]
+
+    def test_feuille_grand_livre(self, channel, grand_livre):
+        """Après annulation, l'écriture du GL BI SEP s'arrête au point de contrôle suivant"""
+        wb = excel_generator.Workbook()
+        channel.cancel()
+
+        with pytest.raises(ProcessingCancelledError):
+            excel_generator.add_grand_livre_sheet(wb, grand_livre)
+
+        # En-tête et 4 écritures: arrêt à la 5e
+        assert wb["GL BI SEP"].max_row == 5
+
+    def test_grand_livre_en_flux(self, channel, grand_livre, tmp_path):
+        """L'enregistrement en flux est interrompu et n'écrit pas de fichier"""
+        wb = excel_generator.Workbook()
+        excel_generator.add_grand_livre_sheet(wb, grand_livre, en_flux=True)
+        channel.cancel()
+
+        sortie = tmp_path / "flux.xlsx"
+        with pytest.raises(ProcessingCancelledError):
+            excel_generator.save_workbook_streaming(wb, str(sortie), grand_livre)
+        assert not sortie.exists()
+
+    def test_annexes(self, channel):
+        """Après annulation, aucune slide d'annexe n'est ajoutée"""
+        from pptx import Presentation
+        from modules import ppt_generator
+        from modules.data_processor import BalanceIndex
+
+        prs = Presentation()
+        channel.cancel()
+
+        with pytest.raises(ProcessingCancelledError):
+            ppt_generator.add_slides_annexes(prs, balance_index=BalanceIndex([]))
+        assert len(prs.slides) == 0
+
+
+class FakeProgressInterface:
+    """Fenêtre de progression sans Tk: scrute le canal comme _poll()"""
+
+    instances = 0
+
+    def __init__(self, channel, state, done, titre):
+        FakeProgressInterface.instances += 1
+        self.channel, self.state, self.done = channel, state, done
+
+    def run(self):
+        while not self.done.done():
+            for event in self.channel.drain():
+                if event['type'] == 'ui':
+                    return event
+                self.state.setdefault('events', []).append(event['type'])
+            time.sleep(0.01)
+        self.state.setdefault('events', []).extend(e['type'] for e in self.channel.drain())
+        return None
+
+
+class TestRunWithProgress:
+    """Tests pour l'exécution du traitement sur un thread de travail"""
+
+    @pytest.fixture(autouse=True)
+    def fake_window(self, monkeypatch):
+        FakeProgressInterface.instances = 0
+        monkeypatch.setattr(ui_interface, 'ProgressInterface', FakeProgressInterface)
+
+    def test_appel_interface_sur_le_thread_principal(self):
+        """Le traitement tourne sur un autre thread; ses fenêtres s'ouvrent sur le thread principal"""
+        main_thread = threading.get_ident()
+
+        def fenetre():
+            return threading.get_ident()
+
+        def work(valeur):
+            progress.report_step(1, 2, "Calcul")
+            ui_thread = progress.call_in_ui(fenetre)
+            return valeur, threading.get_ident(), ui_thread
+
+        valeur, work_thread, ui_thread = ui_interface.run_with_progress(work, 7)
+
+        assert valeur == 7
+        assert work_thread != main_thread
+        assert ui_thread == main_thread
+        assert FakeProgressInterface.instances == 2
+
+    def test_exception_relevee(self):
+        """Une exception du traitement est relevée sur le thread appelant"""
+        def work():
+            raise ValueError("fichier invalide")
+
+        with pytest.raises(ValueError):
+            ui_interface.run_with_progress(work)
+
+    def test_exception_de_fenetre_transmise(self):
+        """Une erreur de fenêtre est transmise au traitement"""
+        def fenetre():
+            raise RuntimeError("fenêtre")
+
+        def work():
+            try:
+                progress.call_in_ui(fenetre)
+            except RuntimeError:
+                return "géré"
+
+        assert ui_interface.run_with_progress(work) == "géré"
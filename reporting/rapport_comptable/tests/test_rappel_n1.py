@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour la colonne "Rappel année N-1" du suivi d'activité
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.data_processor import add_rappel_n1, load_rappel_n1, rappel_n1_signature, MOIS_NOMS
+from modules.excel_generator import add_suivi_activite_sheet
+from modules.syscohada_classifier import aggregate_by_category, aggregate_year_by_category
+from modules.warehouse import LedgerWarehouse
+
+
+@pytest.fixture
+def ledger_n1():
+    """Fixture: grand livre de l'exercice précédent au format de clean_data"""
+    return pd.DataFrame({
+        'compte': pd.array([60110000, 60110000, 62210000, 66110000, 70610000, 70610000, 52110000],
+                           dtype='Int64'),
+        'date': pd.to_datetime(['2024-01-15', '2024-06-10', '2024-03-01', '2024-01-31',
+                                '2024-02-28', None, '2024-02-28']),
+        'libelle': ['Achats', 'Achats', 'Loyer', 'Salaires', 'Ventes', 'Ventes', 'Banque'],
+        'debit': [1000, 500, 2000, 3000, 0, 0, 7000],
+        'credit': [0, 0, 0, 0, 7000, 900, 0],
+    })
+
+
+def _cube(ledger: pd.DataFrame) -> pd.DataFrame:
+    """Débits et crédits par (compte, mois AAAAMM)"""
+    mois = (ledger['date'].dt.year * 100 + ledger['date'].dt.month).fillna(0).astype('int64')
+    return ledger.assign(mois=mois).groupby(['compte', 'mois'], as_index=False)[['debit', 'credit']].sum()
+
+
+class TestRappelN1:
+    """Tests pour les totaux N-1 par catégorie et leur rapprochement"""
+
+    def test_cube_egal_suivi_mensuel(self, ledger_n1):
+        """Les totaux annuels du cube sont ceux du suivi mensuel de l'année N-1"""
+        suivi = aggregate_by_category(ledger_n1, MOIS_NOMS)
+        rappel = aggregate_year_by_category(_cube(ledger_n1))
+
+        for section in ('personnel', 'charges', 'produits'):
+            attendu = {c['libelle']: sum(c['mois_data'].values()) for c in suivi[section]}
+            assert {c['libelle']: c['montant'] for c in rappel[section]} == attendu
+        # Écriture non datée ignorée, comme dans le suivi mensuel
+        assert sum(c['montant'] for c in rappel['produits']) == 7000
+
+    def test_rapprochement_par_categorie(self, ledger_n1):
+        """Chaque catégorie reçoit son montant N-1; une catégorie absente en N est ajoutée"""
+        rappel = aggregate_year_by_category(_cube(ledger_n1))
+        achats = rappel['charges'][0]['libelle']
+        suivi = {
+            'personnel': [],
+            'charges': [{'libelle': achats, 'ordre': 1, 'mois_data': {'Janvier': -800}}],
+            'produits': [],
+        }
+
+        add_rappel_n1(suivi, rappel)
+
+        assert suivi['charges'][0]['rappel_n1'] == -1500
+        assert len(suivi['charges']) == 2
+        assert suivi['charges'][1]['rappel_n1'] == -2000
+        assert sum(suivi['charges'][1]['mois_data'].values()) == 0
+        assert suivi['personnel'][0]['rappel_n1'] == -3000
+
+    def test_sans_rappel(self):
+        """Sans N-1, le suivi est inchangé"""
+        suivi = {'charges': [{'libelle': 'Achats', 'ordre': 1, 'mois_data': {}}]}
+
+        assert add_rappel_n1(suivi, None) == {'charges': [{'libelle': 'Achats', 'ordre': 1, 'mois_data': {}}]}
+
+    def test_lecture_entrepot(self, tmp_path):
+        """Le rappel est lu dans l'entrepôt pour le même client et l'exercice précédent"""
+        export = tmp_path / "gl_2024.txt"
+        export.write_text('\t'.join(['60110000', '150124', 'ACH', 'F1', 'Achats', '', '1000', '0', '1000'])
+                          + '\n', encoding='ISO-8859-1')
+        db_path = tmp_path / "entrepot.sqlite3"
+        LedgerWarehouse(db_path).ingest(export, "BAMBOO IMMO")
+
+        rappel = load_rappel_n1("Bamboo Immo", 2025, db_path)
+
+        assert rappel['charges'][0]['montant'] == -100000
+        assert load_rappel_n1("Bamboo Immo", 2024, db_path) is None
+        assert load_rappel_n1("AUTRE", 2025, db_path) is None
+        assert load_rappel_n1("Bamboo Immo", 2025, tmp_path / "absent.sqlite3") is None
+
+    def test_signature_manifeste(self, tmp_path):
+        """L'empreinte du rappel change quand l'exercice N-1 est importé dans l'entrepôt"""
+        export_n = tmp_path / "gl_2025.txt"
+        export_n.write_text('\t'.join(['60110000', '150125', 'ACH', 'F2', 'Achats', '', '500', '0', '500'])
+                            + '\n', encoding='ISO-8859-1')
+        export_n1 = tmp_path / "gl_2024.txt"
+        export_n1.write_text('\t'.join(['60110000', '150124', 'ACH', 'F1', 'Achats', '', '1000', '0', '1000'])
+                             + '\n', encoding='ISO-8859-1')
+        db_path = tmp_path / "entrepot.sqlite3"
+
+        assert rappel_n1_signature("Bamboo Immo", export_n, db_path) is None
+        LedgerWarehouse(db_path).ingest(export_n, "BAMBOO IMMO")
+        sans_n1 = rappel_n1_signature("Bamboo Immo", export_n, db_path)
+        LedgerWarehouse(db_path).ingest(export_n1, "BAMBOO IMMO")
+        avec_n1 = rappel_n1_signature("Bamboo Immo", export_n, db_path)
+
+        assert sans_n1 is None
+        assert avec_n1 is not None
+        assert avec_n1 == rappel_n1_signature("Bamboo Immo", export_n, db_path)
+
+    def test_colonne_excel(self, ledger_n1):
+        """La feuille SUIVI ACTIVITE écrit le rappel N-1 en colonne C et le total de section"""
+        suivi = {
+            'personnel': [],
+            'charges': [{'libelle': 'Achats', 'ordre': 1, 'mois_data': {'Janvier': -800}, 'rappel_n1': -1500}],
+            'produits': [],
+        }
+        wb = Workbook()
+        add_suivi_activite_sheet(wb, ledger_n1, suivi_data=suivi)
+        ws = wb["SUIVI ACTIVITE"]
+
+        assert ws["C7"].value == -1500
+        assert ws["B8"].value == "Autres charges"
+        assert ws["C8"].value == "=C7"
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le démon de génération de rapports
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.report_daemon import JobQueueFull, ReportDaemon, create_server
+
+
+def wait_for(daemon, job_id, timeout=5.0):
+    """Attend la fin d'un job"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = daemon.get(job_id)
+        if job['status'] in ('termine', 'echec'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} non terminé")
+
+
+class TestReportDaemon:
+    """Tests pour la file de jobs et l'API HTTP locale"""
+
+    def test_job_outputs_returned(self):
+        """Un job terminé expose les chemins générés"""
+        daemon = ReportDaemon(runner=lambda job: {'excel': job['fichier_sage'] + '.xlsx'}, workers=1)
+        job = daemon.submit({'fichier_sage': 'GL.txt', 'client': 'BLUE LEASE'})
+        job = wait_for(daemon, job['job_id'])
+        daemon.shutdown()
+
+        assert job['status'] == 'termine'
+        assert job['outputs'] == {'excel': 'GL.txt.xlsx'}
+
+    def test_failed_job(self):
+        """Une exception du runner marque le job en échec"""
+        def runner(job):
+            raise RuntimeError("fichier illisible")
+
+        daemon = ReportDaemon(runner=runner, workers=1)
+        job = wait_for(daemon, daemon.submit({'fichier_sage': 'GL.txt'})['job_id'])
+        daemon.shutdown()
+
+        assert job['status'] == 'echec'
+        assert job['error'] == "fichier illisible"
+
+    def test_queue_bounded(self):
+        """Au-delà de max_queue jobs en attente, la demande est refusée"""
+        release = threading.Event()
+        daemon = ReportDaemon(runner=lambda job: release.wait(5) and {}, workers=1, max_queue=2)
+        daemon.submit({'fichier_sage': 'a.txt'})
+        daemon.submit({'fichier_sage': 'b.txt'})
+
+        with pytest.raises(JobQueueFull):
+            daemon.submit({'fichier_sage': 'c.txt'})
+
+        release.set()
+        daemon.shutdown()
+
+    def test_finished_jobs_evicted_by_count(self):
+        """Seuls les max_finished derniers jobs terminés sont conservés"""
+        daemon = ReportDaemon(runner=lambda job: {}, workers=1, max_finished=2)
+        job_ids = []
+        for nom in ('a.txt', 'b.txt', 'c.txt'):
+            job_ids.append(daemon.submit({'fichier_sage': nom})['job_id'])
+            wait_for(daemon, job_ids[-1])
+        daemon.shutdown()
+
+        assert daemon.get(job_ids[0]) is None
+        assert [job['job_id'] for job in daemon.list_jobs()] == job_ids[1:]
+
+    def test_finished_jobs_evicted_by_ttl(self):
+        """Un job terminé depuis plus de finished_ttl secondes est oublié"""
+        daemon = ReportDaemon(runner=lambda job: {}, workers=1, finished_ttl=0.05)
+        job_id = daemon.submit({'fichier_sage': 'a.txt'})['job_id']
+        wait_for(daemon, job_id)
+        time.sleep(0.1)
+        daemon.shutdown()
+
+        assert daemon.list_jobs() == []
+        assert daemon.get(job_id) is None
+
+    def test_http_api(self):
+        """POST /jobs puis GET /jobs/<id> via le serveur local"""
+        daemon = ReportDaemon(runner=lambda job: {'ppt': 'rapport.pptx'}, workers=1)
+        server = create_server(daemon, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+        try:
+            request = urllib.request.Request(
+                f"{base_url}/jobs", data=json.dumps({'fichier_sage': 'GL.txt'}).encode('utf-8'),
+                method='POST', headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(request) as response:
+                assert response.status == 202
+                job_id = json.loads(response.read())['job_id']
+
+            wait_for(daemon, job_id)
+            with urllib.request.urlopen(f"{base_url}/jobs/{job_id}") as response:
+                assert json.loads(response.read())['outputs'] == {'ppt': 'rapport.pptx'}
+
+            bad = urllib.request.Request(f"{base_url}/jobs", data=b'{}', method='POST')
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(bad)
+            assert excinfo.value.code == 400
+        finally:
+            server.shutdown()
+            server.server_close()
+            daemon.shutdown()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
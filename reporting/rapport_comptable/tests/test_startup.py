@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du temps de démarrage (imports différés)
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmark_startup import FORBIDDEN_MODULES, measure_startup, parse_importtime
+
+
+class TestStartup:
+    """Tests pour les imports différés de --help et --sans-ui (budgets de temps: benchmark_startup.py)"""
+
+    def test_parse_importtime(self):
+        """La profondeur d'import est déduite de l'indentation"""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        300 | pandas\n"
+            "import time:       200 |        200 |   numpy\n"
+        )
+        assert parse_importtime(stderr) == [("pandas", 0, 300), ("numpy", 1, 200)]
+
+    @pytest.mark.parametrize("path", ["help", "sans-ui"])
+    def test_no_heavy_module_at_startup(self, path):
+        """Aucune bibliothèque lourde n'est chargée avant son étape"""
+        modules = measure_startup(path)['modules']
+        assert [module for module in FORBIDDEN_MODULES[path] if module in modules] == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
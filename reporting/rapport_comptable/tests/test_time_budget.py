@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le budget de temps et la lecture par blocs des gros grands livres
+"""
+
+import contextvars
+import pytest
+import pandas as pd
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules import excel_generator
+from modules.sage_parser import clean_data, count_lines, parse_sage_file
+from openpyxl import Workbook, load_workbook
+from pptx import Presentation
+
+from utils import montants, time_budget
+from utils.exceptions import ProcessingTimeoutError
+from utils.profiler import profile_stage
+
+
+class FakeClock:
+    """Horloge manuelle"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def budget(clock):
+    """Fixture: budget de 10s actif dans le contexte du test"""
+    active = time_budget.TimeBudget(10, clock=clock)
+    time_budget._active_budget.set(active)
+    yield active
+    time_budget.stop_budget()
+
+
+class TestTimeBudget:
+    """Tests pour l'annulation coopérative"""
+
+    def test_etapes_dans_le_budget(self, budget, clock):
+        """Étapes dans le budget: relevées avec leur durée"""
+        with profile_stage("parse"):
+            clock.now += 2
+        with profile_stage("balance"):
+            clock.now += 3
+
+        assert [(s['stage'], s['duree_s']) for s in budget.stages] == [("parse", 2), ("balance", 3)]
+
+    def test_depassement_en_fin_d_etape(self, budget, clock):
+        """L'étape qui dépasse le budget lève l'erreur à sa sortie"""
+        with pytest.raises(ProcessingTimeoutError) as error:
+            with profile_stage("excel"):
+                clock.now += 11
+
+        assert error.value.stage == "excel"
+        assert error.value.budget == 10
+        assert error.value.stages[-1]['stage'] == "excel"
+
+    def test_etape_suivante_non_demarree(self, budget, clock):
+        """Budget dépassé: l'étape suivante n'est pas exécutée"""
+        clock.now += 11
+        executed = []
+
+        with pytest.raises(ProcessingTimeoutError):
+            with profile_stage("ppt"):
+                executed.append("ppt")
+
+        assert executed == []
+
+    def test_etape_en_echec(self, budget, clock):
+        """Une étape qui échoue est relevée; son exception n'est pas masquée par le budget"""
+        with pytest.raises(ValueError):
+            with profile_stage("parse"):
+                clock.now += 11
+                raise ValueError("fichier illisible")
+
+        assert budget.stages == [{'stage': "parse", 'debut_s': 0, 'duree_s': 11}]
+
+    def test_pause_exclue(self, budget, clock):
+        """Le temps de saisie utilisateur ne compte pas"""
+        with time_budget.paused():
+            clock.now += 100
+        time_budget.checkpoint("commentaires")
+
+        assert budget.elapsed() == 0
+
+    def test_contexte_copie_vers_un_thread(self, budget, clock):
+        """Le budget suit le contexte copié (thread de travail de l'interface)"""
+        clock.now += 11
+        context = contextvars.copy_context()
+
+        with pytest.raises(ProcessingTimeoutError):
+            context.run(time_budget.checkpoint, "ppt")
+
+    def test_sans_budget(self):
+        """Sans budget actif, aucun contrôle"""
+        time_budget.start_budget(None)
+        time_budget.checkpoint("parse")
+        assert time_budget.current_budget() is None
+
+    def test_rapport(self, budget, clock):
+        """Le rapport liste les étapes et marque l'étape interrompue"""
+        record = budget.enter("excel")
+        clock.now += 11
+        with pytest.raises(ProcessingTimeoutError) as error:
+            budget.check("excel")
+
+        report = time_budget.format_timeout_report(error.value)
+        assert "Étape interrompue: excel" in report
+        assert "interrompue" in report.splitlines()[-1]
+        assert record['duree_s'] is None
+
+
+class TestLectureParBlocs:
+    """Tests pour la lecture par blocs du parser"""
+
+    @pytest.fixture
+    def sage_file(self, tmp_path):
+        """Fixture: export Sage de 25 lignes sans retour à la ligne final"""
+        lines = [
+            f"{40110000 + i}\t{(i % 28) + 1:02d}0125\tAC\tAC{i:03d}\tLIBELLE {i}\t{'A' if i % 3 else ''}\t{i}.5\t0\t{i}.5"
+            for i in range(25)
+        ]
+        path = tmp_path / "gl.txt"
+        path.write_text("\n".join(lines), encoding='ISO-8859-1')
+        return path
+
+    def test_count_lines(self, sage_file):
+        """Toutes les lignes sont comptées, y compris la dernière"""
+        assert count_lines(str(sage_file), block_size=64) == 25
+
+    def test_blocs_identiques_a_la_lecture_complete(self, sage_file):
+        """La lecture par blocs donne le même DataFrame"""
+        pd.testing.assert_frame_equal(
+            parse_sage_file(str(sage_file), chunk_size=7),
+            parse_sage_file(str(sage_file))
+        )
+
+
+@pytest.fixture
+def grand_livre(tmp_path):
+    """Fixture: grand livre de 25 écritures (unités mineures)"""
+    lines = [
+        f"{40110000 + i}\t{(i % 28) + 1:02d}0125\tAC\tAC{i:03d}\tLIBELLE {i}\t\t{i}.5\t0\t{i}.5"
+        for i in range(25)
+    ]
+    path = tmp_path / "gl.txt"
+    path.write_text("\n".join(lines), encoding='ISO-8859-1')
+    return clean_data(parse_sage_file(str(path)))
+
+
+def _classeur_grand_livre(df, en_flux=False):
+    """Classeur réduit à la feuille GL BI SEP"""
+    wb = Workbook()
+    wb.remove(wb.active)
+    excel_generator.add_grand_livre_sheet(
+        wb, montants.colonnes_en_fcfa(df, excel_generator.GRAND_LIVRE_MONTANTS), en_flux=en_flux
+    )
+    return wb
+
+
+class TestGrandLivreEnFlux:
+    """Tests pour l'écriture en flux de la feuille GL BI SEP (grand livre volumineux)"""
+
+    def test_identique_au_classeur_complet(self, grand_livre, tmp_path, monkeypatch):
+        """Le fichier écrit en flux a les mêmes cellules, formats et totaux"""
+        monkeypatch.setattr(excel_generator, 'CHECKPOINT_ROWS', 4)
+
+        _classeur_grand_livre(grand_livre).save(tmp_path / "complet.xlsx")
+        excel_generator.save_workbook_streaming(
+            _classeur_grand_livre(grand_livre, en_flux=True), str(tmp_path / "flux.xlsx"), grand_livre
+        )
+
+        complet = load_workbook(tmp_path / "complet.xlsx")[excel_generator.GRAND_LIVRE_SHEET]
+        flux = load_workbook(tmp_path / "flux.xlsx")[excel_generator.GRAND_LIVRE_SHEET]
+        assert flux.max_row == complet.max_row == len(grand_livre) + 4
+        for ligne_complet, ligne_flux in zip(complet.iter_rows(), flux.iter_rows()):
+            for a, b in zip(ligne_complet, ligne_flux):
+                assert (a.value, a.number_format, a.font.b, a.fill.fgColor.rgb) == \
+                    (b.value, b.number_format, b.font.b, b.fill.fgColor.rgb), a.coordinate
+        assert flux["G27"].value == "=SUM(G2:G26)"
+        assert flux.column_dimensions["B"].width == complet.column_dimensions["B"].width
+
+
+class TestPointsDeControleEnBoucle:
+    """Tests pour le contrôle du budget de temps à l'intérieur d'une étape"""
+
+    def test_feuille_grand_livre(self, budget, clock, grand_livre, monkeypatch):
+        """Le budget est contrôlé toutes les CHECKPOINT_ROWS lignes du GL BI SEP"""
+        monkeypatch.setattr(excel_generator, 'CHECKPOINT_ROWS', 5)
+        clock.now = 11
+
+        wb = Workbook()
+        with pytest.raises(ProcessingTimeoutError) as error:
+            excel_generator.add_grand_livre_sheet(wb, grand_livre)
+
+        assert error.value.stage == "GL BI SEP"
+        # En-tête et 4 écritures: arrêt à la 5e
+        assert wb["GL BI SEP"].max_row == 5
+
+    def test_grand_livre_en_flux(self, budget, clock, grand_livre, tmp_path, monkeypatch):
+        """L'écriture en flux est interrompue de la même façon"""
+        monkeypatch.setattr(excel_generator, 'CHECKPOINT_ROWS', 5)
+        wb = _classeur_grand_livre(grand_livre, en_flux=True)
+        clock.now = 11
+
+        with pytest.raises(ProcessingTimeoutError) as error:
+            excel_generator.save_workbook_streaming(wb, str(tmp_path / "flux.xlsx"), grand_livre)
+        assert error.value.stage == "GL BI SEP"
+
+    def test_annexes(self, budget, clock, monkeypatch):
+        """Le budget est contrôlé avant chaque slide d'annexe"""
+        from config import AnnexeConfig
+        from modules import ppt_generator
+        from modules.data_processor import BalanceIndex
+
+        monkeypatch.setattr(ppt_generator, 'get_annexes_config',
+                            lambda: [AnnexeConfig("Annexe 1 : Fournisseurs", ["401"])])
+        monkeypatch.setattr(ppt_generator, 'get_annexe_lignes_par_slide', lambda: 4)
+        rows = [[f"401{i:03d}", f"Fournisseur {i}", 0, 100, 0, 100] for i in range(10)]
+
+        prs = Presentation()
+        slides_ajoutees = []
+        apply_slide_template = ppt_generator.apply_slide_template
+
+        def apply_slide_template_puis_depasser(slide, *args, **kwargs):
+            apply_slide_template(slide, *args, **kwargs)
+            slides_ajoutees.append(slide)
+            clock.now = 11
+
+        monkeypatch.setattr(ppt_generator, 'apply_slide_template', apply_slide_template_puis_depasser)
+
+        with pytest.raises(ProcessingTimeoutError) as error:
+            ppt_generator.add_slides_annexes(prs, balance_index=BalanceIndex(rows))
+
+        assert error.value.stage == "annexes"
+        assert len(slides_ajoutees) == 1
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour le compteur d'utilisation SQLite
+"""
+
+import json
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.usage_store import UsageStore
+
+
+def _increment(db_path: str) -> bool:
+    """Incrément depuis un processus séparé (nouvelle connexion)"""
+    allowed, _ = UsageStore(Path(db_path)).increment_if_below("batch", "2025-10-01", 1000)
+    return allowed
+
+
+class TestUsageStore:
+    """Tests pour les incréments atomiques, la reprise JSON et la compaction"""
+
+    def test_limit_enforced(self, tmp_path):
+        """Le compteur s'arrête à la limite"""
+        store = UsageStore(tmp_path / "usage.sqlite3")
+        results = [store.increment_if_below("user", "2025-10-01", 2) for _ in range(3)]
+
+        assert results == [(True, 1), (True, 2), (False, 2)]
+        assert store.get_count("user", "2025-10-01") == 2
+
+    def test_parallel_processes_do_not_lose_increments(self, tmp_path):
+        """Des processus concurrents comptent exactement chaque rapport"""
+        db_path = str(tmp_path / "usage.sqlite3")
+        UsageStore(Path(db_path))
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_increment, [db_path] * 40))
+
+        assert all(results)
+        assert UsageStore(Path(db_path)).get_count("batch", "2025-10-01") == 40
+
+    def test_legacy_json_migrated_once(self, tmp_path):
+        """L'ancien fichier usage_tracking.json est repris une seule fois"""
+        legacy = tmp_path / "usage_tracking.json"
+        legacy.write_text(json.dumps({"jean_dupont_2025-10-01": 3}), encoding='utf-8')
+
+        store = UsageStore(tmp_path / "usage.sqlite3", legacy_json=legacy)
+        store.increment_if_below("jean_dupont", "2025-10-01", 4)
+        store = UsageStore(tmp_path / "usage.sqlite3", legacy_json=legacy)
+
+        assert store.get_count("jean_dupont", "2025-10-01") == 4
+
+    def test_report_counted_once(self, tmp_path):
+        """Un rapport déjà compté dans la journée est autorisé sans nouvel incrément"""
+        store = UsageStore(tmp_path / "usage.sqlite3")
+
+        assert store.increment_if_below("user", "2025-10-01", 2, report_key="modele:a") == (True, 1)
+        assert store.increment_if_below("user", "2025-10-01", 2, report_key="modele:a") == (True, 1)
+        assert store.increment_if_below("user", "2025-10-01", 2, report_key="modele:b") == (True, 2)
+        assert store.increment_if_below("user", "2025-10-01", 2, report_key="modele:a") == (True, 2)
+        assert store.increment_if_below("user", "2025-10-01", 2, report_key="modele:c") == (False, 2)
+        assert store.increment_if_below("user", "2025-10-02", 2, report_key="modele:a") == (True, 1)
+
+    def test_compaction_drops_old_days(self, tmp_path):
+        """Le premier rapport d'une journée supprime les jours hors rétention"""
+        store = UsageStore(tmp_path / "usage.sqlite3", retention_days=30)
+        store.increment_if_below("user", "2025-01-01", 4)
+        store.increment_if_below("user", "2025-10-01", 4)
+
+        assert store.get_count("user", "2025-01-01") == 0
+        assert store.get_count("user", "2025-10-01") == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
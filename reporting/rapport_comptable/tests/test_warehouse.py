@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour l'entrepôt local des grands livres
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules import sage_parser
+from modules.data_processor import calculate_balance
+from modules.warehouse import LedgerWarehouse, infer_exercice
+from tests.helpers import ligne_sage
+
+
+def _export(path: Path, lignes) -> Path:
+    """Écrit un export Sage"""
+    path.write_text('\n'.join(lignes) + '\n', encoding='ISO-8859-1')
+    return path
+
+
+class TestLedgerWarehouse:
+    """Tests pour l'ingestion et les lectures de l'entrepôt"""
+
+    @pytest.fixture
+    def octobre(self):
+        """Fixture: export cumulé à fin octobre"""
+        return [
+            ligne_sage('40110000', '010125', 'RAN', 'RAN', 'Fournisseur', '0', '1000', solde='-1000'),
+            ligne_sage('40110000', '150325', 'BQE', 'B01', 'Reglement', '1000', '0'),
+            ligne_sage('52110000', '150325', 'BQE', 'B01', 'Banque', '0', '1000', solde='-1000'),
+            ligne_sage('60110000', '201025', 'ACH', 'F01', 'Achats', '1000.5', '0', solde='1000.5'),
+        ]
+
+    @pytest.fixture
+    def novembre(self, octobre):
+        """Fixture: export cumulé à fin novembre (lettrage ajouté, nouvelles écritures)"""
+        return [
+            octobre[0].replace('\tRAN\tFournisseur\t', '\tRAN\tFournisseur\tA'),
+            octobre[1].replace('\tReglement\t', '\tReglement\tA'),
+            ligne_sage('52110000', '100325', 'VTE', 'V01', 'Encaissement', '400', '0', solde='400'),
+            octobre[2].replace('-1000', '-600'),
+            octobre[3],
+            ligne_sage('60110000', '151125', 'ACH', 'F02', 'Achats', '250', '0', solde='1250.5'),
+        ]
+
+    @pytest.fixture
+    def entrepot(self, tmp_path):
+        """Fixture: entrepôt vide"""
+        return LedgerWarehouse(tmp_path / "entrepot.sqlite3")
+
+    def test_ingestion_incrementale(self, entrepot, octobre, novembre, tmp_path):
+        """Seules les nouvelles écritures sont ajoutées; les exercices et clients sont séparés"""
+        premier = entrepot.ingest(_export(tmp_path / "oct.txt", octobre), "Bamboo Immo")
+        second = entrepot.ingest(_export(tmp_path / "nov.txt", novembre), "BAMBOO IMMO")
+        entrepot.ingest(_export(tmp_path / "n1.txt", [octobre[3].replace('201025', '201024')]),
+                        "BAMBOO IMMO")
+        entrepot.ingest(tmp_path / "oct.txt", "AUTRE CLIENT")
+
+        assert premier['exercice'] == 2025
+        assert (second['ajoutees'], second['retirees'], second['inchangees']) == (2, 0, 4)
+        assert entrepot.clients() == ["AUTRE CLIENT", "BAMBOO IMMO"]
+        assert entrepot.exercices("bamboo immo") == [2024, 2025]
+
+    def test_grand_livre_egal_clean_data(self, entrepot, octobre, novembre, tmp_path):
+        """Le grand livre relu est celui de clean_data sur le dernier export (lettrage et solde compris)"""
+        entrepot.ingest(_export(tmp_path / "oct.txt", octobre), "BAMBOO IMMO")
+        nov = _export(tmp_path / "nov.txt", novembre)
+        entrepot.ingest(nov, "BAMBOO IMMO")
+
+        attendu = sage_parser.clean_data(sage_parser.parse_sage_file(nov))
+        pd.testing.assert_frame_equal(entrepot.ledger("BAMBOO IMMO", 2025), attendu)
+
+    def test_balance(self, entrepot, octobre, novembre, tmp_path):
+        """Balance de l'exercice et balance arrêtée à une fin de mois"""
+        nov = _export(tmp_path / "nov.txt", novembre)
+        entrepot.ingest(nov, "BAMBOO IMMO")
+        df = sage_parser.clean_data(sage_parser.parse_sage_file(nov))
+
+        pd.testing.assert_frame_equal(entrepot.balance("BAMBOO IMMO", 2025),
+                                      calculate_balance(df).reset_index(drop=True), check_dtype=False)
+
+        mars = entrepot.balance("BAMBOO IMMO", 2025, mois_fin=3).set_index('compte')
+        assert mars.loc[52110000, 'solde'] == -60000
+        assert 60110000 not in mars.index
+
+    def test_preparation_perimee(self, entrepot, octobre, novembre, tmp_path):
+        """Une intégration préparée avant une autre intégration du même exercice est recomparée à l'écriture"""
+        nov = _export(tmp_path / "nov.txt", novembre)
+        preparation = entrepot.prepare_ingest(nov, "BAMBOO IMMO")
+        entrepot.ingest(_export(tmp_path / "oct.txt", octobre), "BAMBOO IMMO")
+        stats = entrepot.commit_ingest(preparation)
+
+        assert (stats['ajoutees'], stats['inchangees']) == (2, 4)
+        pd.testing.assert_frame_equal(entrepot.ledger("BAMBOO IMMO", 2025),
+                                      sage_parser.clean_data(sage_parser.parse_sage_file(nov)))
+
+    def test_ecriture_retiree(self, entrepot, octobre, tmp_path):
+        """Une écriture absente du nouvel export est supprimée, avec ses soldes mensuels"""
+        entrepot.ingest(_export(tmp_path / "oct.txt", octobre), "BAMBOO IMMO")
+        stats = entrepot.ingest(_export(tmp_path / "oct2.txt", octobre[:3]), "BAMBOO IMMO")
+
+        assert stats['retirees'] == 1
+        cube = entrepot.monthly_balances("BAMBOO IMMO", 2025)
+        assert 60110000 not in cube['compte'].tolist()
+        assert cube.set_index(['compte', 'mois']).loc[(40110000, 202503), 'debit'] == 100000
+
+    def test_exercice(self, octobre):
+        """L'exercice est l'année la plus fréquente des dates, lue sans parser l'export"""
+        assert infer_exercice(octobre) == 2025
+        assert infer_exercice([ligne_sage('40110000', '', 'OD', 'X', 'Sans date', '1', '0')]) is None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests unitaires pour la surveillance de dossier
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.data_processor import infer_client_from_filename
+from modules.watch_folder import FolderWatcher
+
+
+class FakeDaemon:
+    """File de génération simulée: les jobs se terminent immédiatement"""
+
+    def __init__(self):
+        self.requests = []
+
+    def submit(self, request):
+        self.requests.append(request)
+        return {'job_id': str(len(self.requests))}
+
+    def get(self, job_id):
+        return {'status': 'termine', 'outputs': {'excel': 'rapport.xlsx'}, 'error': None}
+
+
+class TestWatchFolder:
+    """Tests pour l'anti-rebond, les empreintes et la déduction du client"""
+
+    @pytest.fixture
+    def watcher(self, tmp_path):
+        """Fixture: surveillance avec horloge contrôlée"""
+        self.now = 0.0
+        self.daemon = FakeDaemon()
+        return FolderWatcher(tmp_path, self.daemon, debounce=5, clock=lambda: self.now,
+                             infer_client=infer_client_from_filename)
+
+    def test_debounce(self, watcher, tmp_path):
+        """Un fichier n'est soumis qu'après le délai de stabilité"""
+        (tmp_path / "GL BIMMO NOV25.txt").write_text("ligne 1", encoding='utf-8')
+
+        assert watcher.poll() == []
+        self.now = 3
+        assert watcher.poll() == []
+        self.now = 6
+        assert len(watcher.poll()) == 1
+        assert self.daemon.requests[0]['client'] == "BAMBOO IMMO"
+
+    def test_same_content_not_rebuilt(self, watcher, tmp_path):
+        """Un contenu déjà traité (même renommé) n'est pas régénéré"""
+        (tmp_path / "GL BIMMO NOV25.txt").write_text("ligne 1", encoding='utf-8')
+        watcher.poll()
+        self.now = 6
+        watcher.poll()
+
+        (tmp_path / "copie GL BIMMO.txt").write_text("ligne 1", encoding='utf-8')
+        self.now = 7
+        watcher.poll()
+        self.now = 20
+        assert watcher.poll() == []
+        assert len(self.daemon.requests) == 1
+        assert watcher.state_file.exists()
+
+    def test_changed_content_resubmitted(self, watcher, tmp_path):
+        """Un fichier modifié avec un nouveau contenu est régénéré"""
+        export = tmp_path / "GL BIMMO NOV25.txt"
+        export.write_text("ligne 1", encoding='utf-8')
+        watcher.poll()
+        self.now = 6
+        watcher.poll()
+
+        export.write_text("ligne 1\nligne 2", encoding='utf-8')
+        self.now = 7
+        watcher.poll()
+        self.now = 13
+        assert len(watcher.poll()) == 1
+
+    def test_infer_client_from_filename(self):
+        """Le client est reconnu par son nom, son code ou un alias"""
+        assert infer_client_from_filename("GL BIMMO NOV25.txt") == "BAMBOO IMMO"
+        assert infer_client_from_filename("GL_blue_lease_sep25.txt") == "BLUE LEASE"
+        assert infer_client_from_filename("export inconnu.txt") is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Écriture asynchrone du journal d'audit
+
+Gère:
+- File d'attente non bloquante alimentée par le thread principal
+- Thread d'écriture en arrière-plan (enregistrements JSONL)
+- fsync groupé (par lot ou par intervalle de temps)
+- Rotation mensuelle avec compression gzip des mois clos
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Marqueur de fin transmis au thread d'écriture
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Journal d'audit écrit par un thread dédié
+
+    Les appelants ne font qu'un put() dans une file: l'encodage JSON, l'écriture
+    disque, le fsync et la rotation sont faits hors du chemin critique.
+    Fichiers: audit_dir/audit_YYYY-MM.jsonl, compressés en .jsonl.gz une fois le mois clos.
+    """
+
+    def __init__(self, audit_dir: Path, batch_size: int = 50, flush_interval: float = 1.0):
+        """
+        Args:
+            audit_dir: Répertoire des journaux d'audit
+            batch_size: Nombre d'enregistrements au-delà duquel le lot est écrit et synchronisé
+            flush_interval: Délai maximum (secondes) avant écriture d'un lot incomplet
+        """
+        self.audit_dir = Path(audit_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._month: Optional[str] = None
+
+    def log_file_for(self, month: str) -> Path:
+        """Retourne le fichier JSONL du mois (format YYYY-MM)"""
+        return self.audit_dir / f"audit_{month}.jsonl"
+
+    def start(self):
+        """Démarre le thread d'écriture (sans effet s'il tourne déjà)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self.audit_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict):
+        """
+        Met un enregistrement en file d'attente (ne bloque jamais)
+
+        Args:
+            record: Enregistrement sérialisable en JSON, avec une clé 'timestamp' ISO 8601.
+                Les valeurs appelables sont évaluées par le thread d'écriture.
+        """
+        self._queue.put(record)
+
+    def close(self, timeout: float = 5.0):
+        """Vide la file, synchronise le fichier courant et arrête le thread"""
+        if self._thread is None:
+            return
+
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Thread d'écriture
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        """Boucle du thread: regroupe les enregistrements et les écrit par lots"""
+        self._compress_closed_months(current_month=None)
+
+        batch: List[Dict] = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                self._close_file()
+                return
+
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: List[Dict]):
+        """Écrit un lot puis appelle fsync une seule fois par fichier touché"""
+        if not batch:
+            return
+
+        try:
+            for record in batch:
+                # Un enregistrement illisible est ignoré seul, sans perdre le reste du lot
+                try:
+                    record = {
+                        key: value() if callable(value) else value
+                        for key, value in record.items()
+                    }
+                    ligne = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                except Exception as e:
+                    logger.error(f"❌ Enregistrement d'audit ignoré (non sérialisable): {e}")
+                    continue
+
+                month = str(record.get('timestamp', ''))[:7] or time.strftime("%Y-%m")
+                if month != self._month:
+                    self._rotate(month)
+                self._file.write(ligne)
+
+            self._sync()
+        except Exception as e:
+            # L'audit ne doit jamais interrompre la génération d'un rapport
+            logger.error(f"❌ Erreur d'écriture du journal d'audit: {e}")
+
+    def _rotate(self, month: str):
+        """Bascule sur le fichier du mois donné et compresse les mois clos"""
+        self._close_file()
+        self._month = month
+        self._file = open(self.log_file_for(month), 'a', encoding='utf-8')
+        self._compress_closed_months(current_month=month)
+
+    def _sync(self):
+        """Force l'écriture du fichier courant sur disque"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _close_file(self):
+        """Synchronise et ferme le fichier courant"""
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+            self._month = None
+
+    def _compress_closed_months(self, current_month: Optional[str]):
+        """
+        Compresse en gzip les journaux JSONL des mois antérieurs
+
+        Le démon, le mode surveillance et la ligne de commande écrivent dans le
+        même répertoire: la compression se fait sous un verrou fichier, dans un
+        fichier temporaire renommé atomiquement (os.replace). Un mois dont le
+        .jsonl.gz existe déjà n'est jamais recompressé; si son .jsonl n'a pas
+        pu être supprimé (fichier encore ouvert sous Windows), il est conservé.
+
+        Args:
+            current_month: Mois en cours d'écriture (None: mois courant de l'horloge)
+        """
+        current_month = current_month or time.strftime("%Y-%m")
+
+        try:
+            with file_lock(self.audit_dir / ".compression.lock", timeout=0):
+                for path in self.audit_dir.glob("audit_*.jsonl"):
+                    month = path.stem[len("audit_"):]
+                    if month >= current_month:
+                        continue
+                    self._compress(path)
+        except TimeoutError:
+            # Un autre processus compresse déjà les mois clos
+            logger.debug("Compression des journaux d'audit en cours dans un autre processus")
+
+    def _compress(self, path: Path):
+        """Compresse un journal clos en .jsonl.gz puis supprime le .jsonl"""
+        target = path.with_name(f"{path.name}.gz")
+        if target.exists():
+            return
+
+        tmp = None
+        try:
+            with tempfile.NamedTemporaryFile(dir=self.audit_dir, prefix=f".{path.name}.",
+                                             suffix=".gz.tmp", delete=False) as f:
+                tmp = Path(f.name)
+                with open(path, 'rb') as source, gzip.GzipFile(filename=path.name, mode='wb', fileobj=f) as gz:
+                    shutil.copyfileobj(source, gz)
+            os.replace(tmp, target)
+            tmp = None
+            path.unlink()
+        except Exception as e:
+            logger.error(f"❌ Erreur de compression de {path.name}: {e}")
+        finally:
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
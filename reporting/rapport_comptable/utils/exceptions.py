@@ -14,7 +14,10 @@ RapportException (base)
 ├── GenerationError
 │   ├── ExcelGenerationError
 │   └── PowerPointGenerationError
-└── ConfigurationError
+├── ConfigurationError
+└── ProcessingInterrupted
+    ├── ProcessingTimeoutError
+    └── ProcessingCancelledError
 """
 
 
@@ -79,3 +82,39 @@ class PowerPointGenerationError(GenerationError):
 class ConfigurationError(RapportException):
     """Erreur de configuration"""
     pass
+
+
+# ========== Erreurs de Traitement ==========
+
+class ProcessingInterrupted(RapportException):
+    """Traitement arrêté volontairement (budget de temps, annulation): ce n'est pas une erreur de génération"""
+    pass
+
+
+class ProcessingTimeoutError(ProcessingInterrupted):
+    """
+    Budget de temps de traitement dépassé (performance.max_processing_time)
+
+    Attributes:
+        stage: Étape en cours lors du dépassement
+        elapsed: Temps écoulé (secondes)
+        budget: Budget autorisé (secondes)
+        stages: Étapes démarrées [{'stage', 'debut_s', 'duree_s'}]
+    """
+
+    def __init__(self, stage: str, elapsed: float, budget: float, stages=None):
+        self.stage = stage
+        self.elapsed = elapsed
+        self.budget = budget
+        self.stages = list(stages or [])
+        super().__init__(
+            f"Temps de traitement dépassé à l'étape '{stage}': {elapsed:.1f}s > {budget:g}s"
+        )
+
+
+class ProcessingCancelledError(ProcessingInterrupted):
+    """Traitement annulé par l'utilisateur (bouton Annuler de la fenêtre de progression)"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Traitement annulé par l'utilisateur à l'étape '{stage}'")
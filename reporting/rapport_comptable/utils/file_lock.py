@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verrou inter-processus par fichier
+
+Gère:
+- Verrou exclusif par création atomique d'un fichier (O_CREAT | O_EXCL),
+  identique sous Windows et Linux
+- Attente bornée du verrou détenu par un autre processus
+- Reprise d'un verrou abandonné (processus interrompu avant de le libérer)
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LOCK_STALE_AFTER = 600.0   # Secondes au-delà desquelles un verrou est considéré abandonné
+LOCK_POLL_INTERVAL = 0.05  # Secondes entre deux tentatives
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float = 10.0, stale_after: float = LOCK_STALE_AFTER):
+    """
+    Détient un verrou exclusif le temps du bloc with
+
+    Args:
+        lock_path: Fichier verrou (créé puis supprimé)
+        timeout: Attente maximum en secondes (0: une seule tentative)
+        stale_after: Âge en secondes au-delà duquel un verrou existant est repris
+
+    Raises:
+        TimeoutError: Si le verrou est toujours détenu par un autre processus après timeout
+    """
+    lock_path = Path(lock_path)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                age = time.time() - lock_path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age > stale_after:
+                logger.warning(f"⚠️  Verrou abandonné repris: {lock_path.name} ({age:.0f} s)")
+                try:
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Verrou détenu par un autre processus: {lock_path}")
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    try:
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        yield
+    finally:
+        os.close(fd)
+        try:
+            lock_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Identité du poste (nom de machine, adresses IP locales)
+
+Gère:
+- Lecture des adresses des interfaces locales uniquement (aucun trafic réseau)
+- Cache mémoire et cache disque avec durée de validité (TTL)
+"""
+
+import json
+import logging
+import socket
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HOST_IDENTITY_TTL = 24 * 3600  # Une journée
+
+CACHE_FILE = Path(__file__).parent.parent / "usage_data" / "host_identity.json"
+
+_cache: Optional[Dict] = None
+_lock = threading.Lock()
+
+
+def _interface_ips_ioctl() -> List[str]:
+    """Adresses IPv4 des interfaces via ioctl(SIOCGIFADDR) (Linux)"""
+    import fcntl
+
+    SIOCGIFADDR = 0x8915
+    ips = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for _, name in socket.if_nameindex():
+            try:
+                packed = struct.pack('256s', name.encode('utf-8')[:15])
+                addr = fcntl.ioctl(s.fileno(), SIOCGIFADDR, packed)[20:24]
+                ips.append(socket.inet_ntoa(addr))
+            except OSError:
+                # Interface sans adresse IPv4
+                continue
+    return ips
+
+
+def _interface_ips_hostname(hostname: str) -> List[str]:
+    """Adresses IPv4 associées au nom de machine (résolution locale, Windows/macOS)"""
+    try:
+        infos = socket.getaddrinfo(hostname, None, socket.AF_INET)
+    except OSError:
+        return []
+    return [info[4][0] for info in infos]
+
+
+def collect_host_identity() -> Dict:
+    """
+    Collecte le nom de machine et les adresses IP des interfaces locales
+
+    Aucun paquet n'est émis: seules les interfaces du poste sont interrogées.
+
+    Returns:
+        Dictionnaire {'hostname', 'ips', 'collected_at'}
+    """
+    hostname = socket.gethostname()
+
+    ips: List[str] = []
+    if sys.platform.startswith('linux'):
+        try:
+            ips = _interface_ips_ioctl()
+        except Exception as e:
+            logger.debug(f"Lecture des interfaces impossible: {e}")
+    if not ips:
+        ips = _interface_ips_hostname(hostname)
+
+    # Ignorer la boucle locale et les doublons en conservant l'ordre
+    ips = [ip for ip in dict.fromkeys(ips) if not ip.startswith('127.')]
+
+    return {'hostname': hostname, 'ips': ips, 'collected_at': time.time()}
+
+
+def _load_cache_file(cache_file: Path) -> Optional[Dict]:
+    """Lit l'identité mise en cache sur disque (None si absente ou illisible)"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache_file(cache_file: Path, identity: Dict):
+    """Enregistre l'identité sur disque (échec silencieux)"""
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(identity, f)
+    except OSError as e:
+        logger.debug(f"Cache d'identité non enregistré: {e}")
+
+
+def get_host_identity(ttl: float = HOST_IDENTITY_TTL, cache_file: Path = CACHE_FILE) -> Dict:
+    """
+    Retourne l'identité du poste, depuis le cache tant qu'elle est valide
+
+    Args:
+        ttl: Durée de validité du cache en secondes
+        cache_file: Fichier de cache disque
+
+    Returns:
+        Dictionnaire {'hostname', 'ips', 'collected_at'}
+    """
+    global _cache
+
+    with _lock:
+        now = time.time()
+        if _cache is None:
+            _cache = _load_cache_file(cache_file)
+
+        if _cache is None or now - _cache.get('collected_at', 0) > ttl:
+            _cache = collect_host_identity()
+            _save_cache_file(cache_file, _cache)
+
+        return _cache
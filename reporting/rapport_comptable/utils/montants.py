@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Montants en virgule fixe (unités mineures entières)
+
+Les montants du grand livre sont convertis une seule fois à la lecture en
+entiers int64 de centimes de FCFA. Balance, états et cumuls sont alors des
+sommes d'entiers exactes: un bilan équilibré a un écart strictement nul.
+
+La conversion inverse (FCFA décimaux) n'a lieu qu'au rendu: à l'entrée des
+générateurs Excel et PowerPoint et dans les messages affichés.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+UNITES_PAR_FCFA = 100  # Unités mineures par FCFA (centimes)
+
+# Colonnes de montants de la balance (calculate_balance)
+COLONNES_BALANCE = ('total_debit', 'total_credit', 'solde', 'solde_debiteur', 'solde_crediteur')
+
+# Grandeurs des états exprimées en unités mineures
+_CHAMPS_MONTANTS = ('montant', 'total_actif', 'total_passif', 'resultat_net', 'ecart',
+                    'total_charges', 'total_produits', 'resultat')
+
+
+def en_unites(valeurs) -> pd.Series:
+    """
+    Convertit des montants en FCFA (texte ou nombres) en unités mineures int64
+
+    Les montants exportés ont au plus deux décimales: l'arrondi du produit
+    par UNITES_PAR_FCFA est exact jusqu'à 9e13 FCFA.
+
+    Args:
+        valeurs: Série de montants (texte, entiers ou décimaux)
+
+    Returns:
+        Série int64, ou Int64 (nullable) si des montants sont manquants ou illisibles
+    """
+    nombres = pd.to_numeric(pd.Series(valeurs), errors='coerce')
+    unites = (nombres.astype('float64') * UNITES_PAR_FCFA).round()
+    if unites.isna().any():
+        return unites.astype('Int64')
+    return unites.astype('int64')
+
+
+def en_fcfa(unites):
+    """
+    Convertit un montant en unités mineures en FCFA
+
+    Returns:
+        int si le montant est un nombre entier de FCFA, float sinon
+        (les valeurs non numériques sont retournées telles quelles)
+    """
+    if isinstance(unites, (bool, str)) or unites is None:
+        return unites
+    if isinstance(unites, (int, np.integer)):
+        unites = int(unites)
+        if unites % UNITES_PAR_FCFA == 0:
+            return unites // UNITES_PAR_FCFA
+    if pd.isna(unites):
+        return unites
+    return unites / UNITES_PAR_FCFA
+
+
+def format_fcfa(unites) -> str:
+    """Montant affiché avec séparateurs de milliers (ex: "1,101,589.00 FCFA")"""
+    return f"{en_fcfa(unites):,.2f} FCFA"
+
+
+def colonnes_en_fcfa(df: Optional[pd.DataFrame], colonnes: Iterable[str]) -> Optional[pd.DataFrame]:
+    """
+    Copie d'un DataFrame avec les colonnes de montants converties en FCFA (float64)
+
+    Les colonnes absentes ou déjà décimales sont laissées telles quelles.
+    """
+    if df is None:
+        return None
+    df = df.copy()
+    for colonne in colonnes:
+        if colonne in df.columns and pd.api.types.is_integer_dtype(df[colonne]):
+            df[colonne] = df[colonne].astype('float64') / UNITES_PAR_FCFA
+    return df
+
+
+def _lignes_en_fcfa(lignes: List[Dict]) -> List[Dict]:
+    """Postes d'un état ({poste, radicaux, montant}) en FCFA"""
+    return [{**ligne, 'montant': en_fcfa(ligne['montant'])} if 'montant' in ligne else ligne
+            for ligne in lignes]
+
+
+def etat_en_fcfa(etat: Optional[Dict]) -> Optional[Dict]:
+    """
+    Copie d'un bilan ou d'un compte de résultat avec ses montants en FCFA
+
+    Args:
+        etat: Résultat de generate_bilan_synthetique ou generate_cr_synthetique
+
+    Returns:
+        Même structure, montants en FCFA
+    """
+    if etat is None:
+        return None
+    converti = {}
+    for cle, valeur in etat.items():
+        if isinstance(valeur, list):
+            converti[cle] = _lignes_en_fcfa(valeur)
+        elif cle in _CHAMPS_MONTANTS:
+            converti[cle] = en_fcfa(valeur)
+        else:
+            converti[cle] = valeur
+    return converti
+
+
+def sig_en_fcfa(sig: Optional[Dict]) -> Optional[Dict]:
+    """Copie des SIG (dictionnaire plat de montants) en FCFA"""
+    if sig is None:
+        return None
+    return {cle: en_fcfa(valeur) for cle, valeur in sig.items()}
+
+
+def suivi_en_fcfa(suivi_data: Optional[Dict]) -> Optional[Dict]:
+    """Copie du suivi d'activité ({section: [{libelle, ordre, mois_data}]}) en FCFA"""
+    if suivi_data is None:
+        return None
+
+    def convertir(ligne):
+        if not isinstance(ligne, dict):
+            return ligne
+        ligne = dict(ligne)
+        if 'mois_data' in ligne:
+            ligne['mois_data'] = {mois: en_fcfa(montant) for mois, montant in ligne['mois_data'].items()}
+        for champ in ('rappel_n1', 'budget'):
+            if champ in ligne:
+                ligne[champ] = en_fcfa(ligne[champ])
+        if 'entries' in ligne:
+            ligne['entries'] = [convertir(entree) for entree in ligne['entries']]
+        return ligne
+
+    def convertir_section(lignes):
+        if isinstance(lignes, list):
+            return [convertir(ligne) for ligne in lignes]
+        if isinstance(lignes, dict) and 'groups' in lignes:
+            return {**lignes, 'groups': [convertir(ligne) for ligne in lignes['groups']]}
+        if isinstance(lignes, dict):
+            # Ancien format: {mois: montant}
+            return {mois: en_fcfa(montant) for mois, montant in lignes.items()}
+        return lignes
+
+    return {section: convertir_section(lignes) for section, lignes in suivi_data.items()}
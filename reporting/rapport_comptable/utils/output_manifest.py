@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Manifeste des rapports générés (régénération seulement si une entrée change)
+
+Gère:
+- Empreintes des entrées de chaque fichier généré: grand livre, mapping client,
+  version des règles, commentaires et options
+- Réutilisation d'un rapport existant quand aucune entrée n'a changé
+  (le fichier doit être présent et intact: son empreinte est vérifiée)
+- Un manifeste par dossier de sortie (.manifest_rapports.json), écrit atomiquement
+  sous verrou: plusieurs processus (démon, ligne de commande) peuvent y enregistrer
+  leurs rapports sans effacer les entrées des autres
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = ".manifest_rapports.json"
+MANIFEST_LOCK_NAME = ".manifest_rapports.lock"
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Calcule l'empreinte SHA-256 d'un fichier par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_sha256(data) -> str:
+    """Empreinte SHA-256 d'une valeur JSON (clés triées)"""
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    ).hexdigest()
+
+
+def compute_inputs(fichier_sage: Path, mapping_file: Optional[Path], rules_version: str,
+                   commentaires=None, options: Optional[Dict] = None) -> Dict[str, Optional[str]]:
+    """
+    Calcule les empreintes des entrées d'un rapport
+
+    Args:
+        fichier_sage: Grand livre exporté de Sage
+        mapping_file: Fichier JSON du mapping client (None: mapping par défaut)
+        rules_version: Version des règles (config.get_rules_version)
+        commentaires: Fichier de commentaires (Path) ou commentaires (dict), optionnel
+        options: Options influant sur le contenu (client, ...)
+
+    Returns:
+        Dictionnaire {entrée: empreinte}
+    """
+    mapping_file = Path(mapping_file) if mapping_file else None
+    if isinstance(commentaires, (str, Path)):
+        commentaires_hash = file_sha256(Path(commentaires))
+    else:
+        commentaires_hash = data_sha256(commentaires) if commentaires is not None else None
+
+    return {
+        'gl': file_sha256(Path(fichier_sage)),
+        'mapping': file_sha256(mapping_file) if mapping_file and mapping_file.exists() else None,
+        'rules': rules_version,
+        'commentaires': commentaires_hash,
+        'options': data_sha256(options or {}),
+    }
+
+
+class OutputManifest:
+    """
+    Registre des fichiers générés dans un dossier de sortie
+
+    Chaque fichier est enregistré sous son nom avec son type ('excel', 'ppt'),
+    l'empreinte de ses entrées et sa propre empreinte.
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: Dossier de sortie (le manifeste y est enregistré)
+        """
+        self.directory = Path(directory)
+        self.manifest_file = self.directory / MANIFEST_FILE_NAME
+        self.artifacts: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """Charge le manifeste (vide s'il est absent ou illisible)"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('artifacts', {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def _save(self):
+        """Enregistre le manifeste (fichier temporaire propre à l'écrivain, puis os.replace)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.directory,
+                                         prefix=f"{MANIFEST_FILE_NAME}.", suffix=".tmp",
+                                         delete=False) as f:
+            tmp_file = Path(f.name)
+            try:
+                json.dump({'artifacts': self.artifacts}, f, indent=2, ensure_ascii=False)
+            except BaseException:
+                f.close()
+                tmp_file.unlink(missing_ok=True)
+                raise
+        os.replace(tmp_file, self.manifest_file)
+
+    def find(self, kind: str, inputs: Dict, path: Optional[Path] = None) -> Optional[Path]:
+        """
+        Cherche un fichier déjà généré avec les mêmes entrées
+
+        Args:
+            kind: Type de fichier ('excel', 'ppt')
+            inputs: Empreintes des entrées (compute_inputs)
+            path: Fichier de sortie imposé (sinon tout fichier du dossier convient)
+
+        Returns:
+            Chemin du fichier réutilisable le plus récent, ou None
+        """
+        inputs_key = data_sha256(inputs)
+        candidates = sorted(
+            (
+                (entry['generated_at'], name) for name, entry in self.artifacts.items()
+                if entry.get('kind') == kind and entry.get('inputs_key') == inputs_key
+                and (path is None or name == Path(path).name)
+            ),
+            reverse=True
+        )
+
+        for _, name in candidates:
+            artifact = self.directory / name
+            # Fichier supprimé ou modifié depuis sa génération: non réutilisable
+            if artifact.exists() and file_sha256(artifact) == self.artifacts[name].get('sha256'):
+                return artifact
+
+        return None
+
+    def record(self, kind: str, path: Path, inputs: Dict):
+        """
+        Enregistre un fichier généré
+
+        Args:
+            kind: Type de fichier ('excel', 'ppt')
+            path: Fichier généré (dans le dossier du manifeste)
+            inputs: Empreintes des entrées (compute_inputs)
+        """
+        path = Path(path)
+        entry = {
+            'kind': kind,
+            'inputs_key': data_sha256(inputs),
+            'inputs': inputs,
+            'sha256': file_sha256(path),
+            'generated_at': datetime.now().isoformat(timespec='microseconds'),
+        }
+
+        # Relecture sous verrou: les entrées enregistrées entre-temps par
+        # d'autres processus sont conservées
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.directory / MANIFEST_LOCK_NAME):
+            self.artifacts = self._load()
+            self.artifacts[path.name] = entry
+            self._save()
+        logger.debug(f"Manifeste mis à jour: {path.name}")
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage par étape du pipeline (option --profile)
+
+Gère:
+- Temps réel (wall), temps CPU et pic mémoire (tracemalloc, RSS) par étape
+- Étapes imbriquées (ex: "excel/BILAN SYNTH", "ppt/bilan")
+- Export JSON à côté des fichiers générés
+
+Sans profileur actif, profile_stage() ne mesure rien. Chaque étape est aussi
+un point de contrôle du budget de temps (utils.time_budget) et de l'annulation,
+et est signalée à la fenêtre de progression (utils.progress), s'ils sont actifs.
+"""
+
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.progress import report_stage
+from utils.time_budget import current_budget
+
+try:
+    import resource  # Indisponible sous Windows
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_active_profiler: Optional['StageProfiler'] = None
+
+
+def _rss_max_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus en Mo (None si non mesurable)"""
+    if resource is None:
+        return None
+    # ru_maxrss est en Ko sous Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class StageProfiler:
+    """
+    Collecte les mesures des étapes du pipeline
+
+    Le pic tracemalloc est remis à zéro à l'entrée de chaque étape; le pic
+    d'une étape parente inclut celui de ses sous-étapes.
+    """
+
+    def __init__(self, metadata: Optional[Dict] = None):
+        """
+        Args:
+            metadata: Informations ajoutées au rapport (client, fichier source...)
+        """
+        self.metadata = dict(metadata or {})
+        self.stages: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._thread_id = threading.get_ident()
+        self._started_at = datetime.now()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._own_tracemalloc = False
+
+    def start(self):
+        """Démarre le suivi mémoire"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracemalloc = True
+
+    def stop(self):
+        """Arrête le suivi mémoire démarré par ce profileur"""
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+            self._own_tracemalloc = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mesure le bloc comme une étape (imbriquée dans l'étape en cours)"""
+        if threading.get_ident() != self._thread_id:
+            # Mesures par processus: seul le thread du pipeline est profilé
+            yield
+            return
+
+        if self._stack:
+            parent = self._stack[-1]
+            parent['child_peak'] = max(parent['child_peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        # L'entrée est réservée au démarrage: les étapes restent dans l'ordre d'exécution
+        record = {
+            'stage': "/".join([frame['name'] for frame in self._stack] + [name]),
+            'depth': len(self._stack),
+        }
+        self.stages.append(record)
+
+        frame = {
+            'name': name,
+            'child_peak': 0,
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+        }
+        self._stack.append(frame)
+
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+            if self._stack:
+                self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+
+            record.update({
+                'wall_s': round(time.perf_counter() - frame['wall'], 4),
+                'cpu_s': round(time.process_time() - frame['cpu'], 4),
+                'peak_mem_mb': round(peak / (1024 * 1024), 2),
+                'rss_max_mb': _rss_max_mb(),
+            })
+
+    def to_dict(self) -> Dict:
+        """Retourne le rapport de profilage (étapes dans l'ordre de démarrage)"""
+        return {
+            **self.metadata,
+            'started_at': self._started_at.isoformat(timespec='seconds'),
+            'total_wall_s': round(time.perf_counter() - self._wall_start, 4),
+            'total_cpu_s': round(time.process_time() - self._cpu_start, 4),
+            'rss_max_mb': _rss_max_mb(),
+            'stages': self.stages,
+        }
+
+    def save(self, output_path: Path) -> Path:
+        """
+        Enregistre le rapport de profilage en JSON
+
+        Args:
+            output_path: Chemin du fichier JSON
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        output_path = Path(output_path)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        logger.info(f"⏱️ Profil d'exécution enregistré: {output_path}")
+        return output_path
+
+
+def start_profiling(metadata: Optional[Dict] = None) -> StageProfiler:
+    """Active le profilage pour le processus courant"""
+    global _active_profiler
+    _active_profiler = StageProfiler(metadata)
+    _active_profiler.start()
+    return _active_profiler
+
+
+def stop_profiling() -> Optional[StageProfiler]:
+    """Désactive le profilage et retourne le profileur qui était actif"""
+    global _active_profiler
+    profiler, _active_profiler = _active_profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+@contextmanager
+def profile_stage(name: str):
+    """
+    Mesure une étape du pipeline si le profilage est actif
+
+    Args:
+        name: Nom de l'étape (ex: "parse", "BILAN SYNTH")
+
+    Le budget de temps et l'annulation sont contrôlés à l'entrée et à la sortie de
+    l'étape (annulation coopérative); les boucles longues d'une étape (blocs du
+    parser, lignes du GL BI SEP, slides d'annexes) ont leurs propres points de
+    contrôle. Une étape bloquée hors de ces boucles n'est pas interrompue.
+
+    Raises:
+        ProcessingTimeoutError: Si le budget de temps est dépassé à l'entrée ou à la sortie
+        ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+    """
+    report_stage(name)
+
+    budget = current_budget()
+    record = budget.enter(name) if budget is not None else None
+
+    termine = False
+    try:
+        if _active_profiler is None:
+            yield
+        else:
+            with _active_profiler.stage(name):
+                yield
+        termine = True
+    finally:
+        # Durée relevée même si l'étape échoue; l'exception d'origine n'est pas masquée
+        if record is not None:
+            budget.leave(record, check=termine)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Canal de progression entre le thread de traitement et l'interface
+
+Gère:
+- Événements de progression (étape du pipeline, sous-étape, compteurs de lignes)
+  lus par l'interface sans bloquer (file non bloquante, scrutée par after())
+- Demande d'annulation: vérifiée à chaque étape (profile_stage), lève
+  ProcessingCancelledError sur le thread de traitement
+- Appels d'interface (fenêtres Tk) renvoyés au thread principal: Tk ne doit
+  être utilisé que depuis le thread qui l'a créé
+
+Le canal est porté par un ContextVar, comme le budget de temps: sans canal
+actif (mode --sans-ui), toutes les fonctions sont sans effet.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from utils.exceptions import ProcessingCancelledError
+
+_active_channel: ContextVar[Optional['ProgressChannel']] = ContextVar('progress_channel', default=None)
+
+
+class ProgressChannel:
+    """
+    Canal thread de traitement -> interface
+
+    Événements publiés (dictionnaires):
+        {'type': 'step', 'index', 'total', 'label'}   étape principale
+        {'type': 'stage', 'stage'}                    sous-étape (profile_stage)
+        {'type': 'count', 'label', 'value'}           compteur (écritures, comptes...)
+        {'type': 'ui', 'function', 'args', 'kwargs', 'future'}  appel d'interface
+    """
+
+    def __init__(self):
+        self.events: 'queue.SimpleQueue[Dict]' = queue.SimpleQueue()
+        self._cancel = threading.Event()
+        self.current_stage = ""
+
+    def publish(self, event: Dict):
+        """Publie un événement (appelé depuis le thread de traitement)"""
+        self.events.put(event)
+
+    def drain(self) -> List[Dict]:
+        """Retourne les événements en attente sans bloquer (appelé par l'interface)"""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def cancel(self):
+        """Demande l'annulation du traitement (appelé par l'interface)"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """True si l'annulation a été demandée"""
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """
+        Point de contrôle de l'annulation
+
+        Raises:
+            ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+        """
+        if self._cancel.is_set():
+            raise ProcessingCancelledError(self.current_stage)
+
+
+def start_progress(channel: ProgressChannel):
+    """Active le canal de progression pour le contexte courant"""
+    _active_channel.set(channel)
+
+
+def stop_progress():
+    """Désactive le canal de progression du contexte courant"""
+    _active_channel.set(None)
+
+
+def current_channel() -> Optional[ProgressChannel]:
+    """Canal actif du contexte courant (None si aucun)"""
+    return _active_channel.get()
+
+
+def report_step(index: int, total: int, label: str):
+    """Signale le début d'une étape principale (ex: 2/4 "Calcul des états")"""
+    channel = _active_channel.get()
+    if channel is not None:
+        channel.check_cancelled()
+        channel.publish({'type': 'step', 'index': index, 'total': total, 'label': label})
+
+
+def report_stage(stage: str):
+    """
+    Signale le début d'une sous-étape et vérifie l'annulation
+
+    Raises:
+        ProcessingCancelledError: Si l'utilisateur a demandé l'annulation
+    """
+    channel = _active_channel.get()
+    if channel is not None:
+        channel.current_stage = stage
+        channel.check_cancelled()
+        channel.publish({'type': 'stage', 'stage': stage})
+
+
+def report_count(label: str, value: int):
+    """Signale un compteur (ex: "écritures", 566)"""
+    channel = _active_channel.get()
+    if channel is not None:
+        channel.publish({'type': 'count', 'label': label, 'value': value})
+
+
+def check_cancelled():
+    """Vérifie l'annulation (à appeler dans les boucles longues)"""
+    channel = _active_channel.get()
+    if channel is not None:
+        channel.check_cancelled()
+
+
+def call_in_ui(function: Callable, *args, **kwargs):
+    """
+    Exécute un appel d'interface (fenêtre Tk) sur le thread principal
+
+    Sans canal actif, l'appel est fait directement. Sinon le thread de
+    traitement attend que l'interface l'ait exécuté et reçoit son résultat.
+
+    Returns:
+        Résultat de l'appel
+    """
+    channel = _active_channel.get()
+    if channel is None:
+        return function(*args, **kwargs)
+
+    future: Future = Future()
+    channel.publish({'type': 'ui', 'function': function, 'args': args, 'kwargs': kwargs, 'future': future})
+    return future.result()
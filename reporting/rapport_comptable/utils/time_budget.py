@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Budget de temps de traitement (config.json: performance.max_processing_time)
+
+Gère:
+- Annulation coopérative: un point de contrôle à chaque étape du pipeline
+  (profile_stage) et dans les boucles longues (lecture par blocs) lève
+  ProcessingTimeoutError dès que le budget est dépassé
+- Relevé des étapes démarrées et de leur durée pour le rapport d'annulation
+
+L'annulation est coopérative: rien n'interrompt une étape en cours d'exécution.
+Une étape bloquée (appel qui ne rend pas la main) n'est donc jamais annulée;
+un dépassement n'est constaté qu'au point de contrôle suivant.
+
+Le budget est porté par un ContextVar: chaque job du démon a le sien, et le
+thread de travail de l'interface le reçoit via contextvars.copy_context().
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from utils.exceptions import ProcessingTimeoutError
+
+_active_budget: ContextVar[Optional['TimeBudget']] = ContextVar('time_budget', default=None)
+
+
+class TimeBudget:
+    """
+    Échéance d'une génération de rapport
+
+    Les étapes sont relevées à plat dans l'ordre de démarrage (les étapes
+    imbriquées comprises).
+    """
+
+    def __init__(self, max_seconds: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_seconds: Durée maximale du traitement (secondes)
+            clock: Horloge (injectable pour les tests)
+        """
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self.stages: List[Dict] = []
+        self._lock = threading.Lock()
+        self._start = clock()
+
+    def elapsed(self) -> float:
+        """Temps écoulé depuis le début du traitement (secondes)"""
+        return self.clock() - self._start
+
+    def check(self, stage: str):
+        """
+        Point de contrôle
+
+        Raises:
+            ProcessingTimeoutError: Si le budget est dépassé
+        """
+        elapsed = self.elapsed()
+        if elapsed > self.max_seconds:
+            with self._lock:
+                stages = [dict(record) for record in self.stages]
+            raise ProcessingTimeoutError(stage, elapsed, self.max_seconds, stages)
+
+    def exclude(self, seconds: float):
+        """Retire une durée du temps écoulé (attente d'une saisie utilisateur)"""
+        with self._lock:
+            self._start += seconds
+
+    def enter(self, stage: str) -> Dict:
+        """Démarre une étape (après contrôle du budget) et retourne son relevé"""
+        self.check(stage)
+        record = {'stage': stage, 'debut_s': round(self.elapsed(), 3), 'duree_s': None}
+        with self._lock:
+            self.stages.append(record)
+        return record
+
+    def leave(self, record: Dict, check: bool = True):
+        """
+        Termine une étape et contrôle le budget
+
+        Args:
+            record: Relevé retourné par enter()
+            check: Si False, la durée est relevée sans contrôle (étape sortie sur une exception)
+        """
+        with self._lock:
+            record['duree_s'] = round(self.elapsed() - record['debut_s'], 3)
+        if check:
+            self.check(record['stage'])
+
+
+def start_budget(max_seconds: Optional[float]) -> Optional[TimeBudget]:
+    """
+    Active un budget de temps pour le contexte courant
+
+    Args:
+        max_seconds: Durée maximale (None ou 0: pas de limite)
+
+    Returns:
+        Budget actif, ou None sans limite
+    """
+    budget = TimeBudget(max_seconds) if max_seconds else None
+    _active_budget.set(budget)
+    return budget
+
+
+def stop_budget():
+    """Désactive le budget de temps du contexte courant"""
+    _active_budget.set(None)
+
+
+def current_budget() -> Optional[TimeBudget]:
+    """Budget actif du contexte courant (None si aucun)"""
+    return _active_budget.get()
+
+
+def checkpoint(stage: str):
+    """
+    Contrôle le budget actif, s'il y en a un (à appeler dans les boucles longues)
+
+    Raises:
+        ProcessingTimeoutError: Si le budget est dépassé
+    """
+    budget = _active_budget.get()
+    if budget is not None:
+        budget.check(stage)
+
+
+@contextmanager
+def paused():
+    """Exclut le bloc du temps de traitement (ex: saisie des commentaires dans l'interface)"""
+    budget = _active_budget.get()
+    if budget is None:
+        yield
+        return
+
+    start = budget.clock()
+    try:
+        yield
+    finally:
+        budget.exclude(budget.clock() - start)
+
+
+def format_timeout_report(error: ProcessingTimeoutError) -> str:
+    """Rapport lisible des étapes lors d'un dépassement de budget"""
+    lines = [
+        f"Étape interrompue: {error.stage}",
+        f"Temps écoulé: {error.elapsed:.1f}s (budget: {error.budget:g}s)",
+        "Étapes démarrées:",
+    ]
+    for record in error.stages:
+        duree = f"{record['duree_s']:.2f}s" if record['duree_s'] is not None else "interrompue"
+        lines.append(f"   • {record['stage']:<25} début {record['debut_s']:>8.2f}s  {duree}")
+    return "\n".join(lines)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compteur d'utilisation quotidienne (SQLite, mode WAL)
+
+Gère:
+- Incrément atomique du compteur sous limite (plusieurs processus en parallèle)
+- Un seul décompte par rapport identifié (ex: plusieurs rendus d'un même modèle)
+- Reprise unique de l'ancien fichier usage_tracking.json
+- Compaction périodique des jours anciens
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+USAGE_RETENTION_DAYS = 90  # Jours conservés lors de la compaction
+
+
+class UsageStore:
+    """
+    Compteurs de rapports par utilisateur et par jour
+
+    Chaque opération ouvre sa propre connexion: la base peut être partagée
+    entre processus de traitement par lots lancés en parallèle. L'incrément
+    est fait dans une transaction BEGIN IMMEDIATE, donc aucun incrément n'est perdu.
+    """
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None,
+                 retention_days: int = USAGE_RETENTION_DAYS):
+        """
+        Args:
+            db_path: Fichier SQLite des compteurs
+            legacy_json: Ancien fichier usage_tracking.json à reprendre (optionnel)
+            retention_days: Nombre de jours conservés lors de la compaction
+        """
+        self.db_path = Path(db_path)
+        self.retention_days = retention_days
+        self._init_db(legacy_json)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Ouvre une connexion en mode autocommit (transactions explicites)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def _init_db(self, legacy_json: Optional[Path]):
+        """Crée le schéma (WAL) et reprend l'ancien fichier JSON une seule fois"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                " username TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " PRIMARY KEY (username, day))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage_reports ("
+                " username TEXT NOT NULL,"
+                " day TEXT NOT NULL,"
+                " report_key TEXT NOT NULL,"
+                " PRIMARY KEY (username, day, report_key))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            migrated = conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_json_migrated'").fetchone()
+            if not migrated and legacy_json is not None and Path(legacy_json).exists():
+                self._migrate_legacy_json(conn, Path(legacy_json))
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('legacy_json_migrated', '1')")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _migrate_legacy_json(conn: sqlite3.Connection, legacy_json: Path):
+        """Importe les compteurs de usage_tracking.json (clés 'utilisateur_AAAA-MM-JJ')"""
+        try:
+            with open(legacy_json, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Reprise de {legacy_json.name} impossible: {e}")
+            return
+
+        rows = []
+        for key, count in legacy.items():
+            username, _, day = key.rpartition('_')
+            if username and day:
+                rows.append((username, day, int(count)))
+
+        conn.executemany(
+            "INSERT INTO usage VALUES (?, ?, ?) "
+            "ON CONFLICT(username, day) DO UPDATE SET count = MAX(count, excluded.count)",
+            rows
+        )
+        logger.info(f"Reprise de {len(rows)} compteur(s) depuis {legacy_json.name}")
+
+    def get_count(self, username: str, day: str) -> int:
+        """Retourne le nombre de rapports de l'utilisateur pour le jour (AAAA-MM-JJ)"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT count FROM usage WHERE username = ? AND day = ?", (username, day)
+            ).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    def increment_if_below(self, username: str, day: str, limit: int,
+                           report_key: Optional[str] = None) -> Tuple[bool, int]:
+        """
+        Incrémente le compteur du jour si la limite n'est pas atteinte
+
+        Lecture et écriture sont faites dans la même transaction verrouillée.
+        Un rapport déjà compté dans la journée (même report_key) est autorisé
+        sans nouvel incrément, même si la limite est atteinte entre-temps.
+
+        Args:
+            username: Nom d'utilisateur
+            day: Jour (AAAA-MM-JJ)
+            limit: Nombre maximum de rapports pour le jour
+            report_key: Identifiant du rapport (ex: empreinte du modèle rendu), optionnel
+
+        Returns:
+            Tuple (allowed: bool, count: int) - count est la valeur après incrément
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT count FROM usage WHERE username = ? AND day = ?", (username, day)
+            ).fetchone()
+            count = row[0] if row else 0
+
+            if report_key is not None and conn.execute(
+                "SELECT 1 FROM usage_reports WHERE username = ? AND day = ? AND report_key = ?",
+                (username, day, report_key)
+            ).fetchone():
+                conn.execute("COMMIT")
+                return True, count
+
+            if count >= limit:
+                conn.execute("COMMIT")
+                return False, count
+
+            conn.execute(
+                "INSERT INTO usage VALUES (?, ?, 1) "
+                "ON CONFLICT(username, day) DO UPDATE SET count = count + 1",
+                (username, day)
+            )
+            if report_key is not None:
+                conn.execute("INSERT INTO usage_reports VALUES (?, ?, ?)", (username, day, report_key))
+
+            # Premier rapport de la journée: compacter les jours anciens
+            if row is None:
+                self._compact(conn, day)
+
+            conn.execute("COMMIT")
+            return True, count + 1
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _compact(self, conn: sqlite3.Connection, day: str):
+        """Supprime les compteurs plus anciens que la période de rétention"""
+        cutoff = (date.fromisoformat(day) - timedelta(days=self.retention_days)).isoformat()
+        deleted = conn.execute("DELETE FROM usage WHERE day < ?", (cutoff,)).rowcount
+        conn.execute("DELETE FROM usage_reports WHERE day < ?", (cutoff,))
+        if deleted:
+            logger.debug(f"Compaction des compteurs: {deleted} jour(s) supprimé(s)")